@@ -11,6 +11,9 @@ from app.models.schemas import (
     UserRegister, UserResponse, BirthChartResponse, Token, UserCreate, UserUpdateRequest, UserLogin, EmailVerificationResponse
 )
 from app.services.astrology_calculator import calculate_birth_chart
+from app.services.auth_cache import (
+    cache_primary_chart, cache_user, get_cached_primary_chart, get_cached_user, invalidate_user
+)
 from app.services.email_service import generate_verification_code, send_verification_email
 from jose import JWTError, jwt
 from app.core.config import settings
@@ -40,32 +43,84 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 
-def get_current_user(
-    authorization: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
-):
-    """Get current authenticated user from JWT token."""
+def _bearer_token(authorization: Optional[str]) -> Optional[str]:
+    """Token do header "Bearer <token>" (None se ausente ou em outro formato)."""
     if not authorization:
         return None
-    
     try:
-        # Extrair token do header "Bearer <token>"
         scheme, token = authorization.split()
-        if scheme.lower() != "bearer":
-            return None
     except ValueError:
         return None
-    
+    return token if scheme.lower() == "bearer" else None
+
+
+def _decode_token(token: str) -> Optional[dict]:
+    """Payload do JWT verificado (None se inválido ou sem 'sub')."""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            return None
     except JWTError:
         return None
+    return payload if payload.get("sub") is not None else None
+
+
+def get_current_user(
+    authorization: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Get current authenticated user from JWT token.
     
-    user = db.query(User).filter(User.email == email).first()
-    return user
+    Retorna uma cópia somente-leitura do usuário, com cache curto por token
+    (app.services.auth_cache): requisições seguintes com o mesmo token não
+    decodificam o JWT nem consultam o banco. Para alterar o usuário, usar
+    get_current_user_record.
+    """
+    token = _bearer_token(authorization)
+    if token is None:
+        return None
+    
+    cached = get_cached_user(token)
+    if cached is not None:
+        return cached
+    
+    payload = _decode_token(token)
+    if payload is None:
+        return None
+    
+    user = db.query(User).filter(User.email == payload["sub"]).first()
+    if user is None:
+        return None
+    return cache_user(token, user, payload.get("exp"))
+
+
+def get_current_user_record(
+    authorization: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Usuário autenticado como registro do banco (sem cache), para endpoints que o alteram."""
+    token = _bearer_token(authorization)
+    payload = _decode_token(token) if token else None
+    if payload is None:
+        return None
+    return db.query(User).filter(User.email == payload["sub"]).first()
+
+
+def get_primary_birth_chart(user, db: Session):
+    """
+    Mapa astral primário do usuário (cópia somente-leitura, com cache curto)
+    ou None se ele ainda não tiver mapa.
+    """
+    cached = get_cached_primary_chart(user.id)
+    if cached is not None:
+        return cached
+    
+    birth_chart = db.query(BirthChart).filter(
+        BirthChart.user_id == user.id,
+        BirthChart.is_primary == True
+    ).first()
+    if birth_chart is None:
+        return None
+    return cache_primary_chart(user.id, birth_chart)
 
 
 @router.post("/register", response_model=EmailVerificationResponse)
@@ -437,6 +492,7 @@ def get_user_birth_chart(
         
         db.commit()
         db.refresh(birth_chart)
+        invalidate_user(current_user.id)
     except Exception as e:
         # Se houver erro no recálculo, usar dados existentes no banco
         import traceback
@@ -728,7 +784,7 @@ def complete_onboarding(
     Completa o onboarding de um usuário criando seu mapa astral.
     Usado após login Google para coletar dados de nascimento.
     """
-    current_user = get_current_user(authorization, db)
+    current_user = get_current_user_record(authorization, db)
     if not current_user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -785,6 +841,7 @@ def complete_onboarding(
         db.add(db_birth_chart)
         db.commit()
         db.refresh(db_birth_chart)
+        invalidate_user(current_user.id)
         
         # Retornar dados completos com planetas calculados
         return {
@@ -840,7 +897,7 @@ def update_user(
     db: Session = Depends(get_db)
 ):
     """Atualiza informações do usuário e mapa astral."""
-    current_user = get_current_user(authorization, db)
+    current_user = get_current_user_record(authorization, db)
     if not current_user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -897,6 +954,12 @@ def update_user(
                 detail=f"Erro ao calcular mapa astral: {str(e)}"
             )
         
+        # Interpretações geradas para o mapa antigo deixam de valer
+        from app.services.interpretation_cache import birth_key, invalidate_interpretations
+        invalidate_interpretations(db, birth_key(
+            birth_chart.birth_date, birth_chart.birth_time, birth_chart.latitude, birth_chart.longitude
+        ))
+        
         # Atualizar dados do mapa astral
         birth_chart.name = birth_data.name
         birth_chart.birth_date = birth_data.birth_date
@@ -913,6 +976,7 @@ def update_user(
     
     db.commit()
     db.refresh(current_user)
+    invalidate_user(current_user.id)
     
     return {"message": "Dados atualizados com sucesso"}
 
@@ -1,5 +1,8 @@
-from fastapi import APIRouter, HTTPException, status, Header, Depends
+from fastapi import APIRouter, HTTPException, status, Header, Depends, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from typing import Optional, List, Dict, Any
+import asyncio
+import json
 from pydantic import BaseModel
 from datetime import datetime
 from sqlalchemy.orm import Session
@@ -37,14 +40,11 @@ async def get_daily_info(
         
         if authorization:
             try:
-                from app.api.auth import get_current_user
+                from app.api.auth import get_current_user, get_primary_birth_chart
                 current_user = get_current_user(authorization, db)
                 if current_user:
                     # Tentar obter coordenadas do mapa astral
-                    birth_chart = db.query(BirthChart).filter(
-                        BirthChart.user_id == current_user.id,
-                        BirthChart.is_primary == True
-                    ).first()
+                    birth_chart = get_primary_birth_chart(current_user, db)
                     
                     if birth_chart:
                         user_lat = birth_chart.latitude
@@ -105,151 +105,232 @@ class CompleteChartResponse(BaseModel):
     special_points: List[Dict[str, Any]]
     planets_in_houses: List[Dict[str, Any]]  # Lista de dicts com {house: int, planets: List}
 
-@router.post("/interpretation/planet")
-async def get_planet_interpretation(request: PlanetInterpretationRequest, authorization: Optional[str] = Header(None)):
-    try:
-        from app.services.ai_provider_service import get_ai_provider
-        provider = get_ai_provider()
-        
-        if not provider:
-            return {
+# ============================================================================
+# GERAÇÃO COM IA - Execução normal (JSON) e streaming (Server-Sent Events)
+# ============================================================================
+#
+# Cada endpoint de interpretação monta um "plano" de geração:
+#   provider:   provedor de IA (None = resposta pronta em 'result')
+#   generation: argumentos de generate_text (prompts, temperatura, tokens, modelo)
+#   finalize:   função texto gerado -> resposta final do endpoint
+#   meta:       dados enviados no evento 'start' do stream (opcional)
+#   cleaner:    limpeza incremental aplicada aos tokens do stream (opcional)
+# O mesmo plano atende o endpoint JSON e a variante /stream.
+
+
+async def _run_generation_plan(plan: Dict[str, Any]):
+    """Gera o texto completo e retorna a resposta final do endpoint."""
+    provider = plan.get('provider')
+    if provider is None:
+        return plan['result']
+    
+    text = await provider.agenerate_text(**plan['generation'])
+    # finalize pode gravar no cache de interpretações (banco): fora do event loop
+    return await asyncio.to_thread(plan['finalize'], text)
+
+
+def _sse_event(event: str, data: Any) -> str:
+    """Formata um evento Server-Sent Events com payload JSON."""
+    from fastapi.encoders import jsonable_encoder
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data), ensure_ascii=False)}\n\n"
+
+
+def _stream_generation_plan(plan: Dict[str, Any]) -> StreamingResponse:
+    """
+    Envia os tokens do provedor como eventos SSE:
+    - start: provedor e metadados do plano
+    - token: trecho de texto ({"text": ...}), já limpo quando o plano tem cleaner
+    - done: resposta final validada (a mesma do endpoint JSON)
+    - error: falha durante a geração
+    """
+    async def events():
+        provider = plan.get('provider')
+        if provider is None:
+            yield _sse_event('done', plan['result'])
+            return
+        
+        yield _sse_event('start', {'generated_by': provider.get_provider_name(), **plan.get('meta', {})})
+        cleaner_factory = plan.get('cleaner')
+        cleaner = cleaner_factory() if cleaner_factory else None
+        parts = []
+        try:
+            async for chunk in provider.astream_text(**plan['generation']):
+                parts.append(chunk)
+                text = cleaner.feed(chunk) if cleaner else chunk
+                if text:
+                    yield _sse_event('token', {'text': text})
+            if cleaner:
+                text = cleaner.flush()
+                if text:
+                    yield _sse_event('token', {'text': text})
+            yield _sse_event('done', await asyncio.to_thread(plan['finalize'], ''.join(parts)))
+        except Exception as e:
+            import traceback
+            print(f"[ERROR] Erro durante o streaming da interpretação: {e}")
+            print(traceback.format_exc())
+            yield _sse_event('error', {'detail': str(e)})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _prepare_planet_interpretation(request: PlanetInterpretationRequest) -> Dict[str, Any]:
+    """Plano de geração da interpretação de um planeta."""
+    from app.services.ai_provider_service import get_ai_provider
+    provider = get_ai_provider()
+    
+    if not provider:
+        return {
+            'provider': None,
+            'result': {
                 "interpretation": f"Interpretação básica: {request.planet} em {request.sign}" + (f" na Casa {request.house}" if request.house else ""),
                 "generated_by": "none"
             }
-        
-        provider_name = provider.get_provider_name()
-        print(f"[TEST] Gerando com {provider_name} para {request.planet} em {request.sign}")
-        
-        system_prompt = "Você é um astrólogo experiente."
-        user_prompt = f"Explique o que significa ter {request.planet} em {request.sign}{f' na Casa {request.house}' if request.house else ''} no mapa astral."
-        
-        # Usar modelo profissional do Groq (configurável via GROQ_MODEL)
-        from app.core.config import settings
-        groq_model = getattr(settings, 'GROQ_MODEL', 'llama-3.1-8b-instant')
-        # Modelo padrão: llama-3.1-8b-instant (8B - rápido e sempre disponível)
-        # Modelos disponíveis no Groq (verificar quais estão habilitados em console.groq.com):
-        # - llama-3.1-8b-instant (8B - rápido, padrão, sempre disponível)
-        # - llama-3.3-70b-versatile (70B - pode estar bloqueado no projeto)
-        # - mixtral-8x7b-32768 (56B - pode precisar ser habilitado)
-        
-        print(f"[PLANET API] Gerando com modelo profissional Groq: {groq_model}")
-        
-        interpretation = provider.generate_text(
+        }
+    
+    provider_name = provider.get_provider_name()
+    print(f"[TEST] Gerando com {provider_name} para {request.planet} em {request.sign}")
+    
+    system_prompt = "Você é um astrólogo experiente."
+    user_prompt = f"Explique o que significa ter {request.planet} em {request.sign}{f' na Casa {request.house}' if request.house else ''} no mapa astral."
+    
+    # Usar modelo profissional do Groq (configurável via GROQ_MODEL)
+    from app.core.config import settings
+    groq_model = getattr(settings, 'GROQ_MODEL', 'llama-3.1-8b-instant')
+    # Modelo padrão: llama-3.1-8b-instant (8B - rápido e sempre disponível)
+    # Modelos disponíveis no Groq (verificar quais estão habilitados em console.groq.com):
+    # - llama-3.1-8b-instant (8B - rápido, padrão, sempre disponível)
+    # - llama-3.3-70b-versatile (70B - pode estar bloqueado no projeto)
+    # - mixtral-8x7b-32768 (56B - pode precisar ser habilitado)
+    
+    print(f"[PLANET API] Gerando com modelo profissional Groq: {groq_model}")
+    
+    return {
+        'provider': provider,
+        'generation': dict(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
             temperature=0.7,
             max_tokens=3000,  # Tokens suficientes para texto completo e profissional
             model=groq_model
-        )
-        
-        return {
+        ),
+        'finalize': lambda interpretation: {
             "interpretation": interpretation,
             "generated_by": provider_name,
             "model_used": groq_model
-        }
-        
+        },
+        'meta': {'model_used': groq_model}
+    }
+
+
+@router.post("/interpretation/planet")
+async def get_planet_interpretation(request: PlanetInterpretationRequest, authorization: Optional[str] = Header(None)):
+    try:
+        plan = await asyncio.to_thread(_prepare_planet_interpretation, request)
+        return await _run_generation_plan(plan)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro: {str(e)}"
         )
 
-@router.post("/interpretation/chart-ruler")
-async def get_chart_ruler_interpretation(
-    request: ChartRulerInterpretationRequest,
-    authorization: Optional[str] = Header(None)
-):
-    """
-    Obtém interpretação do regente do mapa usando RAG + IA.
-    
-    Body:
-    {
-        "ascendant": "Aquário",
-        "ruler": "Urano",
-        "rulerSign": "Escorpião",
-        "rulerHouse": 3
-    }
-    """
+
+@router.post("/interpretation/planet/stream")
+async def stream_planet_interpretation(request: PlanetInterpretationRequest, authorization: Optional[str] = Header(None)):
+    """Interpretação de um planeta em streaming (text/event-stream)."""
     try:
-        from app.services.ai_provider_service import get_ai_provider
-        from app.services.rag_service_fastembed import get_rag_service
-        
-        provider = get_ai_provider()
-        if not provider:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Serviço de IA não disponível"
-            )
-        
-        ascendant = request.ascendant
-        ruler = request.ruler
-        ruler_sign = request.rulerSign
-        ruler_house = request.rulerHouse
-        
-        if not ascendant or not ruler:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Ascendente e regente são obrigatórios"
-            )
-        
-        # Buscar contexto do RAG
-        rag_service = get_rag_service()
-        context_text = ""
-        sources = []
-        
-        if rag_service:
+        plan = await asyncio.to_thread(_prepare_planet_interpretation, request)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro: {str(e)}"
+        )
+    return _stream_generation_plan(plan)
+
+def _prepare_chart_ruler_interpretation(request: ChartRulerInterpretationRequest) -> Dict[str, Any]:
+    """Plano de geração da interpretação do regente do mapa (RAG + IA)."""
+    from app.services.ai_provider_service import get_ai_provider
+    from app.services.rag_service_fastembed import get_rag_service
+    
+    provider = get_ai_provider()
+    if not provider:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Serviço de IA não disponível"
+        )
+    
+    ascendant = request.ascendant
+    ruler = request.ruler
+    ruler_sign = request.rulerSign
+    ruler_house = request.rulerHouse
+    
+    if not ascendant or not ruler:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Ascendente e regente são obrigatórios"
+        )
+    
+    # Buscar contexto do RAG
+    rag_service = get_rag_service()
+    context_text = ""
+    sources = []
+    
+    if rag_service:
+        try:
+            queries = [
+                f"regente do mapa {ruler} ascendente {ascendant} importância significado",
+                f"{ruler} como regente do mapa astral personalidade energia vital",
+                f"planeta regente {ruler} influência comportamento características",
+            ]
+            if ruler_sign:
+                queries.append(f"{ruler} em {ruler_sign} regente do mapa interpretação")
+            if ruler_house:
+                queries.append(f"{ruler} casa {ruler_house} regente do mapa significado")
+            
+            # Todas as consultas em um único lote de embeddings
+            all_results = []
             try:
-                queries = [
-                    f"regente do mapa {ruler} ascendente {ascendant} importância significado",
-                    f"{ruler} como regente do mapa astral personalidade energia vital",
-                    f"planeta regente {ruler} influência comportamento características",
-                ]
-                if ruler_sign:
-                    queries.append(f"{ruler} em {ruler_sign} regente do mapa interpretação")
-                if ruler_house:
-                    queries.append(f"{ruler} casa {ruler_house} regente do mapa significado")
-                
-                all_results = []
-                for q in queries:
-                    try:
-                        results = rag_service.search(q, top_k=6, expand_query=True)
-                        all_results.extend(results)
-                    except Exception as e:
-                        print(f"[WARNING] Erro ao buscar com query '{q}': {e}")
-                
-                # Remover duplicatas
-                seen_texts = set()
-                unique_results = []
-                for result in sorted(all_results, key=lambda x: x.get('score', 0), reverse=True):
-                    text_key = result.get('text', '')[:100]
-                    if text_key not in seen_texts:
-                        seen_texts.add(text_key)
-                        unique_results.append(result)
-                        if len(unique_results) >= 12:
-                            break
-                
-                if unique_results:
-                    context_text = "\n\n".join([
-                        f"--- Documento {i+1} (Fonte: {doc.get('source', 'N/A')}, Página {doc.get('page', 'N/A')}) ---\n{doc.get('text', '')}"
-                        for i, doc in enumerate(unique_results[:12])
-                    ])
-                    sources = [
-                        {
-                            'source': r.get('source', 'N/A'),
-                            'page': r.get('page', 'N/A'),
-                            'relevance': r.get('score', 0)
-                        }
-                        for r in unique_results[:10]
-                    ]
+                for results in rag_service.search_many(queries, top_k=6, expand_query=True):
+                    all_results.extend(results)
             except Exception as e:
                 print(f"[WARNING] Erro ao buscar no RAG: {e}")
-        
-        # Limitar contexto
-        context_limit = min(len(context_text), 4000) if context_text else 0
-        context_snippet = context_text[:context_limit] if context_text else "Informações astrológicas gerais sobre regentes do mapa astral."
-        
-        # Gerar interpretação com IA
-        system_prompt = """Você é um astrólogo experiente especializado em interpretação de regentes do mapa astral.
+            
+            # Remover duplicatas
+            seen_texts = set()
+            unique_results = []
+            for result in sorted(all_results, key=lambda x: x.get('score', 0), reverse=True):
+                text_key = result.get('text', '')[:100]
+                if text_key not in seen_texts:
+                    seen_texts.add(text_key)
+                    unique_results.append(result)
+                    if len(unique_results) >= 12:
+                        break
+            
+            if unique_results:
+                context_text = "\n\n".join([
+                    f"--- Documento {i+1} (Fonte: {doc.get('source', 'N/A')}, Página {doc.get('page', 'N/A')}) ---\n{doc.get('text', '')}"
+                    for i, doc in enumerate(unique_results[:12])
+                ])
+                sources = [
+                    {
+                        'source': r.get('source', 'N/A'),
+                        'page': r.get('page', 'N/A'),
+                        'relevance': r.get('score', 0)
+                    }
+                    for r in unique_results[:10]
+                ]
+        except Exception as e:
+            print(f"[WARNING] Erro ao buscar no RAG: {e}")
+    
+    # Limitar contexto
+    context_limit = min(len(context_text), 4000) if context_text else 0
+    context_snippet = context_text[:context_limit] if context_text else "Informações astrológicas gerais sobre regentes do mapa astral."
+    
+    # Gerar interpretação com IA
+    system_prompt = """Você é um astrólogo experiente especializado em interpretação de regentes do mapa astral.
 Sua função é criar interpretações profundas, didáticas e detalhadas sobre o planeta regente do mapa.
 
 REGRAS:
@@ -259,8 +340,8 @@ REGRAS:
 - Explique termos astrológicos de forma simples
 - Foque na importância do regente para autoconhecimento e desenvolvimento pessoal
 - Seja específico e detalhado, evitando generalidades"""
-        
-        user_prompt = f"""REGENTE DO MAPA ASTRAL:
+    
+    user_prompt = f"""REGENTE DO MAPA ASTRAL:
 
 Ascendente: {ascendant}
 Planeta Regente: {ruler}
@@ -281,25 +362,69 @@ Estruture explicando:
 4. Como o regente revela forças naturais e áreas de atenção
 
 Formate a resposta de forma didática, usando quebras de linha e estruturação adequada."""
-        
-        from app.core.config import settings
-        groq_model = getattr(settings, 'GROQ_MODEL', 'llama-3.1-8b-instant')
-        
-        interpretation = provider.generate_text(
+    
+    from app.core.config import settings
+    groq_model = getattr(settings, 'GROQ_MODEL', 'llama-3.1-8b-instant')
+    
+    provider_name = provider.get_provider_name()
+    return {
+        'provider': provider,
+        'generation': dict(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
             temperature=0.7,
             max_tokens=3000,
             model=groq_model
-        )
-        
-        return {
+        ),
+        'finalize': lambda interpretation: {
             "interpretation": interpretation.strip(),
             "sources": sources,
             "query_used": f"regente do mapa {ruler} (múltiplas queries, {len(sources)} documentos)",
-            "generated_by": provider.get_provider_name()
-        }
-        
+            "generated_by": provider_name
+        },
+        'meta': {'sources': sources}
+    }
+
+
+@router.post("/interpretation/chart-ruler")
+async def get_chart_ruler_interpretation(
+    request: ChartRulerInterpretationRequest,
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Obtém interpretação do regente do mapa usando RAG + IA.
+    
+    Body:
+    {
+        "ascendant": "Aquário",
+        "ruler": "Urano",
+        "rulerSign": "Escorpião",
+        "rulerHouse": 3
+    }
+    """
+    try:
+        plan = await asyncio.to_thread(_prepare_chart_ruler_interpretation, request)
+        return await _run_generation_plan(plan)
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        print(f"[ERROR] Erro ao gerar interpretação do regente: {e}")
+        print(traceback.format_exc())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao gerar interpretação do regente: {str(e)}"
+        )
+
+
+@router.post("/interpretation/chart-ruler/stream")
+async def stream_chart_ruler_interpretation(
+    request: ChartRulerInterpretationRequest,
+    authorization: Optional[str] = Header(None)
+):
+    """Interpretação do regente do mapa em streaming (text/event-stream)."""
+    try:
+        plan = await asyncio.to_thread(_prepare_chart_ruler_interpretation, request)
     except HTTPException:
         raise
     except Exception as e:
@@ -310,6 +435,7 @@ Formate a resposta de forma didática, usando quebras de linha e estruturação
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao gerar interpretação do regente: {str(e)}"
         )
+    return _stream_generation_plan(plan)
 
 def remove_duplicates_planets_in_signs(planets_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
@@ -478,7 +604,7 @@ async def get_future_transits(
         max_transits = max(5, min(20, max_transits))
         
         # Obter usuário autenticado (importação local para evitar circular)
-        from app.api.auth import get_current_user
+        from app.api.auth import get_current_user, get_primary_birth_chart
         current_user = get_current_user(authorization, db)
         if not current_user:
             raise HTTPException(
@@ -487,10 +613,7 @@ async def get_future_transits(
             )
         
         # Obter mapa astral primário do usuário
-        birth_chart = db.query(BirthChart).filter(
-            BirthChart.user_id == current_user.id,
-            BirthChart.is_primary == True
-        ).first()
+        birth_chart = get_primary_birth_chart(current_user, db)
         
         if not birth_chart:
             raise HTTPException(
@@ -665,7 +788,7 @@ async def get_current_personal_transits(
     """
     try:
         # Obter usuário autenticado
-        from app.api.auth import get_current_user
+        from app.api.auth import get_current_user, get_primary_birth_chart
         current_user = get_current_user(authorization, db)
         if not current_user:
             raise HTTPException(
@@ -674,10 +797,7 @@ async def get_current_personal_transits(
             )
         
         # Obter mapa astral primário do usuário
-        birth_chart = db.query(BirthChart).filter(
-            BirthChart.user_id == current_user.id,
-            BirthChart.is_primary == True
-        ).first()
+        birth_chart = get_primary_birth_chart(current_user, db)
         
         if not birth_chart:
             raise HTTPException(
@@ -735,9 +855,8 @@ async def get_current_personal_transits(
                 print(f"[WARNING] Erro ao processar trânsito para hoje: {e}")
                 continue
         
-        # Calcular Lua Fora de Curso
+        # Calcular Lua Fora de Curso (agora, a partir do céu compartilhado)
         moon_void = calculate_moon_void_of_course(
-            check_date=datetime.now(),
             latitude=birth_chart.latitude,
             longitude=birth_chart.longitude
         )
@@ -826,6 +945,56 @@ class BestTimingRequest(BaseModel):
     """Request para cálculo de melhores momentos."""
     action_type: str  # Ex: 'pedir_aumento', 'assinar_contrato', 'primeiro_encontro'
     days_ahead: int = 30  # Quantos dias à frente calcular
+    interval_hours: int = 6  # Intervalo entre horários verificados (1 a 24 horas)
+
+
+class BestTimingAllRequest(BaseModel):
+    """Request para cálculo de melhores momentos de todas as ações."""
+    days_ahead: int = 30  # Quantos dias à frente calcular
+    interval_hours: int = 6  # Intervalo entre horários verificados (1 a 24 horas)
+    action_types: Optional[List[str]] = None  # Padrão: todas as ações
+
+
+def _get_primary_birth_chart_for_timing(authorization: Optional[str], db: Session) -> BirthChart:
+    """Mapa astral primário do usuário autenticado (401/404 se ausente)."""
+    from app.api.auth import get_current_user, get_primary_birth_chart
+    current_user = get_current_user(authorization, db)
+    if not current_user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Não autenticado"
+        )
+    
+    birth_chart = get_primary_birth_chart(current_user, db)
+    
+    if not birth_chart:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Mapa astral não encontrado. Por favor, registre seu mapa astral primeiro."
+        )
+    return birth_chart
+
+
+def _validate_timing_interval(interval_hours: int) -> int:
+    """Valida a granularidade pedida (em horas)."""
+    from app.services.best_timing_calculator import MIN_INTERVAL_HOURS, MAX_INTERVAL_HOURS
+    if not MIN_INTERVAL_HOURS <= interval_hours <= MAX_INTERVAL_HOURS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"interval_hours deve estar entre {MIN_INTERVAL_HOURS} e {MAX_INTERVAL_HOURS}"
+        )
+    return interval_hours
+
+
+def _validate_timing_days_ahead(days_ahead: int) -> int:
+    """Valida quantos dias à frente calcular (acima do máximo, usa o máximo)."""
+    from app.services.best_timing_calculator import MIN_DAYS_AHEAD, MAX_DAYS_AHEAD
+    if days_ahead < MIN_DAYS_AHEAD:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"days_ahead deve ser no mínimo {MIN_DAYS_AHEAD}"
+        )
+    return min(days_ahead, MAX_DAYS_AHEAD)
 
 
 @router.post("/best-timing/calculate")
@@ -850,26 +1019,10 @@ async def calculate_best_timing(
         Lista de melhores momentos com scores e aspectos
     """
     try:
-        # Obter usuário autenticado
-        from app.api.auth import get_current_user
-        current_user = get_current_user(authorization, db)
-        if not current_user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Não autenticado"
-            )
-        
-        # Obter mapa astral primário do usuário
-        birth_chart = db.query(BirthChart).filter(
-            BirthChart.user_id == current_user.id,
-            BirthChart.is_primary == True
-        ).first()
-        
-        if not birth_chart:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Mapa astral não encontrado. Por favor, registre seu mapa astral primeiro."
-            )
+        # Obter mapa astral primário do usuário autenticado
+        birth_chart = _get_primary_birth_chart_for_timing(authorization, db)
+        interval_hours = _validate_timing_interval(request.interval_hours)
+        days_ahead = _validate_timing_days_ahead(request.days_ahead)
         
         # Importar calculador
         from app.services.best_timing_calculator import calculate_best_timing
@@ -881,7 +1034,8 @@ async def calculate_best_timing(
             birth_time=birth_chart.birth_time,
             latitude=birth_chart.latitude,
             longitude=birth_chart.longitude,
-            days_ahead=min(request.days_ahead, 90)  # Máximo 90 dias
+            days_ahead=days_ahead,
+            interval_hours=interval_hours
         )
         
         if 'error' in result:
@@ -924,6 +1078,59 @@ async def calculate_best_timing(
         )
 
 
+@router.post("/best-timing/calculate-all")
+async def calculate_best_timing_all(
+    request: BestTimingAllRequest,
+    authorization: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Calcula os melhores momentos de todas as ações (ou das pedidas) em uma única passada.
+    
+    O céu é calculado uma vez por horário e compartilhado por todas as ações;
+    a granularidade pode chegar a 1 hora (interval_hours).
+    
+    Returns:
+        Dicionário com 'actions' (resultado por ação, mesmo formato de /best-timing/calculate),
+        days_ahead, interval_hours e total_slots
+    """
+    try:
+        birth_chart = _get_primary_birth_chart_for_timing(authorization, db)
+        interval_hours = _validate_timing_interval(request.interval_hours)
+        days_ahead = _validate_timing_days_ahead(request.days_ahead)
+        
+        from app.services.best_timing_calculator import calculate_best_timing_all as calculate_all
+        
+        result = calculate_all(
+            birth_date=birth_chart.birth_date,
+            birth_time=birth_chart.birth_time,
+            latitude=birth_chart.latitude,
+            longitude=birth_chart.longitude,
+            days_ahead=days_ahead,
+            interval_hours=interval_hours,
+            action_types=request.action_types
+        )
+        
+        if 'error' in result:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=result['error']
+            )
+        
+        return result
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        print(f"[ERROR] Erro ao calcular melhores momentos: {e}")
+        print(traceback.format_exc())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao calcular melhores momentos: {str(e)}"
+        )
+
+
 # ============================================================================
 # REVOLUÇÃO SOLAR - Endpoints
 # ============================================================================
@@ -935,6 +1142,11 @@ class SolarReturnRequest(BaseModel):
     latitude: float
     longitude: float
     target_year: Optional[int] = None
+    end_year: Optional[int] = None  # Se informado, calcula de target_year até end_year
+
+
+# Máximo de anos por chamada de /solar-return/calculate
+MAX_SOLAR_RETURN_YEARS = 100
 
 
 class SolarReturnInterpretationRequest(BaseModel):
@@ -995,14 +1207,33 @@ async def calculate_solar_return_chart(
         "birth_time": "14:30",
         "latitude": -23.5505,
         "longitude": -46.6333,
-        "target_year": 2025
+        "target_year": 2025,
+        "end_year": 2030  (opcional)
     }
+    
+    Com end_year, retorna {"solar_returns": [...]} com um mapa por ano
+    (de target_year até end_year), calculados em uma única chamada.
     """
     try:
-        from app.services.swiss_ephemeris_calculator import calculate_solar_return
+        from app.services.swiss_ephemeris_calculator import calculate_solar_return, calculate_solar_returns
         
         birth_date = datetime.fromisoformat(request.birth_date.replace('Z', '+00:00'))
         
+        if request.end_year is not None:
+            start_year = request.target_year or datetime.now().year
+            if request.end_year < start_year or request.end_year - start_year >= MAX_SOLAR_RETURN_YEARS:
+                raise ValueError(
+                    f"Intervalo de anos inválido: use target_year <= end_year e no máximo {MAX_SOLAR_RETURN_YEARS} anos"
+                )
+            solar_returns = calculate_solar_returns(
+                birth_date=birth_date,
+                birth_time=request.birth_time,
+                latitude=request.latitude,
+                longitude=request.longitude,
+                years=list(range(start_year, request.end_year + 1))
+            )
+            return {"solar_returns": solar_returns}
+        
         solar_return = calculate_solar_return(
             birth_date=birth_date,
             birth_time=request.birth_time,
@@ -1025,201 +1256,191 @@ async def calculate_solar_return_chart(
         )
 
 
-@router.post("/solar-return/interpretation", response_model=InterpretationResponse)
-async def get_solar_return_interpretation(
-    request: SolarReturnInterpretationRequest,
-    authorization: Optional[str] = Header(None)
-):
-    """
-    Obtém interpretação da Revolução Solar usando IA.
+def _prepare_solar_return_interpretation(request: SolarReturnInterpretationRequest) -> Dict[str, Any]:
+    """Plano de geração da interpretação da Revolução Solar (cálculo validado + RAG + IA)."""
+    from app.services.rag_service_fastembed import get_rag_service
+    from app.services.ai_provider_service import get_ai_provider
+    from app.services.swiss_ephemeris_calculator import calculate_solar_return
+    from app.services.calculation_validator import (
+        validate_astrological_parameters,
+        validate_calculated_chart_data
+    )
+    from app.api.auth import get_current_user
     
-    IMPORTANTE: Todos os dados são calculados pela biblioteca Swiss Ephemeris (via kerykeion).
-    Os parâmetros são validados antes do cálculo e os dados calculados são validados antes da interpretação.
-    """
-    try:
-        from app.services.rag_service_fastembed import get_rag_service
-        from app.services.ai_provider_service import get_ai_provider
-        from app.services.swiss_ephemeris_calculator import calculate_solar_return
-        from app.services.calculation_validator import (
-            validate_astrological_parameters,
-            validate_calculated_chart_data
+    rag_service = get_rag_service()
+    lang = request.language or 'pt'
+    provider = get_ai_provider()
+    
+    if not provider:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Serviço de IA não disponível"
         )
-        from app.api.auth import get_current_user
-        
-        rag_service = get_rag_service()
-        lang = request.language or 'pt'
-        provider = get_ai_provider()
-        
-        if not provider:
+    
+    # VALIDAÇÃO 1: Validar parâmetros de entrada
+    birth_date = None
+    if request.birth_date:
+        try:
+            birth_date = datetime.fromisoformat(request.birth_date.replace('Z', '+00:00'))
+        except Exception as e:
             raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Serviço de IA não disponível"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Formato de data inválido: {str(e)}"
             )
+    
+    # Validar todos os parâmetros
+    is_valid, error_msg, validated_params = validate_astrological_parameters(
+        birth_date=birth_date,
+        birth_time=request.birth_time,
+        latitude=request.latitude,
+        longitude=request.longitude,
+        target_year=request.target_year
+    )
+    
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Parâmetros inválidos: {error_msg}"
+        )
+    
+    # VALIDAÇÃO 2: Calcular e validar dados usando biblioteca
+    # OBRIGATÓRIO: Sempre recalcular usando Swiss Ephemeris (não aceitar dados do frontend)
+    if not (birth_date and request.birth_time and 
+            request.latitude is not None and request.longitude is not None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Dados completos de nascimento são obrigatórios (data, hora, latitude, longitude) para calcular Revolução Solar"
+        )
+    
+    # VALIDAÇÃO 2: Calcular usando biblioteca (Swiss Ephemeris)
+    # OBRIGATÓRIO: Sempre recalcular usando biblioteca (não aceitar dados do frontend)
+    try:
+        # Normalizar birth_date para naive datetime (remover timezone se presente)
+        # Isso evita problemas de comparação entre offset-aware e offset-naive
+        if birth_date.tzinfo is not None:
+            birth_date_naive = birth_date.replace(tzinfo=None)
+        else:
+            birth_date_naive = birth_date
         
-        # VALIDAÇÃO 1: Validar parâmetros de entrada
-        birth_date = None
-        if request.birth_date:
-            try:
-                birth_date = datetime.fromisoformat(request.birth_date.replace('Z', '+00:00'))
-            except Exception as e:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Formato de data inválido: {str(e)}"
-                )
-        
-        # Validar todos os parâmetros
-        is_valid, error_msg, validated_params = validate_astrological_parameters(
-            birth_date=birth_date,
+        # Calcular usando biblioteca (Swiss Ephemeris via kerykeion)
+        recalculated_data = calculate_solar_return(
+            birth_date=birth_date_naive,
             birth_time=request.birth_time,
             latitude=request.latitude,
             longitude=request.longitude,
             target_year=request.target_year
         )
         
+        # Validar dados calculados
+        is_valid, error = validate_calculated_chart_data(recalculated_data)
         if not is_valid:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Parâmetros inválidos: {error_msg}"
-            )
-        
-        # VALIDAÇÃO 2: Calcular e validar dados usando biblioteca
-        # OBRIGATÓRIO: Sempre recalcular usando Swiss Ephemeris (não aceitar dados do frontend)
-        if not (birth_date and request.birth_time and 
-                request.latitude is not None and request.longitude is not None):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Dados completos de nascimento são obrigatórios (data, hora, latitude, longitude) para calcular Revolução Solar"
-            )
-        
-        # VALIDAÇÃO 2: Calcular usando biblioteca (Swiss Ephemeris)
-        # OBRIGATÓRIO: Sempre recalcular usando biblioteca (não aceitar dados do frontend)
-        try:
-            # Normalizar birth_date para naive datetime (remover timezone se presente)
-            # Isso evita problemas de comparação entre offset-aware e offset-naive
-            if birth_date.tzinfo is not None:
-                birth_date_naive = birth_date.replace(tzinfo=None)
-            else:
-                birth_date_naive = birth_date
-            
-            # Calcular usando biblioteca (Swiss Ephemeris via kerykeion)
-            recalculated_data = calculate_solar_return(
-                birth_date=birth_date_naive,
-                birth_time=request.birth_time,
-                latitude=request.latitude,
-                longitude=request.longitude,
-                target_year=request.target_year
-            )
-            
-            # Validar dados calculados
-            is_valid, error = validate_calculated_chart_data(recalculated_data)
-            if not is_valid:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Dados calculados inválidos: {error}"
-                )
-        except HTTPException:
-            raise  # Relançar HTTPException
-        except Exception as e:
-            import traceback
-            print(f"[ERROR] Erro ao calcular Revolução Solar: {e}")
-            print(traceback.format_exc())
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Erro ao calcular Revolução Solar: {str(e)}"
+                detail=f"Dados calculados inválidos: {error}"
             )
-        
-        # VALIDAÇÃO 3: Calcular mapa natal também para ter dados completos
-        from app.services.swiss_ephemeris_calculator import calculate_birth_chart
-        natal_chart = calculate_birth_chart(
-            birth_date=birth_date_naive,
-            birth_time=request.birth_time,
-            latitude=request.latitude,
-            longitude=request.longitude
+    except HTTPException:
+        raise  # Relançar HTTPException
+    except Exception as e:
+        import traceback
+        print(f"[ERROR] Erro ao calcular Revolução Solar: {e}")
+        print(traceback.format_exc())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao calcular Revolução Solar: {str(e)}"
         )
-        
-        # Validar mapa natal calculado
-        is_valid_natal, error_natal = validate_calculated_chart_data(natal_chart)
-        if not is_valid_natal:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Erro ao validar mapa natal: {error_natal}"
-            )
-        
-        # Extrair dados validados do mapa natal
-        natal_sun_sign = natal_chart.get("sun_sign")
-        natal_sun_house = natal_chart.get("sun_house")
-        natal_ascendant = natal_chart.get("ascendant_sign")
-        natal_moon_sign = natal_chart.get("moon_sign")
-        natal_moon_house = natal_chart.get("moon_house")
-        
-        # Validar que dados essenciais do mapa natal foram calculados
-        if not natal_sun_sign or not natal_ascendant or not natal_moon_sign:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Dados essenciais do mapa natal não foram calculados corretamente"
-            )
-        
-        # Extrair dados validados da revolução solar
-        solar_return_ascendant = recalculated_data.get("ascendant_sign")
-        solar_return_sun_house = recalculated_data.get("sun_house")
-        solar_return_sun_sign = recalculated_data.get("sun_sign")
-        solar_return_moon_sign = recalculated_data.get("moon_sign")
-        solar_return_moon_house = recalculated_data.get("moon_house")
-        
-        # Validar que dados essenciais da revolução solar foram calculados
-        if not solar_return_ascendant or solar_return_sun_house is None:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Dados essenciais da Revolução Solar não foram calculados corretamente"
-            )
-        
-        # Calcular idade corretamente
-        target_year = request.target_year or datetime.now().year
-        birth_year = birth_date_naive.year
-        age = target_year - birth_year
-        
-        # Buscar contexto do RAG - Expandido para incluir outras técnicas
-        queries = [
-            # Revolução Solar (principal)
-            f"revolução solar retorno solar {solar_return_ascendant} casa {solar_return_sun_house}",
-            f"casa {solar_return_sun_house} astrologia revolução solar significado interpretação",
-            
-            # Técnicas Complementares
-            f"progressões secundárias revolução solar complemento técnicas previsão",
-            f"retorno saturno jupiter revolução solar integração análise",
-            f"trânsitos revolução solar ano {request.target_year} previsão astrológica",
-            f"direções primárias profecção anual revolução solar",
-            f"técnicas previsão astrológica complemento revolução solar",
-            
-            # Contexto específico
-            f"ascendente {solar_return_ascendant} revolução solar interpretação",
-            f"lua {solar_return_moon_sign} casa {solar_return_moon_house} revolução solar",
-        ]
-        
-        all_rag_results = []
-        if rag_service:
-            for q in queries:
-                try:
-                    results = rag_service.search(q, top_k=6, expand_query=True)
-                    all_rag_results.extend(results)
-                except Exception as e:
-                    print(f"[WARNING] Erro ao buscar no RAG: {e}")
-        
-        # Remover duplicatas
-        seen_texts = set()
-        unique_results = []
-        for result in sorted(all_rag_results, key=lambda x: x.get('score', 0), reverse=True):
-            text_key = result.get('text', '')[:100]
-            if text_key not in seen_texts:
-                seen_texts.add(text_key)
-                unique_results.append(result)
-                if len(unique_results) >= 15:  # Aumentado para mais contexto
-                    break
-        
-        context_text = "\n\n".join([doc.get('text', '') for doc in unique_results[:12] if doc.get('text')])
-        
-        # Gerar interpretação com IA - Prompt melhorado com separação clara
-        system_prompt = """Você é um Astrólogo Sênior especializado em Revolução Solar e técnicas complementares de previsão astrológica.
+    
+    # VALIDAÇÃO 3: Calcular mapa natal também para ter dados completos
+    from app.services.swiss_ephemeris_calculator import calculate_birth_chart
+    natal_chart = calculate_birth_chart(
+        birth_date=birth_date_naive,
+        birth_time=request.birth_time,
+        latitude=request.latitude,
+        longitude=request.longitude
+    )
+    
+    # Validar mapa natal calculado
+    is_valid_natal, error_natal = validate_calculated_chart_data(natal_chart)
+    if not is_valid_natal:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao validar mapa natal: {error_natal}"
+        )
+    
+    # Extrair dados validados do mapa natal
+    natal_sun_sign = natal_chart.get("sun_sign")
+    natal_sun_house = natal_chart.get("sun_house")
+    natal_ascendant = natal_chart.get("ascendant_sign")
+    natal_moon_sign = natal_chart.get("moon_sign")
+    natal_moon_house = natal_chart.get("moon_house")
+    
+    # Validar que dados essenciais do mapa natal foram calculados
+    if not natal_sun_sign or not natal_ascendant or not natal_moon_sign:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Dados essenciais do mapa natal não foram calculados corretamente"
+        )
+    
+    # Extrair dados validados da revolução solar
+    solar_return_ascendant = recalculated_data.get("ascendant_sign")
+    solar_return_sun_house = recalculated_data.get("sun_house")
+    solar_return_sun_sign = recalculated_data.get("sun_sign")
+    solar_return_moon_sign = recalculated_data.get("moon_sign")
+    solar_return_moon_house = recalculated_data.get("moon_house")
+    
+    # Validar que dados essenciais da revolução solar foram calculados
+    if not solar_return_ascendant or solar_return_sun_house is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Dados essenciais da Revolução Solar não foram calculados corretamente"
+        )
+    
+    # Calcular idade corretamente
+    target_year = request.target_year or datetime.now().year
+    birth_year = birth_date_naive.year
+    age = target_year - birth_year
+    
+    # Buscar contexto do RAG - Expandido para incluir outras técnicas
+    queries = [
+        # Revolução Solar (principal)
+        f"revolução solar retorno solar {solar_return_ascendant} casa {solar_return_sun_house}",
+        f"casa {solar_return_sun_house} astrologia revolução solar significado interpretação",
+        
+        # Técnicas Complementares
+        f"progressões secundárias revolução solar complemento técnicas previsão",
+        f"retorno saturno jupiter revolução solar integração análise",
+        f"trânsitos revolução solar ano {request.target_year} previsão astrológica",
+        f"direções primárias profecção anual revolução solar",
+        f"técnicas previsão astrológica complemento revolução solar",
+        
+        # Contexto específico
+        f"ascendente {solar_return_ascendant} revolução solar interpretação",
+        f"lua {solar_return_moon_sign} casa {solar_return_moon_house} revolução solar",
+    ]
+    
+    all_rag_results = []
+    if rag_service:
+        # Todas as consultas em um único lote de embeddings
+        try:
+            for results in rag_service.search_many(queries, top_k=6, expand_query=True):
+                all_rag_results.extend(results)
+        except Exception as e:
+            print(f"[WARNING] Erro ao buscar no RAG: {e}")
+    
+    # Remover duplicatas
+    seen_texts = set()
+    unique_results = []
+    for result in sorted(all_rag_results, key=lambda x: x.get('score', 0), reverse=True):
+        text_key = result.get('text', '')[:100]
+        if text_key not in seen_texts:
+            seen_texts.add(text_key)
+            unique_results.append(result)
+            if len(unique_results) >= 15:  # Aumentado para mais contexto
+                break
+    
+    context_text = "\n\n".join([doc.get('text', '') for doc in unique_results[:12] if doc.get('text')])
+    
+    # Gerar interpretação com IA - Prompt melhorado com separação clara
+    system_prompt = """Você é um Astrólogo Sênior especializado em Revolução Solar e técnicas complementares de previsão astrológica.
 
 IMPORTANTE: Você DEVE sempre separar claramente os dados do MAPA NATAL dos dados da REVOLUÇÃO SOLAR. NUNCA confunda ou misture esses dados.
 
@@ -1232,8 +1453,8 @@ Além da Revolução Solar, você conhece outras técnicas astrológicas relevan
 - Profecção Anual (foco anual por casa astrológica)
 
 Quando apropriado e se o contexto de referência mencionar, você pode sugerir brevemente como outras técnicas podem complementar a análise da Revolução Solar, mas mantenha o foco principal na Revolução Solar."""
-        
-        user_prompt = f"""Dados para Análise da Revolução Solar de {target_year}:
+    
+    user_prompt = f"""Dados para Análise da Revolução Solar de {target_year}:
 
 === MAPA NATAL (Dados de Nascimento) ===
 - Idade em {target_year}: {age} anos
@@ -1260,30 +1481,70 @@ INSTRUÇÕES CRÍTICAS:
 6. Ao final, adicione uma nota sobre outras técnicas astrológicas disponíveis que podem enriquecer a análise
 7. Seja específico e prático, evitando generalidades
 8. Calcule a idade corretamente: {age} anos em {target_year}"""
-        
-        interpretation_text = provider.generate_text(
+    
+    sources_list = [
+        SourceItem(
+            source=r.get('source', 'knowledge_base'),
+            page=r.get('page', 1),
+            relevance=r.get('score', 0.5)
+        )
+        for r in unique_results[:5]
+    ]
+    query_used = f"Revolução Solar {solar_return_ascendant} Casa {solar_return_sun_house}"
+    provider_name = provider.get_provider_name()
+    
+    return {
+        'provider': provider,
+        'generation': dict(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
             temperature=0.7,
             max_tokens=4000
-        )
-        
-        sources_list = [
-            SourceItem(
-                source=r.get('source', 'knowledge_base'),
-                page=r.get('page', 1),
-                relevance=r.get('score', 0.5)
-            )
-            for r in unique_results[:5]
-        ]
-        
-        return InterpretationResponse(
+        ),
+        'finalize': lambda interpretation_text: InterpretationResponse(
             interpretation=interpretation_text,
             sources=sources_list,
-            query_used=f"Revolução Solar {solar_return_ascendant} Casa {solar_return_sun_house}",
-            generated_by=provider.get_provider_name()
+            query_used=query_used,
+            generated_by=provider_name
+        ),
+        'meta': {'query_used': query_used}
+    }
+
+
+@router.post("/solar-return/interpretation", response_model=InterpretationResponse)
+async def get_solar_return_interpretation(
+    request: SolarReturnInterpretationRequest,
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Obtém interpretação da Revolução Solar usando IA.
+    
+    IMPORTANTE: Todos os dados são calculados pela biblioteca Swiss Ephemeris (via kerykeion).
+    Os parâmetros são validados antes do cálculo e os dados calculados são validados antes da interpretação.
+    """
+    try:
+        plan = await asyncio.to_thread(_prepare_solar_return_interpretation, request)
+        return await _run_generation_plan(plan)
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        print(f"[ERROR] Erro ao gerar interpretação de revolução solar: {e}")
+        print(traceback.format_exc())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao gerar interpretação: {str(e)}"
         )
-        
+
+
+@router.post("/solar-return/interpretation/stream")
+async def stream_solar_return_interpretation(
+    request: SolarReturnInterpretationRequest,
+    authorization: Optional[str] = Header(None)
+):
+    """Interpretação da Revolução Solar em streaming (text/event-stream)."""
+    try:
+        plan = await asyncio.to_thread(_prepare_solar_return_interpretation, request)
     except HTTPException:
         raise
     except Exception as e:
@@ -1294,6 +1555,7 @@ INSTRUÇÕES CRÍTICAS:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao gerar interpretação: {str(e)}"
         )
+    return _stream_generation_plan(plan)
 
 
 # ============================================================================
@@ -1622,6 +1884,15 @@ COMPLETE BIRTH CHART OF {request.name.upper()}:
 """
 
 
+# Versão dos templates de prompt do Mapa Astral Completo (_get_master_prompt,
+# _get_full_chart_context, _generate_section_prompt). Incrementar ao alterá-los
+# para que o cache de interpretações não sirva textos gerados pelo prompt antigo.
+SECTION_PROMPT_VERSION = "1"
+
+# Seções do Mapa Astral Completo
+BIRTH_CHART_SECTIONS = ['power', 'triad', 'personal', 'houses', 'karma', 'synthesis']
+
+
 def _generate_section_prompt(request: FullBirthChartRequest, section: str, validation_summary: Optional[str] = None, precomputed_data: Optional[str] = None) -> tuple:
     """Gera o prompt específico para cada seção do mapa baseado na nova estrutura fornecida."""
     lang = request.language or 'pt'
@@ -1797,16 +2068,8 @@ Forneça uma interpretação completa e detalhada desta seção do mapa astral."
     return title, prompt
 
 
-def _clean_interpretation_content(content: str) -> str:
-    """
-    Remove instruções internas e metadados do conteúdo gerado pela IA.
-    Garante que apenas a interpretação astrológica seja retornada ao usuário.
-    """
-    if not content:
-        return content
-    
-    # Lista de padrões a remover (instruções internas)
-    patterns_to_remove = [
+# Padrões de instruções internas que a IA às vezes repete na resposta
+_INTERNAL_INSTRUCTION_PATTERNS = [
         r'⚠️⚠️⚠️\s*\*\*INSTRUÇÕES INTERNAS.*?\*\*.*?(?=\n\n|\*\*|$)',
         r'🚨\s*\*\*INSTRUÇÃO CRÍTICA.*?\*\*.*?(?=\n\n|\*\*|$)',
         r'\*\*INSTRUÇÕES INTERNAS.*?\*\*.*?(?=\n\n|\*\*|$)',
@@ -1819,14 +2082,50 @@ def _clean_interpretation_content(content: str) -> str:
         r'✅ Identifique.*?(?=\n\n|\*\*|$)',
         r'✅ Use EXATAMENTE.*?(?=\n\n|\*\*|$)',
         r'⚠️\s*\*\*IMPORTANTE.*?\*\*.*?(?=\n\n|\*\*|$)',
-    ]
-    
+]
+
+# Padrões que indicam o início real da interpretação
+_INTERPRETATION_STARTERS = [
+    r'\*\*.*?ANÁLISE.*?\*\*',
+    r'\*\*.*?INTERPRETAÇÃO.*?\*\*',
+    r'\*\*.*?TEMPERAMENTO.*?\*\*',
+    r'\*\*.*?TRÍADE.*?\*\*',
+    r'^[A-ZÁÊÔÇ].*?temperamento',
+    r'^[A-ZÁÊÔÇ].*?elemento',
+]
+
+
+def _remove_internal_instructions(content: str) -> str:
+    """Remove os trechos de instruções internas."""
     import re
     cleaned = content
+    for pattern in _INTERNAL_INSTRUCTION_PATTERNS:
+        cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE | re.DOTALL | re.MULTILINE)
+    return cleaned
+
+
+def _find_interpretation_start(content: str) -> Optional[int]:
+    """Posição do início real da interpretação (ou None se não encontrado)."""
+    import re
+    for starter in _INTERPRETATION_STARTERS:
+        match = re.search(starter, content, re.IGNORECASE | re.MULTILINE)
+        if match:
+            return match.start()
+    return None
+
+
+def _clean_interpretation_content(content: str) -> str:
+    """
+    Remove instruções internas e metadados do conteúdo gerado pela IA.
+    Garante que apenas a interpretação astrológica seja retornada ao usuário.
+    """
+    if not content:
+        return content
+    
+    import re
     
     # Remover cada padrão
-    for pattern in patterns_to_remove:
-        cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE | re.DOTALL | re.MULTILINE)
+    cleaned = _remove_internal_instructions(content)
     
     # Remover linhas vazias excessivas (mais de 2 consecutivas)
     cleaned = re.sub(r'\n{3,}', '\n\n', cleaned)
@@ -1835,169 +2134,239 @@ def _clean_interpretation_content(content: str) -> str:
     cleaned = cleaned.strip()
     
     # Se o conteúdo começar com instruções, tentar encontrar o início real
-    # Procura por padrões que indicam início de interpretação
-    interpretation_starters = [
-        r'\*\*.*?ANÁLISE.*?\*\*',
-        r'\*\*.*?INTERPRETAÇÃO.*?\*\*',
-        r'\*\*.*?TEMPERAMENTO.*?\*\*',
-        r'\*\*.*?TRÍADE.*?\*\*',
-        r'^[A-ZÁÊÔÇ].*?temperamento',
-        r'^[A-ZÁÊÔÇ].*?elemento',
-    ]
-    
-    for starter in interpretation_starters:
-        match = re.search(starter, cleaned, re.IGNORECASE | re.MULTILINE)
-        if match:
-            cleaned = cleaned[match.start():]
-            break
+    start = _find_interpretation_start(cleaned)
+    if start is not None:
+        cleaned = cleaned[start:]
     
     return cleaned
 
 
-@router.post("/full-birth-chart/section", response_model=FullBirthChartResponse)
-async def generate_birth_chart_section(
-    request: FullBirthChartRequest,
-    authorization: Optional[str] = Header(None)
-):
+class _IncrementalContentCleaner:
     """
-    Gera uma seção específica do Mapa Astral Completo.
+    Versão incremental de _clean_interpretation_content para o streaming.
     
-    IMPORTANTE: Este endpoint calcula o mapa astral usando Swiss Ephemeris (kerykeion),
-    valida os dados calculados e usa os dados validados no prompt para a IA.
+    Os padrões de instruções internas terminam no fim do parágrafo, então o texto
+    é liberado parágrafo a parágrafo (até o último "\n\n" recebido). Antes do
+    início real da interpretação o texto fica retido, até PREAMBLE_LIMIT
+    caracteres. O evento final do stream sempre traz o texto limpo completo.
+    """
     
-    Seções disponíveis:
-    - power: A Estrutura de Poder (Temperamento e Motivação)
-    - triad: A Tríade Fundamental (Sol, Lua, Ascendente)
-    - personal: Dinâmica Pessoal e Ferramentas (Mercúrio, Vênus, Marte)
-    - houses: Análise Setorial Avançada (Casas 2, 4, 6, 7, 10)
-    - karma: Expansão, Estrutura e Karma (Júpiter, Saturno, Nodos, Quíron)
-    - synthesis: Síntese e Orientação Estratégica
+    PREAMBLE_LIMIT = 2000
+    
+    def __init__(self):
+        self.pending = ""
+        self.started = False
+        self.emitted_any = False
+        self.held_whitespace = ""  # Espaços/quebras retidos até chegar mais texto
+    
+    def _emit(self, text: str) -> str:
+        import re
+        if not self.emitted_any:
+            text = text.lstrip()
+        core = text.strip()
+        if not core:
+            self.held_whitespace += text
+            return ""
+        
+        # Espaços em branco só são enviados antes de um novo texto (nunca no fim)
+        leading = text[:len(text) - len(text.lstrip())]
+        prefix = self.held_whitespace + leading if self.emitted_any else ""
+        self.held_whitespace = text[len(text.rstrip()):]
+        self.emitted_any = True
+        return re.sub(r'\n{3,}', '\n\n', prefix + core)
+    
+    def _release(self, block: str) -> str:
+        cleaned = _remove_internal_instructions(block)
+        if not self.started:
+            start = _find_interpretation_start(cleaned)
+            if start is None:
+                return ""
+            self.started = True
+            cleaned = cleaned[start:]
+        return self._emit(cleaned)
+    
+    def feed(self, chunk: str) -> str:
+        """Recebe um trecho do provedor e retorna o texto limpo pronto para envio."""
+        self.pending += chunk
+        boundary = self.pending.rfind("\n\n")
+        if boundary < 0:
+            return ""
+        
+        if not self.started:
+            # Aguardar o início da interpretação (ou desistir após o limite)
+            released = self._release(self.pending[:boundary + 2])
+            if self.started:
+                self.pending = self.pending[boundary + 2:]
+                return released
+            if len(self.pending) <= self.PREAMBLE_LIMIT:
+                return ""
+            self.started = True
+        
+        block, self.pending = self.pending[:boundary + 2], self.pending[boundary + 2:]
+        return self._release(block)
+    
+    def flush(self) -> str:
+        """Texto restante ao fim do stream."""
+        block, self.pending = self.pending, ""
+        if not self.started:
+            self.started = _find_interpretation_start(_remove_internal_instructions(block)) is None
+        return self._release(block)
+
+
+def _resolve_birth_chart_inputs(request: FullBirthChartRequest) -> Dict[str, Any]:
+    """
+    Dados do Mapa Astral Completo que não dependem da seção: provedor de IA,
+    data e coordenadas do nascimento e a impressão digital das entradas do prompt
+    (base das chaves do cache de interpretações).
     """
+    from app.services.ai_provider_service import get_ai_provider
+    from app.services.interpretation_cache import chart_fingerprint
+    from datetime import datetime
+    
+    lang = request.language or 'pt'
+    provider = get_ai_provider()
+    
+    if not provider:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Serviço de IA não disponível"
+        )
+    
+    # ===== PASSO 1: CALCULAR MAPA ASTRAL USANDO SWISS EPHEMERIS =====
+    print(f"[FULL-BIRTH-CHART] Calculando mapa astral para {request.name}")
+    
+    # Parsear data de nascimento (formato DD/MM/YYYY)
     try:
-        from app.services.rag_service_fastembed import get_rag_service
-        from app.services.ai_provider_service import get_ai_provider
-        from app.services.swiss_ephemeris_calculator import calculate_birth_chart as calculate_swiss
-        from datetime import datetime
-        
-        if not request.section:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Especifique uma seção: power, triad, personal, houses, karma, synthesis"
-            )
-        
-        lang = request.language or 'pt'
-        provider = get_ai_provider()
-        
-        if not provider:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Serviço de IA não disponível"
-            )
-        
-        # ===== PASSO 1: CALCULAR MAPA ASTRAL USANDO SWISS EPHEMERIS =====
-        print(f"[FULL-BIRTH-CHART] Calculando mapa astral para {request.name}")
-        
-        # Parsear data de nascimento (formato DD/MM/YYYY)
-        try:
-            birth_date = datetime.strptime(request.birthDate, "%d/%m/%Y")
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Formato de data inválido. Use DD/MM/YYYY. Recebido: {request.birthDate}"
-            )
-        
-        # Obter coordenadas do local (latitude/longitude)
-        # PRIORIDADE 1: Usar coordenadas fornecidas pelo frontend (mais preciso)
-        latitude = request.latitude
-        longitude = request.longitude
-        
-        # PRIORIDADE 2: Se não fornecidas, tentar obter do nome do local
-        if latitude is None or longitude is None:
-            birth_place_lower = request.birthPlace.lower()
-            
-            # Mapeamento de cidades conhecidas (pode ser expandido)
-            city_coordinates = {
-                'são paulo': (-23.5505, -46.6333),
-                'sao paulo': (-23.5505, -46.6333),
-                'rio de janeiro': (-22.9068, -43.1729),
-                'rio': (-22.9068, -43.1729),
-                'belo horizonte': (-19.9167, -43.9345),
-                'brasília': (-15.7942, -47.8822),
-                'salvador': (-12.9714, -38.5014),
-                'fortaleza': (-3.7172, -38.5433),
-                'curitiba': (-25.4284, -49.2733),
-                'recife': (-8.0476, -34.8770),
-                'porto alegre': (-30.0346, -51.2177),
-                'sobral': (-3.6883, -40.3497),
-            }
-            
-            for city, (lat, lon) in city_coordinates.items():
-                if city in birth_place_lower:
-                    latitude = lat
-                    longitude = lon
-                    print(f"[FULL-BIRTH-CHART] Coordenadas encontradas para {city}: ({latitude}, {longitude})")
-                    break
-        
-        # PRIORIDADE 3: Se ainda não encontrou, usar valores padrão (São Paulo)
-        if latitude is None or longitude is None:
-            print(f"[WARNING] Coordenadas não encontradas para {request.birthPlace}, usando valores padrão (São Paulo)")
-            latitude = -23.5505
-            longitude = -46.6333
-        
-        # CALCULAR MAPA ASTRAL USANDO SWISS EPHEMERIS (FONTE ÚNICA DE VERDADE)
-        try:
-            calculated_chart = calculate_swiss(
-                birth_date=birth_date,
-                birth_time=request.birthTime,
-                latitude=latitude,
-                longitude=longitude
-            )
-            print(f"[FULL-BIRTH-CHART] Mapa astral calculado com sucesso usando Swiss Ephemeris")
-        except Exception as e:
-            print(f"[ERROR] Erro ao calcular mapa astral com Swiss Ephemeris: {e}")
-            import traceback
-            print(traceback.format_exc())
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Erro ao calcular mapa astral: {str(e)}"
-            )
-        
-        # ===== PASSO 2: VALIDAR DADOS CALCULADOS =====
-        print(f"[FULL-BIRTH-CHART] Validando dados calculados")
-        
-        # Construir dicionário de dados do mapa para validação
-        chart_data_for_validation = {
-            'sun_sign': calculated_chart.get('sun_sign'),
-            'moon_sign': calculated_chart.get('moon_sign'),
-            'ascendant_sign': calculated_chart.get('ascendant_sign'),
-            'mercury_sign': calculated_chart.get('mercury_sign'),
-            'venus_sign': calculated_chart.get('venus_sign'),
-            'mars_sign': calculated_chart.get('mars_sign'),
-            'jupiter_sign': calculated_chart.get('jupiter_sign'),
-            'saturn_sign': calculated_chart.get('saturn_sign'),
-            'uranus_sign': calculated_chart.get('uranus_sign'),
-            'neptune_sign': calculated_chart.get('neptune_sign'),
-            'pluto_sign': calculated_chart.get('pluto_sign'),
-            'midheaven_sign': calculated_chart.get('midheaven_sign'),
-            'north_node_sign': calculated_chart.get('north_node_sign'),
-            'south_node_sign': calculated_chart.get('south_node_sign'),
-            'chiron_sign': calculated_chart.get('chiron_sign'),
-        }
-        
-        # Adicionar longitudes se disponíveis
-        if '_source_longitudes' in calculated_chart:
-            chart_data_for_validation['_source_longitudes'] = calculated_chart['_source_longitudes']
-        
-        # Validar mapa astral completo
-        validated_chart, validation_summary, precomputed_data = _validate_chart_request(
-            request, lang
+        birth_date = datetime.strptime(request.birthDate, "%d/%m/%Y")
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Formato de data inválido. Use DD/MM/YYYY. Recebido: {request.birthDate}"
+        )
+    
+    # Obter coordenadas do local (latitude/longitude)
+    # PRIORIDADE 1: Usar coordenadas fornecidas pelo frontend (mais preciso)
+    latitude = request.latitude
+    longitude = request.longitude
+    
+    # PRIORIDADE 2: Se não fornecidas, tentar obter do nome do local
+    if latitude is None or longitude is None:
+        from app.services.geo_service import geocode_place
+        
+        # Gazetteer offline de cidades (busca na trie de nomes)
+        city = geocode_place(request.birthPlace or "")
+        if city:
+            latitude = city['latitude']
+            longitude = city['longitude']
+            print(f"[FULL-BIRTH-CHART] Coordenadas encontradas para {city['name']}: ({latitude}, {longitude})")
+    
+    # PRIORIDADE 3: Se ainda não encontrou, usar valores padrão (São Paulo)
+    if latitude is None or longitude is None:
+        print(f"[WARNING] Coordenadas não encontradas para {request.birthPlace}, usando valores padrão (São Paulo)")
+        latitude = -23.5505
+        longitude = -46.6333
+    
+    chart_inputs = request.model_dump(exclude={'section', 'language'})
+    chart_inputs.update(latitude=latitude, longitude=longitude)
+    
+    return {
+        'lang': lang,
+        'provider': provider,
+        'provider_name': provider.get_provider_name(),
+        'model': provider.get_model_name(),
+        'birth_date': birth_date,
+        'latitude': latitude,
+        'longitude': longitude,
+        'fingerprint': chart_fingerprint(chart_inputs),
+    }
+
+
+def _birth_chart_section_cache_key(inputs: Dict[str, Any], section: str) -> str:
+    """Chave do cache de interpretações para uma seção (mesmas entradas = mesma resposta)."""
+    from app.services.interpretation_cache import interpretation_cache_key
+    return interpretation_cache_key(
+        inputs['fingerprint'], section, inputs['lang'], inputs['provider_name'], inputs['model'],
+        SECTION_PROMPT_VERSION
+    )
+
+
+def _get_cached_birth_chart_section(inputs: Dict[str, Any], section: str) -> Optional[FullBirthChartResponse]:
+    """Seção já gerada para as mesmas entradas, ou None."""
+    from app.services.interpretation_cache import get_cached_interpretation
+    
+    cached = get_cached_interpretation(_birth_chart_section_cache_key(inputs, section))
+    if cached is None:
+        return None
+    print(f"[FULL-BIRTH-CHART] Seção {section} obtida do cache de interpretações")
+    return FullBirthChartResponse(**cached)
+
+
+def _build_birth_chart_context(request: FullBirthChartRequest, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Contexto compartilhado por todas as seções (passos 1, 2 e 4): mapa calculado,
+    validação, dados pré-calculados, request atualizado e prompt mestre.
+    """
+    from app.services.swiss_ephemeris_calculator import calculate_birth_chart as calculate_swiss
+    
+    lang = inputs['lang']
+    birth_date = inputs['birth_date']
+    latitude = inputs['latitude']
+    longitude = inputs['longitude']
+    
+    # CALCULAR MAPA ASTRAL USANDO SWISS EPHEMERIS (FONTE ÚNICA DE VERDADE)
+    try:
+        calculated_chart = calculate_swiss(
+            birth_date=birth_date,
+            birth_time=request.birthTime,
+            latitude=latitude,
+            longitude=longitude
         )
-        
-        # Se a validação falhar, usar dados calculados diretamente
-        if not validated_chart or not precomputed_data:
-            print(f"[WARNING] Validação retornou dados vazios, usando dados calculados diretamente")
-            # Criar bloco pré-calculado mínimo
-            precomputed_data = f"""
+        print(f"[FULL-BIRTH-CHART] Mapa astral calculado com sucesso usando Swiss Ephemeris")
+    except Exception as e:
+        print(f"[ERROR] Erro ao calcular mapa astral com Swiss Ephemeris: {e}")
+        import traceback
+        print(traceback.format_exc())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao calcular mapa astral: {str(e)}"
+        )
+    
+    # ===== PASSO 2: VALIDAR DADOS CALCULADOS =====
+    print(f"[FULL-BIRTH-CHART] Validando dados calculados")
+    
+    # Construir dicionário de dados do mapa para validação
+    chart_data_for_validation = {
+        'sun_sign': calculated_chart.get('sun_sign'),
+        'moon_sign': calculated_chart.get('moon_sign'),
+        'ascendant_sign': calculated_chart.get('ascendant_sign'),
+        'mercury_sign': calculated_chart.get('mercury_sign'),
+        'venus_sign': calculated_chart.get('venus_sign'),
+        'mars_sign': calculated_chart.get('mars_sign'),
+        'jupiter_sign': calculated_chart.get('jupiter_sign'),
+        'saturn_sign': calculated_chart.get('saturn_sign'),
+        'uranus_sign': calculated_chart.get('uranus_sign'),
+        'neptune_sign': calculated_chart.get('neptune_sign'),
+        'pluto_sign': calculated_chart.get('pluto_sign'),
+        'midheaven_sign': calculated_chart.get('midheaven_sign'),
+        'north_node_sign': calculated_chart.get('north_node_sign'),
+        'south_node_sign': calculated_chart.get('south_node_sign'),
+        'chiron_sign': calculated_chart.get('chiron_sign'),
+    }
+    
+    # Adicionar longitudes se disponíveis
+    if '_source_longitudes' in calculated_chart:
+        chart_data_for_validation['_source_longitudes'] = calculated_chart['_source_longitudes']
+    
+    # Validar mapa astral completo
+    validated_chart, validation_summary, precomputed_data = _validate_chart_request(
+        request, lang
+    )
+    
+    # Se a validação falhar, usar dados calculados diretamente
+    if not validated_chart or not precomputed_data:
+        print(f"[WARNING] Validação retornou dados vazios, usando dados calculados diretamente")
+        # Criar bloco pré-calculado mínimo
+        precomputed_data = f"""
 🔒 DADOS PRÉ-CALCULADOS (TRAVAS DE SEGURANÇA ATIVADAS)
 
 📊 TEMPERAMENTO (CALCULADO MATEMATICAMENTE):
@@ -2014,122 +2383,226 @@ async def generate_birth_chart_section(
 👑 REGENTE DO MAPA:
 [Calculado pela biblioteca]
 """
-            validation_summary = "✅ Dados calculados pela biblioteca Swiss Ephemeris (kerykeion)"
-        
-        # ===== PASSO 3: BUSCAR CONTEXTO DO RAG =====
-        rag_service = get_rag_service()
-        
-        # Usar signos calculados para buscar contexto
-        sun_sign = calculated_chart.get('sun_sign', request.sunSign)
-        moon_sign = calculated_chart.get('moon_sign', request.moonSign)
-        ascendant = calculated_chart.get('ascendant_sign', request.ascendant)
-        
-        queries = {
-            'power': f"temperamento elementos fogo terra ar água predominante ausente {sun_sign} {moon_sign} {ascendant}",
-            'triad': f"Sol Lua Ascendente tríade {sun_sign} {moon_sign} {ascendant} personalidade",
-            'personal': f"Mercúrio {calculated_chart.get('mercury_sign', request.mercurySign or '')} Vênus {calculated_chart.get('venus_sign', request.venusSign or '')} Marte {calculated_chart.get('mars_sign', request.marsSign or '')} dinâmica pessoal",
-            'houses': f"casas astrológicas Casa 2 Casa 4 Casa 6 Casa 7 Casa 10 vocação",
-            'karma': f"Júpiter Saturno Nodo Norte Sul Quíron karma propósito {calculated_chart.get('jupiter_sign', request.jupiterSign or '')} {calculated_chart.get('saturn_sign', request.saturnSign or '')}",
-            'synthesis': f"síntese mapa astral integração pontos fortes desafios"
-        }
-        
-        query = queries.get(request.section, "interpretação mapa astral")
-        context_documents = []
-        
-        if rag_service:
-            try:
-                results = rag_service.search(query, top_k=8, expand_query=True)
-                context_documents = results[:6]
-            except Exception as e:
-                print(f"[WARNING] Erro ao buscar no RAG: {e}")
-        
-        context_text = "\n\n".join([
-            f"[Fonte: {doc.get('source', 'unknown')}]\n{doc.get('text', '')}"
-            for doc in context_documents
-            if doc.get('text')
-        ])
-        
-        # ===== PASSO 4: ATUALIZAR REQUEST COM DADOS CALCULADOS =====
-        # Criar novo request com dados calculados pela biblioteca
-        updated_request = FullBirthChartRequest(
-            name=request.name,
-            birthDate=request.birthDate,
-            birthTime=request.birthTime,
-            birthPlace=request.birthPlace,
-            sunSign=calculated_chart.get('sun_sign', request.sunSign),
-            moonSign=calculated_chart.get('moon_sign', request.moonSign),
-            ascendant=calculated_chart.get('ascendant_sign', request.ascendant),
-            sunHouse=calculated_chart.get('sun_house', request.sunHouse),
-            moonHouse=calculated_chart.get('moon_house', request.moonHouse),
-            section=request.section,
-            language=request.language,
-            mercurySign=calculated_chart.get('mercury_sign', request.mercurySign),
-            mercuryHouse=calculated_chart.get('mercury_house', request.mercuryHouse),
-            venusSign=calculated_chart.get('venus_sign', request.venusSign),
-            venusHouse=calculated_chart.get('venus_house', request.venusHouse),
-            marsSign=calculated_chart.get('mars_sign', request.marsSign),
-            marsHouse=calculated_chart.get('mars_house', request.marsHouse),
-            jupiterSign=calculated_chart.get('jupiter_sign', request.jupiterSign),
-            jupiterHouse=calculated_chart.get('jupiter_house', request.jupiterHouse),
-            saturnSign=calculated_chart.get('saturn_sign', request.saturnSign),
-            saturnHouse=calculated_chart.get('saturn_house', request.saturnHouse),
-            uranusSign=calculated_chart.get('uranus_sign', request.uranusSign),
-            uranusHouse=calculated_chart.get('uranus_house', request.uranusHouse),
-            neptuneSign=calculated_chart.get('neptune_sign', request.neptuneSign),
-            neptuneHouse=calculated_chart.get('neptune_house', request.neptuneHouse),
-            plutoSign=calculated_chart.get('pluto_sign', request.plutoSign),
-            plutoHouse=calculated_chart.get('pluto_house', request.plutoHouse),
-            northNodeSign=calculated_chart.get('north_node_sign', request.northNodeSign),
-            northNodeHouse=calculated_chart.get('north_node_house', request.northNodeHouse),
-            southNodeSign=calculated_chart.get('south_node_sign', request.southNodeSign),
-            southNodeHouse=calculated_chart.get('south_node_house', request.southNodeHouse),
-            chironSign=calculated_chart.get('chiron_sign', request.chironSign),
-            chironHouse=calculated_chart.get('chiron_house', request.chironHouse),
-            midheavenSign=calculated_chart.get('midheaven_sign', request.midheavenSign),
-            icSign=calculated_chart.get('ic_sign', request.icSign),
-        )
-        
-        # ===== PASSO 5: GERAR PROMPT COM DADOS VALIDADOS =====
-        # Obter prompt mestre
-        master_prompt = _get_master_prompt(lang)
-        
-        # Gerar prompt específico da seção com dados validados
-        title, section_prompt = _generate_section_prompt(
-            updated_request, 
-            request.section, 
-            validation_summary, 
-            precomputed_data
-        )
-        
-        # Combinar prompt mestre + prompt da seção + contexto RAG
-        full_user_prompt = f"""{section_prompt}
+        validation_summary = "✅ Dados calculados pela biblioteca Swiss Ephemeris (kerykeion)"
+    
+    # ===== PASSO 4: ATUALIZAR REQUEST COM DADOS CALCULADOS =====
+    # Criar novo request com dados calculados pela biblioteca
+    updated_request = FullBirthChartRequest(
+        name=request.name,
+        birthDate=request.birthDate,
+        birthTime=request.birthTime,
+        birthPlace=request.birthPlace,
+        sunSign=calculated_chart.get('sun_sign', request.sunSign),
+        moonSign=calculated_chart.get('moon_sign', request.moonSign),
+        ascendant=calculated_chart.get('ascendant_sign', request.ascendant),
+        sunHouse=calculated_chart.get('sun_house', request.sunHouse),
+        moonHouse=calculated_chart.get('moon_house', request.moonHouse),
+        section=request.section,
+        language=request.language,
+        mercurySign=calculated_chart.get('mercury_sign', request.mercurySign),
+        mercuryHouse=calculated_chart.get('mercury_house', request.mercuryHouse),
+        venusSign=calculated_chart.get('venus_sign', request.venusSign),
+        venusHouse=calculated_chart.get('venus_house', request.venusHouse),
+        marsSign=calculated_chart.get('mars_sign', request.marsSign),
+        marsHouse=calculated_chart.get('mars_house', request.marsHouse),
+        jupiterSign=calculated_chart.get('jupiter_sign', request.jupiterSign),
+        jupiterHouse=calculated_chart.get('jupiter_house', request.jupiterHouse),
+        saturnSign=calculated_chart.get('saturn_sign', request.saturnSign),
+        saturnHouse=calculated_chart.get('saturn_house', request.saturnHouse),
+        uranusSign=calculated_chart.get('uranus_sign', request.uranusSign),
+        uranusHouse=calculated_chart.get('uranus_house', request.uranusHouse),
+        neptuneSign=calculated_chart.get('neptune_sign', request.neptuneSign),
+        neptuneHouse=calculated_chart.get('neptune_house', request.neptuneHouse),
+        plutoSign=calculated_chart.get('pluto_sign', request.plutoSign),
+        plutoHouse=calculated_chart.get('pluto_house', request.plutoHouse),
+        northNodeSign=calculated_chart.get('north_node_sign', request.northNodeSign),
+        northNodeHouse=calculated_chart.get('north_node_house', request.northNodeHouse),
+        southNodeSign=calculated_chart.get('south_node_sign', request.southNodeSign),
+        southNodeHouse=calculated_chart.get('south_node_house', request.southNodeHouse),
+        chironSign=calculated_chart.get('chiron_sign', request.chironSign),
+        chironHouse=calculated_chart.get('chiron_house', request.chironHouse),
+        midheavenSign=calculated_chart.get('midheaven_sign', request.midheavenSign),
+        icSign=calculated_chart.get('ic_sign', request.icSign),
+    )
+    
+    return {
+        'calculated_chart': calculated_chart,
+        'validation_summary': validation_summary,
+        'precomputed_data': precomputed_data,
+        'updated_request': updated_request,
+        'master_prompt': _get_master_prompt(lang),
+    }
+
+
+def _build_birth_chart_section_plan(
+    request: FullBirthChartRequest,
+    section: str,
+    inputs: Dict[str, Any],
+    context: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Plano de geração de uma seção a partir do contexto compartilhado (passos 3 e 5)."""
+    from app.services.rag_service_fastembed import get_rag_service
+    from app.services.interpretation_cache import birth_key as make_birth_key, store_interpretation
+    
+    # ===== PASSO 3: BUSCAR CONTEXTO DO RAG =====
+    rag_service = get_rag_service()
+    
+    # Usar signos calculados para buscar contexto
+    calculated_chart = context['calculated_chart']
+    sun_sign = calculated_chart.get('sun_sign', request.sunSign)
+    moon_sign = calculated_chart.get('moon_sign', request.moonSign)
+    ascendant = calculated_chart.get('ascendant_sign', request.ascendant)
+    
+    queries = {
+        'power': f"temperamento elementos fogo terra ar água predominante ausente {sun_sign} {moon_sign} {ascendant}",
+        'triad': f"Sol Lua Ascendente tríade {sun_sign} {moon_sign} {ascendant} personalidade",
+        'personal': f"Mercúrio {calculated_chart.get('mercury_sign', request.mercurySign or '')} Vênus {calculated_chart.get('venus_sign', request.venusSign or '')} Marte {calculated_chart.get('mars_sign', request.marsSign or '')} dinâmica pessoal",
+        'houses': f"casas astrológicas Casa 2 Casa 4 Casa 6 Casa 7 Casa 10 vocação",
+        'karma': f"Júpiter Saturno Nodo Norte Sul Quíron karma propósito {calculated_chart.get('jupiter_sign', request.jupiterSign or '')} {calculated_chart.get('saturn_sign', request.saturnSign or '')}",
+        'synthesis': f"síntese mapa astral integração pontos fortes desafios"
+    }
+    
+    query = queries.get(section, "interpretação mapa astral")
+    context_documents = []
+    
+    if rag_service:
+        try:
+            results = rag_service.search(query, top_k=8, expand_query=True)
+            context_documents = results[:6]
+        except Exception as e:
+            print(f"[WARNING] Erro ao buscar no RAG: {e}")
+    
+    context_text = "\n\n".join([
+        f"[Fonte: {doc.get('source', 'unknown')}]\n{doc.get('text', '')}"
+        for doc in context_documents
+        if doc.get('text')
+    ])
+    
+    # ===== PASSO 5: GERAR PROMPT COM DADOS VALIDADOS =====
+    # Gerar prompt específico da seção com dados validados
+    title, section_prompt = _generate_section_prompt(
+        context['updated_request'],
+        section,
+        context['validation_summary'],
+        context['precomputed_data']
+    )
+    
+    # Combinar prompt mestre + prompt da seção + contexto RAG
+    full_user_prompt = f"""{section_prompt}
 
 CONHECIMENTO ASTROLÓGICO DE REFERÊNCIA:
 {context_text[:3000] if context_text else "Informações astrológicas gerais."}"""
-        
-        # ===== PASSO 6: GERAR INTERPRETAÇÃO COM IA =====
-        print(f"[FULL-BIRTH-CHART] Gerando interpretação para seção {request.section}")
-        
-        interpretation = provider.generate_text(
-            system_prompt=master_prompt,
-            user_prompt=full_user_prompt,
-            temperature=0.7,
-            max_tokens=4000
-        )
-        
+    
+    def finalize(interpretation: str) -> FullBirthChartResponse:
         # ===== PASSO 7: LIMPAR CONTEÚDO DE INSTRUÇÕES INTERNAS =====
         print(f"[FULL-BIRTH-CHART] Limpando conteúdo de instruções internas")
         cleaned_interpretation = _clean_interpretation_content(interpretation)
         
         print(f"[FULL-BIRTH-CHART] Interpretação gerada e limpa com sucesso")
         
-        return FullBirthChartResponse(
-            section=request.section,
+        response = FullBirthChartResponse(
+            section=section,
             title=title,
             content=cleaned_interpretation,
-            generated_by=provider.get_provider_name()
+            generated_by=inputs['provider_name']
         )
-        
+        if cleaned_interpretation:
+            store_interpretation(
+                _birth_chart_section_cache_key(inputs, section),
+                response.model_dump(),
+                birth_key=make_birth_key(inputs['birth_date'], request.birthTime, inputs['latitude'], inputs['longitude']),
+                section=section,
+                language=inputs['lang'],
+                provider=inputs['provider_name'],
+                model=inputs['model'],
+                prompt_version=SECTION_PROMPT_VERSION
+            )
+        return response
+    
+    # ===== PASSO 6: GERAR INTERPRETAÇÃO COM IA (executado pelo endpoint) =====
+    print(f"[FULL-BIRTH-CHART] Gerando interpretação para seção {section}")
+    
+    return {
+        'provider': inputs['provider'],
+        'generation': dict(
+            system_prompt=context['master_prompt'],
+            user_prompt=full_user_prompt,
+            temperature=0.7,
+            max_tokens=4000,
+            model=inputs['model']
+        ),
+        'finalize': finalize,
+        'meta': {'section': section, 'title': title},
+        'cleaner': _IncrementalContentCleaner
+    }
+
+
+def _prepare_birth_chart_section(request: FullBirthChartRequest) -> Dict[str, Any]:
+    """Plano de geração de uma seção do Mapa Astral Completo (passos 1 a 5)."""
+    if not request.section:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Especifique uma seção: power, triad, personal, houses, karma, synthesis"
+        )
+    
+    inputs = _resolve_birth_chart_inputs(request)
+    
+    # ===== CACHE DE INTERPRETAÇÕES (mesmas entradas do prompt = mesma resposta) =====
+    cached = _get_cached_birth_chart_section(inputs, request.section)
+    if cached is not None:
+        return {'provider': None, 'result': cached}
+    
+    context = _build_birth_chart_context(request, inputs)
+    return _build_birth_chart_section_plan(request, request.section, inputs, context)
+
+
+@router.post("/full-birth-chart/section", response_model=FullBirthChartResponse)
+async def generate_birth_chart_section(
+    request: FullBirthChartRequest,
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Gera uma seção específica do Mapa Astral Completo.
+    
+    IMPORTANTE: Este endpoint calcula o mapa astral usando Swiss Ephemeris (kerykeion),
+    valida os dados calculados e usa os dados validados no prompt para a IA.
+    
+    Seções disponíveis:
+    - power: A Estrutura de Poder (Temperamento e Motivação)
+    - triad: A Tríade Fundamental (Sol, Lua, Ascendente)
+    - personal: Dinâmica Pessoal e Ferramentas (Mercúrio, Vênus, Marte)
+    - houses: Análise Setorial Avançada (Casas 2, 4, 6, 7, 10)
+    - karma: Expansão, Estrutura e Karma (Júpiter, Saturno, Nodos, Quíron)
+    - synthesis: Síntese e Orientação Estratégica
+    """
+    try:
+        plan = await asyncio.to_thread(_prepare_birth_chart_section, request)
+        return await _run_generation_plan(plan)
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        print(f"[ERROR] Erro ao gerar seção do mapa astral: {e}")
+        print(traceback.format_exc())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao gerar seção: {str(e)}"
+        )
+
+
+@router.post("/full-birth-chart/section/stream")
+async def stream_birth_chart_section(
+    request: FullBirthChartRequest,
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Seção do Mapa Astral Completo em streaming (text/event-stream).
+    
+    Os tokens chegam já sem instruções internas; o evento 'done' traz a mesma
+    resposta (FullBirthChartResponse) do endpoint /full-birth-chart/section.
+    """
+    try:
+        plan = await asyncio.to_thread(_prepare_birth_chart_section, request)
     except HTTPException:
         raise
     except Exception as e:
@@ -2140,6 +2613,228 @@ CONHECIMENTO ASTROLÓGICO DE REFERÊNCIA:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao gerar seção: {str(e)}"
         )
+    return _stream_generation_plan(plan)
+
+
+class FullBirthChartSectionsRequest(FullBirthChartRequest):
+    """Request para gerar várias seções do Mapa Astral Completo de uma vez."""
+    section: str = 'all'
+    sections: Optional[List[str]] = None  # Padrão: todas as seções
+
+
+def _requested_birth_chart_sections(requested: Optional[List[str]]) -> List[str]:
+    """Seções pedidas (sem repetição), validadas contra BIRTH_CHART_SECTIONS."""
+    sections = list(dict.fromkeys(requested or BIRTH_CHART_SECTIONS))
+    invalid = [section for section in sections if section not in BIRTH_CHART_SECTIONS]
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Seções inválidas: {', '.join(invalid)}. Use: {', '.join(BIRTH_CHART_SECTIONS)}"
+        )
+    return sections
+
+
+async def _generate_birth_chart_sections(
+    request: FullBirthChartRequest,
+    sections: List[str],
+    inputs: Dict[str, Any]
+):
+    """
+    Gera várias seções do Mapa Astral Completo, entregando cada uma assim que termina.
+    
+    O mapa é calculado e validado uma única vez; a busca no RAG e a geração de
+    cada seção rodam em paralelo, limitadas por FULL_BIRTH_CHART_CONCURRENCY.
+    Seções já cacheadas são entregues primeiro.
+    
+    Yields:
+        Tuplas (seção, FullBirthChartResponse, 'cached' | 'generated')
+        ou (seção, exceção, 'error')
+    """
+    from app.core.config import settings
+    
+    pending = []
+    for section in sections:
+        cached = await asyncio.to_thread(_get_cached_birth_chart_section, inputs, section)
+        if cached is not None:
+            yield section, cached, 'cached'
+        else:
+            pending.append(section)
+    
+    if not pending:
+        return
+    
+    try:
+        context = await asyncio.to_thread(_build_birth_chart_context, request, inputs)
+    except Exception as e:
+        for section in pending:
+            yield section, e, 'error'
+        return
+    
+    semaphore = asyncio.Semaphore(max(1, int(getattr(settings, 'FULL_BIRTH_CHART_CONCURRENCY', 6))))
+    
+    async def generate(section: str):
+        async with semaphore:
+            try:
+                plan = await asyncio.to_thread(_build_birth_chart_section_plan, request, section, inputs, context)
+                return section, await _run_generation_plan(plan), 'generated'
+            except Exception as e:
+                print(f"[WARNING] Erro ao gerar seção {section} do mapa astral: {e}")
+                return section, e, 'error'
+    
+    for next_section in asyncio.as_completed([generate(section) for section in pending]):
+        yield await next_section
+
+
+# Gerações de várias seções em andamento (/all e warm-up), por mapa e idioma
+_birth_chart_generations: Dict[tuple, int] = {}
+
+
+def _birth_chart_generation_key(inputs: Dict[str, Any]) -> tuple:
+    return inputs['fingerprint'], inputs['lang']
+
+
+def _is_birth_chart_generation_running(inputs: Dict[str, Any]) -> bool:
+    return _birth_chart_generations.get(_birth_chart_generation_key(inputs), 0) > 0
+
+
+def _start_birth_chart_generation(inputs: Dict[str, Any]) -> None:
+    key = _birth_chart_generation_key(inputs)
+    _birth_chart_generations[key] = _birth_chart_generations.get(key, 0) + 1
+
+
+def _finish_birth_chart_generation(inputs: Dict[str, Any]) -> None:
+    key = _birth_chart_generation_key(inputs)
+    remaining = _birth_chart_generations.get(key, 0) - 1
+    if remaining > 0:
+        _birth_chart_generations[key] = remaining
+    else:
+        _birth_chart_generations.pop(key, None)
+
+
+@router.post("/full-birth-chart/all")
+async def stream_all_birth_chart_sections(
+    request: FullBirthChartSectionsRequest,
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Gera todas as seções (ou as pedidas em 'sections') do Mapa Astral Completo
+    em paralelo, em streaming (text/event-stream):
+    - start: seções pedidas e provedor
+    - section: cada FullBirthChartResponse, na ordem em que fica pronta
+    - error: falha de uma seção ({"section": ..., "detail": ...})
+    - done: seções concluídas e com falha
+    
+    O relatório completo leva aproximadamente o tempo da seção mais lenta.
+    """
+    sections = _requested_birth_chart_sections(request.sections)
+    chart_request = FullBirthChartRequest(**request.model_dump(exclude={'sections'}))
+    inputs = await asyncio.to_thread(_resolve_birth_chart_inputs, chart_request)
+    
+    async def events():
+        _start_birth_chart_generation(inputs)
+        try:
+            yield _sse_event('start', {'sections': sections, 'generated_by': inputs['provider_name']})
+            completed, failed = [], []
+            async for section, result, origin in _generate_birth_chart_sections(chart_request, sections, inputs):
+                if origin == 'error':
+                    failed.append(section)
+                    detail = result.detail if isinstance(result, HTTPException) else str(result)
+                    yield _sse_event('error', {'section': section, 'detail': detail})
+                else:
+                    completed.append(section)
+                    yield _sse_event('section', result)
+            yield _sse_event('done', {'completed': completed, 'failed': failed})
+        finally:
+            _finish_birth_chart_generation(inputs)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _warm_up_birth_chart_sections(
+    request: FullBirthChartRequest,
+    sections: List[str],
+    inputs: Dict[str, Any]
+) -> Dict[str, str]:
+    """Gera e armazena no cache as seções ainda não cacheadas."""
+    summary = {}
+    try:
+        async for section, _, origin in _generate_birth_chart_sections(request, sections, inputs):
+            summary[section] = origin
+        print(f"[FULL-BIRTH-CHART] Warm-up concluído: {summary}")
+    except Exception as e:
+        print(f"[WARNING] Erro no warm-up do mapa astral: {e}")
+    finally:
+        _finish_birth_chart_generation(inputs)
+    return summary
+
+
+class BirthChartWarmUpRequest(BaseModel):
+    """Request para pré-gerar as seções do Mapa Astral Completo do usuário autenticado."""
+    sections: Optional[List[str]] = None  # Padrão: todas as seções
+    language: Optional[str] = 'pt'
+
+
+def _birth_chart_request_from_primary_chart(birth_chart: Any, language: Optional[str]) -> FullBirthChartRequest:
+    """FullBirthChartRequest com os dados do mapa primário (mesmos padrões do frontend)."""
+    return FullBirthChartRequest(
+        name=birth_chart.name,
+        birthDate=birth_chart.birth_date.strftime("%d/%m/%Y"),
+        birthTime=birth_chart.birth_time,
+        birthPlace=birth_chart.birth_place,
+        sunSign=birth_chart.sun_sign,
+        moonSign=birth_chart.moon_sign,
+        ascendant=birth_chart.ascendant_sign,
+        sunHouse=1,
+        moonHouse=4,
+        section='all',
+        language=language or 'pt',
+        latitude=birth_chart.latitude,
+        longitude=birth_chart.longitude,
+    )
+
+
+@router.post("/full-birth-chart/warm-up", status_code=status.HTTP_202_ACCEPTED)
+async def warm_up_birth_chart(
+    request: BirthChartWarmUpRequest,
+    background_tasks: BackgroundTasks,
+    authorization: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Pré-gera em segundo plano as seções do Mapa Astral Completo do usuário
+    autenticado (ex: logo após o cadastro), para que a primeira abertura venha
+    do cache. Não agenda nada se um warm-up ou /all do mesmo mapa já estiver rodando.
+    """
+    from app.api.auth import get_current_user, get_primary_birth_chart
+    
+    user = get_current_user(authorization, db)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Não autenticado"
+        )
+    
+    birth_chart = get_primary_birth_chart(user, db)
+    if not birth_chart:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Mapa astral não encontrado. Por favor, registre seu mapa astral primeiro."
+        )
+    
+    sections = _requested_birth_chart_sections(request.sections)
+    chart_request = _birth_chart_request_from_primary_chart(birth_chart, request.language)
+    inputs = await asyncio.to_thread(_resolve_birth_chart_inputs, chart_request)
+    
+    if _is_birth_chart_generation_running(inputs):
+        return {"status": "already_running", "sections": sections}
+    
+    _start_birth_chart_generation(inputs)
+    background_tasks.add_task(_warm_up_birth_chart_sections, chart_request, sections, inputs)
+    return {"status": "scheduled", "sections": sections}
 
 
 @router.get("/numerology/map", response_model=NumerologyMapResponse)
@@ -2152,7 +2847,7 @@ async def get_numerology_map(
     """
     try:
         from app.services.numerology_calculator import NumerologyCalculator
-        from app.api.auth import get_current_user
+        from app.api.auth import get_current_user, get_primary_birth_chart
         
         user = get_current_user(authorization, db)
         if not user:
@@ -2161,10 +2856,7 @@ async def get_numerology_map(
                 detail="Não autenticado"
             )
         
-        birth_chart = db.query(BirthChart).filter(
-            BirthChart.user_id == user.id,
-            BirthChart.is_primary == True
-        ).first()
+        birth_chart = get_primary_birth_chart(user, db)
         
         if not birth_chart:
             raise HTTPException(
@@ -2219,7 +2911,7 @@ async def get_numerology_interpretation(
         from app.services.numerology_calculator import NumerologyCalculator
         from app.services.rag_service_fastembed import get_rag_service
         from app.services.ai_provider_service import get_ai_provider
-        from app.api.auth import get_current_user
+        from app.api.auth import get_current_user, get_primary_birth_chart
         
         user = get_current_user(authorization, db)
         if not user:
@@ -2228,10 +2920,7 @@ async def get_numerology_interpretation(
                 detail="Não autenticado"
             )
         
-        birth_chart = db.query(BirthChart).filter(
-            BirthChart.user_id == user.id,
-            BirthChart.is_primary == True
-        ).first()
+        birth_chart = get_primary_birth_chart(user, db)
         
         if not birth_chart:
             raise HTTPException(
@@ -2549,7 +3238,7 @@ ESTILO E TOM:
 
 IMPORTANTE: O usuário é leigo e busca orientação prática para viver melhor. Foque em como usar os números de forma positiva e construtiva."""
         
-        interpretation_text = provider.generate_text(
+        interpretation_text = await provider.agenerate_text(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
             temperature=0.7,
@@ -2650,7 +3339,7 @@ CONHECIMENTO NUMEROLÓGICO DE REFERÊNCIA:
 
 Explique o significado das quantidades de cada número na grade."""
         
-        explanation = provider.generate_text(
+        explanation = await provider.agenerate_text(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
             temperature=0.7,
@@ -2738,16 +3427,43 @@ async def get_synastry_interpretation(
             f"{sign1} ruling planet natural house"
         ]
         
+        # 2. Buscar informações específicas sobre o Signo 2 (busca mais abrangente)
+        sign2_queries = [
+            f"{sign2} características personalidade traços comportamento",
+            f"{sign2} emoções valores comunicação relacionamentos",
+            f"{sign2} signo elemento modalidade",
+            f"{sign2} planeta regente casa natural"
+        ] if lang == 'pt' else [
+            f"{sign2} characteristics personality traits behavior",
+            f"{sign2} emotions values communication relationships",
+            f"{sign2} sign element modality",
+            f"{sign2} ruling planet natural house"
+        ]
+        
+        # 3. Buscar informações específicas sobre sinastria/compatibilidade entre os dois signos
+        synastry_queries = [
+            f"sinastria compatibilidade {sign1} com {sign2}",
+            f"relacionamento {sign1} {sign2} dinâmica",
+            f"{sign1} {sign2} pontos fortes desafios",
+            f"compatibilidade {sign1} {sign2} casal"
+        ] if lang == 'pt' else [
+            f"synastry compatibility {sign1} with {sign2}",
+            f"relationship {sign1} {sign2} dynamics",
+            f"{sign1} {sign2} strengths challenges",
+            f"compatibility {sign1} {sign2} couple"
+        ]
+        
+        # Todas as consultas (signo 1, signo 2 e compatibilidade) em um único
+        # lote de embeddings e uma única multiplicação matricial
+        batch_results = rag_service.search_many(
+            sign1_queries + sign2_queries + synastry_queries,
+            top_k=8,
+            category='astrology',
+            expand_query=True
+        )
+        
         print(f"[SINASTRIA] Buscando informações detalhadas sobre {sign1}...")
-        sign1_all_results = []
-        for query in sign1_queries:
-            results = rag_service.search(
-                query=query,
-                top_k=8,
-                category='astrology',
-                expand_query=True
-            )
-            sign1_all_results.extend(results)
+        sign1_all_results = [r for results in batch_results[:len(sign1_queries)] for r in results]
         
         # Remover duplicatas mantendo os mais relevantes
         seen_texts = set()
@@ -2763,29 +3479,11 @@ async def get_synastry_interpretation(
         sign1_context = "\n\n".join([r.get('text', '') for r in sign1_unique_results[:10]])
         print(f"[SINASTRIA] Encontradas {len(sign1_unique_results)} informações sobre {sign1} (usando top 10)")
         
-        # 2. Buscar informações específicas sobre o Signo 2 (busca mais abrangente)
-        sign2_queries = [
-            f"{sign2} características personalidade traços comportamento",
-            f"{sign2} emoções valores comunicação relacionamentos",
-            f"{sign2} signo elemento modalidade",
-            f"{sign2} planeta regente casa natural"
-        ] if lang == 'pt' else [
-            f"{sign2} characteristics personality traits behavior",
-            f"{sign2} emotions values communication relationships",
-            f"{sign2} sign element modality",
-            f"{sign2} ruling planet natural house"
-        ]
-        
         print(f"[SINASTRIA] Buscando informações detalhadas sobre {sign2}...")
-        sign2_all_results = []
-        for query in sign2_queries:
-            results = rag_service.search(
-                query=query,
-                top_k=8,
-                category='astrology',
-                expand_query=True
-            )
-            sign2_all_results.extend(results)
+        sign2_offset = len(sign1_queries)
+        sign2_all_results = [
+            r for results in batch_results[sign2_offset:sign2_offset + len(sign2_queries)] for r in results
+        ]
         
         # Remover duplicatas mantendo os mais relevantes
         seen_texts = set()
@@ -2801,29 +3499,10 @@ async def get_synastry_interpretation(
         sign2_context = "\n\n".join([r.get('text', '') for r in sign2_unique_results[:10]])
         print(f"[SINASTRIA] Encontradas {len(sign2_unique_results)} informações sobre {sign2} (usando top 10)")
         
-        # 3. Buscar informações específicas sobre sinastria/compatibilidade entre os dois signos
-        synastry_queries = [
-            f"sinastria compatibilidade {sign1} com {sign2}",
-            f"relacionamento {sign1} {sign2} dinâmica",
-            f"{sign1} {sign2} pontos fortes desafios",
-            f"compatibilidade {sign1} {sign2} casal"
-        ] if lang == 'pt' else [
-            f"synastry compatibility {sign1} with {sign2}",
-            f"relationship {sign1} {sign2} dynamics",
-            f"{sign1} {sign2} strengths challenges",
-            f"compatibility {sign1} {sign2} couple"
-        ]
-        
         print(f"[SINASTRIA] Buscando informações sobre compatibilidade {sign1} + {sign2}...")
-        synastry_all_results = []
-        for query in synastry_queries:
-            results = rag_service.search(
-                query=query,
-                top_k=8,
-                category='astrology',
-                expand_query=True
-            )
-            synastry_all_results.extend(results)
+        synastry_all_results = [
+            r for results in batch_results[len(sign1_queries) + len(sign2_queries):] for r in results
+        ]
         
         # Remover duplicatas mantendo os mais relevantes
         seen_texts = set()
@@ -3206,7 +3885,7 @@ CRITICAL IMPORTANT:
         groq_model = getattr(settings, 'GROQ_MODEL', 'llama-3.1-8b-instant')
         
         print(f"[SINASTRIA] Gerando interpretação com IA (modelo: {groq_model})...")
-        interpretation = provider.generate_text(
+        interpretation = await provider.agenerate_text(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
             temperature=0.7,
@@ -16,7 +16,7 @@ async def test_groq():
         print(f"[TEST GROQ] Provedor obtido: {provider_name}")
         
         # Teste simples
-        test_response = provider.generate_text(
+        test_response = await provider.agenerate_text(
             system_prompt="Você é um assistente útil.",
             user_prompt="Responda apenas com 'OK' se estiver funcionando.",
             temperature=0.7,
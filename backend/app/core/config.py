@@ -1,7 +1,7 @@
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
 from pathlib import Path
-from typing import List, Union
+from typing import Dict, List, Union
 import os
 
 
@@ -56,6 +56,11 @@ class Settings(BaseSettings):
     
     # AI Provider Configuration
     AI_PROVIDER: str = "groq"  # Padrão: groq (rápido e profissional)
+    AI_MAX_CONCURRENCY: int = 32  # Gerações simultâneas por provedor (por worker)
+    AI_PROVIDER_CONCURRENCY: Dict[str, int] = {}  # Limites por provedor, ex: {"groq": 16}
+    FULL_BIRTH_CHART_CONCURRENCY: int = 6  # Seções geradas em paralelo por requisição (/full-birth-chart/all)
+    SKY_STATE_BUCKET_SECONDS: int = 60  # Céu atual compartilhado: um cálculo por bucket (sky_state)
+    SKY_STATE_PREROLL_BUCKETS: int = 2  # Próximos buckets pré-calculados em segundo plano
     
     # API Keys - Múltiplos provedores
     DEEPSEEK_API_KEY: str = ""  # Fallback
@@ -75,6 +80,36 @@ class Settings(BaseSettings):
     DOCS_PATH: str = "docs"
     INDEX_PATH: str = "rag_index_fastembed"
     BGE_MODEL_NAME: str = "BAAI/bge-small-en-v1.5"
+    RAG_ANN_BACKEND: str = ""  # "" (busca exata), "hnsw" (hnswlib) ou "ivfpq" (faiss-cpu)
+    RAG_EMBEDDINGS_DTYPE: str = "float32"  # "float16" reduz o índice em disco/memória pela metade
+    RAG_INGEST_WORKERS: int = 0  # Processos de extração de PDFs na reconstrução do índice (0 = número de CPUs)
+    
+    # Tabela pré-computada de planetas lentos (gerada por scripts/build_ephemeris_table.py)
+    EPHEMERIS_TABLE_PATH: str = "ephemeris_tables"
+    
+    # Cache de mapas natais (memória LRU/TTL + SQLite compartilhado entre workers)
+    CHART_CACHE_DB_PATH: str = "chart_cache.db"
+    CHART_CACHE_MEMORY_SIZE: int = 512
+    CHART_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    
+    # Cache persistente de interpretações da IA (tabela interpretation_cache)
+    INTERPRETATION_CACHE_ENABLED: bool = True
+    INTERPRETATION_CACHE_TTL_SECONDS: int = 90 * 24 * 3600
+    
+    # Geolocalização offline (gazetteer de cidades) e cache de timezone por coordenadas
+    GEO_GAZETTEER_PATH: str = ""  # Vazio = app/data/gazetteer_cities.csv
+    GEO_TIMEZONE_CACHE_SIZE: int = 4096
+    
+    # Cache em memória da autenticação (token verificado -> usuário e mapa primário), por worker
+    AUTH_CACHE_TTL_SECONDS: int = 60  # 0 desativa; alterações em outros workers aparecem após o TTL
+    AUTH_CACHE_SIZE: int = 10000
+    
+    # Instrumentação: header Server-Timing por requisição e endpoint /metrics (formato Prometheus)
+    METRICS_ENABLED: bool = True
+    
+    # Inicialização: o servidor aceita conexões logo e /readyz só fica pronto após o aquecimento
+    RUN_MIGRATIONS_ON_STARTUP: bool = True  # False = migrações fora de banda (python -m app.core.migrations)
+    WARMUP_ON_STARTUP: bool = True  # Carregar efemérides, modelo/índice do RAG e provedor de IA em segundo plano
     
     @field_validator('CORS_ORIGINS', mode='before')
     @classmethod
@@ -31,15 +31,10 @@ try:
         pool_recycle=3600,  # Recicla conexões após 1 hora
     )
     print("[DATABASE] ✅ Engine criado com sucesso")
-    
-    # Testar conexão
-    print("[DATABASE] 🧪 Testando conexão...")
-    from sqlalchemy import text
-    with engine.connect() as conn:
-        conn.execute(text("SELECT 1"))
-    print("[DATABASE] ✅ Conexão testada com sucesso")
+    # A conexão não é aberta no import: o aquecimento do startup e /readyz a
+    # verificam (app.core.warmup), sem atrasar o servidor
 except Exception as e:
-    print(f"[DATABASE] ❌ ERRO ao criar engine ou testar conexão: {e}")
+    print(f"[DATABASE] ❌ ERRO ao criar engine: {e}")
     import traceback
     print(f"[DATABASE] Traceback: {traceback.format_exc()}")
     raise
@@ -60,6 +55,11 @@ if settings.DATABASE_URL.startswith("sqlite"):
         cursor.execute("PRAGMA cache_size=-64000")  # 64MB
         cursor.close()
 
+# Tempo das queries no Server-Timing e em /metrics (etapa db)
+if settings.METRICS_ENABLED:
+    from app.core.metrics import instrument_engine
+    instrument_engine(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
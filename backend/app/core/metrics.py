@@ -0,0 +1,432 @@
+"""
+Instrumentação de desempenho: tempo por etapa, header Server-Timing e /metrics.
+
+Etapas instrumentadas (nome → onde é medido):
+- ephemeris: cálculos do Swiss Ephemeris (mapas, revolução solar, lotes de posições)
+- rag: rag_service.search / search_many
+- llm: gerações dos provedores de IA (também por provedor)
+- db: queries SQL do engine do SQLAlchemy
+
+Cada requisição acumula o tempo das suas etapas (ContextVar, propagado para
+asyncio.to_thread e para o threadpool dos endpoints síncronos) e o devolve no
+header Server-Timing. Os histogramas do processo são expostos em /metrics no
+formato texto do Prometheus, sem dependência de prometheus_client.
+
+Etapas aninhadas com o mesmo nome (ex: calculate_complete_chart_with_houses →
+create_kr_instance) são contadas uma única vez, pela mais externa.
+Etapas executadas em paralelo na mesma requisição (ex: seções da IA em
+asyncio.gather) têm as durações somadas no Server-Timing.
+"""
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import threading
+
+from app.core.config import settings
+
+
+# Limites dos buckets de duração (segundos): de queries rápidas a gerações longas da IA
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_PREFIX = "astrologia"
+
+# Etapas sempre listadas no Server-Timing, na ordem (as demais vêm depois)
+SERVER_TIMING_STAGES = ('ephemeris', 'rag', 'llm', 'db')
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Histograma cumulativo com rótulos (seguro entre threads)."""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (), buckets: Sequence[float] = DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # [contagem por bucket (não cumulativa, último = +Inf), soma, total]
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Dict[str, object]]:
+        """Contagem, soma e buckets cumulativos por combinação de rótulos."""
+        with self._lock:
+            series = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+        result = {}
+        for labels, (counts, total, count) in series.items():
+            cumulative, running = [], 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                running += bucket_count
+                cumulative.append((bound, running))
+            result[labels] = {'buckets': cumulative, 'sum': total, 'count': count}
+        return result
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, data in sorted(self.snapshot().items()):
+            for bound, cumulative in data['buckets']:
+                le = 'le="{}"'.format(_format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {_format_value(data['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {data['count']}")
+        return lines
+
+
+class Gauge:
+    """Valor instantâneo com rótulos (ex: requisições em andamento)."""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+    def value(self, *label_values: str) -> float:
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        for labels, value in values:
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Métricas do processo e coletores consultados a cada leitura de /metrics."""
+
+    def __init__(self):
+        self._metrics: "OrderedDict[str, object]" = OrderedDict()
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        """Coletor: função que retorna linhas prontas no formato Prometheus."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                print(f"[WARNING] Coletor de métricas falhou: {e}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION = REGISTRY.register(Histogram(
+    f"{METRIC_PREFIX}_stage_duration_seconds",
+    "Duração das etapas instrumentadas (ephemeris, rag, llm, db).",
+    ['stage']
+))
+STAGE_IN_FLIGHT = REGISTRY.register(Gauge(
+    f"{METRIC_PREFIX}_stage_in_flight",
+    "Etapas em execução no momento.",
+    ['stage']
+))
+LLM_DURATION = REGISTRY.register(Histogram(
+    f"{METRIC_PREFIX}_llm_duration_seconds",
+    "Duração das gerações de texto por provedor de IA.",
+    ['provider', 'outcome']
+))
+HTTP_DURATION = REGISTRY.register(Histogram(
+    f"{METRIC_PREFIX}_http_request_duration_seconds",
+    "Duração das requisições HTTP por endpoint (até o fim da resposta).",
+    ['method', 'endpoint', 'status']
+))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    f"{METRIC_PREFIX}_http_requests_in_flight",
+    "Requisições HTTP em andamento."
+))
+
+
+# ===== Tempos por requisição (Server-Timing) =====
+
+class RequestTimings:
+    """Tempo acumulado e quantidade de chamadas por etapa em uma requisição."""
+
+    def __init__(self):
+        self.started = perf_counter()
+        self._stages: "OrderedDict[str, List]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._stages.setdefault(stage, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def stages(self) -> Dict[str, Tuple[float, int]]:
+        with self._lock:
+            return {name: (entry[0], entry[1]) for name, entry in self._stages.items()}
+
+    def header(self) -> str:
+        """Valor do header Server-Timing (durações em milissegundos)."""
+        stages = self.stages()
+        names = [name for name in SERVER_TIMING_STAGES if name in stages]
+        names += [name for name in stages if name not in SERVER_TIMING_STAGES]
+        parts = [f'{name};dur={stages[name][0] * 1000:.2f};desc="{stages[name][1]}x"' for name in names]
+        parts.append(f"total;dur={(perf_counter() - self.started) * 1000:.2f}")
+        return ", ".join(parts)
+
+
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar('request_timings', default=None)
+_active_stages: ContextVar[frozenset] = ContextVar('active_stages', default=frozenset())
+
+
+def current_request_timings() -> Optional[RequestTimings]:
+    """Tempos da requisição em andamento (None fora de uma requisição)."""
+    return _request_timings.get()
+
+
+def observe_stage(name: str, seconds: float) -> None:
+    """Registra uma etapa já medida no histograma e na requisição atual."""
+    if not settings.METRICS_ENABLED:
+        return
+    STAGE_DURATION.observe(seconds, name)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def stage(name: str):
+    """Mede o bloco como a etapa `name` (ignorado se já estiver dentro dela)."""
+    active = _active_stages.get()
+    if not settings.METRICS_ENABLED or name in active:
+        yield
+        return
+
+    token = _active_stages.set(active | {name})
+    STAGE_IN_FLIGHT.inc(name)
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = perf_counter() - started
+        STAGE_IN_FLIGHT.dec(name)
+        _active_stages.reset(token)
+        observe_stage(name, elapsed)
+
+
+def timed_stage(name: str) -> Callable:
+    """Decorador: cada chamada da função é medida como a etapa `name`."""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def observe_llm(provider: str, seconds: float, ok: bool = True) -> None:
+    """Registra uma geração da IA (histograma por provedor + etapa llm)."""
+    if not settings.METRICS_ENABLED:
+        return
+    LLM_DURATION.observe(seconds, provider, "ok" if ok else "error")
+    observe_stage('llm', seconds)
+
+
+# ===== Banco de dados =====
+
+def instrument_engine(engine) -> None:
+    """Mede cada query do engine como a etapa db."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_query_started', []).append(perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('metrics_query_started')
+        if started:
+            observe_stage('db', perf_counter() - started.pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        connection = exception_context.connection
+        started = connection.info.get('metrics_query_started') if connection is not None else None
+        if started:
+            observe_stage('db', perf_counter() - started.pop())
+
+
+# ===== Middleware HTTP =====
+
+_endpoint_paths: Dict[object, str] = {}
+
+
+def _endpoint_label(scope) -> str:
+    """Caminho da rota (ex: /api/best-timing/calculate), não a URL com parâmetros."""
+    endpoint = scope.get('endpoint')
+    if endpoint is None:
+        return "unmatched"
+    path = _endpoint_paths.get(endpoint)
+    if path is None:
+        app = scope.get('app')
+        for route in getattr(app, 'routes', []):
+            if getattr(route, 'endpoint', None) is endpoint:
+                path = route.path
+                break
+        path = _endpoint_paths[endpoint] = path or getattr(endpoint, '__name__', 'unknown')
+    return path
+
+
+class ServerTimingMiddleware:
+    """
+    Middleware ASGI: acumula as etapas da requisição, adiciona o header
+    Server-Timing e registra a duração por endpoint e as requisições em andamento.
+
+    Em respostas em streaming o header reflete as etapas até o início do envio;
+    o histograma por endpoint mede até o fim do corpo.
+    """
+
+    def __init__(self, app, allowed_origins: Sequence[str] = ()):
+        self.app = app
+        self.allowed_origins = set(allowed_origins)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        from starlette.datastructures import Headers, MutableHeaders
+
+        timings = RequestTimings()
+        token = _request_timings.set(timings)
+        origin = Headers(scope=scope).get('origin')
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                headers = MutableHeaders(scope=message)
+                headers.append('Server-Timing', timings.header())
+                # Sem Timing-Allow-Origin o navegador esconde o Server-Timing de outra origem
+                if origin and origin in self.allowed_origins:
+                    headers.append('Timing-Allow-Origin', origin)
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            _request_timings.reset(token)
+            HTTP_DURATION.observe(
+                perf_counter() - timings.started,
+                scope.get('method', ''), _endpoint_label(scope), str(status_code)
+            )
+
+
+# ===== Caches (lidos a cada /metrics) =====
+
+def _cache_counters() -> Dict[str, Tuple[int, int]]:
+    """(acertos, falhas) de cada cache do processo."""
+    counters = {}
+
+    from app.services.chart_data_cache import ChartDataCache
+    chart = ChartDataCache.stats()
+    counters['chart_data'] = (chart.get('memory_hits', 0) + chart.get('disk_hits', 0), chart.get('misses', 0))
+
+    from app.services.interpretation_cache import interpretation_cache_stats
+    interpretation = interpretation_cache_stats()
+    counters['interpretation'] = (interpretation['hits'], interpretation['misses'])
+
+    from app.services.geo_service import geo_cache_stats
+    geo = geo_cache_stats()
+    counters['geo_timezone'] = (geo['hits'], geo['misses'])
+
+    from app.services.auth_cache import auth_cache_stats
+    auth = auth_cache_stats()
+    counters['auth'] = (auth['hits'], auth['misses'])
+
+    from app.services import sky_state
+    if sky_state._provider is not None:
+        sky = sky_state._provider.stats()
+        counters['sky_state'] = (sky['hits'], sky['misses'])
+
+    # Não carregar o serviço RAG só para ler as métricas
+    from app.services import rag_service_fastembed
+    if rag_service_fastembed._rag_service_instance is not None:
+        rag = rag_service_fastembed._rag_service_instance.query_cache_stats()
+        counters['rag_query_embedding'] = (rag['hits'], rag['misses'])
+
+    return counters
+
+
+def collect_cache_metrics() -> List[str]:
+    counters = _cache_counters()
+    requests_name = f"{METRIC_PREFIX}_cache_requests_total"
+    ratio_name = f"{METRIC_PREFIX}_cache_hit_ratio"
+    lines = [
+        f"# HELP {requests_name} Consultas aos caches do processo por resultado.",
+        f"# TYPE {requests_name} counter",
+    ]
+    for cache, (hits, misses) in counters.items():
+        lines.append(f'{requests_name}{{cache="{cache}",result="hit"}} {hits}')
+        lines.append(f'{requests_name}{{cache="{cache}",result="miss"}} {misses}')
+    lines += [
+        f"# HELP {ratio_name} Fração de acertos de cada cache desde o início do processo.",
+        f"# TYPE {ratio_name} gauge",
+    ]
+    for cache, (hits, misses) in counters.items():
+        total = hits + misses
+        lines.append(f'{ratio_name}{{cache="{cache}"}} {_format_value(hits / total if total else 0.0)}')
+    return lines
+
+
+REGISTRY.add_collector(collect_cache_metrics)
+
+
+def render_metrics() -> str:
+    """Todas as métricas no formato texto do Prometheus."""
+    return REGISTRY.render()
@@ -0,0 +1,152 @@
+"""
+Migrações do banco de dados (fora do caminho de inicialização do servidor).
+
+Antes, app/main.py criava as tabelas e inspecionava/alterava o schema no
+import, atrasando o momento em que o container aceita tráfego. Agora:
+- Fora de banda (release/deploy): python -m app.core.migrations
+- Ou em segundo plano no startup (RUN_MIGRATIONS_ON_STARTUP=True), antes
+  de /readyz ficar pronto (ver app.core.warmup)
+
+As etapas são idempotentes; falhas são registradas como aviso, como antes.
+"""
+import sys
+import traceback
+
+from app.core.database import engine as default_engine, Base
+
+
+def run_migrations(engine=None) -> bool:
+    """
+    Cria as tabelas e aplica as migrações automáticas (colunas e tabelas
+    necessárias, apenas para PostgreSQL; SQLite já foi migrado manualmente).
+
+    Returns:
+        True se a criação das tabelas funcionou (avisos das migrações não contam)
+    """
+    engine = engine or default_engine
+
+    # Registrar os modelos no metadata antes do create_all
+    import app.models.database  # noqa: F401
+
+    tables_ok = True
+    try:
+        print("[MIGRATION] 🏗️  Criando tabelas do banco de dados...")
+        Base.metadata.create_all(bind=engine)
+        print("[MIGRATION] ✅ Tabelas criadas/verificadas")
+    except Exception as e:
+        tables_ok = False
+        print(f"[MIGRATION] ❌ ERRO ao criar tabelas: {e}")
+        print(f"[MIGRATION] Traceback: {traceback.format_exc()}")
+        # Pode ser que as tabelas já existam
+
+    try:
+        from sqlalchemy import text, inspect
+        inspector = inspect(engine)
+    
+        # Verificar e adicionar colunas de verificação de email na tabela users
+        try:
+            columns = [col['name'] for col in inspector.get_columns('users')]
+        
+            if 'email_verified' not in columns:
+                print("[MIGRATION] Adicionando colunas de verificação de email...")
+                with engine.connect() as conn:
+                    conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS email_verified BOOLEAN DEFAULT FALSE"))
+                    conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS verification_code TEXT"))
+                    conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS verification_code_expires TIMESTAMP"))
+                    conn.execute(text("ALTER TABLE users ALTER COLUMN is_active SET DEFAULT FALSE"))
+                    conn.commit()
+                    print("[MIGRATION] ✅ Colunas de verificação adicionadas com sucesso!")
+        except Exception as e:
+            print(f"[MIGRATION] Aviso ao verificar colunas users: {e}")
+    
+        # Verificar se tabela pending_registrations existe
+        try:
+            tables = inspector.get_table_names()
+            if 'pending_registrations' not in tables:
+                print("[MIGRATION] Criando tabela pending_registrations...")
+                with engine.connect() as conn:
+                    # Criar tabela pending_registrations
+                    conn.execute(text("""
+                        CREATE TABLE IF NOT EXISTS pending_registrations (
+                            id SERIAL PRIMARY KEY,
+                            email VARCHAR UNIQUE NOT NULL,
+                            password_hash VARCHAR,
+                            name VARCHAR,
+                            verification_code VARCHAR NOT NULL,
+                            verification_code_expires TIMESTAMP NOT NULL,
+                            birth_chart_data TEXT NOT NULL,
+                            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                        )
+                    """))
+                    # Criar índices
+                    conn.execute(text("CREATE INDEX IF NOT EXISTS idx_pending_registrations_email ON pending_registrations(email)"))
+                    conn.execute(text("CREATE INDEX IF NOT EXISTS idx_pending_registrations_expires ON pending_registrations(verification_code_expires)"))
+                    conn.commit()
+                    print("[MIGRATION] ✅ Tabela pending_registrations criada com sucesso!")
+            else:
+                print("[MIGRATION] ✅ Tabela pending_registrations já existe")
+        except Exception as e:
+            print(f"[MIGRATION] Aviso ao verificar tabela pending_registrations: {e}")
+            # Tentar criar via SQLAlchemy como fallback
+            try:
+                from app.models.database import PendingRegistration
+                PendingRegistration.__table__.create(bind=engine, checkfirst=True)
+                print("[MIGRATION] ✅ Tabela pending_registrations criada via SQLAlchemy")
+            except Exception as e2:
+                print(f"[MIGRATION] Erro ao criar pending_registrations: {e2}")
+    
+        # Índice composto do mapa primário (bancos criados antes do índice existir no modelo)
+        try:
+            from app.models.database import BirthChart
+            for index in BirthChart.__table__.indexes:
+                index.create(bind=engine, checkfirst=True)
+        except Exception as e:
+            print(f"[MIGRATION] Aviso ao criar índices de birth_charts: {e}")
+    
+        # Verificar e corrigir foreign key constraint com CASCADE
+        try:
+            # Verificar se a constraint existe e se tem CASCADE
+            with engine.connect() as conn:
+                result = conn.execute(text("""
+                    SELECT 
+                        rc.delete_rule
+                    FROM information_schema.referential_constraints AS rc
+                    JOIN information_schema.table_constraints AS tc
+                      ON rc.constraint_name = tc.constraint_name
+                    JOIN information_schema.key_column_usage AS kcu
+                      ON tc.constraint_name = kcu.constraint_name
+                    WHERE tc.table_name = 'birth_charts' 
+                      AND tc.constraint_type = 'FOREIGN KEY'
+                      AND kcu.column_name = 'user_id'
+                    LIMIT 1
+                """))
+                constraint = result.fetchone()
+            
+                if constraint and constraint[0] != 'CASCADE':
+                    print("[MIGRATION] Corrigindo foreign key constraint para CASCADE...")
+                    # Remover constraint antiga
+                    conn.execute(text("ALTER TABLE birth_charts DROP CONSTRAINT IF EXISTS birth_charts_user_id_fkey"))
+                    # Recriar com CASCADE
+                    conn.execute(text("""
+                        ALTER TABLE birth_charts 
+                        ADD CONSTRAINT birth_charts_user_id_fkey 
+                        FOREIGN KEY (user_id) 
+                        REFERENCES users(id) 
+                        ON DELETE CASCADE
+                    """))
+                    conn.commit()
+                    print("[MIGRATION] ✅ Foreign key constraint corrigida com CASCADE!")
+                elif constraint and constraint[0] == 'CASCADE':
+                    print("[MIGRATION] ✅ Foreign key constraint já tem CASCADE")
+        except Exception as e:
+            print(f"[MIGRATION] Aviso ao verificar foreign key constraint: {e}")
+            
+    except Exception as e:
+        print(f"[MIGRATION] Aviso: Não foi possível executar migração automática: {e}")
+        print("[MIGRATION] Execute os scripts de migração manualmente se necessário.")
+
+    return tables_ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_migrations() else 1)
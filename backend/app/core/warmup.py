@@ -0,0 +1,177 @@
+"""
+Aquecimento em segundo plano e prontidão do servidor (/livez e /readyz).
+
+O import de app.main não abre conexões nem carrega dependências pesadas:
+o servidor aceita conexões em seguida e, em uma thread, executa as etapas
+abaixo. /readyz só responde 200 depois delas, então o balanceador não manda
+a primeira requisição de usuário para um worker que ainda carregaria o modelo.
+
+Etapas (na ordem):
+- migrations: tabelas e migrações automáticas (se RUN_MIGRATIONS_ON_STARTUP)
+- database: conexão com o banco
+- ephemeris: kerykeion/Swiss Ephemeris, tabela de planetas lentos, gazetteer e céu atual
+- rag: modelo FastEmbed (ONNX), índice e documentos aprendidos
+- ai_provider: cliente do provedor de IA configurado
+
+Uma etapa que falha é registrada e não impede as seguintes: o serviço
+correspondente volta a tentar carregar sob demanda, como antes.
+"""
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+import threading
+import time
+import traceback
+
+from app.core.config import settings
+
+
+def _run_migrations() -> None:
+    from app.core.migrations import run_migrations
+    if not run_migrations():
+        raise RuntimeError("Falha ao criar as tabelas do banco de dados")
+
+
+def check_database() -> None:
+    """Abre uma conexão e executa SELECT 1 (exceção se o banco estiver indisponível)."""
+    from sqlalchemy import text
+    from app.core.database import engine
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+def _warm_ephemeris() -> None:
+    from app.services.swiss_ephemeris_calculator import create_kr_instance
+    from app.services.slow_planet_table import get_slow_planet_table
+    from app.services.geo_service import get_gazetteer
+    from app.services.sky_state import get_sky_state
+
+    get_gazetteer()
+    get_slow_planet_table()
+    create_kr_instance(datetime(2000, 1, 1), "12:00", -23.5505, -46.6333, "America/Sao_Paulo")
+    get_sky_state()
+
+
+def _warm_rag() -> None:
+    from app.services.rag_service_fastembed import get_rag_service
+
+    service = get_rag_service()
+    if service is None:
+        raise RuntimeError("Serviço RAG indisponível")
+    # A primeira inferência do ONNX aloca buffers: fazer aqui, não na requisição
+    if service.embedding_model is not None and service.documents:
+        service.search("Sol em Áries", top_k=1)
+
+
+def _warm_ai_provider() -> None:
+    from app.services.ai_provider_service import get_ai_provider
+
+    if get_ai_provider() is None:
+        raise RuntimeError("Nenhum provedor de IA configurado")
+
+
+def warmup_steps() -> List[Tuple[str, Callable[[], None]]]:
+    """Etapas do aquecimento conforme a configuração."""
+    steps = []
+    if settings.RUN_MIGRATIONS_ON_STARTUP:
+        steps.append(('migrations', _run_migrations))
+    steps.append(('database', check_database))
+    if settings.WARMUP_ON_STARTUP:
+        steps += [
+            ('ephemeris', _warm_ephemeris),
+            ('rag', _warm_rag),
+            ('ai_provider', _warm_ai_provider),
+        ]
+    return steps
+
+
+_state_lock = threading.Lock()
+_state: Dict[str, object] = {'started_at': None, 'finished_at': None, 'steps': OrderedDict()}
+_thread: Optional[threading.Thread] = None
+
+
+def _set_step(name: str, **values) -> None:
+    with _state_lock:
+        _state['steps'].setdefault(name, {'status': 'pending', 'duration_ms': None, 'error': None}).update(values)
+
+
+def run_warmup(steps: Optional[List[Tuple[str, Callable[[], None]]]] = None) -> Dict[str, object]:
+    """Executa as etapas em sequência (bloqueante) e retorna o estado final."""
+    steps = warmup_steps() if steps is None else steps
+    with _state_lock:
+        _state['started_at'] = datetime.now().isoformat(timespec='seconds')
+        _state['finished_at'] = None
+        _state['steps'] = OrderedDict(
+            (name, {'status': 'pending', 'duration_ms': None, 'error': None}) for name, _ in steps
+        )
+
+    for name, func in steps:
+        _set_step(name, status='running')
+        started = time.perf_counter()
+        try:
+            func()
+            duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            _set_step(name, status='ok', duration_ms=duration_ms)
+            print(f"[WARMUP] ✅ {name} ({duration_ms:.0f} ms)")
+        except Exception as e:
+            _set_step(name, status='failed', error=str(e), duration_ms=round((time.perf_counter() - started) * 1000, 1))
+            print(f"[WARMUP] ⚠️  {name} falhou: {e}")
+            print(f"[WARMUP] Traceback: {traceback.format_exc()}")
+
+    with _state_lock:
+        _state['finished_at'] = datetime.now().isoformat(timespec='seconds')
+    return warmup_state()
+
+
+def start_warmup() -> bool:
+    """Inicia o aquecimento em uma thread (uma vez por processo). True se iniciou agora."""
+    global _thread
+    with _state_lock:
+        if _thread is not None:
+            return False
+        _thread = threading.Thread(target=run_warmup, name="warmup", daemon=True)
+    _thread.start()
+    return True
+
+
+def warmup_state() -> Dict[str, object]:
+    """Cópia do estado: início, fim e status/duração/erro de cada etapa."""
+    with _state_lock:
+        return {
+            'started_at': _state['started_at'],
+            'finished_at': _state['finished_at'],
+            'steps': {name: dict(step) for name, step in _state['steps'].items()},
+        }
+
+
+def readiness() -> Dict[str, object]:
+    """
+    Pronto = aquecimento concluído e banco acessível agora (verificado a cada
+    chamada, para o worker voltar a ficar pronto quando o banco voltar).
+    """
+    state = warmup_state()
+    database = "unknown"
+    if state['finished_at'] is not None:
+        try:
+            check_database()
+            database = "connected"
+        except Exception:
+            database = "disconnected"
+
+    ready = state['finished_at'] is not None and database == "connected"
+    return {
+        'status': "ready" if ready else ("starting" if state['finished_at'] is None else "unavailable"),
+        'ready': ready,
+        'database': database,
+        'warmup': state,
+    }
+
+
+def reset_warmup() -> None:
+    """Volta ao estado inicial (testes)."""
+    global _thread
+    with _state_lock:
+        _thread = None
+        _state['started_at'] = None
+        _state['finished_at'] = None
+        _state['steps'] = OrderedDict()
@@ -30,9 +30,9 @@ except Exception as e:
     sys.exit(1)
 
 try:
-    print("[STARTUP] 🗄️  Conectando ao banco de dados...")
-    from app.core.database import engine, Base
-    print(f"[STARTUP] ✅ Engine do banco criado")
+    print("[STARTUP] 🗄️  Configurando banco de dados...")
+    from app.core.database import engine
+    print(f"[STARTUP] ✅ Engine do banco criado (conexão verificada em /readyz)")
 except Exception as e:
     print(f"[STARTUP] ❌ ERRO ao conectar banco: {e}")
     print(f"[STARTUP] Traceback: {traceback.format_exc()}")
@@ -49,114 +49,9 @@ except Exception as e:
     print(f"[STARTUP] Traceback: {traceback.format_exc()}")
     sys.exit(1)
 
-try:
-    print("[STARTUP] 🏗️  Criando tabelas do banco de dados...")
-    Base.metadata.create_all(bind=engine)
-    print("[STARTUP] ✅ Tabelas criadas/verificadas")
-except Exception as e:
-    print(f"[STARTUP] ❌ ERRO ao criar tabelas: {e}")
-    print(f"[STARTUP] Traceback: {traceback.format_exc()}")
-    # Não sair aqui, pode ser que as tabelas já existam
-
-# Migração automática: Adicionar colunas e tabelas necessárias
-# (apenas para PostgreSQL, SQLite já foi migrado manualmente)
-try:
-    from sqlalchemy import text, inspect
-    inspector = inspect(engine)
-    
-    # Verificar e adicionar colunas de verificação de email na tabela users
-    try:
-        columns = [col['name'] for col in inspector.get_columns('users')]
-        
-        if 'email_verified' not in columns:
-            print("[MIGRATION] Adicionando colunas de verificação de email...")
-            with engine.connect() as conn:
-                conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS email_verified BOOLEAN DEFAULT FALSE"))
-                conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS verification_code TEXT"))
-                conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS verification_code_expires TIMESTAMP"))
-                conn.execute(text("ALTER TABLE users ALTER COLUMN is_active SET DEFAULT FALSE"))
-                conn.commit()
-                print("[MIGRATION] ✅ Colunas de verificação adicionadas com sucesso!")
-    except Exception as e:
-        print(f"[MIGRATION] Aviso ao verificar colunas users: {e}")
-    
-    # Verificar se tabela pending_registrations existe
-    try:
-        tables = inspector.get_table_names()
-        if 'pending_registrations' not in tables:
-            print("[MIGRATION] Criando tabela pending_registrations...")
-            with engine.connect() as conn:
-                # Criar tabela pending_registrations
-                conn.execute(text("""
-                    CREATE TABLE IF NOT EXISTS pending_registrations (
-                        id SERIAL PRIMARY KEY,
-                        email VARCHAR UNIQUE NOT NULL,
-                        password_hash VARCHAR,
-                        name VARCHAR,
-                        verification_code VARCHAR NOT NULL,
-                        verification_code_expires TIMESTAMP NOT NULL,
-                        birth_chart_data TEXT NOT NULL,
-                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-                    )
-                """))
-                # Criar índices
-                conn.execute(text("CREATE INDEX IF NOT EXISTS idx_pending_registrations_email ON pending_registrations(email)"))
-                conn.execute(text("CREATE INDEX IF NOT EXISTS idx_pending_registrations_expires ON pending_registrations(verification_code_expires)"))
-                conn.commit()
-                print("[MIGRATION] ✅ Tabela pending_registrations criada com sucesso!")
-        else:
-            print("[MIGRATION] ✅ Tabela pending_registrations já existe")
-    except Exception as e:
-        print(f"[MIGRATION] Aviso ao verificar tabela pending_registrations: {e}")
-        # Tentar criar via SQLAlchemy como fallback
-        try:
-            from app.models.database import PendingRegistration
-            PendingRegistration.__table__.create(bind=engine, checkfirst=True)
-            print("[MIGRATION] ✅ Tabela pending_registrations criada via SQLAlchemy")
-        except Exception as e2:
-            print(f"[MIGRATION] Erro ao criar pending_registrations: {e2}")
-    
-    # Verificar e corrigir foreign key constraint com CASCADE
-    try:
-        # Verificar se a constraint existe e se tem CASCADE
-        with engine.connect() as conn:
-            result = conn.execute(text("""
-                SELECT 
-                    rc.delete_rule
-                FROM information_schema.referential_constraints AS rc
-                JOIN information_schema.table_constraints AS tc
-                  ON rc.constraint_name = tc.constraint_name
-                JOIN information_schema.key_column_usage AS kcu
-                  ON tc.constraint_name = kcu.constraint_name
-                WHERE tc.table_name = 'birth_charts' 
-                  AND tc.constraint_type = 'FOREIGN KEY'
-                  AND kcu.column_name = 'user_id'
-                LIMIT 1
-            """))
-            constraint = result.fetchone()
-            
-            if constraint and constraint[0] != 'CASCADE':
-                print("[MIGRATION] Corrigindo foreign key constraint para CASCADE...")
-                # Remover constraint antiga
-                conn.execute(text("ALTER TABLE birth_charts DROP CONSTRAINT IF EXISTS birth_charts_user_id_fkey"))
-                # Recriar com CASCADE
-                conn.execute(text("""
-                    ALTER TABLE birth_charts 
-                    ADD CONSTRAINT birth_charts_user_id_fkey 
-                    FOREIGN KEY (user_id) 
-                    REFERENCES users(id) 
-                    ON DELETE CASCADE
-                """))
-                conn.commit()
-                print("[MIGRATION] ✅ Foreign key constraint corrigida com CASCADE!")
-            elif constraint and constraint[0] == 'CASCADE':
-                print("[MIGRATION] ✅ Foreign key constraint já tem CASCADE")
-    except Exception as e:
-        print(f"[MIGRATION] Aviso ao verificar foreign key constraint: {e}")
-            
-except Exception as e:
-    print(f"[MIGRATION] Aviso: Não foi possível executar migração automática: {e}")
-    print("[MIGRATION] Execute os scripts de migração manualmente se necessário.")
+# Criação de tabelas e migrações: fora do import (app.core.migrations).
+# Rodam fora de banda (python -m app.core.migrations) ou no aquecimento em
+# segundo plano do startup (RUN_MIGRATIONS_ON_STARTUP), antes de /readyz.
 
 print("=" * 80)
 print("[STARTUP] 🎯 Criando aplicação FastAPI...")
@@ -205,6 +100,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Server-Timing por requisição e duração por endpoint (registrado depois do CORS = mais externo)
+if settings.METRICS_ENABLED:
+    from app.core.metrics import ServerTimingMiddleware
+    app.add_middleware(ServerTimingMiddleware, allowed_origins=cors_origins)
+
 # Exception handlers para garantir CORS mesmo em erros
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
@@ -287,6 +187,34 @@ def health_check():
         )
 
 
+@app.get("/livez")
+def liveness_check():
+    """Liveness: o processo responde (sem I/O; não depende do banco nem do aquecimento)"""
+    return {"status": "alive", "service": "astrologia-api"}
+
+@app.get("/readyz")
+def readiness_check():
+    """Readiness: aquecimento concluído (migrações, efemérides, RAG, IA) e banco acessível"""
+    from app.core.warmup import readiness
+
+    result = readiness()
+    result["service"] = "astrologia-api"
+    if not result["ready"]:
+        return JSONResponse(status_code=503, content=result)
+    return result
+
+
+@app.get("/metrics")
+def metrics():
+    """Métricas do processo no formato Prometheus (etapas, provedores de IA, endpoints e caches)"""
+    from fastapi.responses import PlainTextResponse
+    from app.core.metrics import render_metrics
+
+    if not settings.METRICS_ENABLED:
+        return JSONResponse(status_code=404, content={"detail": "Métricas desabilitadas"})
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # Eventos de startup/shutdown para logs
 try:
     @app.on_event("startup")
@@ -297,6 +225,10 @@ try:
         print(f"[STARTUP] ⏰ Timestamp: {datetime.now().isoformat()}")
         print(f"[STARTUP] 🌐 Porta: {os.environ.get('PORT', '8000')}")
         print(f"[STARTUP] 🗄️  Database: {settings.DATABASE_URL[:30]}...")
+        # Migrações e carga das dependências pesadas em segundo plano (/readyz indica o fim)
+        from app.core.warmup import start_warmup
+        if start_warmup():
+            print("[STARTUP] 🔥 Aquecimento iniciado em segundo plano (acompanhe em /readyz)")
         print("[STARTUP] ✅ Aplicação pronta para receber requisições")
         print("=" * 80)
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Boolean, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -43,6 +43,10 @@ class User(Base):
 
 class BirthChart(Base):
     __tablename__ = "birth_charts"
+    __table_args__ = (
+        # Busca do mapa primário do usuário autenticado (user_id + is_primary)
+        Index("ix_birth_charts_user_id_is_primary", "user_id", "is_primary"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -72,3 +76,21 @@ class BirthChart(Base):
     # Relationship
     user = relationship("User", back_populates="birth_charts")
 
+
+class InterpretationCache(Base):
+    """Interpretações geradas pela IA, endereçadas pelo hash dos dados do prompt."""
+    __tablename__ = "interpretation_cache"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), unique=True, index=True, nullable=False)  # mapa + seção + idioma + modelo + versão
+    birth_key = Column(String(64), index=True, nullable=False)  # data/hora/local (para invalidação)
+    
+    section = Column(String, nullable=False)
+    language = Column(String, nullable=False)
+    provider = Column(String, nullable=False)
+    model = Column(String, nullable=True)
+    prompt_version = Column(String, nullable=False)
+    
+    content = Column(Text, nullable=False)  # JSON da resposta do endpoint
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime, index=True, nullable=False)
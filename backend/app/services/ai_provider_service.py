@@ -1,12 +1,23 @@
 """
 Serviço abstrato para múltiplos provedores de IA.
 Permite trocar facilmente entre Groq, OpenAI, Anthropic, Google Gemini, etc.
+
+Cada provedor expõe generate_text (síncrono), agenerate_text (assíncrono,
+para uso dentro dos handlers async do FastAPI sem bloquear o event loop) e
+astream_text (tokens conforme são gerados, para respostas em streaming).
+As instâncias são reutilizadas entre chamadas (conexões keep-alive) e cada
+provedor tem um limite de gerações simultâneas por worker. A duração de cada
+geração é registrada por provedor (app.core.metrics, etapa llm).
 """
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, Tuple
 from enum import Enum
+import asyncio
 import os
+import threading
+import time
 from app.core.config import settings
+from app.core.metrics import STAGE_IN_FLIGHT, observe_llm
 
 
 class AIProvider(str, Enum):
@@ -19,9 +30,34 @@ class AIProvider(str, Enum):
     OLLAMA = "ollama"  # Para modelos locais
 
 
+def _max_concurrency(provider_name: str) -> int:
+    """Limite de gerações simultâneas do provedor (AI_PROVIDER_CONCURRENCY ou AI_MAX_CONCURRENCY)."""
+    overrides = getattr(settings, "AI_PROVIDER_CONCURRENCY", None) or {}
+    limit = overrides.get(provider_name, getattr(settings, "AI_MAX_CONCURRENCY", 32))
+    return max(1, int(limit))
+
+
+# Semáforos por provedor: (event loop, semáforo). Recriados se o loop mudar.
+_concurrency_limiters: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = {}
+
+
+def _get_concurrency_limiter(provider_name: str) -> asyncio.Semaphore:
+    """Semáforo do provedor para o event loop atual."""
+    loop = asyncio.get_running_loop()
+    entry = _concurrency_limiters.get(provider_name)
+    if entry is None or entry[0] is not loop:
+        entry = (loop, asyncio.Semaphore(_max_concurrency(provider_name)))
+        _concurrency_limiters[provider_name] = entry
+    return entry[1]
+
+
 class AIProviderService(ABC):
     """Interface abstrata para provedores de IA."""
     
+    # Cliente assíncrono (pool de conexões httpx) e o event loop ao qual pertence
+    _async_client: Any = None
+    _async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+    
     @abstractmethod
     def generate_text(
         self,
@@ -34,6 +70,99 @@ class AIProviderService(ABC):
         """Gera texto usando o provedor de IA."""
         pass
     
+    async def agenerate_text(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        **kwargs
+    ) -> str:
+        """
+        Gera texto sem bloquear o event loop.
+        Respeita o limite de gerações simultâneas do provedor.
+        """
+        async with _get_concurrency_limiter(self.get_provider_name()):
+            started, ok = time.perf_counter(), False
+            STAGE_IN_FLIGHT.inc('llm')
+            try:
+                text = await self._agenerate(
+                    system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens, **kwargs
+                )
+                ok = True
+                return text
+            finally:
+                STAGE_IN_FLIGHT.dec('llm')
+                observe_llm(self.get_provider_name(), time.perf_counter() - started, ok)
+    
+    async def _agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        **kwargs
+    ) -> str:
+        """Implementação padrão: executa generate_text em uma thread."""
+        return await asyncio.to_thread(
+            self.generate_text, system_prompt, user_prompt,
+            temperature=temperature, max_tokens=max_tokens, **kwargs
+        )
+    
+    async def astream_text(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Gera texto em partes, conforme o provedor as envia.
+        A vaga no limite de concorrência é mantida até o fim do stream.
+        """
+        async with _get_concurrency_limiter(self.get_provider_name()):
+            started, ok = time.perf_counter(), False
+            STAGE_IN_FLIGHT.inc('llm')
+            try:
+                async for chunk in self._astream(
+                    system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens, **kwargs
+                ):
+                    if chunk:
+                        yield chunk
+                ok = True
+            finally:
+                STAGE_IN_FLIGHT.dec('llm')
+                observe_llm(self.get_provider_name(), time.perf_counter() - started, ok)
+    
+    async def _astream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Implementação padrão: texto completo em uma única parte."""
+        yield await self._agenerate(
+            system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens, **kwargs
+        )
+    
+    def _create_async_client(self):
+        """Cria o cliente assíncrono do SDK (None = usar a implementação em thread)."""
+        return None
+    
+    def _get_async_client(self):
+        """
+        Cliente assíncrono reutilizado entre chamadas.
+        O pool httpx pertence a um event loop, então é recriado se o loop mudar.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._async_client = self._create_async_client()
+            self._async_client_loop = loop
+        return self._async_client
+    
     @abstractmethod
     def is_available(self) -> bool:
         """Verifica se o provedor está disponível e configurado."""
@@ -43,11 +172,71 @@ class AIProviderService(ABC):
     def get_provider_name(self) -> str:
         """Retorna o nome do provedor."""
         pass
+    
+    # Modelo usado quando a chamada não informa 'model'
+    default_model: Optional[str] = None
+    
+    def get_model_name(self) -> Optional[str]:
+        """Retorna o modelo padrão do provedor (parte das chaves de cache)."""
+        return self.default_model
+
+
+def _chat_messages(system_prompt: str, user_prompt: str) -> list:
+    """Mensagens no formato chat (OpenAI, Groq, DeepSeek)."""
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+async def _astream_chat_completion(
+    async_client,
+    provider_label: str,
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float,
+    max_tokens: int,
+    **kwargs
+) -> AsyncIterator[str]:
+    """Stream de uma API de chat compatível com OpenAI (OpenAI, Groq, DeepSeek)."""
+    try:
+        stream = await async_client.chat.completions.create(
+            model=model,
+            messages=_chat_messages(system_prompt, user_prompt),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            top_p=kwargs.get("top_p", 0.9),
+            frequency_penalty=kwargs.get("frequency_penalty", 0.1),
+            presence_penalty=kwargs.get("presence_penalty", 0.1),
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    except Exception as e:
+        raise Exception(f"Erro ao gerar texto com {provider_label}: {str(e)}")
+
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def _get_http_session():
+    """Sessão requests compartilhada (keep-alive) para chamadas HTTP diretas."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            import requests
+            _http_session = requests.Session()
+        return _http_session
 
 
 class DeepSeekProvider(AIProviderService):
     """Implementação do provedor DeepSeek (compatível com OpenAI API)."""
     
+    default_model = "deepseek-chat"
+    
     def __init__(self):
         self.client = None
         self._initialize()
@@ -122,7 +311,6 @@ class DeepSeekProvider(AIProviderService):
                 return response.choices[0].message.content
             else:
                 # Usar requests diretamente (fallback se openai não estiver instalado)
-                import requests
                 headers = {
                     "Authorization": f"Bearer {self.api_key}",
                     "Content-Type": "application/json"
@@ -141,7 +329,7 @@ class DeepSeekProvider(AIProviderService):
                 }
                 # Usar timeout configurável (padrão 180 segundos)
                 timeout_seconds = getattr(self, 'timeout', 180) if hasattr(self, 'timeout') else int(os.getenv("DEEPSEEK_TIMEOUT", "180"))
-                response = requests.post(
+                response = _get_http_session().post(
                     "https://api.deepseek.com/chat/completions",
                     headers=headers,
                     json=data,
@@ -151,11 +339,82 @@ class DeepSeekProvider(AIProviderService):
                 return response.json()["choices"][0]["message"]["content"]
         except Exception as e:
             raise Exception(f"Erro ao gerar texto com DeepSeek: {str(e)}")
+    
+    def _create_async_client(self):
+        if self.client is None:
+            return None
+        from openai import AsyncOpenAI
+        return AsyncOpenAI(
+            api_key=self.api_key,
+            base_url="https://api.deepseek.com",
+            timeout=self.timeout,
+            max_retries=2
+        )
+    
+    async def _agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        model: str = "deepseek-chat",
+        **kwargs
+    ) -> str:
+        """Gera texto usando DeepSeek (cliente assíncrono)."""
+        if not self.is_available():
+            raise ValueError("DeepSeek não está disponível")
+        
+        async_client = self._get_async_client()
+        if async_client is None:
+            return await super()._agenerate(
+                system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens, model=model, **kwargs
+            )
+        
+        try:
+            response = await async_client.chat.completions.create(
+                model=model,
+                messages=_chat_messages(system_prompt, user_prompt),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                top_p=kwargs.get("top_p", 0.9),
+                frequency_penalty=kwargs.get("frequency_penalty", 0.1),
+                presence_penalty=kwargs.get("presence_penalty", 0.1)
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            raise Exception(f"Erro ao gerar texto com DeepSeek: {str(e)}")
+    
+    async def _astream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        model: str = "deepseek-chat",
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream de texto usando DeepSeek."""
+        if not self.is_available():
+            raise ValueError("DeepSeek não está disponível")
+        
+        async_client = self._get_async_client()
+        if async_client is None:
+            yield await self._agenerate(
+                system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens, model=model, **kwargs
+            )
+            return
+        
+        async for chunk in _astream_chat_completion(
+            async_client, "DeepSeek", model, system_prompt, user_prompt, temperature, max_tokens, **kwargs
+        ):
+            yield chunk
 
 
 class GroqProvider(AIProviderService):
     """Implementação do provedor Groq."""
     
+    default_model = "llama-3.1-8b-instant"
+    
     def __init__(self):
         self.client = None
         self._initialize()
@@ -168,7 +427,8 @@ class GroqProvider(AIProviderService):
                 return
             
             from groq import Groq
-            self.client = Groq(api_key=api_key.strip())
+            self.api_key = api_key.strip()
+            self.client = Groq(api_key=self.api_key)
         except Exception as e:
             print(f"[AI Provider] Erro ao inicializar Groq: {e}")
             self.client = None
@@ -180,6 +440,9 @@ class GroqProvider(AIProviderService):
     def get_provider_name(self) -> str:
         return "groq"
     
+    def get_model_name(self) -> str:
+        return getattr(settings, 'GROQ_MODEL', None) or self.default_model
+    
     def generate_text(
         self,
         system_prompt: str,
@@ -210,11 +473,62 @@ class GroqProvider(AIProviderService):
             return chat_completion.choices[0].message.content
         except Exception as e:
             raise Exception(f"Erro ao gerar texto com Groq: {str(e)}")
+    
+    def _create_async_client(self):
+        from groq import AsyncGroq
+        return AsyncGroq(api_key=self.api_key)
+    
+    async def _agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        model: str = "llama-3.1-8b-instant",
+        **kwargs
+    ) -> str:
+        """Gera texto usando Groq (cliente assíncrono)."""
+        if not self.is_available():
+            raise ValueError("Groq não está disponível")
+        
+        try:
+            chat_completion = await self._get_async_client().chat.completions.create(
+                model=model,
+                messages=_chat_messages(system_prompt, user_prompt),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                top_p=kwargs.get("top_p", 0.9),
+                frequency_penalty=kwargs.get("frequency_penalty", 0.1),
+                presence_penalty=kwargs.get("presence_penalty", 0.1)
+            )
+            return chat_completion.choices[0].message.content
+        except Exception as e:
+            raise Exception(f"Erro ao gerar texto com Groq: {str(e)}")
+    
+    async def _astream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        model: str = "llama-3.1-8b-instant",
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream de texto usando Groq."""
+        if not self.is_available():
+            raise ValueError("Groq não está disponível")
+        
+        async for chunk in _astream_chat_completion(
+            self._get_async_client(), "Groq", model, system_prompt, user_prompt, temperature, max_tokens, **kwargs
+        ):
+            yield chunk
 
 
 class OpenAIProvider(AIProviderService):
     """Implementação do provedor OpenAI."""
     
+    default_model = "gpt-4o-mini"
+    
     def __init__(self):
         self.client = None
         self._initialize()
@@ -227,7 +541,8 @@ class OpenAIProvider(AIProviderService):
                 return
             
             from openai import OpenAI
-            self.client = OpenAI(api_key=api_key.strip())
+            self.api_key = api_key.strip()
+            self.client = OpenAI(api_key=self.api_key)
         except Exception as e:
             print(f"[AI Provider] Erro ao inicializar OpenAI: {e}")
             self.client = None
@@ -269,11 +584,62 @@ class OpenAIProvider(AIProviderService):
             return response.choices[0].message.content
         except Exception as e:
             raise Exception(f"Erro ao gerar texto com OpenAI: {str(e)}")
+    
+    def _create_async_client(self):
+        from openai import AsyncOpenAI
+        return AsyncOpenAI(api_key=self.api_key)
+    
+    async def _agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        model: str = "gpt-4o-mini",
+        **kwargs
+    ) -> str:
+        """Gera texto usando OpenAI (cliente assíncrono)."""
+        if not self.is_available():
+            raise ValueError("OpenAI não está disponível")
+        
+        try:
+            response = await self._get_async_client().chat.completions.create(
+                model=model,
+                messages=_chat_messages(system_prompt, user_prompt),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                top_p=kwargs.get("top_p", 0.9),
+                frequency_penalty=kwargs.get("frequency_penalty", 0.1),
+                presence_penalty=kwargs.get("presence_penalty", 0.1)
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            raise Exception(f"Erro ao gerar texto com OpenAI: {str(e)}")
+    
+    async def _astream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        model: str = "gpt-4o-mini",
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream de texto usando OpenAI."""
+        if not self.is_available():
+            raise ValueError("OpenAI não está disponível")
+        
+        async for chunk in _astream_chat_completion(
+            self._get_async_client(), "OpenAI", model, system_prompt, user_prompt, temperature, max_tokens, **kwargs
+        ):
+            yield chunk
 
 
 class AnthropicProvider(AIProviderService):
     """Implementação do provedor Anthropic (Claude)."""
     
+    default_model = "claude-3-5-sonnet-20241022"
+    
     def __init__(self):
         self.client = None
         self._initialize()
@@ -286,7 +652,8 @@ class AnthropicProvider(AIProviderService):
                 return
             
             from anthropic import Anthropic
-            self.client = Anthropic(api_key=api_key.strip())
+            self.api_key = api_key.strip()
+            self.client = Anthropic(api_key=self.api_key)
         except Exception as e:
             print(f"[AI Provider] Erro ao inicializar Anthropic: {e}")
             self.client = None
@@ -325,11 +692,74 @@ class AnthropicProvider(AIProviderService):
             return message.content[0].text
         except Exception as e:
             raise Exception(f"Erro ao gerar texto com Anthropic: {str(e)}")
+    
+    def _create_async_client(self):
+        from anthropic import AsyncAnthropic
+        return AsyncAnthropic(api_key=self.api_key)
+    
+    async def _agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        model: str = "claude-3-5-sonnet-20241022",
+        **kwargs
+    ) -> str:
+        """Gera texto usando Anthropic Claude (cliente assíncrono)."""
+        if not self.is_available():
+            raise ValueError("Anthropic não está disponível")
+        
+        try:
+            message = await self._get_async_client().messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system=system_prompt,
+                messages=[
+                    {"role": "user", "content": user_prompt}
+                ]
+            )
+            return message.content[0].text
+        except Exception as e:
+            raise Exception(f"Erro ao gerar texto com Anthropic: {str(e)}")
+    
+    async def _astream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        model: str = "claude-3-5-sonnet-20241022",
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream de texto usando Anthropic Claude."""
+        if not self.is_available():
+            raise ValueError("Anthropic não está disponível")
+        
+        try:
+            stream = await self._get_async_client().messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system=system_prompt,
+                messages=[
+                    {"role": "user", "content": user_prompt}
+                ],
+                stream=True
+            )
+            async for event in stream:
+                if event.type == "content_block_delta" and getattr(event.delta, "text", None):
+                    yield event.delta.text
+        except Exception as e:
+            raise Exception(f"Erro ao gerar texto com Anthropic: {str(e)}")
 
 
 class GeminiProvider(AIProviderService):
     """Implementação do provedor Google Gemini."""
     
+    default_model = "gemini-pro"
+    
     def __init__(self):
         self.client = None
         self._initialize()
@@ -385,6 +815,89 @@ class GeminiProvider(AIProviderService):
             return response.text
         except Exception as e:
             raise Exception(f"Erro ao gerar texto com Gemini: {str(e)}")
+    
+    async def _agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        model: str = "gemini-pro",
+        **kwargs
+    ) -> str:
+        """Gera texto usando Google Gemini (API assíncrona do SDK)."""
+        if not self.is_available():
+            raise ValueError("Gemini não está disponível")
+        
+        try:
+            response = await self.client.generate_content_async(
+                f"{system_prompt}\n\n{user_prompt}",
+                generation_config={
+                    "temperature": temperature,
+                    "max_output_tokens": max_tokens,
+                }
+            )
+            return response.text
+        except Exception as e:
+            raise Exception(f"Erro ao gerar texto com Gemini: {str(e)}")
+    
+    async def _astream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        model: str = "gemini-pro",
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream de texto usando Google Gemini."""
+        if not self.is_available():
+            raise ValueError("Gemini não está disponível")
+        
+        try:
+            response = await self.client.generate_content_async(
+                f"{system_prompt}\n\n{user_prompt}",
+                generation_config={
+                    "temperature": temperature,
+                    "max_output_tokens": max_tokens,
+                },
+                stream=True
+            )
+            async for chunk in response:
+                yield chunk.text
+        except Exception as e:
+            raise Exception(f"Erro ao gerar texto com Gemini: {str(e)}")
+
+
+# Classes por nome de provedor (ordem = prioridade: Groq, DeepSeek, outros)
+PROVIDER_CLASSES = {
+    "groq": GroqProvider,
+    "deepseek": DeepSeekProvider,
+    "openai": OpenAIProvider,
+    "anthropic": AnthropicProvider,
+    "gemini": GeminiProvider,
+}
+
+# Instâncias reutilizadas entre requisições (clientes e pools de conexão)
+_provider_instances: Dict[str, AIProviderService] = {}
+_provider_lock = threading.Lock()
+
+
+def _get_provider_instance(name: str) -> AIProviderService:
+    """Instância compartilhada do provedor (criada na primeira chamada)."""
+    with _provider_lock:
+        provider = _provider_instances.get(name)
+        if provider is None:
+            provider = PROVIDER_CLASSES[name]()
+            _provider_instances[name] = provider
+        return provider
+
+
+def reset_ai_providers() -> None:
+    """Descarta as instâncias compartilhadas (ex: após trocar as chaves de API)."""
+    with _provider_lock:
+        _provider_instances.clear()
+    _concurrency_limiters.clear()
 
 
 def get_ai_provider(provider_name: Optional[str] = None) -> Optional[AIProviderService]:
@@ -392,6 +905,9 @@ def get_ai_provider(provider_name: Optional[str] = None) -> Optional[AIProviderS
     Retorna o provedor de IA configurado.
     Ordem de prioridade: Groq (padrão) -> DeepSeek (fallback) -> outros
     
+    As instâncias são compartilhadas entre chamadas, então os clientes HTTP
+    (e suas conexões keep-alive) não são recriados a cada requisição.
+    
     Args:
         provider_name: Nome do provedor (groq, deepseek, openai, anthropic, gemini).
                       Se None, usa Groq como padrão, com DeepSeek como fallback.
@@ -399,50 +915,22 @@ def get_ai_provider(provider_name: Optional[str] = None) -> Optional[AIProviderS
     Returns:
         Instância do provedor de IA ou None se nenhum estiver disponível.
     """
-    # Ordem de prioridade: Groq primeiro, depois DeepSeek, depois outros
-    priority_order = [
-        ("groq", GroqProvider),
-        ("deepseek", DeepSeekProvider),
-        ("openai", OpenAIProvider),
-        ("anthropic", AnthropicProvider),
-        ("gemini", GeminiProvider),
-    ]
+    priority_order = list(PROVIDER_CLASSES)
     
     # Se um provedor específico foi solicitado, tentar apenas ele primeiro
     if provider_name:
         provider_name = provider_name.lower()
-        # Reordenar para tentar o solicitado primeiro
         priority_order = [
-            (name, cls) for name, cls in priority_order if name == provider_name
+            name for name in priority_order if name == provider_name
         ] + [
-            (name, cls) for name, cls in priority_order if name != provider_name
+            name for name in priority_order if name != provider_name
         ]
-    else:
-        # Padrão: Groq primeiro, DeepSeek como fallback
-        # Verificar se Groq está disponível
-        try:
-            groq = GroqProvider()
-            if groq.is_available():
-                print(f"[AI Provider] Usando provedor padrão: Groq")
-                return groq
-        except Exception as e:
-            print(f"[AI Provider] Erro ao inicializar Groq: {e}")
-        
-        # Se Groq não estiver disponível, tentar DeepSeek
-        try:
-            deepseek = DeepSeekProvider()
-            if deepseek.is_available():
-                print(f"[AI Provider] Groq não disponível, usando fallback: DeepSeek")
-                return deepseek
-        except Exception as e:
-            print(f"[AI Provider] Erro ao inicializar DeepSeek: {e}")
     
     # Tentar todos os provedores na ordem de prioridade
-    for name, provider_class in priority_order:
+    for name in priority_order:
         try:
-            provider = provider_class()
+            provider = _get_provider_instance(name)
             if provider.is_available():
-                print(f"[AI Provider] Usando provedor: {provider.get_provider_name()}")
                 return provider
         except Exception as e:
             print(f"[AI Provider] Erro ao inicializar {name}: {e}")
@@ -454,16 +942,7 @@ def get_ai_provider(provider_name: Optional[str] = None) -> Optional[AIProviderS
 
 def get_available_providers() -> Dict[str, bool]:
     """Retorna um dicionário com os provedores disponíveis."""
-    providers = {
-        "deepseek": DeepSeekProvider(),
-        "groq": GroqProvider(),
-        "openai": OpenAIProvider(),
-        "anthropic": AnthropicProvider(),
-        "gemini": GeminiProvider(),
-    }
-    
     return {
-        name: provider.is_available()
-        for name, provider in providers.items()
+        name: _get_provider_instance(name).is_available()
+        for name in ("deepseek", "groq", "openai", "anthropic", "gemini")
     }
-
@@ -0,0 +1,261 @@
+"""
+Solver de Eventos de Aspectos (entrada no orbe, exatidão e saída do orbe).
+
+Substitui as varreduras de passo fixo por busca de raízes sobre a separação
+angular entre o planeta em trânsito e o ponto natal:
+1. Passos seguros: o tamanho do passo é limitado pela velocidade máxima do
+   planeta, então nenhum cruzamento é pulado (inclusive em retrogradações)
+2. Refinamento: cada cruzamento encontrado é refinado por falsa posição
+   (Illinois) até a precisão de 1 minuto
+
+Trânsitos de planetas lentos com múltiplas passagens (direto → retrógrado →
+direto) retornam todas as datas exatas dentro da janela.
+"""
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.services.ephemeris_batch_engine import (
+    calculate_body_at_julian_day,
+    datetimes_to_julian_days,
+    julian_day_to_datetime,
+)
+
+
+# Ângulos alvo de cada aspecto
+ASPECT_TARGETS = {
+    'conjunção': 0,
+    'sextil': 60,
+    'quadratura': 90,
+    'trígono': 120,
+    'oposição': 180
+}
+
+# Velocidade máxima aproximada de cada corpo (graus/dia, com margem de segurança)
+MAX_DAILY_MOTION = {
+    'sun': 1.03,
+    'moon': 15.4,
+    'mercury': 2.25,
+    'venus': 1.3,
+    'mars': 0.8,
+    'jupiter': 0.25,
+    'saturn': 0.14,
+    'uranus': 0.07,
+    'neptune': 0.04,
+    'pluto': 0.05,
+}
+
+# Precisão dos eventos: 1 minuto (em dias)
+EVENT_TOLERANCE_DAYS = 1.0 / 1440.0
+
+# Passo mínimo da busca (em dias) - evita passos infinitesimais perto das raízes
+MIN_STEP_DAYS = 0.25
+
+# Horizonte máximo de busca para cada lado (em dias)
+# Plutão pode permanecer ~10 anos dentro de um orbe de 8°
+MAX_SEARCH_DAYS = 12 * 365
+
+MAX_REFINE_ITERATIONS = 60
+
+
+def _wrap180(angle: float) -> float:
+    """Normaliza um ângulo para o intervalo [-180, 180)."""
+    return (angle + 180.0) % 360.0 - 180.0
+
+
+def refine_root(
+    func: Callable[[float], float],
+    a: float,
+    fa: float,
+    b: float,
+    fb: float,
+    tolerance: float = EVENT_TOLERANCE_DAYS
+) -> float:
+    """
+    Refina a raiz de func dentro do intervalo [a, b] (fa e fb com sinais opostos)
+    usando falsa posição com modificação de Illinois.
+
+    Returns:
+        Abscissa da raiz (mesma unidade de a e b)
+    """
+    if fa == 0:
+        return a
+    if fb == 0:
+        return b
+
+    side = 0
+    for _ in range(MAX_REFINE_ITERATIONS):
+        if abs(b - a) <= tolerance:
+            break
+
+        c = (a * fb - b * fa) / (fb - fa)
+        # Garantir progresso mesmo com funções quase planas
+        if not (min(a, b) < c < max(a, b)):
+            c = (a + b) / 2.0
+        fc = func(c)
+
+        if fc == 0:
+            return c
+        if fc * fb > 0:
+            b, fb = c, fc
+            if side == -1:
+                fa /= 2.0
+            side = -1
+        else:
+            a, fa = c, fc
+            if side == 1:
+                fb /= 2.0
+            side = 1
+
+    return (a + b) / 2.0
+
+
+class AspectOffsetFunction:
+    """
+    Distância angular com sinal entre a separação atual e o ângulo do aspecto.
+    Zero = aspecto exato; |valor| <= orbe = aspecto ativo.
+    """
+
+    def __init__(self, planet: str, natal_longitude: float, target_angle: float, side: int):
+        self.planet = planet
+        self.natal_longitude = natal_longitude
+        self.target = side * target_angle
+        self.evaluations = 0
+
+    def __call__(self, julian_day: float) -> float:
+        self.evaluations += 1
+        longitude, _ = calculate_body_at_julian_day(julian_day, self.planet)
+        separation = _wrap180(longitude - self.natal_longitude)
+        return _wrap180(separation - self.target)
+
+
+def _safe_step(offset: float, orb: float, max_speed: float) -> float:
+    """
+    Maior passo que não pode pular nenhum cruzamento de nível (0 ou ±orbe):
+    o planeta não percorre mais do que max_speed graus por dia.
+    """
+    distance_to_level = min(abs(offset), abs(orb - abs(offset)))
+    return max(MIN_STEP_DAYS, distance_to_level / max_speed)
+
+
+def _scan_direction(
+    func: AspectOffsetFunction,
+    start_jd: float,
+    start_offset: float,
+    orb: float,
+    max_speed: float,
+    direction: int,
+    max_days: float
+) -> Tuple[Optional[float], List[float]]:
+    """
+    Caminha a partir de start_jd (dentro do orbe) em uma direção até sair do orbe.
+
+    Returns:
+        Tupla (data juliana da fronteira do orbe ou None, datas julianas exatas encontradas)
+    """
+    exact_hits = []
+    current_jd, current_offset = start_jd, start_offset
+    limit_jd = start_jd + direction * max_days
+
+    while (limit_jd - current_jd) * direction > 0:
+        step = _safe_step(current_offset, orb, max_speed)
+        next_jd = current_jd + direction * step
+        if (limit_jd - next_jd) * direction < 0:
+            next_jd = limit_jd
+        next_offset = func(next_jd)
+
+        # Cruzamento do ponto exato (sinal trocou sem sair do orbe)
+        if current_offset * next_offset < 0 and abs(next_offset) <= orb:
+            exact_hits.append(refine_root(func, current_jd, current_offset, next_jd, next_offset))
+
+        # Saída do orbe: refinar a fronteira |offset| = orbe
+        if abs(next_offset) > orb:
+            boundary = orb if next_offset > 0 else -orb
+
+            def level(jd: float, boundary=boundary) -> float:
+                return func(jd) - boundary
+
+            # Pode ter cruzado o exato e saído do outro lado no mesmo passo
+            if current_offset * next_offset < 0:
+                exact_hits.append(refine_root(func, current_jd, current_offset, next_jd, next_offset))
+
+            edge_jd = refine_root(
+                level, current_jd, current_offset - boundary, next_jd, next_offset - boundary
+            )
+            return edge_jd, exact_hits
+
+        current_jd, current_offset = next_jd, next_offset
+
+    return None, exact_hits
+
+
+def find_aspect_window(
+    planet: str,
+    natal_longitude: float,
+    aspect_type: str,
+    check_date: datetime,
+    orb: float = 8.0,
+    max_search_days: int = MAX_SEARCH_DAYS
+) -> Dict[str, any]:
+    """
+    Encontra a janela contínua em que um aspecto de trânsito está dentro do orbe,
+    contendo check_date, e todas as passagens exatas dentro dela.
+
+    Args:
+        planet: Planeta em trânsito (ex: 'saturn')
+        natal_longitude: Longitude do ponto natal
+        aspect_type: Tipo de aspecto (ex: 'quadratura')
+        check_date: Instante UTC de referência
+        orb: Orbe em graus (padrão: 8.0)
+        max_search_days: Horizonte máximo de busca para cada lado
+
+    Returns:
+        Dicionário com:
+        - in_orb: bool - Se o aspecto está ativo em check_date
+        - start_date: Optional[datetime] - Entrada no orbe (None se além do horizonte)
+        - end_date: Optional[datetime] - Saída do orbe (None se além do horizonte)
+        - exact_dates: List[datetime] - Passagens exatas (várias em caso de retrogradação)
+        - evaluations: int - Número de avaliações de efemérides usadas
+    """
+    target_angle = ASPECT_TARGETS.get(aspect_type)
+    planet = planet.lower()
+    if target_angle is None:
+        raise ValueError(f"Aspecto desconhecido: {aspect_type}")
+    if planet not in MAX_DAILY_MOTION:
+        raise ValueError(f"Planeta desconhecido: {planet}")
+
+    check_jd = float(datetimes_to_julian_days([check_date])[0])
+    check_longitude, _ = calculate_body_at_julian_day(check_jd, planet)
+
+    # Aspectos de 60/90/120 existem dos dois lados do ponto natal
+    side = 1 if _wrap180(check_longitude - natal_longitude) >= 0 else -1
+    func = AspectOffsetFunction(planet, natal_longitude, target_angle, side)
+    check_offset = func(check_jd)
+
+    if abs(check_offset) > orb:
+        return {
+            'in_orb': False,
+            'start_date': None,
+            'end_date': None,
+            'exact_dates': [],
+            'evaluations': func.evaluations
+        }
+
+    max_speed = MAX_DAILY_MOTION[planet]
+    start_jd, exact_before = _scan_direction(
+        func, check_jd, check_offset, orb, max_speed, -1, max_search_days
+    )
+    end_jd, exact_after = _scan_direction(
+        func, check_jd, check_offset, orb, max_speed, 1, max_search_days
+    )
+
+    exact_jds = sorted(set(round(jd, 6) for jd in exact_before + exact_after))
+    if check_offset == 0:
+        exact_jds.append(check_jd)
+
+    return {
+        'in_orb': True,
+        'start_date': julian_day_to_datetime(start_jd) if start_jd is not None else None,
+        'end_date': julian_day_to_datetime(end_jd) if end_jd is not None else None,
+        'exact_dates': [julian_day_to_datetime(jd) for jd in sorted(exact_jds)],
+        'evaluations': func.evaluations
+    }
@@ -0,0 +1,135 @@
+"""
+Cache em memória do caminho de autenticação.
+
+Cada requisição autenticada decodificava o JWT e buscava o usuário no banco,
+e os endpoints de trânsitos/interpretações ainda buscavam o mapa primário:
+duas idas ao banco por requisição. Aqui ficam, por worker e com TTL curto
+(AUTH_CACHE_TTL_SECONDS):
+- token já verificado -> cópia do usuário
+- user_id -> cópia do mapa astral primário
+
+As cópias são somente-leitura (não estão ligadas a uma sessão do SQLAlchemy).
+Endpoints que alteram o usuário ou o mapa usam o registro do banco e chamam
+invalidate_user após o commit; em outros workers a alteração aparece após o TTL.
+A ausência de mapa primário não é guardada (o usuário pode completar o
+onboarding em outro worker).
+"""
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Any, Dict, Optional, Tuple
+import threading
+import time
+
+from app.core.config import settings
+
+
+# Campos do usuário que não entram no cache
+USER_PRIVATE_FIELDS = ('password_hash', 'verification_code', 'verification_code_expires')
+
+
+class CachedRecord(SimpleNamespace):
+    """Cópia somente-leitura das colunas de uma linha (usuário ou mapa astral)."""
+
+
+_lock = threading.Lock()
+_users: "OrderedDict[str, Tuple[float, CachedRecord]]" = OrderedDict()  # token -> (expira_em, usuário)
+_charts: Dict[int, Tuple[float, CachedRecord]] = {}  # user_id -> (expira_em, mapa primário)
+_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+
+def _ttl() -> float:
+    return float(settings.AUTH_CACHE_TTL_SECONDS)
+
+
+def snapshot(row: Any, exclude: Tuple[str, ...] = ()) -> CachedRecord:
+    """Copia as colunas de uma linha do SQLAlchemy."""
+    return CachedRecord(**{
+        column.key: getattr(row, column.key)
+        for column in row.__table__.columns
+        if column.key not in exclude
+    })
+
+
+def _evict(cache: Dict, max_size: int) -> None:
+    """Remove os itens mais antigos além do limite. Requer _lock."""
+    while len(cache) > max_size:
+        cache.pop(next(iter(cache)))
+
+
+def get_cached_user(token: str) -> Optional[CachedRecord]:
+    """Usuário do token (já verificado), se estiver no cache e dentro do TTL."""
+    if _ttl() <= 0:
+        return None
+    with _lock:
+        entry = _users.get(token)
+        if entry is not None and entry[0] > time.monotonic():
+            _stats['hits'] += 1
+            return entry[1]
+        if entry is not None:
+            del _users[token]
+        _stats['misses'] += 1
+        return None
+
+
+def cache_user(token: str, user: Any, token_expires_at: Optional[float] = None) -> CachedRecord:
+    """
+    Guarda a cópia do usuário para o token verificado e a retorna.
+    token_expires_at: claim 'exp' do JWT (epoch); a entrada não dura além dele.
+    """
+    cached = snapshot(user, exclude=USER_PRIVATE_FIELDS)
+    ttl = _ttl()
+    if token_expires_at is not None:
+        ttl = min(ttl, float(token_expires_at) - time.time())
+    if ttl <= 0:
+        return cached
+    with _lock:
+        _users[token] = (time.monotonic() + ttl, cached)
+        _evict(_users, settings.AUTH_CACHE_SIZE)
+    return cached
+
+
+def get_cached_primary_chart(user_id: int) -> Optional[CachedRecord]:
+    """Mapa primário do usuário, se estiver no cache e dentro do TTL."""
+    if _ttl() <= 0:
+        return None
+    with _lock:
+        entry = _charts.get(user_id)
+        if entry is not None and entry[0] > time.monotonic():
+            _stats['hits'] += 1
+            return entry[1]
+        if entry is not None:
+            del _charts[user_id]
+        _stats['misses'] += 1
+        return None
+
+
+def cache_primary_chart(user_id: int, birth_chart: Any) -> CachedRecord:
+    """Guarda a cópia do mapa primário do usuário e a retorna."""
+    cached = snapshot(birth_chart)
+    if _ttl() > 0:
+        with _lock:
+            _charts[user_id] = (time.monotonic() + _ttl(), cached)
+            _evict(_charts, settings.AUTH_CACHE_SIZE)
+    return cached
+
+
+def invalidate_user(user_id: int) -> None:
+    """Remove do cache (deste worker) o usuário, todos os seus tokens e o mapa primário."""
+    with _lock:
+        tokens = [token for token, (_, user) in _users.items() if user.id == user_id]
+        for token in tokens:
+            del _users[token]
+        removed = len(tokens) + (1 if _charts.pop(user_id, None) is not None else 0)
+        _stats['invalidations'] += removed
+
+
+def clear_auth_cache() -> None:
+    with _lock:
+        _users.clear()
+        _charts.clear()
+
+
+def auth_cache_stats() -> Dict[str, int]:
+    """Contadores do cache (acertos, falhas, invalidações) e tamanho atual."""
+    with _lock:
+        return dict(_stats, users=len(_users), charts=len(_charts))
@@ -4,10 +4,14 @@ Utiliza aspectos e casas astrológicas para determinar timing ideal.
 """
 
 import ephem
+import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
-from app.services.astrology_calculator import get_zodiac_sign, shortest_angular_distance
+from app.services.astrology_calculator import get_zodiac_sign
 from app.services.transits_calculator import calculate_aspect_angle, get_aspect_type
+from app.services.ephemeris_batch_engine import local_to_utc
+from app.services.slow_planet_table import lookup_positions
+from app.services.swiss_ephemeris_calculator import resolve_timezone_name
 
 
 # Mapeamento de ações para casas astrológicas relevantes
@@ -84,65 +88,107 @@ PLANET_NAMES = {
     'pluto': 'Plutão'
 }
 
+# Planetas em trânsito verificados (ordem das colunas do motor vetorizado)
+TIMING_PLANETS = list(PLANET_NAMES)
 
-def calculate_house_cusp(
-    observer: ephem.Observer,
-    house_number: int,
+# Aspectos na ordem de get_aspect_type (o primeiro dentro do orbe vence)
+ASPECT_TYPES = ['conjunção', 'sextil', 'quadratura', 'trígono', 'oposição']
+ASPECT_ANGLES = np.array([0.0, 60.0, 90.0, 120.0, 180.0])
+NO_ASPECT = len(ASPECT_TYPES)
+ASPECT_ORB = 8.0
+
+# Pontuação de planetas benéficos em aspecto com casas primárias e secundárias
+PRIMARY_ASPECT_SCORES = {'trígono': 10, 'sextil': 7, 'conjunção': 8}
+SECONDARY_ASPECT_SCORES = {'trígono': 5, 'sextil': 3, 'conjunção': 4}
+
+# Penalidades: planetas desfavoráveis em aspecto tenso com casas primárias e Lua Fora de Curso
+AVOID_ASPECTS = ['quadratura', 'oposição']
+AVOID_PENALTY = 5
+MOON_VOID_PENALTY = 3
+
+# Intervalo entre horários verificados (em horas)
+DEFAULT_INTERVAL_HOURS = 6
+MIN_INTERVAL_HOURS = 1
+MAX_INTERVAL_HOURS = 24
+
+# Quantos dias à frente podem ser calculados
+MIN_DAYS_AHEAD = 1
+MAX_DAYS_AHEAD = 90
+
+MAX_BEST_MOMENTS = 10
+
+
+def calculate_natal_house_cusps(
     birth_date: datetime,
     birth_time: str,
     latitude: float,
-    longitude: float
-) -> float:
+    longitude: float,
+    observer: Optional[ephem.Observer] = None
+) -> Dict[int, float]:
     """
-    Calcula a cúspide de uma casa astrológica.
-    Tenta usar Swiss Ephemeris (kerykeion) se disponível, senão usa sistema Equal House.
+    Calcula as cúspides das 12 casas do mapa natal de uma só vez.
+    Tenta usar Swiss Ephemeris (kerykeion, um único mapa) se disponível,
+    senão usa sistema Equal House.
     """
+    house_cusps = {}
+    
     # Tentar usar Swiss Ephemeris primeiro (mais preciso)
     try:
         from app.services.swiss_ephemeris_calculator import create_kr_instance
         
-        # Criar instância kerykeion
         kr = create_kr_instance(birth_date, birth_time, latitude, longitude, None)
         
-        # kerykeion fornece as casas através do objeto houses
+        # kerykeion fornece as casas através do objeto houses (house_1, house_2, etc.)
         if hasattr(kr, 'houses') and kr.houses:
-            # Acessar casa específica (house_1, house_2, etc.)
-            house_attr = f"house_{house_number}"
-            if hasattr(kr.houses, house_attr):
-                house_obj = getattr(kr.houses, house_attr)
-                if hasattr(house_obj, 'abs_pos'):
-                    house_cusp = float(house_obj.abs_pos)
-                    return house_cusp
+            for house_number in range(1, 13):
+                house_obj = getattr(kr.houses, f"house_{house_number}", None)
+                if house_obj is not None and hasattr(house_obj, 'abs_pos'):
+                    house_cusps[house_number] = float(house_obj.abs_pos)
     except Exception as e:
         # Se falhar, usar cálculo simplificado
         pass
     
-    # Fallback: Calcular Ascendente (cúspide da Casa 1)
-    from app.services.astrology_calculator import calculate_ascendant
-    ascendant = calculate_ascendant(observer)
+    if len(house_cusps) == 12:
+        return house_cusps
+    
+    if observer is None:
+        time_parts = birth_time.split(":")
+        hour = int(time_parts[0]) if len(time_parts) > 0 else 0
+        minute = int(time_parts[1]) if len(time_parts) > 1 else 0
+        observer = ephem.Observer()
+        observer.lat = str(latitude)
+        observer.lon = str(longitude)
+        observer.date = birth_date.replace(hour=hour, minute=minute, second=0, microsecond=0).strftime('%Y/%m/%d %H:%M:%S')
     
-    # Calcular MC (cúspide da Casa 10)
-    from app.services.astrology_calculator import calculate_midheaven
+    # Fallback: Calcular Ascendente (cúspide da Casa 1) e MC (cúspide da Casa 10)
+    from app.services.astrology_calculator import calculate_ascendant, calculate_midheaven
+    ascendant = calculate_ascendant(observer)
     mc = calculate_midheaven(observer)
     
     # Sistema Equal House simplificado
     # Cada casa tem 30 graus a partir do Ascendente
-    house_cusps = {
-        1: ascendant,
-        2: (ascendant + 30) % 360,
-        3: (ascendant + 60) % 360,
-        4: (ascendant + 90) % 360,
-        5: (ascendant + 120) % 360,
-        6: (ascendant + 150) % 360,
-        7: (ascendant + 180) % 360,
-        8: (ascendant + 210) % 360,
-        9: (ascendant + 240) % 360,
-        10: mc,
-        11: (mc + 30) % 360,
-        12: (mc + 60) % 360
-    }
+    equal_house_cusps = {house_number: (ascendant + 30 * (house_number - 1)) % 360 for house_number in range(1, 10)}
+    equal_house_cusps.update({10: mc, 11: (mc + 30) % 360, 12: (mc + 60) % 360})
     
-    return house_cusps.get(house_number, ascendant)
+    for house_number, cusp in equal_house_cusps.items():
+        house_cusps.setdefault(house_number, cusp)
+    return house_cusps
+
+
+def calculate_house_cusp(
+    observer: ephem.Observer,
+    house_number: int,
+    birth_date: datetime,
+    birth_time: str,
+    latitude: float,
+    longitude: float
+) -> float:
+    """
+    Calcula a cúspide de uma casa astrológica.
+    Para várias casas do mesmo mapa prefira calculate_natal_house_cusps (um único mapa).
+    """
+    house_cusps = calculate_natal_house_cusps(birth_date, birth_time, latitude, longitude, observer)
+    return house_cusps.get(house_number, house_cusps[1])
 
 
 def calculate_planet_position_swiss(
@@ -153,34 +199,18 @@ def calculate_planet_position_swiss(
 ) -> float:
     """
     Calcula a posição de um planeta usando Swiss Ephemeris (biblioteca padrão).
+    check_date é interpretado como horário local do local informado.
     """
     try:
-        from app.services.swiss_ephemeris_calculator import create_kr_instance, get_planet_longitude
+        from app.services.ephemeris_batch_engine import calculate_positions_at, local_to_utc
         
-        # Criar instância kerykeion para a data/hora de trânsito
-        time_str = check_date.strftime("%H:%M")
-        kr = create_kr_instance(check_date, time_str, latitude, longitude, None)
-        
-        # Mapear nomes de planetas para chaves do kerykeion
-        planet_map = {
-            'sun': 'Sun',
-            'moon': 'Moon',
-            'mercury': 'Mercury',
-            'venus': 'Venus',
-            'mars': 'Mars',
-            'jupiter': 'Jupiter',
-            'saturn': 'Saturn',
-            'uranus': 'Uranus',
-            'neptune': 'Neptune',
-            'pluto': 'Pluto'
-        }
-        
-        planet_key = planet_map.get(planet_name.lower())
-        if not planet_key:
+        planet_key = planet_name.lower()
+        if planet_key not in PLANET_NAMES:
             raise ValueError(f"Planeta desconhecido: {planet_name}")
         
-        # Obter longitude do planeta usando função do swiss_ephemeris_calculator
-        return get_planet_longitude(kr, planet_key)
+        # Consultar o Swiss Ephemeris diretamente (sem construir um mapa kerykeion)
+        utc_date = local_to_utc(check_date, latitude, longitude)
+        return calculate_positions_at(utc_date, [planet_key])[planet_key]
             
     except Exception as e:
         # Fallback para PyEphem se Swiss Ephemeris falhar
@@ -228,13 +258,213 @@ def check_planetary_aspects_to_house(
     return aspects_found
 
 
+
+
+def _slot_dates(today: datetime, days_ahead: int, interval_hours: int) -> List[datetime]:
+    """Horários locais verificados: de hoje 00:00 até days_ahead dias, a cada interval_hours."""
+    check_interval = timedelta(hours=interval_hours)
+    end_date = today + timedelta(days=days_ahead)
+    slot_dates = []
+    slot_date = today
+    while slot_date <= end_date:
+        slot_dates.append(slot_date)
+        slot_date += check_interval
+    return slot_dates
+
+
+def _aspect_index_table(slot_longitudes: np.ndarray, house_cusps: np.ndarray, orb: float = ASPECT_ORB) -> np.ndarray:
+    """
+    Aspecto de cada planeta em trânsito com cada cúspide natal.
+    
+    Args:
+        slot_longitudes: Matriz (horário × planeta) de longitudes
+        house_cusps: Vetor com as 12 cúspides natais
+    
+    Returns:
+        Matriz (horário × planeta × casa) com o índice em ASPECT_TYPES,
+        ou NO_ASPECT (mesma regra de get_aspect_type: primeiro aspecto dentro do orbe)
+    """
+    angle = np.abs(slot_longitudes[:, :, None] - house_cusps[None, None, :])
+    angle = np.where(angle > 180, 360 - angle, angle)
+    
+    aspect_index = np.full(angle.shape, NO_ASPECT, dtype=np.int8)
+    for index in range(len(ASPECT_ANGLES) - 1, -1, -1):
+        aspect_index[np.abs(angle - ASPECT_ANGLES[index]) <= orb] = index
+    return aspect_index
+
+
+def _action_weight_tables(action_types: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Tabelas de pontuação das ações, indexadas por (ação, planeta, casa, aspecto).
+    
+    Returns:
+        (pesos do score, 1 onde o aspecto conta como aspecto favorável do momento)
+    """
+    shape = (len(action_types), len(TIMING_PLANETS), 12, len(ASPECT_TYPES) + 1)
+    weights = np.zeros(shape, dtype=np.int32)
+    favorable = np.zeros(shape, dtype=np.int32)
+    
+    for action_index, action_type in enumerate(action_types):
+        action_config = ACTION_HOUSES[action_type]
+        for planet_index, planet_name in enumerate(TIMING_PLANETS):
+            planet_display = PLANET_NAMES[planet_name]
+            
+            if planet_display in action_config['beneficial_planets']:
+                for houses, aspect_scores in (
+                    (action_config['primary_houses'], PRIMARY_ASPECT_SCORES),
+                    (action_config['secondary_houses'], SECONDARY_ASPECT_SCORES),
+                ):
+                    for house_num in houses:
+                        for aspect_type in action_config['preferred_aspects']:
+                            aspect_index = ASPECT_TYPES.index(aspect_type)
+                            weights[action_index, planet_index, house_num - 1, aspect_index] += aspect_scores.get(aspect_type, 0)
+                            favorable[action_index, planet_index, house_num - 1, aspect_index] = 1
+            
+            if planet_display in action_config['avoid_planets']:
+                for house_num in action_config['primary_houses']:
+                    for aspect_type in AVOID_ASPECTS:
+                        weights[action_index, planet_index, house_num - 1, ASPECT_TYPES.index(aspect_type)] -= AVOID_PENALTY
+    
+    return weights, favorable
+
+
+def _moon_void_mask(slot_utc_dates: List[datetime]) -> np.ndarray:
+    """Horários (UTC) em que a Lua está Fora de Curso, a partir do calendário compartilhado."""
+    from app.services.moon_void_calculator import get_void_of_course_periods
+    
+    mask = np.zeros(len(slot_utc_dates), dtype=bool)
+    if not slot_utc_dates:
+        return mask
+    
+    slot_times = np.array(slot_utc_dates, dtype='datetime64[s]')
+    for period in get_void_of_course_periods(slot_utc_dates[0], slot_utc_dates[-1]):
+        start, end = np.datetime64(period['start'], 's'), np.datetime64(period['end'], 's')
+        mask |= (slot_times >= start) & (slot_times < end)
+    return mask
+
+
+def _describe_moment(
+    action_config: Dict[str, any],
+    slot_aspects: np.ndarray,
+    is_moon_void: bool
+) -> Tuple[List[Dict[str, any]], List[str]]:
+    """Aspectos e motivos de um horário selecionado (casas primárias, secundárias, penalidades)."""
+    aspects_found = []
+    reasons = []
+    
+    for houses, is_primary in ((action_config['primary_houses'], True), (action_config['secondary_houses'], False)):
+        for house_num in houses:
+            for planet_index, planet_name in enumerate(TIMING_PLANETS):
+                planet_display = PLANET_NAMES[planet_name]
+                aspect_index = slot_aspects[planet_index, house_num - 1]
+                if planet_display not in action_config['beneficial_planets'] or aspect_index == NO_ASPECT:
+                    continue
+                aspect_type = ASPECT_TYPES[aspect_index]
+                if aspect_type in action_config['preferred_aspects']:
+                    aspects_found.append({
+                        'planet': planet_display,
+                        'house': house_num,
+                        'aspect_type': aspect_type,
+                        'is_primary': is_primary
+                    })
+                    reasons.append(f"{planet_display} em {aspect_type} com Casa {house_num}")
+    
+    for planet_index, planet_name in enumerate(TIMING_PLANETS):
+        planet_display = PLANET_NAMES[planet_name]
+        if planet_display not in action_config['avoid_planets']:
+            continue
+        for house_num in action_config['primary_houses']:
+            aspect_index = slot_aspects[planet_index, house_num - 1]
+            if aspect_index != NO_ASPECT and ASPECT_TYPES[aspect_index] in AVOID_ASPECTS:
+                reasons.append(f"⚠️ {planet_display} em {ASPECT_TYPES[aspect_index]} com Casa {house_num}")
+    
+    if is_moon_void:
+        reasons.append("⚠️ Lua Fora de Curso")
+    
+    return aspects_found, reasons
+
+
+def _score_actions(
+    action_types: List[str],
+    birth_date: datetime,
+    birth_time: str,
+    latitude: float,
+    longitude: float,
+    days_ahead: int,
+    interval_hours: int
+) -> Tuple[Dict[str, Dict[str, any]], int]:
+    """
+    Motor vetorizado: cúspides natais uma vez, céu uma vez por horário e todas
+    as ações pontuadas juntas como operações em matrizes (horário × planeta × casa).
+    
+    Returns:
+        (resultado por ação, quantidade de horários verificados)
+    """
+    natal_house_cusps = calculate_natal_house_cusps(birth_date, birth_time, latitude, longitude)
+    house_cusps = np.array([natal_house_cusps[house_num] for house_num in range(1, 13)], dtype=np.float64)
+    
+    # Horários locais do usuário; o céu é calculado em lote em UTC
+    # Planetas lentos vêm da tabela pré-computada, os rápidos do Swiss Ephemeris
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    slot_dates = _slot_dates(today, days_ahead, interval_hours)
+    timezone_name = resolve_timezone_name(latitude, longitude)
+    slot_utc_dates = [local_to_utc(d, latitude, longitude, timezone_name) for d in slot_dates]
+    slot_positions, _ = lookup_positions(slot_utc_dates, TIMING_PLANETS)
+    
+    aspect_index = _aspect_index_table(np.asarray(slot_positions, dtype=np.float64), house_cusps)
+    moon_void = _moon_void_mask(slot_utc_dates)
+    
+    # Pontuação de todas as ações: (ação × horário × planeta × casa) somado em planeta e casa
+    weights, favorable = _action_weight_tables(action_types)
+    planet_axis = np.arange(len(TIMING_PLANETS))[None, :, None]
+    house_axis = np.arange(12)[None, None, :]
+    scores = weights[:, planet_axis, house_axis, aspect_index].sum(axis=(2, 3))
+    scores -= MOON_VOID_PENALTY * moon_void
+    favorable_counts = favorable[:, planet_axis, house_axis, aspect_index].sum(axis=(2, 3))
+    
+    analysis_date = datetime.now().isoformat()
+    results = {}
+    for action_index, action_type in enumerate(action_types):
+        action_config = ACTION_HOUSES[action_type]
+        action_scores = scores[action_index]
+        
+        # Momentos com score positivo; válidos se tiverem ao menos um aspecto favorável
+        positive = action_scores > 0
+        valid_slots = np.flatnonzero(positive & (favorable_counts[action_index] > 0))
+        ranked_slots = valid_slots[np.argsort(-action_scores[valid_slots], kind='stable')]
+        
+        best_moments = []
+        for slot in ranked_slots[:MAX_BEST_MOMENTS]:
+            is_moon_void = bool(moon_void[slot])
+            aspects_found, reasons = _describe_moment(action_config, aspect_index[slot], is_moon_void)
+            best_moments.append({
+                'date': slot_dates[slot].isoformat(),
+                'score': int(action_scores[slot]),
+                'aspects': aspects_found,
+                'reasons': reasons,
+                'is_moon_void': is_moon_void
+            })
+        
+        results[action_type] = {
+            'action_type': action_type,
+            'action_config': action_config,
+            'best_moments': best_moments,
+            'total_checked': int(positive.sum()),
+            'total_valid': int(len(valid_slots)),
+            'analysis_date': analysis_date
+        }
+    
+    return results, len(slot_dates)
+
+
 def calculate_best_timing(
     action_type: str,
     birth_date: datetime,
     birth_time: str,
     latitude: float,
     longitude: float,
-    days_ahead: int = 30
+    days_ahead: int = 30,
+    interval_hours: int = DEFAULT_INTERVAL_HOURS
 ) -> Dict[str, any]:
     """
     Calcula os melhores momentos para uma ação específica.
@@ -246,6 +476,7 @@ def calculate_best_timing(
         latitude: Latitude do local
         longitude: Longitude do local
         days_ahead: Quantos dias à frente calcular (padrão: 30)
+        interval_hours: Intervalo entre os horários verificados (padrão: 6 horas)
     
     Returns:
         Dicionário com melhores momentos e análise
@@ -256,303 +487,44 @@ def calculate_best_timing(
             'best_moments': []
         }
     
-    action_config = ACTION_HOUSES[action_type]
-    
-    # Converter hora de nascimento
-    time_parts = birth_time.split(":")
-    hour = int(time_parts[0]) if len(time_parts) > 0 else 0
-    minute = int(time_parts[1]) if len(time_parts) > 1 else 0
-    
-    # Criar observador para mapa natal
-    birth_observer = ephem.Observer()
-    birth_observer.lat = str(latitude)
-    birth_observer.lon = str(longitude)
-    birth_datetime = birth_date.replace(hour=hour, minute=minute, second=0, microsecond=0)
-    birth_observer.date = birth_datetime.strftime('%Y/%m/%d %H:%M:%S')
-    
-    # Calcular cúspides das casas relevantes no mapa natal
-    natal_house_cusps = {}
-    for house_num in action_config['primary_houses'] + action_config['secondary_houses']:
-        natal_house_cusps[house_num] = calculate_house_cusp(
-            birth_observer, 
-            house_num,
-            birth_date,
-            birth_time,
-            latitude,
-            longitude
-        )
-    
-    # Buscar melhores momentos nos próximos dias
-    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    best_moments = []
-    
-    # Verificar a cada 6 horas (4 vezes por dia)
-    check_interval = timedelta(hours=6)
-    current_date = today
-    end_date = today + timedelta(days=days_ahead)
-    
-    # Planetas a verificar
-    all_planets = ['sun', 'moon', 'mercury', 'venus', 'mars', 'jupiter', 'saturn', 'uranus', 'neptune', 'pluto']
-    
-    while current_date <= end_date:
-        # Calcular score para este momento (usando Swiss Ephemeris diretamente)
-        score = 0
-        aspects_found = []
-        reasons = []
-        
-        # Verificar aspectos em casas primárias (peso maior)
-        for house_num in action_config['primary_houses']:
-            house_cusp = natal_house_cusps[house_num]
-            
-            # Verificar aspectos de planetas benéficos
-            for planet_name in all_planets:
-                planet_display = PLANET_NAMES.get(planet_name, planet_name)
-                
-                if planet_display in action_config['beneficial_planets']:
-                    try:
-                        # Usar Swiss Ephemeris (biblioteca padrão)
-                        transit_planet_longitude = calculate_planet_position_swiss(
-                            current_date, latitude, longitude, planet_name
-                        )
-                        angle = calculate_aspect_angle(transit_planet_longitude, house_cusp)
-                        aspect_type = get_aspect_type(angle, orb=8.0)
-                        
-                        # VALIDAÇÃO RIGOROSA: Verificar novamente se o aspecto está dentro do orbe
-                        if aspect_type and aspect_type in action_config['preferred_aspects']:
-                            # Definir ângulos alvo para cada aspecto
-                            aspect_targets = {
-                                'conjunção': 0,
-                                'sextil': 60,
-                                'quadratura': 90,
-                                'trígono': 120,
-                                'oposição': 180
-                            }
-                            target_angle = aspect_targets.get(aspect_type)
-                            
-                            # Validar se está realmente dentro do orbe de 8°
-                            # CORREÇÃO: Usar shortest_angular_distance para lidar corretamente com geometria circular
-                            # Isso garante que ângulos próximos de 0° ou 180° sejam tratados corretamente
-                            if target_angle is not None:
-                                # angle já é a menor distância (0-180°) de calculate_aspect_angle
-                                # Mas precisamos comparar com target_angle considerando geometria circular
-                                # Exemplo: angle=179° e target=180° deve dar diff=1°, não 179°
-                                angle_diff = shortest_angular_distance(angle, target_angle)
-                                if angle_diff > 8.0:
-                                    # Aspecto fora do orbe - não adicionar
-                                    continue
-                            
-                            # Pontuação baseada no tipo de aspecto
-                            if aspect_type == 'trígono':
-                                score += 10
-                            elif aspect_type == 'sextil':
-                                score += 7
-                            elif aspect_type == 'conjunção':
-                                score += 8
-                            
-                            # VALIDAÇÃO CRÍTICA: Garantir que house_num está na lista permitida
-                            if house_num not in action_config['primary_houses']:
-                                print(f"[ERROR] Bug detectado: house_num {house_num} não está em primary_houses {action_config['primary_houses']}")
-                                continue
-                            
-                            aspects_found.append({
-                                'planet': planet_display,
-                                'house': house_num,
-                                'aspect_type': aspect_type,
-                                'is_primary': True
-                            })
-                            
-                            reasons.append(f"{planet_display} em {aspect_type} com Casa {house_num}")
-                    except Exception as e:
-                        # Log erro silenciosamente (não quebrar o cálculo)
-                        continue
-        
-        # Verificar aspectos em casas secundárias (peso menor)
-        for house_num in action_config['secondary_houses']:
-            house_cusp = natal_house_cusps[house_num]
-            
-            for planet_name in all_planets:
-                planet_display = PLANET_NAMES.get(planet_name, planet_name)
-                
-                if planet_display in action_config['beneficial_planets']:
-                    try:
-                        # Usar Swiss Ephemeris (biblioteca padrão)
-                        transit_planet_longitude = calculate_planet_position_swiss(
-                            current_date, latitude, longitude, planet_name
-                        )
-                        angle = calculate_aspect_angle(transit_planet_longitude, house_cusp)
-                        aspect_type = get_aspect_type(angle, orb=8.0)
-                        
-                        # VALIDAÇÃO RIGOROSA: Verificar novamente se o aspecto está dentro do orbe
-                        if aspect_type and aspect_type in action_config['preferred_aspects']:
-                            # Definir ângulos alvo para cada aspecto
-                            aspect_targets = {
-                                'conjunção': 0,
-                                'sextil': 60,
-                                'quadratura': 90,
-                                'trígono': 120,
-                                'oposição': 180
-                            }
-                            target_angle = aspect_targets.get(aspect_type)
-                            
-                            # Validar se está realmente dentro do orbe de 8°
-                            # CORREÇÃO: Usar shortest_angular_distance para lidar corretamente com geometria circular
-                            # Isso garante que ângulos próximos de 0° ou 180° sejam tratados corretamente
-                            if target_angle is not None:
-                                # angle já é a menor distância (0-180°) de calculate_aspect_angle
-                                # Mas precisamos comparar com target_angle considerando geometria circular
-                                # Exemplo: angle=179° e target=180° deve dar diff=1°, não 179°
-                                angle_diff = shortest_angular_distance(angle, target_angle)
-                                if angle_diff > 8.0:
-                                    # Aspecto fora do orbe - não adicionar
-                                    continue
-                            
-                            # Pontuação menor para casas secundárias
-                            if aspect_type == 'trígono':
-                                score += 5
-                            elif aspect_type == 'sextil':
-                                score += 3
-                            elif aspect_type == 'conjunção':
-                                score += 4
-                            
-                            # VALIDAÇÃO CRÍTICA: Garantir que house_num está na lista permitida
-                            if house_num not in action_config['secondary_houses']:
-                                print(f"[ERROR] Bug detectado: house_num {house_num} não está em secondary_houses {action_config['secondary_houses']}")
-                                continue
-                            
-                            aspects_found.append({
-                                'planet': planet_display,
-                                'house': house_num,
-                                'aspect_type': aspect_type,
-                                'is_primary': False
-                            })
-                            
-                            reasons.append(f"{planet_display} em {aspect_type} com Casa {house_num}")
-                    except Exception as e:
-                        # Log erro silenciosamente (não quebrar o cálculo)
-                        continue
-        
-        # Penalizar se planetas desfavoráveis estão em aspectos tensos
-        for planet_name in all_planets:
-            planet_display = PLANET_NAMES.get(planet_name, planet_name)
-            
-            if planet_display in action_config['avoid_planets']:
-                for house_num in action_config['primary_houses']:
-                    house_cusp = natal_house_cusps[house_num]
-                    try:
-                        # Usar Swiss Ephemeris (biblioteca padrão)
-                        transit_planet_longitude = calculate_planet_position_swiss(
-                            current_date, latitude, longitude, planet_name
-                        )
-                        angle = calculate_aspect_angle(transit_planet_longitude, house_cusp)
-                        aspect_type = get_aspect_type(angle, orb=8.0)
-                        
-                        if aspect_type in ['quadratura', 'oposição']:
-                            score -= 5
-                            reasons.append(f"⚠️ {planet_display} em {aspect_type} com Casa {house_num}")
-                    except:
-                        continue
-        
-        # Verificar Lua Fora de Curso (penalizar)
-        from app.services.moon_void_calculator import calculate_moon_void_of_course
-        moon_void = calculate_moon_void_of_course(
-            check_date=current_date,
-            latitude=latitude,
-            longitude=longitude
-        )
-        
-        if moon_void.get('is_void', False):
-            score -= 3
-            reasons.append("⚠️ Lua Fora de Curso")
-        
-        # Adicionar momento se score for positivo
-        if score > 0:
-            best_moments.append({
-                'date': current_date.isoformat(),
-                'score': score,
-                'aspects': aspects_found,
-                'reasons': reasons,
-                'is_moon_void': moon_void.get('is_void', False)
-            })
-        
-        current_date += check_interval
-    
-    # VALIDAÇÃO E FILTRAGEM: Validar e filtrar momentos antes de retornar
-    def validate_moment(moment: Dict) -> bool:
-        """Valida se um momento tem todos os campos obrigatórios e válidos."""
-        if not isinstance(moment, dict):
-            return False
-        
-        # Validar data
-        if 'date' not in moment or not moment['date']:
-            return False
-        try:
-            # Verificar se é uma data ISO válida
-            datetime.fromisoformat(moment['date'].replace('Z', '+00:00'))
-        except (ValueError, AttributeError):
-            return False
-        
-        # Validar score
-        if 'score' not in moment or not isinstance(moment['score'], (int, float)):
-            return False
-        if moment['score'] <= 0:
-            return False
-        
-        # Validar aspectos
-        if 'aspects' not in moment or not isinstance(moment['aspects'], list):
-            return False
-        if len(moment['aspects']) == 0:
-            return False
-        
-        # Validar cada aspecto - CRÍTICO: Garantir que apenas planetas permitidos apareçam
-        valid_aspects = []
-        beneficial_planets = action_config['beneficial_planets']
-        
-        for aspect in moment['aspects']:
-            if not isinstance(aspect, dict):
-                continue
-            if 'planet' not in aspect or not isinstance(aspect['planet'], str) or not aspect['planet']:
-                continue
-            if 'aspect_type' not in aspect or not isinstance(aspect['aspect_type'], str) or not aspect['aspect_type']:
-                continue
-            if 'house' not in aspect or not isinstance(aspect['house'], int):
-                continue
-            if aspect['house'] < 1 or aspect['house'] > 12:
-                continue
-            
-            # VALIDAÇÃO CRÍTICA: Garantir que o planeta está na lista de planetas benéficos
-            if aspect['planet'] not in beneficial_planets:
-                print(f"[VALIDATION] Removendo aspecto com planeta não permitido: {aspect['planet']} (permitidos: {beneficial_planets})")
-                continue
-            
-            # Validar que o tipo de aspecto está na lista preferida
-            if aspect['aspect_type'] not in action_config['preferred_aspects']:
-                print(f"[VALIDATION] Removendo aspecto com tipo não permitido: {aspect['aspect_type']} (permitidos: {action_config['preferred_aspects']})")
-                continue
-            
-            valid_aspects.append(aspect)
-        
-        # Se não houver aspectos válidos após filtragem, momento é inválido
-        if len(valid_aspects) == 0:
-            return False
-        
-        # Atualizar aspectos do momento com apenas os válidos
-        moment['aspects'] = valid_aspects
-        
-        return True
-    
-    # Filtrar apenas momentos válidos
-    valid_moments = [m for m in best_moments if validate_moment(m)]
+    results, _ = _score_actions(
+        [action_type], birth_date, birth_time, latitude, longitude, days_ahead, interval_hours
+    )
+    return results[action_type]
+
+
+def calculate_best_timing_all(
+    birth_date: datetime,
+    birth_time: str,
+    latitude: float,
+    longitude: float,
+    days_ahead: int = 30,
+    interval_hours: int = DEFAULT_INTERVAL_HOURS,
+    action_types: Optional[List[str]] = None
+) -> Dict[str, any]:
+    """
+    Calcula os melhores momentos de várias ações (padrão: todas) em uma única passada.
     
-    # Ordenar por score (maior primeiro)
-    valid_moments.sort(key=lambda x: x['score'], reverse=True)
+    Returns:
+        Dicionário com:
+        - actions: resultado de cada ação (mesmo formato de calculate_best_timing)
+        - days_ahead, interval_hours, total_slots, analysis_date
+    """
+    action_types = list(action_types) if action_types else list(ACTION_HOUSES)
+    unknown = [action_type for action_type in action_types if action_type not in ACTION_HOUSES]
+    if unknown:
+        return {
+            'error': f"Ação desconhecida: {', '.join(unknown)}",
+            'actions': {}
+        }
     
-    # Retornar top 10 melhores momentos (apenas os válidos)
+    results, total_slots = _score_actions(
+        action_types, birth_date, birth_time, latitude, longitude, days_ahead, interval_hours
+    )
     return {
-        'action_type': action_type,
-        'action_config': action_config,
-        'best_moments': valid_moments[:10],
-        'total_checked': len(best_moments),
-        'total_valid': len(valid_moments),
+        'actions': results,
+        'days_ahead': days_ahead,
+        'interval_hours': interval_hours,
+        'total_slots': total_slots,
         'analysis_date': datetime.now().isoformat()
     }
-
@@ -3,21 +3,68 @@ Cache de Dados do Mapa Astral - Fonte Única de Verdade
 
 Este módulo garante que uma vez calculado, o mapa astral seja armazenado
 e reutilizado, evitando recálculos que podem gerar inconsistências.
+
+Duas camadas:
+1. Memória: LRU com TTL, thread-safe (por processo)
+2. Disco: SQLite compartilhado entre workers e preservado entre deploys
 """
+from collections import OrderedDict
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, Optional, Tuple
 import hashlib
 import json
+import os
+import sqlite3
+import threading
+import time
+
+from app.services.single_flight import SingleFlight
+
+
+# Versão do cálculo do mapa: incrementar ao mudar o cálculo (Swiss Ephemeris,
+# sistema de casas, tabela de planetas lentos, campos retornados). Faz parte da
+# chave, então mapas calculados pela versão anterior deixam de ser encontrados
+# (memória e SQLite) e expiram pelo TTL.
+CHART_CALC_VERSION = "1"
+
+
+def _resolve_db_path() -> Path:
+    """Caminho do SQLite do cache (configurável via CHART_CACHE_DB_PATH)."""
+    from app.core.config import settings
+
+    db_path = Path(settings.CHART_CACHE_DB_PATH)
+    if not db_path.is_absolute():
+        backend_root = Path(__file__).parent.parent.parent
+        db_path = backend_root / db_path
+    return db_path
 
 
 class ChartDataCache:
     """
-    Cache simples em memória para armazenar mapas astrais calculados.
-    Garante que o mesmo mapa não seja recalculado múltiplas vezes.
+    Cache em duas camadas para armazenar mapas astrais calculados.
+    Garante que o mesmo mapa não seja recalculado múltiplas vezes,
+    nem entre workers do uvicorn nem após reinícios.
     """
-    _cache: Dict[str, Dict] = {}
-    _max_cache_size = 100  # Limitar tamanho do cache
-    
+    _cache: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+    _max_cache_size: Optional[int] = None  # Padrão: CHART_CACHE_MEMORY_SIZE
+    _ttl_seconds: Optional[float] = None  # Padrão: CHART_CACHE_TTL_SECONDS
+    _db_path: Optional[Path] = None  # Padrão: CHART_CACHE_DB_PATH
+    _disk_enabled = True
+
+    _lock = threading.RLock()
+    _connection: Optional[sqlite3.Connection] = None
+    _connection_pid: Optional[int] = None
+
+    _stats = {
+        'memory_hits': 0,
+        'disk_hits': 0,
+        'misses': 0,
+        'evictions': 0,
+        'expirations': 0,
+        'disk_errors': 0,
+    }
+
     @staticmethod
     def _generate_cache_key(
         birth_date: datetime,
@@ -30,24 +77,162 @@ class ChartDataCache:
         date_str = birth_date.isoformat() if isinstance(birth_date, datetime) else str(birth_date)
         lat = round(latitude, 6)  # Precisão suficiente para coordenadas
         lon = round(longitude, 6)
-        
-        # Criar hash único
-        key_data = f"{date_str}|{birth_time}|{lat}|{lon}"
+
+        # Criar hash único (inclui a versão do cálculo)
+        key_data = f"{CHART_CALC_VERSION}|{date_str}|{birth_time}|{lat}|{lon}"
         key_hash = hashlib.md5(key_data.encode()).hexdigest()
-        
+
         return f"chart_{key_hash}"
-    
+
+    @staticmethod
+    def _settings_value(name: str, default):
+        try:
+            from app.core.config import settings
+            return getattr(settings, name, default)
+        except Exception:
+            return default
+
+    @staticmethod
+    def _max_size() -> int:
+        if ChartDataCache._max_cache_size is None:
+            ChartDataCache._max_cache_size = int(ChartDataCache._settings_value('CHART_CACHE_MEMORY_SIZE', 512))
+        return ChartDataCache._max_cache_size
+
+    @staticmethod
+    def _ttl() -> float:
+        if ChartDataCache._ttl_seconds is None:
+            ChartDataCache._ttl_seconds = float(ChartDataCache._settings_value('CHART_CACHE_TTL_SECONDS', 30 * 24 * 3600))
+        return ChartDataCache._ttl_seconds
+
+    @staticmethod
+    def _get_connection() -> Optional[sqlite3.Connection]:
+        """
+        Conexão SQLite do processo atual (recriada após fork).
+        Deve ser chamada com _lock adquirido.
+        """
+        if not ChartDataCache._disk_enabled:
+            return None
+
+        pid = os.getpid()
+        if ChartDataCache._connection is not None and ChartDataCache._connection_pid == pid:
+            return ChartDataCache._connection
+
+        try:
+            if ChartDataCache._db_path is None:
+                ChartDataCache._db_path = _resolve_db_path()
+            ChartDataCache._db_path.parent.mkdir(parents=True, exist_ok=True)
+
+            connection = sqlite3.connect(
+                str(ChartDataCache._db_path), timeout=5.0, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS chart_cache ("
+                "key TEXT PRIMARY KEY, data TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            connection.commit()
+        except Exception as e:
+            print(f"[WARNING] Cache de mapas em disco indisponível, usando apenas memória: {e}")
+            ChartDataCache._stats['disk_errors'] += 1
+            ChartDataCache._disk_enabled = False
+            return None
+
+        ChartDataCache._connection = connection
+        ChartDataCache._connection_pid = pid
+        return connection
+
+    @staticmethod
+    def _memory_store(cache_key: str, created_at: float, chart_data: Dict) -> None:
+        """Insere na camada de memória, removendo o item menos usado. Requer _lock."""
+        cache = ChartDataCache._cache
+        cache[cache_key] = (created_at, chart_data)
+        cache.move_to_end(cache_key)
+        while len(cache) > ChartDataCache._max_size():
+            cache.popitem(last=False)
+            ChartDataCache._stats['evictions'] += 1
+
+    @staticmethod
+    def _disk_get(cache_key: str) -> Optional[Tuple[float, Dict]]:
+        """Busca na camada de disco. Requer _lock."""
+        connection = ChartDataCache._get_connection()
+        if connection is None:
+            return None
+        try:
+            row = connection.execute(
+                "SELECT data, created_at FROM chart_cache WHERE key = ?", (cache_key,)
+            ).fetchone()
+            if row is None:
+                return None
+            data, created_at = row
+            if time.time() - created_at > ChartDataCache._ttl():
+                connection.execute("DELETE FROM chart_cache WHERE key = ?", (cache_key,))
+                connection.commit()
+                ChartDataCache._stats['expirations'] += 1
+                return None
+            return created_at, json.loads(data)
+        except Exception as e:
+            print(f"[WARNING] Erro ao ler cache de mapas em disco: {e}")
+            ChartDataCache._stats['disk_errors'] += 1
+            return None
+
+    @staticmethod
+    def _disk_set(cache_key: str, created_at: float, chart_data: Dict) -> None:
+        """Grava na camada de disco (apenas dados serializáveis em JSON). Requer _lock."""
+        connection = ChartDataCache._get_connection()
+        if connection is None:
+            return
+        try:
+            payload = json.dumps(chart_data)
+        except (TypeError, ValueError):
+            # Dados não serializáveis ficam apenas em memória
+            return
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO chart_cache (key, data, created_at) VALUES (?, ?, ?)",
+                (cache_key, payload, created_at)
+            )
+            connection.commit()
+        except Exception as e:
+            print(f"[WARNING] Erro ao gravar cache de mapas em disco: {e}")
+            ChartDataCache._stats['disk_errors'] += 1
+
     @staticmethod
     def get(
         birth_date: datetime,
         birth_time: str,
         latitude: float,
-        longitude: float
+        longitude: float,
+        record_miss: bool = True
     ) -> Optional[Dict]:
-        """Obtém dados do cache se existirem."""
+        """
+        Obtém dados do cache (memória, depois disco) se existirem.
+        record_miss=False permite rechecar o cache sem contar uma nova falha.
+        """
         cache_key = ChartDataCache._generate_cache_key(birth_date, birth_time, latitude, longitude)
-        return ChartDataCache._cache.get(cache_key)
-    
+
+        with ChartDataCache._lock:
+            entry = ChartDataCache._cache.get(cache_key)
+            if entry is not None:
+                created_at, chart_data = entry
+                if time.time() - created_at <= ChartDataCache._ttl():
+                    ChartDataCache._cache.move_to_end(cache_key)
+                    ChartDataCache._stats['memory_hits'] += 1
+                    return chart_data.copy()
+                del ChartDataCache._cache[cache_key]
+                ChartDataCache._stats['expirations'] += 1
+
+            entry = ChartDataCache._disk_get(cache_key)
+            if entry is not None:
+                created_at, chart_data = entry
+                ChartDataCache._memory_store(cache_key, created_at, chart_data)
+                ChartDataCache._stats['disk_hits'] += 1
+                return chart_data.copy()
+
+            if record_miss:
+                ChartDataCache._stats['misses'] += 1
+            return None
+
     @staticmethod
     def set(
         birth_date: datetime,
@@ -56,29 +241,50 @@ class ChartDataCache:
         longitude: float,
         chart_data: Dict
     ) -> None:
-        """Armazena dados do mapa no cache."""
+        """Armazena dados do mapa nas duas camadas do cache."""
         cache_key = ChartDataCache._generate_cache_key(birth_date, birth_time, latitude, longitude)
-        
-        # Limpar cache se estiver muito grande
-        if len(ChartDataCache._cache) >= ChartDataCache._max_cache_size:
-            # Remover item mais antigo (simples - remover primeiro)
-            if ChartDataCache._cache:
-                first_key = next(iter(ChartDataCache._cache))
-                del ChartDataCache._cache[first_key]
-        
-        # Armazenar dados
-        ChartDataCache._cache[cache_key] = chart_data.copy()
-    
+        created_at = time.time()
+
+        with ChartDataCache._lock:
+            ChartDataCache._memory_store(cache_key, created_at, chart_data.copy())
+            ChartDataCache._disk_set(cache_key, created_at, chart_data)
+
     @staticmethod
-    def clear() -> None:
-        """Limpa o cache."""
-        ChartDataCache._cache.clear()
-    
+    def clear(include_disk: bool = False) -> None:
+        """Limpa o cache em memória (e opcionalmente o de disco)."""
+        with ChartDataCache._lock:
+            ChartDataCache._cache.clear()
+            if include_disk:
+                connection = ChartDataCache._get_connection()
+                if connection is not None:
+                    connection.execute("DELETE FROM chart_cache")
+                    connection.commit()
+
     @staticmethod
     def size() -> int:
-        """Retorna o tamanho atual do cache."""
+        """Retorna o tamanho atual do cache em memória."""
         return len(ChartDataCache._cache)
 
+    @staticmethod
+    def stats() -> Dict[str, int]:
+        """Retorna os contadores de acertos, falhas e remoções."""
+        with ChartDataCache._lock:
+            stats = dict(ChartDataCache._stats)
+            stats['memory_size'] = len(ChartDataCache._cache)
+            stats['memory_max_size'] = ChartDataCache._max_size()
+            return stats
+
+    @staticmethod
+    def reset_stats() -> None:
+        """Zera os contadores."""
+        with ChartDataCache._lock:
+            for name in ChartDataCache._stats:
+                ChartDataCache._stats[name] = 0
+
+
+# Cálculos de mapas em andamento (requisições simultâneas do mesmo usuário)
+_chart_flight = SingleFlight("natal_chart")
+
 
 def get_or_calculate_chart(
     birth_date: datetime,
@@ -89,15 +295,16 @@ def get_or_calculate_chart(
 ) -> Dict:
     """
     Obtém dados do cache ou calcula se não existirem.
-    Garante que o mapa seja calculado apenas uma vez.
-    
+    Garante que o mapa seja calculado apenas uma vez, inclusive quando
+    várias requisições simultâneas pedem o mesmo mapa (single-flight).
+
     Args:
         birth_date: Data de nascimento
         birth_time: Hora de nascimento
         latitude: Latitude
         longitude: Longitude
         calculate_func: Função que calcula o mapa (calculate_birth_chart)
-    
+
     Returns:
         Dados do mapa astral (sempre os mesmos para os mesmos inputs)
     """
@@ -105,12 +312,24 @@ def get_or_calculate_chart(
     cached = ChartDataCache.get(birth_date, birth_time, latitude, longitude)
     if cached is not None:
         return cached
-    
-    # Calcular se não estiver no cache
-    chart_data = calculate_func(birth_date, birth_time, latitude, longitude)
-    
-    # Armazenar no cache
-    ChartDataCache.set(birth_date, birth_time, latitude, longitude, chart_data)
-    
-    return chart_data
 
+    def calculate_and_store() -> Dict:
+        # Outra requisição pode ter concluído o cálculo enquanto esperávamos
+        cached = ChartDataCache.get(birth_date, birth_time, latitude, longitude, record_miss=False)
+        if cached is not None:
+            return cached
+
+        chart_data = calculate_func(birth_date, birth_time, latitude, longitude)
+        ChartDataCache.set(birth_date, birth_time, latitude, longitude, chart_data)
+        return chart_data
+
+    # Calcular se não estiver no cache (uma única vez entre chamadas simultâneas)
+    flight_key = (
+        ChartDataCache._generate_cache_key(birth_date, birth_time, latitude, longitude),
+        getattr(calculate_func, '__module__', None),
+        getattr(calculate_func, '__qualname__', repr(calculate_func))
+    )
+    chart_data = _chart_flight.do(flight_key, calculate_and_store)
+
+    # Cada chamador recebe sua própria cópia
+    return chart_data.copy()
@@ -79,6 +79,8 @@ def get_daily_info(
         - moon_sign: Signo da Lua (ex: "Aquário")
         - moon_phase_description: Descrição da fase (ex: "Lua Crescente em Aquário")
     """
+    # Sem data informada: usar o céu atual compartilhado (calculado uma vez por bucket)
+    use_sky_state = target_date is None
     if target_date is None:
         target_date = datetime.now()
     
@@ -97,7 +99,12 @@ def get_daily_info(
     
     # Calcular posições usando Swiss Ephemeris (biblioteca padrão)
     try:
-        if HAS_SWISS_EPHEMERIS:
+        if use_sky_state:
+            from app.services.sky_state import get_sky_state
+            sky = get_sky_state()
+            moon_longitude = sky['longitudes']['moon']
+            sun_longitude = sky['longitudes']['sun']
+        elif HAS_SWISS_EPHEMERIS:
             # Usar função do best_timing_calculator que já tem a lógica correta
             from app.services.best_timing_calculator import calculate_planet_position_swiss
             
@@ -0,0 +1,230 @@
+"""
+Motor de Efemérides em Lote (Swiss Ephemeris direto).
+
+Calcula longitudes e velocidades de vários corpos para vários instantes em
+uma única passada sobre o Swiss Ephemeris (pyswisseph), sem construir um
+AstrologicalSubject completo (timezone, casas, todos os planetas) por ponto.
+
+Resultado: matrizes NumPy (tempo × corpo) usadas pelas varreduras de
+best timing, trânsitos futuros e Lua Fora de Curso.
+"""
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pytz
+
+from app.core.metrics import timed_stage
+
+# Importação do Swiss Ephemeris com tratamento de erro
+try:
+    import swisseph as swe
+    SWISSEPH_AVAILABLE = True
+except ImportError:
+    swe = None
+    SWISSEPH_AVAILABLE = False
+
+
+# Corpos suportados (mesma ordem usada em todo o backend)
+BATCH_BODIES = [
+    'sun', 'moon', 'mercury', 'venus', 'mars',
+    'jupiter', 'saturn', 'uranus', 'neptune', 'pluto'
+]
+
+# Identificadores do Swiss Ephemeris para cada corpo
+SWISS_BODY_IDS = {
+    'sun': 0,
+    'moon': 1,
+    'mercury': 2,
+    'venus': 3,
+    'mars': 4,
+    'jupiter': 5,
+    'saturn': 6,
+    'uranus': 7,
+    'neptune': 8,
+    'pluto': 9,
+}
+
+# Data juliana da época Unix (1970-01-01T00:00:00 UTC)
+UNIX_EPOCH_JD = 2440587.5
+
+# Passo usado para estimar velocidade no fallback PyEphem (em dias)
+FALLBACK_SPEED_STEP_DAYS = 1.0 / 24.0
+
+if SWISSEPH_AVAILABLE:
+    # Usar os mesmos arquivos de efemérides do kerykeion (quando instalados)
+    try:
+        import kerykeion
+        _ephe_path = Path(kerykeion.__file__).parent / "sweph"
+        if _ephe_path.exists():
+            swe.set_ephe_path(str(_ephe_path))
+    except Exception:
+        pass
+    SWISS_FLAGS = swe.FLG_SWIEPH | swe.FLG_SPEED
+else:
+    SWISS_FLAGS = 0
+
+
+def local_to_utc(
+    local_dt: datetime,
+    latitude: float,
+    longitude: float,
+    timezone_name: Optional[str] = None
+) -> datetime:
+    """
+    Converte um horário local (do local informado) para UTC sem timezone.
+    Datetimes com tzinfo são apenas convertidos para UTC.
+
+    Args:
+        local_dt: Data/hora local
+        latitude: Latitude do local
+        longitude: Longitude do local
+        timezone_name: Nome do timezone. Se None, é inferido das coordenadas
+
+    Returns:
+        Datetime ingênuo (naive) em UTC
+    """
+    if local_dt.tzinfo is None:
+        if timezone_name is None:
+            from app.services.swiss_ephemeris_calculator import resolve_timezone_name
+            timezone_name = resolve_timezone_name(latitude, longitude)
+        try:
+            tz = pytz.timezone(timezone_name)
+        except Exception:
+            tz = pytz.UTC
+        local_dt = tz.localize(local_dt)
+
+    return local_dt.astimezone(pytz.UTC).replace(tzinfo=None)
+
+
+def datetimes_to_julian_days(instants: Sequence[datetime]) -> np.ndarray:
+    """
+    Converte instantes UTC para datas julianas (UT) de forma vetorizada.
+    Datetimes sem timezone são tratados como UTC.
+    """
+    normalized = [
+        dt.astimezone(pytz.UTC).replace(tzinfo=None) if dt.tzinfo is not None else dt
+        for dt in instants
+    ]
+    if not normalized:
+        return np.empty(0, dtype=np.float64)
+
+    microseconds = np.array(normalized, dtype='datetime64[us]').astype(np.int64)
+    return UNIX_EPOCH_JD + microseconds / 86_400_000_000.0
+
+
+def julian_day_to_datetime(julian_day: float) -> datetime:
+    """Converte data juliana (UT) para datetime UTC sem timezone."""
+    return datetime(1970, 1, 1) + timedelta(days=julian_day - UNIX_EPOCH_JD)
+
+
+def _ephem_longitude(instant: datetime, body: str) -> float:
+    """Fallback: longitude eclíptica de um corpo via PyEphem."""
+    import ephem
+    from app.services.astrology_calculator import calculate_planet_position
+
+    observer = ephem.Observer()
+    observer.date = instant.strftime('%Y/%m/%d %H:%M:%S')
+    return calculate_planet_position(observer, body)
+
+
+def _calculate_body_fallback(instants: List[datetime], body: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Fallback PyEphem para um corpo: longitude e velocidade por diferença finita."""
+    longitudes = np.empty(len(instants), dtype=np.float64)
+    speeds = np.empty(len(instants), dtype=np.float64)
+    step = timedelta(days=FALLBACK_SPEED_STEP_DAYS)
+
+    for i, instant in enumerate(instants):
+        lon = _ephem_longitude(instant, body)
+        lon_next = _ephem_longitude(instant + step, body)
+        delta = (lon_next - lon + 180.0) % 360.0 - 180.0
+        longitudes[i] = lon
+        speeds[i] = delta / FALLBACK_SPEED_STEP_DAYS
+
+    return longitudes, speeds
+
+
+@timed_stage('ephemeris')
+def calculate_positions_batch(
+    instants: Sequence[datetime],
+    bodies: Optional[Sequence[str]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula longitudes eclípticas geocêntricas e velocidades para vários
+    instantes e corpos em uma única passada sobre o Swiss Ephemeris.
+
+    Args:
+        instants: Sequência de instantes UTC (naive = UTC)
+        bodies: Corpos a calcular (padrão: BATCH_BODIES). Ordem define as colunas
+
+    Returns:
+        Tupla (longitudes, speeds), ambas com shape (len(instants), len(bodies)).
+        Longitudes em graus [0, 360), velocidades em graus/dia (negativa = retrógrado)
+    """
+    body_keys = [b.lower() for b in (bodies or BATCH_BODIES)]
+    for body in body_keys:
+        if body not in SWISS_BODY_IDS:
+            raise ValueError(f"Planeta desconhecido: {body}")
+
+    instants = list(instants)
+    julian_days = datetimes_to_julian_days(instants)
+    n_times, n_bodies = len(julian_days), len(body_keys)
+
+    longitudes = np.empty((n_times, n_bodies), dtype=np.float64)
+    speeds = np.empty((n_times, n_bodies), dtype=np.float64)
+
+    for col, body in enumerate(body_keys):
+        if SWISSEPH_AVAILABLE:
+            body_id = SWISS_BODY_IDS[body]
+            try:
+                for row, jd in enumerate(julian_days.tolist()):
+                    position = swe.calc_ut(jd, body_id, SWISS_FLAGS)[0]
+                    longitudes[row, col] = position[0]
+                    speeds[row, col] = position[3]
+                continue
+            except Exception as e:
+                print(f"[WARNING] Swiss Ephemeris falhou para {body}, usando PyEphem: {e}")
+
+        naive_instants = [
+            dt.astimezone(pytz.UTC).replace(tzinfo=None) if dt.tzinfo is not None else dt
+            for dt in instants
+        ]
+        longitudes[:, col], speeds[:, col] = _calculate_body_fallback(naive_instants, body)
+
+    return np.mod(longitudes, 360.0), speeds
+
+
+def calculate_positions_at(
+    instant: datetime,
+    bodies: Optional[Sequence[str]] = None
+) -> Dict[str, float]:
+    """
+    Atalho para um único instante UTC.
+
+    Returns:
+        Dicionário {corpo: longitude}
+    """
+    body_keys = [b.lower() for b in (bodies or BATCH_BODIES)]
+    longitudes, _ = calculate_positions_batch([instant], body_keys)
+    return dict(zip(body_keys, longitudes[0].tolist()))
+
+
+def calculate_body_at_julian_day(julian_day: float, body: str) -> Tuple[float, float]:
+    """
+    Longitude e velocidade de um único corpo em uma data juliana (UT).
+    Usado pelos solvers de eventos, que avaliam um ponto por vez.
+
+    Returns:
+        Tupla (longitude, velocidade em graus/dia)
+    """
+    body = body.lower()
+    if body not in SWISS_BODY_IDS:
+        raise ValueError(f"Planeta desconhecido: {body}")
+
+    if SWISSEPH_AVAILABLE:
+        position = swe.calc_ut(julian_day, SWISS_BODY_IDS[body], SWISS_FLAGS)[0]
+        return position[0] % 360.0, position[3]
+
+    longitudes, speeds = _calculate_body_fallback([julian_day_to_datetime(julian_day)], body)
+    return float(longitudes[0]), float(speeds[0])
@@ -0,0 +1,243 @@
+"""
+Serviço de Geolocalização e Timezone (offline, com cache).
+
+create_kr_instance resolvia o timezone com uma busca em polígonos
+(timezonefinder) a cada chamada, e o mapa completo procurava a cidade em um
+dicionário fixo. Aqui:
+- Timezone: cache LRU por coordenadas arredondadas; cidades do gazetteer
+  já trazem o timezone, sem busca em polígonos
+- Gazetteer de cidades (app/data/gazetteer_cities.csv) carregado uma única vez:
+  - Trie de prefixos dos nomes normalizados (geocodificação e autocompletar)
+  - KD-tree em coordenadas 3D na esfera unitária (cidade mais próxima)
+"""
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import csv
+import math
+import threading
+import unicodedata
+
+from app.core.config import settings
+
+try:
+    from timezonefinder import TimezoneFinder
+    TZ_FINDER = TimezoneFinder()
+except ImportError:
+    TZ_FINDER = None
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Casas decimais das coordenadas na chave do cache de timezone (~11 m)
+TIMEZONE_COORDINATE_PRECISION = 4
+
+# Coordenadas a até esta distância de uma cidade do gazetteer usam o timezone dela
+GAZETTEER_TIMEZONE_MATCH_KM = 1.0
+
+DEFAULT_GAZETTEER_PATH = Path(__file__).parent.parent / "data" / "gazetteer_cities.csv"
+
+
+def normalize_place_name(text: str) -> str:
+    """Minúsculas, sem acentos e com pontuação trocada por espaços."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+    return " ".join("".join(c if c.isalnum() else " " for c in stripped).split())
+
+
+def _unit_vector(latitude: float, longitude: float) -> Tuple[float, float, float]:
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+
+def _chord_to_km(chord: float) -> float:
+    """Distância em linha reta na esfera unitária → distância sobre a superfície (km)."""
+    return 2.0 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2.0))
+
+
+class Gazetteer:
+    """Cidades com trie de nomes e KD-tree de coordenadas (somente leitura após construído)."""
+
+    def __init__(self, cities: List[Dict[str, object]]):
+        self.cities = cities
+        self._trie: Dict[str, object] = {}
+        for index, city in enumerate(cities):
+            for name in [city['name']] + list(city.get('aliases', [])):
+                self._insert(normalize_place_name(name), index)
+
+        self._points = [_unit_vector(city['latitude'], city['longitude']) for city in cities]
+        self._tree = self._build_tree(list(range(len(cities))), 0)
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "Gazetteer":
+        cities = []
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                cities.append({
+                    'name': row['name'],
+                    'state': row['state'] or None,
+                    'country': row['country'],
+                    'latitude': float(row['latitude']),
+                    'longitude': float(row['longitude']),
+                    'timezone': row['timezone'],
+                    'aliases': [a.strip() for a in (row.get('aliases') or '').split('|') if a.strip()],
+                })
+        return cls(cities)
+
+    # ===== Trie de prefixos =====
+
+    def _insert(self, name: str, index: int) -> None:
+        node = self._trie
+        for char in name:
+            node = node.setdefault(char, {})
+        indices = node.setdefault(None, [])
+        if index not in indices:
+            indices.append(index)
+
+    def _node(self, prefix: str) -> Optional[Dict[str, object]]:
+        node = self._trie
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node
+
+    def search(self, prefix: str, limit: int = 10) -> List[Dict[str, object]]:
+        """Cidades cujo nome (ou apelido) começa com o prefixo, na ordem do gazetteer."""
+        node = self._node(normalize_place_name(prefix))
+        if node is None:
+            return []
+        found, stack = set(), [node]
+        while stack:
+            current = stack.pop()
+            for key, child in current.items():
+                if key is None:
+                    found.update(child)
+                else:
+                    stack.append(child)
+        return [self.cities[i] for i in sorted(found)[:limit]]
+
+    def find_in_text(self, text: str) -> Optional[Dict[str, object]]:
+        """
+        Primeira cidade citada no texto (ex: "Sobral, CE, Brasil"): a partir de
+        cada início de palavra, o nome mais longo que termina em fim de palavra.
+        """
+        normalized = normalize_place_name(text)
+        starts = [0] + [i + 1 for i, c in enumerate(normalized) if c == " "]
+        for start in starts:
+            node, match = self._trie, None
+            for position in range(start, len(normalized)):
+                node = node.get(normalized[position])
+                if node is None:
+                    break
+                ends_word = position + 1 == len(normalized) or normalized[position + 1] == " "
+                if ends_word and None in node:
+                    match = node[None][0]
+            if match is not None:
+                return self.cities[match]
+        return None
+
+    # ===== KD-tree =====
+
+    def _build_tree(self, indices: List[int], depth: int):
+        if not indices:
+            return None
+        axis = depth % 3
+        indices.sort(key=lambda i: self._points[i][axis])
+        middle = len(indices) // 2
+        return (
+            indices[middle],
+            axis,
+            self._build_tree(indices[:middle], depth + 1),
+            self._build_tree(indices[middle + 1:], depth + 1),
+        )
+
+    def nearest(self, latitude: float, longitude: float) -> Optional[Tuple[Dict[str, object], float]]:
+        """Cidade mais próxima e a distância em km (None se o gazetteer estiver vazio)."""
+        if self._tree is None:
+            return None
+        target = _unit_vector(latitude, longitude)
+        best = [None, float('inf')]
+
+        def visit(node):
+            if node is None:
+                return
+            index, axis, left, right = node
+            point = self._points[index]
+            distance = sum((a - b) ** 2 for a, b in zip(point, target))
+            if distance < best[1]:
+                best[0], best[1] = index, distance
+            delta = target[axis] - point[axis]
+            near, far = (left, right) if delta < 0 else (right, left)
+            visit(near)
+            if delta * delta < best[1]:
+                visit(far)
+
+        visit(self._tree)
+        return self.cities[best[0]], _chord_to_km(math.sqrt(best[1]))
+
+
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """Gazetteer compartilhado do processo (carregado na primeira chamada)."""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                path = Path(settings.GEO_GAZETTEER_PATH) if settings.GEO_GAZETTEER_PATH else DEFAULT_GAZETTEER_PATH
+                try:
+                    _gazetteer = Gazetteer.from_csv(path)
+                except Exception as e:
+                    print(f"[WARNING] Gazetteer de cidades indisponível ({path}): {e}")
+                    _gazetteer = Gazetteer([])
+    return _gazetteer
+
+
+def geocode_place(place: str) -> Optional[Dict[str, object]]:
+    """Cidade citada no nome do local (ex: "Rio de Janeiro, RJ"), ou None."""
+    return get_gazetteer().find_in_text(place)
+
+
+def search_cities(prefix: str, limit: int = 10) -> List[Dict[str, object]]:
+    """Autocompletar: cidades cujo nome começa com o prefixo."""
+    return get_gazetteer().search(prefix, limit)
+
+
+def reverse_geocode(latitude: float, longitude: float) -> Optional[Dict[str, object]]:
+    """Cidade do gazetteer mais próxima das coordenadas, com 'distance_km'."""
+    result = get_gazetteer().nearest(latitude, longitude)
+    if result is None:
+        return None
+    city, distance_km = result
+    return dict(city, distance_km=distance_km)
+
+
+@lru_cache(maxsize=settings.GEO_TIMEZONE_CACHE_SIZE)
+def _cached_timezone_at(latitude: float, longitude: float) -> Optional[str]:
+    result = get_gazetteer().nearest(latitude, longitude)
+    if result is not None and result[1] <= GAZETTEER_TIMEZONE_MATCH_KM:
+        return result[0]['timezone']
+
+    if TZ_FINDER:
+        try:
+            return TZ_FINDER.timezone_at(lat=latitude, lng=longitude)
+        except Exception:
+            return None
+    return None
+
+
+def timezone_at(latitude: float, longitude: float) -> Optional[str]:
+    """Nome IANA do timezone das coordenadas (None se não for possível determinar)."""
+    return _cached_timezone_at(
+        round(float(latitude), TIMEZONE_COORDINATE_PRECISION),
+        round(float(longitude), TIMEZONE_COORDINATE_PRECISION),
+    )
+
+
+def geo_cache_stats() -> Dict[str, int]:
+    """Acertos e falhas do cache de timezone (por processo)."""
+    info = _cached_timezone_at.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize}
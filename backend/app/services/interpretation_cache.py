@@ -0,0 +1,198 @@
+"""
+Cache Persistente de Interpretações - Endereçado por Conteúdo.
+
+As interpretações geradas pela IA são determinísticas para os mesmos dados do
+mapa, seção, idioma, provedor/modelo e versão do template de prompt. A chave do
+cache é o hash desses dados, então reabrir o mapa completo não chama o LLM de novo.
+
+Armazenado no banco principal (tabela interpretation_cache), com:
+- TTL (INTERPRETATION_CACHE_TTL_SECONDS)
+- Invalidação explícita por birth_key quando o mapa é atualizado via /auth
+- Remoção de itens expirados (purge_expired_interpretations)
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Union
+import hashlib
+import json
+import unicodedata
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.database import InterpretationCache
+
+
+# Casas decimais das coordenadas na chave (~11 m)
+COORDINATE_PRECISION = 4
+
+_stats = {'hits': 0, 'misses': 0, 'stores': 0, 'invalidations': 0, 'errors': 0}
+
+
+def _normalize_value(value: Any) -> Any:
+    """Normaliza valores para que dados equivalentes gerem o mesmo hash."""
+    if isinstance(value, str):
+        return " ".join(unicodedata.normalize("NFC", value).split())
+    if isinstance(value, float):
+        return round(value, COORDINATE_PRECISION)
+    if isinstance(value, dict):
+        return {str(k): _normalize_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize_value(v) for v in value]
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _hash(data: Any) -> str:
+    payload = json.dumps(_normalize_value(data), sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def chart_fingerprint(chart_data: Dict[str, Any]) -> str:
+    """Hash dos dados normalizados do mapa (todas as entradas do prompt)."""
+    return _hash(chart_data)
+
+
+def birth_key(
+    birth_date: Union[datetime, str],
+    birth_time: str,
+    latitude: float,
+    longitude: float
+) -> str:
+    """
+    Identidade do nascimento (data, hora e local), usada para invalidar todas
+    as interpretações de um mapa quando ele é alterado.
+    """
+    if isinstance(birth_date, datetime):
+        birth_date = birth_date.strftime("%Y-%m-%d")
+    return _hash({
+        'birth_date': birth_date,
+        'birth_time': (birth_time or "").strip()[:5],
+        'latitude': round(float(latitude), COORDINATE_PRECISION),
+        'longitude': round(float(longitude), COORDINATE_PRECISION),
+    })
+
+
+def interpretation_cache_key(
+    fingerprint: str,
+    section: str,
+    language: str,
+    provider: str,
+    model: Optional[str],
+    prompt_version: str
+) -> str:
+    """Chave do cache: mapa + seção + idioma + provedor/modelo + versão do prompt."""
+    return _hash({
+        'fingerprint': fingerprint,
+        'section': section,
+        'language': language or 'pt',
+        'provider': provider,
+        'model': model or 'default',
+        'prompt_version': prompt_version,
+    })
+
+
+def _enabled() -> bool:
+    return bool(getattr(settings, 'INTERPRETATION_CACHE_ENABLED', True))
+
+
+def get_cached_interpretation(cache_key: str) -> Optional[Dict[str, Any]]:
+    """Retorna a resposta armazenada (dict) ou None se ausente/expirada."""
+    if not _enabled():
+        return None
+
+    db = SessionLocal()
+    try:
+        entry = db.query(InterpretationCache).filter(
+            InterpretationCache.cache_key == cache_key
+        ).first()
+        if entry is None or entry.expires_at < datetime.utcnow():
+            _stats['misses'] += 1
+            return None
+        _stats['hits'] += 1
+        return json.loads(entry.content)
+    except Exception as e:
+        print(f"[WARNING] Erro ao ler cache de interpretações: {e}")
+        _stats['errors'] += 1
+        return None
+    finally:
+        db.close()
+
+
+def store_interpretation(
+    cache_key: str,
+    payload: Dict[str, Any],
+    birth_key: str,
+    section: str,
+    language: str,
+    provider: str,
+    model: Optional[str],
+    prompt_version: str
+) -> None:
+    """Grava (ou substitui) uma interpretação gerada. Falhas não afetam a resposta."""
+    if not _enabled():
+        return
+
+    ttl = int(getattr(settings, 'INTERPRETATION_CACHE_TTL_SECONDS', 90 * 24 * 3600))
+    expires_at = datetime.utcnow() + timedelta(seconds=ttl)
+    content = json.dumps(payload, ensure_ascii=False)
+
+    db = SessionLocal()
+    try:
+        entry = db.query(InterpretationCache).filter(
+            InterpretationCache.cache_key == cache_key
+        ).first()
+        if entry is None:
+            entry = InterpretationCache(cache_key=cache_key)
+            db.add(entry)
+        entry.birth_key = birth_key
+        entry.section = section
+        entry.language = language or 'pt'
+        entry.provider = provider
+        entry.model = model
+        entry.prompt_version = prompt_version
+        entry.content = content
+        entry.expires_at = expires_at
+        db.commit()
+        _stats['stores'] += 1
+    except IntegrityError:
+        # Outro worker gravou a mesma chave ao mesmo tempo
+        db.rollback()
+    except Exception as e:
+        db.rollback()
+        print(f"[WARNING] Erro ao gravar cache de interpretações: {e}")
+        _stats['errors'] += 1
+    finally:
+        db.close()
+
+
+def invalidate_interpretations(db: Session, birth_key: str) -> int:
+    """
+    Remove as interpretações de um nascimento (ex: mapa atualizado em /auth/me).
+    Usa a sessão do chamador, então a remoção é confirmada no mesmo commit.
+    """
+    removed = db.query(InterpretationCache).filter(
+        InterpretationCache.birth_key == birth_key
+    ).delete(synchronize_session=False)
+    _stats['invalidations'] += removed
+    return removed
+
+
+def purge_expired_interpretations() -> int:
+    """Remove os itens expirados. Retorna a quantidade removida."""
+    db = SessionLocal()
+    try:
+        removed = db.query(InterpretationCache).filter(
+            InterpretationCache.expires_at < datetime.utcnow()
+        ).delete(synchronize_session=False)
+        db.commit()
+        return removed
+    finally:
+        db.close()
+
+
+def interpretation_cache_stats() -> Dict[str, int]:
+    """Contadores de acertos, falhas, gravações e invalidações (por processo)."""
+    return dict(_stats)
@@ -0,0 +1,168 @@
+"""
+Buffer de embeddings dos documentos aprendidos pelo RAG.
+
+A matriz é pré-alocada e dobra de capacidade quando enche, então cada
+inserção custa O(1) amortizado (np.vstack copiava a matriz inteira a cada
+documento aprendido). As linhas são guardadas já normalizadas, com as
+máscaras de categoria mantidas junto, e a busca não recalcula nada por
+inserção.
+
+Concorrência: um escritor por vez (lock) e leitores sem lock. O escritor
+preenche linhas além do tamanho publicado e só então publica um novo
+snapshot (atribuição atômica de um dict imutável). Um leitor usa o snapshot
+que pegou até o fim da busca; ao crescer, a matriz nova é uma cópia e a
+antiga continua válida para quem ainda a usa.
+"""
+from typing import Any, Dict, List, Optional
+import threading
+
+import numpy as np
+
+
+INITIAL_CAPACITY = 256
+
+_EMPTY_SNAPSHOT: Dict[str, Any] = {
+    'size': 0,
+    'source': None,
+    'normalized': None,
+    'categories': np.empty(0, dtype=object),
+    'masks': {},
+    'documents': [],
+}
+
+
+def _normalized(embeddings: np.ndarray) -> np.ndarray:
+    rows = np.asarray(embeddings, dtype=np.float32)
+    if rows.ndim == 1:
+        rows = rows.reshape(1, -1)
+    norms = np.linalg.norm(rows, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return rows / norms
+
+
+class LearnedEmbeddingBuffer:
+    """Documentos aprendidos + matriz normalizada com crescimento geométrico."""
+
+    def __init__(self, initial_capacity: int = INITIAL_CAPACITY):
+        self._initial_capacity = max(1, initial_capacity)
+        self._write_lock = threading.Lock()
+        self._matrix: Optional[np.ndarray] = None
+        self._categories = np.empty(0, dtype=object)
+        self._masks: Dict[str, np.ndarray] = {}
+        self._documents: List[Dict[str, Any]] = []
+        self._size = 0
+        self._snapshot = _EMPTY_SNAPSHOT
+
+    def __len__(self) -> int:
+        return self._snapshot['size']
+
+    @property
+    def documents(self) -> List[Dict[str, Any]]:
+        return self._documents
+
+    @property
+    def capacity(self) -> int:
+        return 0 if self._matrix is None else len(self._matrix)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Estado publicado (sem lock), no formato do estado de busca do serviço:
+        size, normalized (matriz size × dim), categories, masks e documents.
+        Os documentos válidos são documents[:size].
+        """
+        return self._snapshot
+
+    def append(self, document: Dict[str, Any], embedding: np.ndarray) -> None:
+        self.extend([document], np.asarray(embedding).reshape(1, -1))
+
+    def extend(self, documents: List[Dict[str, Any]], embeddings: np.ndarray) -> None:
+        """Anexa documentos e seus embeddings (mesma ordem) e publica o novo snapshot."""
+        rows = _normalized(embeddings)
+        if len(rows) != len(documents):
+            raise ValueError(f"{len(documents)} documentos para {len(rows)} embeddings")
+        if len(rows) == 0:
+            return
+        with self._write_lock:
+            self._write(documents, rows)
+
+    def replace(self, documents: List[Dict[str, Any]], embeddings: Optional[np.ndarray]) -> None:
+        """
+        Substitui todo o conteúdo (carga inicial). Com tamanhos diferentes,
+        valem as primeiras min(len(documents), len(embeddings)) linhas.
+        """
+        rows = _normalized(embeddings) if embeddings is not None and len(embeddings) else None
+        with self._write_lock:
+            self._matrix = None
+            self._categories = np.empty(0, dtype=object)
+            self._masks = {}
+            self._size = 0
+            self._documents = list(documents)
+            if rows is not None and self._documents:
+                size = min(len(self._documents), len(rows))
+                self._write(self._documents[:size], rows[:size], documents_stored=True)
+            else:
+                self._publish()
+
+    def clear(self) -> None:
+        self.replace([], None)
+
+    def _reserve(self, size: int, dim: int) -> None:
+        """Garante capacidade para `size` linhas, dobrando a capacidade. Requer _write_lock."""
+        if self._matrix is not None and self._matrix.shape[1] != dim:
+            raise ValueError(f"Embedding com dimensão {dim}, esperado {self._matrix.shape[1]}")
+        if size <= self.capacity:
+            return
+
+        capacity = max(self._initial_capacity, self.capacity)
+        while capacity < size:
+            capacity *= 2
+
+        # Cópias novas: snapshots já publicados continuam apontando para os arrays antigos
+        n = self._size
+        matrix = np.empty((capacity, dim), dtype=np.float32)
+        categories = np.empty(capacity, dtype=object)
+        if self._matrix is not None:
+            matrix[:n] = self._matrix[:n]
+            categories[:n] = self._categories[:n]
+        masks = {}
+        for category, mask in self._masks.items():
+            masks[category] = np.zeros(capacity, dtype=bool)
+            masks[category][:n] = mask[:n]
+        self._matrix, self._categories, self._masks = matrix, categories, masks
+
+    def _write(self, documents: List[Dict[str, Any]], rows: np.ndarray, documents_stored: bool = False) -> None:
+        """Grava as linhas após o tamanho publicado e publica. Requer _write_lock."""
+        start = self._size
+        end = start + len(rows)
+        self._reserve(end, rows.shape[1])
+
+        self._matrix[start:end] = rows
+        for i, document in enumerate(documents, start):
+            category = document.get('category')
+            self._categories[i] = category
+            mask = self._masks.get(category)
+            if mask is None:
+                mask = self._masks[category] = np.zeros(self.capacity, dtype=bool)
+            mask[i] = True
+
+        if not documents_stored:
+            # Leitores só acessam documents[:size]: descartar sobras além disso é seguro
+            del self._documents[start:]
+            self._documents.extend(documents)
+        self._size = end
+        self._publish()
+
+    def _publish(self) -> None:
+        n = self._size
+        if n == 0:
+            self._snapshot = dict(_EMPTY_SNAPSHOT, documents=self._documents, masks={})
+            return
+        matrix = self._matrix[:n]
+        self._snapshot = {
+            'size': n,
+            'source': matrix,
+            'normalized': matrix,
+            'categories': self._categories[:n],
+            'masks': {category: mask[:n] for category, mask in self._masks.items()},
+            'documents': self._documents,
+        }
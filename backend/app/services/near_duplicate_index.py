@@ -0,0 +1,109 @@
+"""
+Detecção de quase-duplicatas por MinHash + LSH (locality-sensitive hashing).
+
+A similaridade usada pelo aprendizado do RAG é a de Jaccard entre os conjuntos
+de palavras de dois textos. Comparar um texto novo com todos os aprendidos é
+O(n); aqui cada texto vira uma assinatura MinHash de MINHASH_PERMUTATIONS
+valores, dividida em LSH_BANDS faixas de LSH_ROWS valores. Dois textos viram
+candidatos se coincidirem em pelo menos uma faixa, e só os candidatos são
+comparados com Jaccard exato.
+
+Probabilidade de um par virar candidato: 1 - (1 - s^LSH_ROWS)^LSH_BANDS
+- s = 0.8 (limite de rejeição): ~99,8%
+- s = 0.5: ~27%
+- s = 0.3: ~1,5%
+"""
+import hashlib
+import re
+from typing import Dict, FrozenSet, Iterable, List, Set
+
+import numpy as np
+
+
+MINHASH_PERMUTATIONS = 120
+LSH_BANDS = 20
+LSH_ROWS = 6  # LSH_BANDS * LSH_ROWS == MINHASH_PERMUTATIONS
+
+SIGNATURE_DTYPE = np.uint32
+SIGNATURE_BYTES = MINHASH_PERMUTATIONS * np.dtype(SIGNATURE_DTYPE).itemsize
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# Permutações fixas: as assinaturas persistidas continuam válidas entre processos e deploys
+_permutation_rng = np.random.default_rng(20240611)
+_PERM_A = _permutation_rng.integers(1, (1 << 61) - 1, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _permutation_rng.integers(0, (1 << 61) - 1, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+
+def word_set(text: str) -> FrozenSet[str]:
+    """Conjunto de palavras (minúsculas) do texto."""
+    return frozenset(re.findall(r'\w+', text.lower()))
+
+
+def jaccard(words1: FrozenSet[str], words2: FrozenSet[str]) -> float:
+    """Similaridade de Jaccard entre dois conjuntos de palavras (0-1)."""
+    if not words1 or not words2:
+        return 0.0
+    return len(words1 & words2) / len(words1 | words2)
+
+
+def minhash_signature(words: Iterable[str]) -> np.ndarray:
+    """Assinatura MinHash (MINHASH_PERMUTATIONS valores uint32) de um conjunto de palavras."""
+    hashes = np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=4).digest(), 'little')
+            for word in words
+        ),
+        dtype=np.uint64,
+    )
+    if hashes.size == 0:
+        return np.full(MINHASH_PERMUTATIONS, _MAX_HASH, dtype=SIGNATURE_DTYPE)
+
+    # (a * h + b) mod p, com estouro em 64 bits como nas implementações usuais de MinHash
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME
+    return (permuted & _MAX_HASH).min(axis=0).astype(SIGNATURE_DTYPE)
+
+
+def signature_to_bytes(signature: np.ndarray) -> bytes:
+    return np.ascontiguousarray(signature, dtype=SIGNATURE_DTYPE).tobytes()
+
+
+def signature_from_bytes(data: bytes) -> np.ndarray:
+    """Assinatura a partir de bytes (ValueError se o tamanho não confere)."""
+    if data is None or len(data) != SIGNATURE_BYTES:
+        raise ValueError("Assinatura MinHash com tamanho inválido")
+    return np.frombuffer(data, dtype=SIGNATURE_DTYPE)
+
+
+class NearDuplicateIndex:
+    """Índice LSH em memória: assinatura MinHash -> ids dos itens com alguma faixa igual."""
+
+    def __init__(self):
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(LSH_BANDS)]
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _band_keys(signature: np.ndarray) -> List[bytes]:
+        raw = signature_to_bytes(signature)
+        width = LSH_ROWS * np.dtype(SIGNATURE_DTYPE).itemsize
+        return [raw[band * width:(band + 1) * width] for band in range(LSH_BANDS)]
+
+    def add(self, item_id: int, signature: np.ndarray) -> None:
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            buckets.setdefault(key, []).append(item_id)
+        self._size += 1
+
+    def candidates(self, signature: np.ndarray) -> Set[int]:
+        """Ids que coincidem com a assinatura em pelo menos uma faixa."""
+        found: Set[int] = set()
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            found.update(buckets.get(key, ()))
+        return found
+
+    def clear(self) -> None:
+        self._buckets = [{} for _ in range(LSH_BANDS)]
+        self._size = 0
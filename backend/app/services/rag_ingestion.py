@@ -0,0 +1,416 @@
+"""
+Ingestão de documentos para o índice RAG (paralela e incremental).
+
+- Extração (PDF/Markdown → limpeza → chunks) em um pool de processos
+- Os chunks seguem por geradores até o modelo de embeddings, em lotes,
+  enquanto os demais arquivos ainda estão sendo extraídos
+- Manifesto (manifest.json no diretório do índice) com o hash SHA-256 e o
+  intervalo de linhas de cada arquivo: a reconstrução só extrai e gera
+  embeddings dos arquivos novos ou alterados; as linhas dos demais são
+  copiadas da matriz atual
+
+Este módulo é importado pelos processos do pool: não deve importar o
+FastEmbed nem o restante do serviço RAG.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+
+import numpy as np
+
+try:
+    import PyPDF2
+    HAS_PYPDF2 = True
+except ImportError:
+    HAS_PYPDF2 = False
+    print("[WARNING] PyPDF2 não instalado. PDFs não poderão ser processados.")
+
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+# Chunks menores que isso (em caracteres) são descartados
+MIN_CHUNK_CHARS = 50
+
+# Textos por chamada ao modelo de embeddings
+EMBED_BATCH_SIZE = 256
+
+MANIFEST_FILENAME = "manifest.json"
+# Incrementar quando a extração/limpeza mudar (força reconstrução completa)
+MANIFEST_VERSION = 1
+
+FILE_TYPES = {'.pdf': 'pdf', '.md': 'markdown'}
+
+
+def chunk_text(text: str, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """
+    Divide texto em chunks com overlap.
+
+    Args:
+        text: Texto a dividir
+        chunk_size: Tamanho do chunk
+        chunk_overlap: Overlap entre chunks
+
+    Returns:
+        Lista de chunks
+    """
+    if not text or len(text) < chunk_size:
+        return [text] if text else []
+
+    chunks = []
+    start = 0
+
+    while start < len(text):
+        end = start + chunk_size
+        chunk = text[start:end]
+
+        # Tentar quebrar em parágrafo ou frase
+        if end < len(text):
+            # Procurar última quebra de linha ou ponto
+            last_newline = chunk.rfind('\n')
+            last_period = chunk.rfind('. ')
+
+            if last_newline > chunk_size * 0.5:
+                chunk = chunk[:last_newline + 1]
+                end = start + last_newline + 1
+            elif last_period > chunk_size * 0.5:
+                chunk = chunk[:last_period + 1]
+                end = start + last_period + 1
+
+        chunks.append(chunk.strip())
+        start = end - chunk_overlap
+
+    return chunks
+
+
+def clean_text(text: str) -> str:
+    """Remove ruído comum de PDFs."""
+    if not text:
+        return ""
+
+    # Remover URLs
+    text = re.sub(r'https?://[^\s]+', '', text)
+    text = re.sub(r'www\.[^\s]+', '', text)
+
+    # Remover padrões comuns de lixo de PDFs
+    noise_patterns = [
+        r'Privacy\s*',
+        r'\d{2}/\d{2}/\d{2},?\s*\d{2}:\d{2}',
+        r'vebuka\.com[^\n]*',
+        r'pdfcoffee\.com[^\n]*',
+        r'Past_Life_Astrology[^\n]*',
+        r'IndirectObject\([^)]+\)',
+        r'unknown widths\s*:',
+        r'incorrect startxref pointer\(\d+\)',
+        r'\d{1,4}/\d{2,3}',
+        r'^\s*\d+\s*$',
+    ]
+
+    for pattern in noise_patterns:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.MULTILINE)
+
+    # Remover linhas muito curtas
+    lines = text.split('\n')
+    cleaned_lines = []
+    for line in lines:
+        line = line.strip()
+        if len(line) < 15:
+            continue
+        if re.match(r'^[\d\s\-\./]+$', line):
+            continue
+        cleaned_lines.append(line)
+
+    text = '\n'.join(cleaned_lines)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+
+    return text.strip()
+
+
+def detect_category(filename: str, folder_path: Path) -> str:
+    """Detecta a categoria do documento (prefixo do arquivo ou pasta)."""
+    filename_lower = filename.lower()
+    folder_str = str(folder_path).lower()
+
+    if filename_lower.startswith('num_'):
+        return 'numerology'
+    elif filename_lower.startswith('ast_'):
+        return 'astrology'
+
+    if 'numerologia' in folder_str:
+        return 'numerology'
+
+    return 'astrology'
+
+
+def extract_pdf_text(pdf_path: Path) -> str:
+    """Extrai texto de um PDF."""
+    if not HAS_PYPDF2:
+        return ""
+
+    try:
+        text = ""
+        with open(pdf_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            for page in pdf_reader.pages:
+                text += page.extract_text() + "\n"
+        return text
+    except Exception as e:
+        print(f"[ERROR] Erro ao extrair texto de {pdf_path.name}: {e}")
+        return ""
+
+
+def extract_document_chunks(path: str, category: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Extrai os chunks de um arquivo (executado nos processos do pool).
+
+    Args:
+        path: Caminho do PDF ou Markdown
+        category: Categoria forçada (ex: tarot → numerology). None = detectar
+    """
+    file_path = Path(path)
+    file_type = FILE_TYPES[file_path.suffix.lower()]
+    category = category or detect_category(file_path.name, file_path.parent)
+
+    try:
+        if file_type == 'pdf':
+            text = clean_text(extract_pdf_text(file_path))
+        else:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                text = f.read()
+    except Exception as e:
+        print(f"[ERROR] Erro ao processar {file_path.name}: {e}")
+        return []
+
+    if not text.strip():
+        return []
+
+    documents = []
+    for i, chunk in enumerate(chunk_text(text)):
+        if len(chunk.strip()) > MIN_CHUNK_CHARS:  # Ignorar chunks muito pequenos
+            documents.append({
+                'text': chunk,
+                'source': file_path.name,
+                'file_type': file_type,
+                'category': category,
+                'page': i + 1,  # Aproximação
+                'metadata': {
+                    'source': file_path.name,
+                    'file_type': file_type,
+                    'category': category
+                }
+            })
+    return documents
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def discover_sources(docs_path: Path) -> List[Dict[str, Any]]:
+    """
+    Arquivos a indexar, em ordem estável: docs/, numerologia/ e tarot/
+    (irmãs de docs/; tarot entra como numerologia). PDFs e depois Markdowns
+    de cada pasta, por nome.
+    """
+    docs_path = Path(docs_path)
+    root = docs_path.parent
+    folders = [
+        (docs_path, None),
+        (root / "numerologia", None),
+        # Forte ligação entre tarot e numerologia
+        (root / "tarot", 'numerology'),
+    ]
+
+    sources = []
+    for folder, category in folders:
+        if not folder.exists():
+            print(f"[RAG-Ingest] Pasta não encontrada: {folder}")
+            continue
+        for suffix in FILE_TYPES:
+            for path in sorted(folder.glob(f"*{suffix}")):
+                sources.append({
+                    'key': path.relative_to(root).as_posix(),
+                    'path': path,
+                    'category': category,
+                })
+    return sources
+
+
+def load_manifest(index_path: Path) -> Optional[Dict[str, Any]]:
+    path = Path(index_path) / MANIFEST_FILENAME
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"[WARNING] Manifesto do índice ilegível ({path}): {e}")
+        return None
+
+
+def save_manifest(index_path: Path, manifest: Dict[str, Any]) -> None:
+    path = Path(index_path) / MANIFEST_FILENAME
+    temp_path = path.with_suffix(".json.tmp")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def _fingerprint(source: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Hash, tamanho e mtime do arquivo (hash reaproveitado se tamanho e mtime não mudaram)."""
+    stat = source['path'].stat()
+    if previous and previous.get('size') == stat.st_size and previous.get('mtime') == stat.st_mtime_ns:
+        sha256 = previous['sha256']
+    else:
+        sha256 = file_sha256(source['path'])
+    return {'sha256': sha256, 'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'category': source['category']}
+
+
+def _usable_manifest(
+    manifest: Optional[Dict[str, Any]],
+    settings_signature: Dict[str, Any],
+    previous_count: int
+) -> Dict[str, Dict[str, Any]]:
+    """Entradas do manifesto, ou {} se ele não corresponder ao índice atual."""
+    if not manifest or manifest.get('settings') != settings_signature:
+        return {}
+    files = manifest.get('files', {})
+    if sum(entry['rows'][1] for entry in files.values()) != previous_count:
+        print("[RAG-Ingest] Manifesto não corresponde ao índice atual, reconstruindo tudo")
+        return {}
+    return files
+
+
+def iter_extracted(sources: List[Dict[str, Any]], workers: int) -> Iterator[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    """(arquivo, chunks) conforme cada extração termina (pool de processos se workers > 1)."""
+    if workers <= 1 or len(sources) <= 1:
+        for source in sources:
+            yield source, extract_document_chunks(str(source['path']), source['category'])
+        return
+
+    # spawn: o processo principal pode ter threads (ONNX) que não sobrevivem a um fork
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = {
+            executor.submit(extract_document_chunks, str(source['path']), source['category']): source
+            for source in sources
+        }
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                chunks = future.result()
+            except Exception as e:
+                print(f"[ERROR] Erro ao processar {source['path'].name}: {e}")
+                chunks = []
+            yield source, chunks
+
+
+def iter_batches(
+    extracted: Iterable[Tuple[Dict[str, Any], List[Dict[str, Any]]]],
+    batch_size: int
+) -> Iterator[List[Tuple[str, Dict[str, Any]]]]:
+    """Agrupa os chunks de todos os arquivos em lotes de (chave do arquivo, chunk)."""
+    batch = []
+    for source, chunks in extracted:
+        print(f"[RAG-Ingest] {source['key']}: {len(chunks)} chunks")
+        for chunk in chunks:
+            batch.append((source['key'], chunk))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def ingest_documents(
+    sources: List[Dict[str, Any]],
+    embed: Callable[[List[str]], Iterable[np.ndarray]],
+    previous_documents: Optional[List[Dict[str, Any]]] = None,
+    previous_matrix: Optional[np.ndarray] = None,
+    manifest: Optional[Dict[str, Any]] = None,
+    settings_signature: Optional[Dict[str, Any]] = None,
+    workers: int = 1,
+    batch_size: int = EMBED_BATCH_SIZE
+) -> Dict[str, Any]:
+    """
+    Monta documentos e matriz de embeddings para os arquivos atuais.
+
+    Args:
+        sources: Arquivos (discover_sources)
+        embed: Função que recebe um lote de textos e retorna seus vetores
+        previous_documents, previous_matrix, manifest: Índice atual (None = reconstrução completa)
+        settings_signature: Parâmetros que invalidam o índice inteiro se mudarem (ex: modelo)
+        workers: Processos de extração
+        batch_size: Textos por chamada de embed
+
+    Returns:
+        documents, embeddings (float32, linhas copiadas ainda no estado em que
+        estavam), manifest e stats (arquivos reaproveitados, reprocessados e removidos)
+    """
+    settings_signature = dict(settings_signature or {}, version=MANIFEST_VERSION)
+    previous_count = len(previous_documents) if previous_documents is not None and previous_matrix is not None else 0
+    old_files = _usable_manifest(manifest, settings_signature, previous_count) if previous_count else {}
+
+    fingerprints, reused, changed = {}, [], []
+    for source in sources:
+        previous = old_files.get(source['key'])
+        fingerprints[source['key']] = _fingerprint(source, previous)
+        if previous and previous['sha256'] == fingerprints[source['key']]['sha256'] \
+                and previous.get('category') == source['category']:
+            reused.append(source['key'])
+        else:
+            changed.append(source)
+    removed = [key for key in old_files if key not in fingerprints]
+
+    print(f"[RAG-Ingest] {len(reused)} arquivos sem alteração, {len(changed)} a processar, {len(removed)} removidos")
+
+    # Extração e embeddings dos arquivos alterados (em fluxo, por lotes)
+    new_chunks: Dict[str, List[Dict[str, Any]]] = {source['key']: [] for source in changed}
+    new_vectors: Dict[str, List[np.ndarray]] = {source['key']: [] for source in changed}
+    dimension = previous_matrix.shape[1] if previous_count else None
+    for batch in iter_batches(iter_extracted(changed, workers), batch_size):
+        vectors = np.asarray(list(embed([chunk['text'] for _, chunk in batch])), dtype=np.float32)
+        dimension = vectors.shape[1]
+        for (key, chunk), vector in zip(batch, vectors):
+            new_chunks[key].append(chunk)
+            new_vectors[key].append(vector)
+
+    # Matriz final: linhas reaproveitadas + novas, na ordem dos arquivos
+    counts = {
+        source['key']: len(new_chunks[source['key']]) if source['key'] in new_chunks else old_files[source['key']]['rows'][1]
+        for source in sources
+    }
+    total = sum(counts.values())
+    embeddings = np.empty((total, dimension or 0), dtype=np.float32)
+    documents: List[Dict[str, Any]] = []
+    files: Dict[str, Dict[str, Any]] = {}
+
+    row = 0
+    for source in sources:
+        key, count = source['key'], counts[source['key']]
+        if key in new_chunks:
+            if count:
+                embeddings[row:row + count] = np.vstack(new_vectors[key])
+            documents.extend(new_chunks[key])
+        else:
+            start = old_files[key]['rows'][0]
+            embeddings[row:row + count] = previous_matrix[start:start + count]
+            documents.extend(previous_documents[start:start + count])
+        files[key] = dict(fingerprints[key], rows=[row, count])
+        row += count
+
+    return {
+        'documents': documents,
+        'embeddings': embeddings,
+        'manifest': {'settings': settings_signature, 'files': files},
+        'stats': {'reused': len(reused), 'processed': len(changed), 'removed': len(removed), 'chunks': total},
+    }
@@ -6,14 +6,37 @@ Permite que o RAG aprenda e expanda seus conhecimentos a partir das interpretaç
 import json
 import hashlib
 import re
+import sqlite3
+import threading
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from collections import defaultdict
 
+from app.services.near_duplicate_index import (
+    NearDuplicateIndex,
+    jaccard,
+    minhash_signature,
+    signature_from_bytes,
+    signature_to_bytes,
+    word_set,
+)
+
+
+SIMILARITY_THRESHOLD = 0.8  # Acima disso a interpretação é considerada repetida
+COMPACT_EVERY = 1000  # Inserções entre compactações do log (checkpoint do WAL)
+
 
 class RAGLearningService:
-    """Gerencia o aprendizado contínuo do RAG a partir de interpretações geradas."""
+    """
+    Gerencia o aprendizado contínuo do RAG a partir de interpretações geradas.
+    
+    As interpretações ficam em um log somente-anexação (SQLite em modo WAL,
+    compartilhado entre workers): salvar é um INSERT, não a reescrita do
+    arquivo inteiro. Duplicatas exatas são detectadas pelo hash e as quase
+    duplicatas pelo índice MinHash/LSH, então o custo por interpretação não
+    cresce com o número de interpretações aprendidas.
+    """
     
     def __init__(self, learning_path: str = "rag_learning"):
         """
@@ -25,7 +48,8 @@ class RAGLearningService:
         self.learning_path = Path(learning_path)
         self.learning_path.mkdir(parents=True, exist_ok=True)
         
-        self.learned_file = self.learning_path / "learned_interpretations.json"
+        self.learned_db = self.learning_path / "learned_interpretations.db"
+        self.legacy_file = self.learning_path / "learned_interpretations.json"
         self.metadata_file = self.learning_path / "learning_metadata.json"
         
         # Carregar dados existentes
@@ -38,19 +62,35 @@ class RAGLearningService:
             "last_updated": None
         }
         
+        self._lock = threading.RLock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._last_id = 0  # Maior id do log já carregado em memória
+        self._hash_index: Dict[str, int] = {}
+        self._near_duplicates = NearDuplicateIndex()
+        self._inserts_since_compaction = 0
+        
         self._load_data()
     
+    def _get_connection(self) -> sqlite3.Connection:
+        """Conexão com o log (cria as tabelas na primeira vez). Requer _lock."""
+        if self._connection is None:
+            connection = sqlite3.connect(str(self.learned_db), timeout=5.0, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS learned_interpretations ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, hash TEXT NOT NULL UNIQUE, "
+                "entry TEXT NOT NULL, minhash BLOB NOT NULL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS learning_state (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+    
     def _load_data(self):
         """Carrega dados de aprendizado do disco."""
-        # Carregar interpretações aprendidas
-        if self.learned_file.exists():
-            try:
-                with open(self.learned_file, 'r', encoding='utf-8') as f:
-                    self.learned_interpretations = json.load(f)
-            except Exception as e:
-                print(f"[RAG-Learning] Erro ao carregar interpretações: {e}")
-                self.learned_interpretations = []
-        
         # Carregar metadados
         if self.metadata_file.exists():
             try:
@@ -61,14 +101,82 @@ class RAGLearningService:
                         self.metadata["by_category"] = defaultdict(int, self.metadata["by_category"])
             except Exception as e:
                 print(f"[RAG-Learning] Erro ao carregar metadados: {e}")
+        
+        # Carregar interpretações aprendidas
+        try:
+            with self._lock:
+                self._migrate_legacy_file()
+                self._sync()
+        except Exception as e:
+            print(f"[RAG-Learning] Erro ao carregar interpretações: {e}")
+    
+    def _migrate_legacy_file(self):
+        """Importa (uma única vez) o antigo learned_interpretations.json para o log. Requer _lock."""
+        connection = self._get_connection()
+        if connection.execute("SELECT 1 FROM learning_state WHERE key = 'legacy_migrated'").fetchone():
+            return
+        
+        migrated = 0
+        if self.legacy_file.exists():
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                legacy_entries = json.load(f)
+            for entry in legacy_entries:
+                if entry.get("text") and self._insert(entry, commit=False):
+                    migrated += 1
+        connection.execute("INSERT OR REPLACE INTO learning_state (key, value) VALUES ('legacy_migrated', '1')")
+        connection.commit()
+        if migrated:
+            print(f"[RAG-Learning] {migrated} interpretações migradas de {self.legacy_file.name}")
+    
+    def _sync(self):
+        """Carrega as entradas anexadas ao log desde a última leitura (inclusive por outros workers). Requer _lock."""
+        rows = self._get_connection().execute(
+            "SELECT id, hash, entry, minhash FROM learned_interpretations WHERE id > ? ORDER BY id",
+            (self._last_id,)
+        ).fetchall()
+        for row_id, text_hash, entry_json, minhash in rows:
+            self._last_id = row_id
+            if text_hash in self._hash_index:
+                continue
+            try:
+                entry = json.loads(entry_json)
+                signature = signature_from_bytes(minhash)
+            except ValueError as e:
+                print(f"[RAG-Learning] Entrada {row_id} inválida no log: {e}")
+                continue
+            self._hash_index[text_hash] = len(self.learned_interpretations)
+            self._near_duplicates.add(len(self.learned_interpretations), signature)
+            self.learned_interpretations.append(entry)
+    
+    def _insert(self, entry: Dict[str, Any], commit: bool = True) -> bool:
+        """Anexa uma entrada ao log. False se o hash já existe (salvo por outro worker). Requer _lock."""
+        text_hash = entry.get("hash") or self._generate_hash(entry["text"])
+        entry = dict(entry, hash=text_hash)
+        signature = minhash_signature(word_set(entry["text"]))
+        connection = self._get_connection()
+        cursor = connection.execute(
+            "INSERT OR IGNORE INTO learned_interpretations (hash, entry, minhash) VALUES (?, ?, ?)",
+            (text_hash, json.dumps(entry, ensure_ascii=False), signature_to_bytes(signature))
+        )
+        if commit:
+            connection.commit()
+        return cursor.rowcount == 1
+    
+    def compact(self):
+        """
+        Compactação periódica: incorpora o WAL (as anexações recentes) ao
+        arquivo principal e o trunca, para o log não crescer sem limite.
+        """
+        with self._lock:
+            try:
+                self._get_connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                self._inserts_since_compaction = 0
+            except sqlite3.Error as e:
+                print(f"[RAG-Learning] Erro ao compactar log: {e}")
     
     def _save_data(self):
-        """Salva dados de aprendizado no disco."""
+        """Salva os metadados (as interpretações já estão no log)."""
         try:
-            # Salvar interpretações
-            with open(self.learned_file, 'w', encoding='utf-8') as f:
-                json.dump(self.learned_interpretations, f, ensure_ascii=False, indent=2)
-            
             # Salvar metadados (converter defaultdict para dict)
             metadata_to_save = self.metadata.copy()
             metadata_to_save["by_category"] = dict(self.metadata["by_category"])
@@ -130,36 +238,26 @@ class RAGLearningService:
                 # Não é crítico, mas preferível
                 pass
         
-        # Validação 4: Verificar duplicatas
+        # Validação 4: Verificar duplicatas (hash exato)
         text_hash = self._generate_hash(interpretation)
-        for learned in self.learned_interpretations:
-            if learned.get("hash") == text_hash:
+        with self._lock:
+            self._sync()
+            if text_hash in self._hash_index:
                 return False, "Interpretação duplicada"
-        
-        # Validação 5: Verificar similaridade muito alta (80%+)
-        for learned in self.learned_interpretations:
-            learned_text = learned.get("text", "")
-            if len(learned_text) > 0:
-                similarity = self._calculate_similarity(interpretation, learned_text)
-                if similarity > 0.8:
+            
+            # Validação 5: Verificar similaridade muito alta (80%+), só entre os candidatos do LSH
+            words = word_set(interpretation)
+            for candidate in sorted(self._near_duplicates.candidates(minhash_signature(words))):
+                learned_text = self.learned_interpretations[candidate].get("text", "")
+                similarity = jaccard(words, word_set(learned_text))
+                if similarity > SIMILARITY_THRESHOLD:
                     return False, f"Interpretação muito similar (similaridade: {similarity:.2f})"
         
         return True, "Válida"
     
     def _calculate_similarity(self, text1: str, text2: str) -> float:
         """Calcula similaridade simples entre dois textos (0-1)."""
-        # Normalizar textos
-        words1 = set(re.findall(r'\w+', text1.lower()))
-        words2 = set(re.findall(r'\w+', text2.lower()))
-        
-        if not words1 or not words2:
-            return 0.0
-        
-        # Jaccard similarity
-        intersection = len(words1 & words2)
-        union = len(words1 | words2)
-        
-        return intersection / union if union > 0 else 0.0
+        return jaccard(word_set(text1), word_set(text2))
     
     def should_learn(self, interpretation: str, metadata: Dict[str, Any]) -> bool:
         """
@@ -216,8 +314,20 @@ class RAGLearningService:
             "source": "groq_generated"
         }
         
-        # Adicionar à lista
-        self.learned_interpretations.append(learned_entry)
+        # Anexar ao log e carregar em memória
+        with self._lock:
+            try:
+                inserted = self._insert(learned_entry)
+            except sqlite3.Error as e:
+                print(f"[RAG-Learning] Erro ao salvar interpretação: {e}")
+                return False
+            self._sync()
+            if not inserted:
+                print("[RAG-Learning] Interpretação rejeitada: Interpretação duplicada")
+                return False
+            self._inserts_since_compaction += 1
+            if self._inserts_since_compaction >= COMPACT_EVERY:
+                self.compact()
         
         # Atualizar estatísticas
         self.metadata["total_learned"] += 1
@@ -246,7 +356,9 @@ class RAGLearningService:
         Returns:
             Lista de interpretações aprendidas
         """
-        results = self.learned_interpretations
+        with self._lock:
+            self._sync()
+            results = list(self.learned_interpretations)
         
         if category:
             results = [r for r in results if r.get("category") == category]
@@ -268,7 +380,15 @@ class RAGLearningService:
     
     def clear_learned_data(self):
         """Limpa todos os dados aprendidos (útil para testes)."""
-        self.learned_interpretations = []
+        with self._lock:
+            connection = self._get_connection()
+            connection.execute("DELETE FROM learned_interpretations")
+            connection.commit()
+            connection.execute("VACUUM")
+            self.learned_interpretations = []
+            self._hash_index = {}
+            self._near_duplicates.clear()
+            self._inserts_since_compaction = 0
         self.metadata = {
             "total_learned": 0,
             "total_validated": 0,
@@ -282,16 +402,21 @@ class RAGLearningService:
 
 # Instância global
 _learning_service_instance: Optional[RAGLearningService] = None
+_learning_service_lock = threading.Lock()
 
 
 def get_learning_service() -> RAGLearningService:
     """Obtém instância singleton do serviço de aprendizado."""
     global _learning_service_instance
     
-    if _learning_service_instance is None:
-        service_path = Path(__file__).parent.parent.parent
-        learning_path = service_path / "rag_learning"
-        _learning_service_instance = RAGLearningService(str(learning_path))
+    if _learning_service_instance is not None:
+        return _learning_service_instance
+    
+    with _learning_service_lock:
+        if _learning_service_instance is None:
+            service_path = Path(__file__).parent.parent.parent
+            learning_path = service_path / "rag_learning"
+            _learning_service_instance = RAGLearningService(str(learning_path))
     
     return _learning_service_instance
 
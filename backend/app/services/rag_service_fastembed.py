@@ -5,7 +5,11 @@ Versão otimizada - mais leve e rápida que LlamaIndex.
 
 import os
 import json
+import hashlib
 import pickle
+import threading
+import unicodedata
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Dict, Optional, Any
 import re
@@ -18,72 +22,111 @@ except ImportError as e:
     HAS_FASTEMBED = False
     print(f"[DEBUG] ImportError ao carregar FastEmbed: {e}")
 
-try:
-    import PyPDF2
-    HAS_PYPDF2 = True
-except ImportError:
-    HAS_PYPDF2 = False
-    print("[WARNING] PyPDF2 não instalado. PDFs não poderão ser processados.")
-
 try:
     from groq import Groq
     HAS_GROQ = True
 except ImportError:
     HAS_GROQ = False
 
+from app.core.metrics import timed_stage
+from app.services.ann_index import ANN_BACKENDS, ANNIndex
+from app.services.learned_embeddings import LearnedEmbeddingBuffer
 from app.services.local_knowledge_base import LocalKnowledgeBase
+from app.services.rag_ingestion import (
+    CHUNK_OVERLAP,
+    CHUNK_SIZE,
+    EMBED_BATCH_SIZE,
+    MANIFEST_FILENAME,
+    discover_sources,
+    ingest_documents,
+    load_manifest,
+    save_manifest,
+)
+
+# Candidatos pedidos ao índice ANN por resultado (reavaliados com a similaridade exata)
+ANN_RERANK_FACTOR = 4
+# Fator extra de candidatos quando há filtro de categoria
+ANN_CATEGORY_OVERSAMPLE = 4
+
+# Quantidade de embeddings de consultas mantidos em cache (LRU)
+QUERY_EMBEDDING_CACHE_SIZE = 2048
+
+# Tipos aceitos para a matriz de embeddings em disco
+EMBEDDING_DTYPES = ('float32', 'float16')
+
+# Linhas convertidas por bloco ao pontuar matrizes float16 (limita memória temporária)
+SCORE_BLOCK_ROWS = 16384
 
+# Embeddings dos documentos aprendidos já calculados (por hash do texto), reaproveitados no startup
+LEARNED_EMBEDDINGS_FILENAME = "learned_embeddings.npz"
 
-def _chunk_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[str]:
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
     """
-    Divide texto em chunks com overlap.
-    
-    Args:
-        text: Texto a dividir
-        chunk_size: Tamanho do chunk
-        chunk_overlap: Overlap entre chunks
-    
-    Returns:
-        Lista de chunks
+    Normaliza cada linha para norma 1 (float32), de modo que o produto
+    escalar seja a similaridade cosseno. Linhas nulas permanecem nulas.
     """
-    if not text or len(text) < chunk_size:
-        return [text] if text else []
-    
-    chunks = []
-    start = 0
-    
-    while start < len(text):
-        end = start + chunk_size
-        chunk = text[start:end]
-        
-        # Tentar quebrar em parágrafo ou frase
-        if end < len(text):
-            # Procurar última quebra de linha ou ponto
-            last_newline = chunk.rfind('\n')
-            last_period = chunk.rfind('. ')
-            
-            if last_newline > chunk_size * 0.5:
-                chunk = chunk[:last_newline + 1]
-                end = start + last_newline + 1
-            elif last_period > chunk_size * 0.5:
-                chunk = chunk[:last_period + 1]
-                end = start + last_period + 1
-        
-        chunks.append(chunk.strip())
-        start = end - chunk_overlap
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _score_matrix(query_vectors: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    Similaridades (consultas × documentos) entre vetores normalizados.
+    Matrizes float16 (ex: memória mapeada) são convertidas em blocos, sem
+    materializar uma cópia float32 inteira.
+    """
+    if matrix.dtype == np.float32:
+        return query_vectors @ matrix.T
     
-    return chunks
+    scores = np.empty((len(query_vectors), len(matrix)), dtype=np.float32)
+    for start in range(0, len(matrix), SCORE_BLOCK_ROWS):
+        block = np.asarray(matrix[start:start + SCORE_BLOCK_ROWS], dtype=np.float32)
+        scores[:, start:start + len(block)] = query_vectors @ block.T
+    return scores
+
+
+def _normalize_query(query: str) -> str:
+    """Chave do cache de embeddings: Unicode NFC e espaços colapsados."""
+    return " ".join(unicodedata.normalize("NFC", query).split())
+
+
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Índices dos k maiores scores em ordem decrescente.
+    Usa argpartition (O(n)) e ordena apenas os k selecionados.
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
 
 
 class RAGServiceFastEmbed:
     """Serviço RAG usando FastEmbed e modelo BGE do Hugging Face."""
     
+    # Hash e linhas de cada arquivo do índice (gerado por process_all_documents)
+    _manifest: Optional[Dict[str, Any]] = None
+    
+    # Documentos aprendidos e seus embeddings (ver learned_embeddings)
+    _learned: Optional[LearnedEmbeddingBuffer] = None
+    
     def __init__(
         self,
         docs_path: str = "docs",
         index_path: str = "rag_index_fastembed",
         groq_api_key: Optional[str] = None,
-        bge_model_name: str = "BAAI/bge-small-en-v1.5"
+        bge_model_name: str = "BAAI/bge-small-en-v1.5",
+        ann_backend: Optional[str] = None,
+        embeddings_dtype: str = "float32"
     ):
         """
         Inicializa o serviço RAG com FastEmbed.
@@ -93,6 +136,8 @@ class RAGServiceFastEmbed:
             index_path: Caminho para salvar/carregar o índice
             groq_api_key: Chave API do Groq para geração
             bge_model_name: Nome do modelo BGE do Hugging Face
+            ann_backend: Índice aproximado opcional ('hnsw' ou 'ivfpq'). None = busca exata
+            embeddings_dtype: Tipo da matriz salva em disco ('float32' ou 'float16')
         """
         self.docs_path = Path(docs_path)
         self.index_path = Path(index_path)
@@ -101,12 +146,34 @@ class RAGServiceFastEmbed:
         self.bge_model_name = bge_model_name
         
         # Dados do índice
-        self.documents: List[Dict[str, Any]] = []  # Lista de documentos com embeddings
+        # O documento i corresponde à linha i da matriz; a matriz é carregada
+        # via mmap e compartilhada (page cache) entre os workers
+        self.documents: List[Dict[str, Any]] = []  # Lista de documentos (sem embeddings)
         self.embeddings_matrix: Optional[np.ndarray] = None  # Matriz de embeddings
-        
-        # Dados de aprendizado contínuo
-        self.learned_documents: List[Dict[str, Any]] = []  # Documentos aprendidos
-        self.learned_embeddings_matrix: Optional[np.ndarray] = None  # Embeddings dos aprendidos
+        self.embeddings_normalized = False  # Linhas já com norma 1 (índices salvos normalizados)
+        if embeddings_dtype not in EMBEDDING_DTYPES:
+            print(f"[WARNING] Tipo de embeddings desconhecido '{embeddings_dtype}', usando float32")
+            embeddings_dtype = "float32"
+        self.embeddings_dtype = embeddings_dtype
+        
+        # Dados de aprendizado contínuo: buffer com um escritor por vez e leitura sem lock
+        self._learned = LearnedEmbeddingBuffer()
+        
+        # Estado da busca vetorial (matrizes normalizadas e máscaras por categoria),
+        # reconstruído sempre que a matriz de origem muda
+        self._search_state: Dict[str, Dict[str, Any]] = {}
+        
+        # Cache LRU de embeddings de consultas (chave = texto normalizado)
+        self._query_embedding_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        self._query_cache_stats = {'hits': 0, 'misses': 0}
+        
+        # Índice ANN opcional sobre os documentos base
+        if ann_backend and ann_backend not in ANN_BACKENDS:
+            print(f"[WARNING] Backend ANN desconhecido '{ann_backend}', usando busca exata")
+            ann_backend = None
+        self.ann_backend: Optional[str] = ann_backend or None
+        self.ann_index: Optional[ANNIndex] = None
         
         if not HAS_FASTEMBED:
             print("[WARNING] FastEmbed não instalado. Instale com: pip install fastembed")
@@ -144,165 +211,43 @@ class RAGServiceFastEmbed:
                 print("[WARNING] GROQ_API_KEY não configurada. Funcionalidades com Groq estarão desabilitadas.")
                 self.groq_client = None
     
-    def _clean_text(self, text: str) -> str:
-        """Remove ruído comum de PDFs."""
-        if not text:
-            return ""
-        
-        # Remover URLs
-        text = re.sub(r'https?://[^\s]+', '', text)
-        text = re.sub(r'www\.[^\s]+', '', text)
-        
-        # Remover padrões comuns de lixo de PDFs
-        noise_patterns = [
-            r'Privacy\s*',
-            r'\d{2}/\d{2}/\d{2},?\s*\d{2}:\d{2}',
-            r'vebuka\.com[^\n]*',
-            r'pdfcoffee\.com[^\n]*',
-            r'Past_Life_Astrology[^\n]*',
-            r'IndirectObject\([^)]+\)',
-            r'unknown widths\s*:',
-            r'incorrect startxref pointer\(\d+\)',
-            r'\d{1,4}/\d{2,3}',
-            r'^\s*\d+\s*$',
-        ]
-        
-        for pattern in noise_patterns:
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.MULTILINE)
-        
-        # Remover linhas muito curtas
-        lines = text.split('\n')
-        cleaned_lines = []
-        for line in lines:
-            line = line.strip()
-            if len(line) < 15:
-                continue
-            if re.match(r'^[\d\s\-\./]+$', line):
-                continue
-            cleaned_lines.append(line)
-        
-        text = '\n'.join(cleaned_lines)
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        
-        return text.strip()
+    def _learned_store(self) -> LearnedEmbeddingBuffer:
+        if self._learned is None:
+            self._learned = LearnedEmbeddingBuffer()
+        return self._learned
     
-    def _detect_category(self, filename: str, folder_path: Path) -> str:
-        """Detecta a categoria do documento."""
-        filename_lower = filename.lower()
-        folder_str = str(folder_path).lower()
-        
-        if filename_lower.startswith('num_'):
-            return 'numerology'
-        elif filename_lower.startswith('ast_'):
-            return 'astrology'
-        
-        if 'numerologia' in folder_str:
-            return 'numerology'
-        
-        return 'astrology'
+    @property
+    def learned_documents(self) -> List[Dict[str, Any]]:
+        """Documentos aprendidos (o i-ésimo corresponde à linha i de learned_embeddings_matrix)."""
+        return self._learned_store().documents
     
-    def _extract_text_from_pdf(self, pdf_path: Path) -> str:
-        """Extrai texto de um PDF."""
-        if not HAS_PYPDF2:
-            return ""
-        
-        try:
-            text = ""
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            return text
-        except Exception as e:
-            print(f"[ERROR] Erro ao extrair texto de {pdf_path.name}: {e}")
-            return ""
+    @learned_documents.setter
+    def learned_documents(self, documents: List[Dict[str, Any]]) -> None:
+        store = self._learned_store()
+        state = store.snapshot()
+        store.replace(documents, state['normalized'])
     
-    def _process_folder(self, folder_path: Path) -> List[Dict[str, Any]]:
-        """Processa todos os documentos de uma pasta."""
-        if not folder_path.exists():
-            print(f"[RAG-FastEmbed] Pasta não encontrada: {folder_path}")
-            return []
-        
-        folder_name = folder_path.name
-        print(f"[RAG-FastEmbed] Processando pasta: {folder_name}...")
-        
-        documents = []
-        
-        # Processar PDFs
-        pdf_files = list(folder_path.glob("*.pdf"))
-        print(f"[RAG-FastEmbed] Encontrados {len(pdf_files)} arquivos PDF em {folder_name}")
-        
-        for pdf_path in pdf_files:
-            print(f"[RAG-FastEmbed] Processando PDF: {pdf_path.name}...")
-            try:
-                category = self._detect_category(pdf_path.name, folder_path)
-                text = self._extract_text_from_pdf(pdf_path)
-                cleaned_text = self._clean_text(text)
-                
-                if cleaned_text:
-                    # Dividir em chunks
-                    chunks = _chunk_text(cleaned_text, chunk_size=1000, chunk_overlap=200)
-                    
-                    for i, chunk in enumerate(chunks):
-                        if len(chunk.strip()) > 50:  # Ignorar chunks muito pequenos
-                            documents.append({
-                                'text': chunk,
-                                'source': pdf_path.name,
-                                'file_type': 'pdf',
-                                'category': category,
-                                'page': i + 1,  # Aproximação
-                                'metadata': {
-                                    'source': pdf_path.name,
-                                    'file_type': 'pdf',
-                                    'category': category
-                                }
-                            })
-                    
-                    print(f"  → {len(chunks)} chunks extraídos (categoria: {category})")
-            except Exception as e:
-                print(f"[ERROR] Erro ao processar {pdf_path.name}: {e}")
-        
-        # Processar Markdowns
-        md_files = list(folder_path.glob("*.md"))
-        print(f"[RAG-FastEmbed] Encontrados {len(md_files)} arquivos Markdown em {folder_name}")
-        
-        for md_path in md_files:
-            print(f"[RAG-FastEmbed] Processando MD: {md_path.name}...")
-            try:
-                with open(md_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                if content.strip():
-                    category = self._detect_category(md_path.name, folder_path)
-                    
-                    # Dividir em chunks
-                    chunks = _chunk_text(content, chunk_size=1000, chunk_overlap=200)
-                    
-                    for i, chunk in enumerate(chunks):
-                        if len(chunk.strip()) > 50:
-                            documents.append({
-                                'text': chunk,
-                                'source': md_path.name,
-                                'file_type': 'markdown',
-                                'category': category,
-                                'page': i + 1,
-                                'metadata': {
-                                    'source': md_path.name,
-                                    'file_type': 'markdown',
-                                    'category': category
-                                }
-                            })
-                    
-                    print(f"  → {len(chunks)} chunks extraídos (categoria: {category})")
-            except Exception as e:
-                print(f"[ERROR] Erro ao processar {md_path.name}: {e}")
-        
-        return documents
+    @property
+    def learned_embeddings_matrix(self) -> Optional[np.ndarray]:
+        """Embeddings (normalizados) dos documentos aprendidos; None se não houver."""
+        return self._learned_store().snapshot()['normalized']
+    
+    @learned_embeddings_matrix.setter
+    def learned_embeddings_matrix(self, matrix: Optional[np.ndarray]) -> None:
+        store = self._learned_store()
+        store.replace(store.documents, matrix)
     
-    def process_all_documents(self) -> int:
+    def process_all_documents(self, incremental: bool = True, workers: Optional[int] = None) -> int:
         """
-        Processa todos os documentos e cria o índice.
+        Processa os documentos (docs/, numerologia/ e tarot/) e cria o índice.
+        
+        Com incremental=True e um índice carregado com manifesto, apenas os
+        arquivos novos ou alterados são extraídos e têm embeddings gerados;
+        os demais reaproveitam as linhas da matriz atual (ver rag_ingestion).
+        
+        Args:
+            incremental: Reaproveitar o índice atual (False = reconstrução completa)
+            workers: Processos de extração (None = RAG_INGEST_WORKERS ou número de CPUs)
         
         Returns:
             Número de chunks processados
@@ -313,32 +258,28 @@ class RAGServiceFastEmbed:
         if not self.docs_path.exists():
             raise FileNotFoundError(f"Pasta de documentos não encontrada: {self.docs_path}")
         
-        # Definir pastas
-        docs_path = Path(self.docs_path)
-        numerologia_path = docs_path.parent / "numerologia"
-        tarot_path = docs_path.parent / "tarot"
-        
-        print(f"[RAG-FastEmbed] Processando documentos em {docs_path}, {numerologia_path} e {tarot_path}...")
-        
-        # Processar documentos
-        documents = []
-        documents.extend(self._process_folder(docs_path))
-        
-        if numerologia_path.exists():
-            documents.extend(self._process_folder(numerologia_path))
-        else:
-            print(f"[RAG-FastEmbed] Pasta numerologia não encontrada: {numerologia_path}")
-        
-        # Processar pasta tarot como numerologia (forte ligação entre tarot e numerologia)
-        if tarot_path.exists():
-            tarot_docs = self._process_folder(tarot_path)
-            # Forçar categoria 'numerology' para documentos de tarot
-            for doc in tarot_docs:
-                doc['category'] = 'numerology'
-            documents.extend(tarot_docs)
-            print(f"[RAG-FastEmbed] Processados {len(tarot_docs)} documentos de tarot como numerologia")
-        else:
-            print(f"[RAG-FastEmbed] Pasta tarot não encontrada: {tarot_path}")
+        if workers is None:
+            from app.core.config import settings
+            workers = settings.RAG_INGEST_WORKERS or os.cpu_count() or 1
+        
+        sources = discover_sources(self.docs_path)
+        print(f"[RAG-FastEmbed] {len(sources)} arquivos encontrados (extração com {workers} processos)")
+        
+        use_previous = incremental and self.embeddings_matrix is not None and bool(self.documents)
+        result = ingest_documents(
+            sources,
+            embed=lambda texts: self.embedding_model.embed(texts, batch_size=EMBED_BATCH_SIZE),
+            previous_documents=self.documents if use_previous else None,
+            previous_matrix=self.embeddings_matrix if use_previous else None,
+            manifest=load_manifest(self.index_path) if use_previous else None,
+            settings_signature={
+                'model_name': self.bge_model_name,
+                'chunk_size': CHUNK_SIZE,
+                'chunk_overlap': CHUNK_OVERLAP,
+            },
+            workers=workers,
+        )
+        documents = result['documents']
         
         if not documents:
             print("[WARNING] Nenhum documento processado")
@@ -354,23 +295,17 @@ class RAGServiceFastEmbed:
         for cat, count in categories_count.items():
             print(f"  → {cat}: {count} chunks")
         
-        print(f"[RAG-FastEmbed] Gerando embeddings com FastEmbed...")
-        
-        # Gerar embeddings para todos os documentos
-        texts = [doc['text'] for doc in documents]
-        embeddings_list = list(self.embedding_model.embed(texts))
-        
-        # Converter para numpy array
-        self.embeddings_matrix = np.array(embeddings_list)
-        
-        # Adicionar embeddings aos documentos
-        for i, doc in enumerate(documents):
-            doc['embedding'] = embeddings_list[i]
-        
+        # Matriz contígua normalizada (documento i = linha i)
+        self.embeddings_matrix = _normalize_rows(result['embeddings']).astype(self.embeddings_dtype)
+        self.embeddings_normalized = True
         self.documents = documents
+        self._manifest = result['manifest']
+        self._build_ann_index()
         
+        stats = result['stats']
         print(f"[RAG-FastEmbed] Índice criado com sucesso!")
         print(f"  → {len(documents)} chunks indexados")
+        print(f"  → {stats['processed']} arquivos processados, {stats['reused']} reaproveitados, {stats['removed']} removidos")
         print(f"  → Dimensão dos embeddings: {self.embeddings_matrix.shape[1]}")
         
         return len(documents)
@@ -383,6 +318,9 @@ class RAGServiceFastEmbed:
         # Criar diretório se não existir
         self.index_path.mkdir(parents=True, exist_ok=True)
         
+        # Manifesto antigo não pode descrever a matriz nova se a gravação for interrompida
+        (self.index_path / MANIFEST_FILENAME).unlink(missing_ok=True)
+        
         # Salvar documentos (sem embeddings para economizar espaço)
         documents_to_save = []
         for doc in self.documents:
@@ -394,18 +332,36 @@ class RAGServiceFastEmbed:
         with open(self.index_path / "documents.json", 'w', encoding='utf-8') as f:
             json.dump(documents_to_save, f, ensure_ascii=False, indent=2)
         
-        # Salvar embeddings como numpy array (mais eficiente)
-        np.save(self.index_path / "embeddings.npy", self.embeddings_matrix)
+        # Salvar embeddings normalizados como numpy array (carregado via mmap)
+        embeddings = self.embeddings_matrix
+        if not self.embeddings_normalized:
+            embeddings = _normalize_rows(embeddings)
+        # Arquivo temporário + rename: o arquivo atual pode estar mapeado em memória
+        temp_path = self.index_path / "embeddings.npy.tmp"
+        with open(temp_path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(embeddings, dtype=self.embeddings_dtype))
+        os.replace(temp_path, self.index_path / "embeddings.npy")
+        
+        # Salvar índice ANN (se configurado)
+        if self.ann_index is not None:
+            self.ann_index.save(self.index_path)
         
         # Salvar metadados
         metadata = {
             'model_name': self.bge_model_name,
             'num_documents': len(self.documents),
-            'embedding_dim': self.embeddings_matrix.shape[1]
+            'embedding_dim': self.embeddings_matrix.shape[1],
+            'embedding_dtype': self.embeddings_dtype,
+            'normalized': True,
+            'ann_backend': self.ann_index.backend if self.ann_index is not None else None
         }
         with open(self.index_path / "metadata.json", 'w', encoding='utf-8') as f:
             json.dump(metadata, f, indent=2)
         
+        # Manifesto por arquivo (reconstrução incremental); gravado por último
+        if self._manifest is not None:
+            save_manifest(self.index_path, self._manifest)
+        
         print(f"[RAG-FastEmbed] Índice salvo em {self.index_path}")
     
     def load_index(self) -> bool:
@@ -444,13 +400,24 @@ class RAGServiceFastEmbed:
             if not embeddings_path.exists():
                 return False
             
-            self.embeddings_matrix = np.load(embeddings_path)
+            # Memória mapeada: sem cópia por worker, páginas compartilhadas pelo SO
+            embeddings_matrix = np.load(embeddings_path, mmap_mode='r')
+            if len(embeddings_matrix) != len(documents):
+                print(f"[ERROR] Índice inconsistente: {len(documents)} documentos e {len(embeddings_matrix)} embeddings")
+                return False
+            
+            # Documentos referenciam a linha da matriz pela posição
+            self.embeddings_matrix = embeddings_matrix
+            self.embeddings_normalized = bool(metadata.get('normalized', False))
+            self.documents = documents
             
-            # Reconstruir documentos com embeddings
-            self.documents = []
-            for i, doc in enumerate(documents):
-                doc['embedding'] = self.embeddings_matrix[i].tolist()
-                self.documents.append(doc)
+            # Carregar índice ANN salvo (ou construí-lo se o índice base for mais antigo)
+            if self.ann_backend:
+                self.ann_index = ANNIndex.load(self.index_path, self.ann_backend)
+                if self.ann_index is None or self.ann_index.size != len(self.documents):
+                    print(f"[RAG-FastEmbed] Índice ANN '{self.ann_backend}' não encontrado, construindo...")
+                    self._build_ann_index()
+                    self._save_rebuilt_ann_index()
             
             print(f"[RAG-FastEmbed] Índice carregado de {self.index_path}")
             print(f"  → {len(self.documents)} documentos carregados")
@@ -461,21 +428,227 @@ class RAGServiceFastEmbed:
             traceback.print_exc()
             return False
     
-    def _cosine_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
-        """Calcula similaridade cosseno entre dois vetores."""
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
-        return float(dot_product / (norm1 * norm2))
+    def _save_rebuilt_ann_index(self) -> None:
+        """Persiste o índice ANN reconstruído no startup (os próximos workers só o carregam)."""
+        if self.ann_index is None:
+            return
+        try:
+            self.ann_index.save(self.index_path)
+            print(f"[RAG-FastEmbed] Índice ANN '{self.ann_backend}' salvo em {self.index_path}")
+        except Exception as e:
+            print(f"[WARNING] Não foi possível salvar o índice ANN (será reconstruído no próximo startup): {e}")
+    
+    def _build_ann_index(self) -> None:
+        """Constrói o índice ANN configurado sobre os embeddings base normalizados."""
+        self.ann_index = None
+        if not self.ann_backend or self.embeddings_matrix is None or not self.documents:
+            return
+        
+        try:
+            state = self._get_search_state('base', self.embeddings_matrix, self.documents)
+            self.ann_index = ANNIndex.build(state['normalized'], self.ann_backend)
+            print(f"[RAG-FastEmbed] Índice ANN '{self.ann_backend}' construído ({self.ann_index.size} vetores)")
+        except (ImportError, ValueError) as e:
+            print(f"[WARNING] Índice ANN indisponível, usando busca exata: {e}")
+    
+    def _get_search_state(
+        self,
+        name: str,
+        matrix: Optional[np.ndarray],
+        documents: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Matriz normalizada e máscaras de categoria de um conjunto de documentos.
+        Recalculada apenas quando a matriz de embeddings é substituída.
+        """
+        if matrix is None or len(documents) == 0:
+            return None
+        
+        state = self._search_state.get(name)
+        if state is None or state['source'] is not matrix or state['size'] != len(documents):
+            # Índice base já normalizado (mmap) é usado sem cópia
+            if name == 'base' and self.embeddings_normalized:
+                normalized = matrix[:len(documents)]
+            else:
+                normalized = _normalize_rows(matrix[:len(documents)])
+            state = {
+                'source': matrix,
+                'size': len(documents),
+                'normalized': normalized,
+                'categories': np.array([doc.get('category') for doc in documents], dtype=object),
+                'masks': {}
+            }
+            self._search_state[name] = state
+        return state
+    
+    def _category_mask(self, state: Dict[str, Any], category: str) -> np.ndarray:
+        """Máscara booleana (pré-computada) dos documentos de uma categoria."""
+        mask = state['masks'].get(category)
+        if mask is None:
+            mask = state['categories'] == category
+            state['masks'][category] = mask
+        return mask
+    
+    def _embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Embeddings das consultas, usando o cache LRU. Todas as consultas fora
+        do cache são calculadas em um único lote do FastEmbed.
+        
+        Returns:
+            Matriz (len(queries) × dim)
+        """
+        keys = [_normalize_query(q) for q in queries]
+        embeddings: Dict[str, np.ndarray] = {}
+        
+        with self._query_cache_lock:
+            for key in keys:
+                cached = self._query_embedding_cache.get(key)
+                if cached is not None:
+                    self._query_embedding_cache.move_to_end(key)
+                    embeddings[key] = cached
+            self._query_cache_stats['hits'] += sum(1 for key in keys if key in embeddings)
+        
+        missing = [key for key in dict.fromkeys(keys) if key not in embeddings]
+        if missing:
+            computed = list(self.embedding_model.embed(missing))
+            with self._query_cache_lock:
+                self._query_cache_stats['misses'] += len(missing)
+                for key, embedding in zip(missing, computed):
+                    embedding = np.asarray(embedding, dtype=np.float32)
+                    embeddings[key] = embedding
+                    self._query_embedding_cache[key] = embedding
+                    self._query_embedding_cache.move_to_end(key)
+                while len(self._query_embedding_cache) > QUERY_EMBEDDING_CACHE_SIZE:
+                    self._query_embedding_cache.popitem(last=False)
+        
+        return np.vstack([embeddings[key] for key in keys])
+    
+    def query_cache_stats(self) -> Dict[str, int]:
+        """Contadores do cache de embeddings de consultas."""
+        with self._query_cache_lock:
+            return dict(self._query_cache_stats, size=len(self._query_embedding_cache))
+    
+    def _rank_documents(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int,
+        category: Optional[str] = None,
+        ann_effort: Optional[int] = None,
+        learned_state: Optional[Dict[str, Any]] = None
+    ) -> List[tuple]:
+        """
+        Rankeia documentos base e aprendidos por similaridade cosseno.
+        
+        Returns:
+            Lista de tuplas (score, índice, 'base' | 'learned') em ordem decrescente
+        """
+        return self._rank_documents_many(
+            np.asarray(query_embedding).reshape(1, -1), top_k, category, ann_effort, learned_state
+        )[0]
+    
+    def _rank_documents_many(
+        self,
+        query_embeddings: np.ndarray,
+        top_k: int,
+        category: Optional[str] = None,
+        ann_effort: Optional[int] = None,
+        learned_state: Optional[Dict[str, Any]] = None
+    ) -> List[List[tuple]]:
+        """
+        Rankeia documentos para várias consultas com uma única multiplicação
+        matricial (consultas × documentos) por conjunto. Com índice ANN, os
+        documentos base são pré-selecionados pelo índice e reavaliados com a
+        similaridade exata.
+        
+        learned_state: snapshot dos documentos aprendidos (padrão: o atual);
+        os índices 'learned' retornados se referem a ele.
+        
+        Returns:
+            Para cada consulta, lista de tuplas (score, índice, 'base' | 'learned')
+            em ordem decrescente
+        """
+        query_vectors = _normalize_rows(query_embeddings)
+        ranked: List[List[tuple]] = [[] for _ in range(len(query_vectors))]
+        
+        if learned_state is None:
+            learned_state = self._learned_store().snapshot()
+        sources = [
+            ('base', self._get_search_state('base', self.embeddings_matrix, self.documents), 1.0),
+            # Dar um pequeno boost para documentos aprendidos (mais recentes)
+            ('learned', learned_state if learned_state['size'] else None, 1.05),
+        ]
+        for source_type, state, boost in sources:
+            if state is None:
+                continue
+            
+            indices = np.flatnonzero(self._category_mask(state, category)) if category else None
+            use_ann = (
+                source_type == 'base'
+                and self.ann_index is not None
+                and self.ann_index.size == state['size']
+            )
+            score_matrix = None
+            
+            for q, query_vector in enumerate(query_vectors):
+                if use_ann:
+                    best = self._ann_candidates(state, query_vector, top_k, category, ann_effort)
+                    if best is not None:
+                        scores = np.asarray(state['normalized'][best], dtype=np.float32) @ query_vector
+                        ranked[q].extend((float(score), int(i), source_type) for score, i in zip(scores, best))
+                        continue
+                
+                if score_matrix is None:
+                    score_matrix = _score_matrix(query_vectors, state['normalized'])
+                    if boost != 1.0:
+                        score_matrix *= boost
+                
+                scores = score_matrix[q]
+                if indices is not None:
+                    best = indices[_top_k_indices(scores[indices], top_k)]
+                else:
+                    best = _top_k_indices(scores, top_k)
+                ranked[q].extend((float(scores[i]), int(i), source_type) for i in best)
+        
+        for candidates in ranked:
+            candidates.sort(reverse=True, key=lambda x: x[0])
+            del candidates[top_k:]
+        return ranked
+    
+    def _ann_candidates(
+        self,
+        state: Dict[str, Any],
+        query_vector: np.ndarray,
+        top_k: int,
+        category: Optional[str],
+        ann_effort: Optional[int]
+    ) -> Optional[np.ndarray]:
+        """
+        Candidatos do índice ANN (filtrados por categoria), em número maior
+        que top_k para a reavaliação exata compensar a aproximação.
+        Retorna None quando o filtro deixa poucos candidatos - nesse caso a
+        busca exata é usada.
+        """
+        n_candidates = top_k * ANN_RERANK_FACTOR
+        if category:
+            n_candidates *= ANN_CATEGORY_OVERSAMPLE
+        indices, _ = self.ann_index.search(query_vector, n_candidates, effort=ann_effort)
+        
+        if category:
+            indices = indices[self._category_mask(state, category)[indices]]
+            category_size = int(self._category_mask(state, category).sum())
+            if len(indices) < min(top_k, category_size):
+                return None
+        
+        return indices
     
+    @timed_stage('rag')
     def search(
         self, 
         query: str, 
         top_k: int = 5, 
         expand_query: bool = False,
-        category: Optional[str] = None
+        category: Optional[str] = None,
+        ann_effort: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Busca documentos relevantes para a query.
@@ -485,6 +658,7 @@ class RAGServiceFastEmbed:
             top_k: Número de resultados a retornar
             expand_query: Se True, faz múltiplas buscas com variações da query
             category: Filtrar por categoria ('astrology' ou 'numerology')
+            ann_effort: Esforço do índice ANN (ef/nprobe): maior = mais recall e latência
         
         Returns:
             Lista de documentos relevantes com metadados e score
@@ -548,68 +722,18 @@ class RAGServiceFastEmbed:
             raise ValueError("Índice não carregado. Execute load_index() ou process_all_documents() primeiro.")
         
         try:
-            # Gerar embedding da query
-            query_embedding = np.array(list(self.embedding_model.embed([query]))[0])
+            # Gerar embedding da query (cache LRU)
+            query_embedding = self._embed_queries([query])[0]
             
             # Buscar mais resultados se houver filtro de categoria (otimizado: reduzido de *3 para *1.5)
             search_top_k = int(top_k * 1.5) if category else (int(top_k * 1.2) if expand_query else top_k)
             
-            # Calcular similaridade com todos os documentos (base + aprendidos)
-            similarities = []
-            
-            # Buscar em documentos base
-            for i, doc in enumerate(self.documents):
-                # Filtrar por categoria se especificada
-                if category and doc.get('category') != category:
-                    continue
-                
-                doc_embedding = np.array(doc.get('embedding', []))
-                if len(doc_embedding) == 0:
-                    continue
-                
-                similarity = self._cosine_similarity(query_embedding, doc_embedding)
-                similarities.append((similarity, i, 'base'))
-            
-            # Buscar em documentos aprendidos (se houver)
-            if self.learned_documents and self.learned_embeddings_matrix is not None:
-                for i, doc in enumerate(self.learned_documents):
-                    # Filtrar por categoria se especificada
-                    if category and doc.get('category') != category:
-                        continue
-                    
-                    doc_embedding = self.learned_embeddings_matrix[i]
-                    if len(doc_embedding) == 0:
-                        continue
-                    
-                    similarity = self._cosine_similarity(query_embedding, doc_embedding)
-                    # Dar um pequeno boost para documentos aprendidos (mais recentes)
-                    adjusted_similarity = similarity * 1.05  # 5% boost
-                    similarities.append((adjusted_similarity, i, 'learned'))
-            
-            # Ordenar por similaridade e pegar top_k
-            similarities.sort(reverse=True, key=lambda x: x[0])
-            top_results = similarities[:search_top_k]
-            
-            # Converter para formato esperado
-            results = []
-            for similarity_score, idx, source_type in top_results:
-                if source_type == 'base':
-                    doc = self.documents[idx]
-                else:  # learned
-                    doc = self.learned_documents[idx]
-                
-                results.append({
-                    'text': doc.get('text', ''),
-                    'score': float(similarity_score),
-                    'source': doc.get('source', 'learned' if source_type == 'learned' else 'unknown'),
-                    'page': doc.get('page', 1),
-                    'category': doc.get('category', 'astrology'),
-                    'metadata': doc.get('metadata', {}),
-                    'is_learned': source_type == 'learned'
-                })
-                
-                if len(results) >= top_k:
-                    break
+            # Similaridade com todos os documentos (base + aprendidos) em uma
+            # única multiplicação matriz × vetor por conjunto
+            # Snapshot dos aprendidos: inserções concorrentes não afetam esta busca
+            learned_state = self._learned_store().snapshot()
+            similarities = self._rank_documents(query_embedding, search_top_k, category, ann_effort, learned_state)
+            results = self._format_results(similarities[:search_top_k], top_k, learned_state['documents'])
             
             if category:
                 print(f"[RAG-FastEmbed] Busca filtrada por categoria '{category}': {len(results)} resultados")
@@ -621,6 +745,79 @@ class RAGServiceFastEmbed:
             traceback.print_exc()
             return []
     
+    @timed_stage('rag')
+    def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        expand_query: bool = False,
+        category: Optional[str] = None,
+        ann_effort: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Busca várias consultas de uma vez: embeddings fora do cache são gerados
+        em um único lote e todas as consultas são pontuadas em uma única
+        multiplicação matricial.
+        
+        Args:
+            queries: Textos das consultas
+            top_k, expand_query, category, ann_effort: Mesmo significado de search()
+        
+        Returns:
+            Lista de resultados (mesmo formato de search()) na ordem das consultas
+        """
+        if not queries:
+            return []
+        
+        if not HAS_FASTEMBED or self.embedding_model is None:
+            return [self.search(q, top_k=top_k, expand_query=expand_query, category=category) for q in queries]
+        
+        if not self.documents or self.embeddings_matrix is None:
+            raise ValueError("Índice não carregado. Execute load_index() ou process_all_documents() primeiro.")
+        
+        try:
+            query_embeddings = self._embed_queries(queries)
+            search_top_k = int(top_k * 1.5) if category else (int(top_k * 1.2) if expand_query else top_k)
+            
+            learned_state = self._learned_store().snapshot()
+            ranked = self._rank_documents_many(query_embeddings, search_top_k, category, ann_effort, learned_state)
+            return [self._format_results(similarities, top_k, learned_state['documents']) for similarities in ranked]
+        except Exception as e:
+            print(f"[RAG-FastEmbed] Erro ao buscar em lote: {e}")
+            import traceback
+            traceback.print_exc()
+            return [[] for _ in queries]
+    
+    def _format_results(
+        self,
+        similarities: List[tuple],
+        top_k: int,
+        learned_documents: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """Converte tuplas (score, índice, origem) para o formato de resultado."""
+        if learned_documents is None:
+            learned_documents = self.learned_documents
+        results = []
+        for similarity_score, idx, source_type in similarities:
+            if source_type == 'base':
+                doc = self.documents[idx]
+            else:  # learned
+                doc = learned_documents[idx]
+            
+            results.append({
+                'text': doc.get('text', ''),
+                'score': float(similarity_score),
+                'source': doc.get('source', 'learned' if source_type == 'learned' else 'unknown'),
+                'page': doc.get('page', 1),
+                'category': doc.get('category', 'astrology'),
+                'metadata': doc.get('metadata', {}),
+                'is_learned': source_type == 'learned'
+            })
+            
+            if len(results) >= top_k:
+                break
+        return results
+    
     def _generate_with_groq(
         self,
         query: str,
@@ -1059,21 +1256,11 @@ INSTRUÇÕES:
                 'metadata': metadata or {}
             }
             
-            # Gerar embedding
+            # Gerar embedding (fora do lock; guardado apenas na matriz de aprendidos)
             embedding = np.array(list(self.embedding_model.embed([text]))[0])
-            learned_doc['embedding'] = embedding.tolist()
-            
-            # Adicionar à lista de aprendidos
-            self.learned_documents.append(learned_doc)
             
-            # Atualizar matriz de embeddings aprendidos
-            if self.learned_embeddings_matrix is None:
-                self.learned_embeddings_matrix = np.array([embedding])
-            else:
-                self.learned_embeddings_matrix = np.vstack([
-                    self.learned_embeddings_matrix,
-                    embedding
-                ])
+            # Anexar ao buffer (O(1) amortizado) e publicar para as próximas buscas
+            self._learned_store().append(learned_doc, embedding)
             
             print(f"[RAG-FastEmbed] ✅ Documento aprendido adicionado (total aprendidos: {len(self.learned_documents)})")
             return True
@@ -1084,8 +1271,45 @@ INSTRUÇÕES:
             traceback.print_exc()
             return False
     
+    def _load_learned_embedding_cache(self) -> Dict[str, np.ndarray]:
+        """Embeddings aprendidos salvos no startup anterior (hash do texto -> vetor normalizado)."""
+        cache_file = self.index_path / LEARNED_EMBEDDINGS_FILENAME
+        if not cache_file.exists():
+            return {}
+        try:
+            with np.load(cache_file, allow_pickle=False) as data:
+                if str(data['model_name']) != self.bge_model_name:
+                    return {}
+                return dict(zip(data['hashes'].tolist(), data['embeddings']))
+        except Exception as e:
+            print(f"[WARNING] Cache de embeddings aprendidos inválido, recalculando: {e}")
+            return {}
+    
+    def _save_learned_embedding_cache(self, hashes: List[str], embeddings: np.ndarray) -> None:
+        """Grava o cache de embeddings aprendidos (escrita atômica)."""
+        try:
+            self.index_path.mkdir(parents=True, exist_ok=True)
+            cache_file = self.index_path / LEARNED_EMBEDDINGS_FILENAME
+            tmp_file = cache_file.with_name(cache_file.name + ".tmp")
+            with open(tmp_file, 'wb') as f:
+                np.savez(
+                    f,
+                    model_name=np.array(self.bge_model_name),
+                    hashes=np.array(hashes, dtype=str),
+                    embeddings=np.asarray(embeddings, dtype=np.float32),
+                )
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            print(f"[WARNING] Não foi possível salvar o cache de embeddings aprendidos: {e}")
+    
     def load_learned_documents(self):
-        """Carrega documentos aprendidos do serviço de aprendizado."""
+        """
+        Carrega documentos aprendidos do serviço de aprendizado.
+        
+        Os embeddings já calculados em startups anteriores vêm do cache em
+        disco; só os textos novos passam pelo modelo, em lotes. O buffer é
+        preenchido e publicado de uma vez.
+        """
         try:
             from app.services.rag_learning_service import get_learning_service
             
@@ -1096,18 +1320,48 @@ INSTRUÇÕES:
                 print("[RAG-FastEmbed] Nenhum documento aprendido para carregar")
                 return
             
+            if not HAS_FASTEMBED or self.embedding_model is None:
+                print("[RAG-FastEmbed] FastEmbed não disponível para carregar documentos aprendidos")
+                return
+            
             print(f"[RAG-FastEmbed] Carregando {len(learned_interpretations)} documentos aprendidos...")
             
-            loaded_count = 0
+            documents: List[Dict[str, Any]] = []
+            hashes: List[str] = []
             for learned in learned_interpretations:
                 text = learned.get('text', '')
-                metadata = learned.get('metadata', {})
-                category = learned.get('category', 'astrology')
-                
-                if self.add_learned_document(text, metadata, category):
-                    loaded_count += 1
+                if not text or len(text.strip()) < 50:
+                    continue
+                documents.append({
+                    'text': text.strip(),
+                    'source': 'learned',
+                    'file_type': 'learned',
+                    'category': learned.get('category', 'astrology'),
+                    'page': 1,
+                    'metadata': learned.get('metadata', {}) or {}
+                })
+                hashes.append(learned.get('hash') or hashlib.md5(text.strip().encode('utf-8')).hexdigest())
+            
+            if not documents:
+                print("[RAG-FastEmbed] Nenhum documento aprendido para carregar")
+                return
             
-            print(f"[RAG-FastEmbed] ✅ {loaded_count} documentos aprendidos carregados com sucesso")
+            cached = self._load_learned_embedding_cache()
+            missing = [i for i, text_hash in enumerate(hashes) if text_hash not in cached]
+            if missing:
+                texts = [documents[i]['text'] for i in missing]
+                for i, embedding in zip(missing, self.embedding_model.embed(texts, batch_size=EMBED_BATCH_SIZE)):
+                    cached[hashes[i]] = np.asarray(embedding, dtype=np.float32)
+            
+            embeddings = np.vstack([cached[text_hash] for text_hash in hashes])
+            self._learned_store().replace(documents, embeddings)
+            if missing:
+                self._save_learned_embedding_cache(hashes, self.learned_embeddings_matrix)
+            
+            print(
+                f"[RAG-FastEmbed] ✅ {len(documents)} documentos aprendidos carregados com sucesso "
+                f"({len(documents) - len(missing)} do cache, {len(missing)} calculados)"
+            )
             
         except Exception as e:
             print(f"[RAG-FastEmbed] Erro ao carregar documentos aprendidos: {e}")
@@ -1117,36 +1371,54 @@ INSTRUÇÕES:
 
 # Instância global
 _rag_service_instance: Optional[RAGServiceFastEmbed] = None
+_rag_service_lock = threading.Lock()
 
 
 def get_rag_service() -> Optional[RAGServiceFastEmbed]:
-    """Obtém instância singleton do serviço RAG com FastEmbed."""
+    """
+    Obtém instância singleton do serviço RAG com FastEmbed.
+    O aquecimento do startup (app.core.warmup) e uma requisição podem chamar
+    ao mesmo tempo: o modelo e o índice são carregados uma única vez.
+    """
     global _rag_service_instance
     
-    if _rag_service_instance is None:
-        from app.core.config import settings
-        
-        service_path = Path(__file__).parent.parent.parent
-        docs_path = service_path / getattr(settings, 'DOCS_PATH', 'docs')
-        index_path = service_path / getattr(settings, 'INDEX_PATH', 'rag_index_fastembed')
-        
-        groq_api_key = settings.GROQ_API_KEY if settings.GROQ_API_KEY else None
-        
-        bge_model_name = getattr(settings, 'BGE_MODEL_NAME', 'BAAI/bge-small-en-v1.5')
-        
-        _rag_service_instance = RAGServiceFastEmbed(
-            docs_path=str(docs_path),
-            index_path=str(index_path),
-            groq_api_key=groq_api_key,
-            bge_model_name=bge_model_name
-        )
-        
-        # Tentar carregar índice existente
-        if not _rag_service_instance.load_index():
-            print("[RAG-Service] Índice não encontrado. Execute o script de build do índice para criar.")
-        else:
-            # Carregar documentos aprendidos após carregar índice base
-            _rag_service_instance.load_learned_documents()
+    if _rag_service_instance is not None:
+        return _rag_service_instance
+    
+    with _rag_service_lock:
+        if _rag_service_instance is None:
+            _rag_service_instance = _create_rag_service()
     
     return _rag_service_instance
 
+
+def _create_rag_service() -> RAGServiceFastEmbed:
+    """Cria o serviço e carrega o índice base e os documentos aprendidos."""
+    from app.core.config import settings
+    
+    service_path = Path(__file__).parent.parent.parent
+    docs_path = service_path / getattr(settings, 'DOCS_PATH', 'docs')
+    index_path = service_path / getattr(settings, 'INDEX_PATH', 'rag_index_fastembed')
+    
+    groq_api_key = settings.GROQ_API_KEY if settings.GROQ_API_KEY else None
+    
+    bge_model_name = getattr(settings, 'BGE_MODEL_NAME', 'BAAI/bge-small-en-v1.5')
+    
+    service = RAGServiceFastEmbed(
+        docs_path=str(docs_path),
+        index_path=str(index_path),
+        groq_api_key=groq_api_key,
+        bge_model_name=bge_model_name,
+        ann_backend=getattr(settings, 'RAG_ANN_BACKEND', '') or None,
+        embeddings_dtype=getattr(settings, 'RAG_EMBEDDINGS_DTYPE', 'float32')
+    )
+    
+    # Tentar carregar índice existente
+    if not service.load_index():
+        print("[RAG-Service] Índice não encontrado. Execute o script de build do índice para criar.")
+    else:
+        # Carregar documentos aprendidos após carregar índice base
+        service.load_learned_documents()
+    
+    return service
+
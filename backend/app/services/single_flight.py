@@ -0,0 +1,80 @@
+"""
+Single-Flight - Coalescência de Cálculos Idênticos Concorrentes.
+
+Quando várias requisições pedem o mesmo cálculo ao mesmo tempo (ex: o dashboard
+dispara trânsitos, best timing e interpretações para o mesmo usuário), apenas
+a primeira executa; as demais aguardam e recebem o mesmo resultado (ou erro).
+
+Não é um cache: terminada a execução, a próxima chamada calcula novamente.
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _InFlightCall:
+    """Cálculo em andamento compartilhado entre as threads que o aguardam."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Grupo de chamadas coalescidas por chave."""
+
+    def __init__(self, name: str = "single_flight"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _InFlightCall] = {}
+        self._stats = {'executions': 0, 'coalesced': 0}
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Executa func(*args, **kwargs) uma única vez por chave entre chamadas concorrentes.
+
+        Returns:
+            Resultado de func (o mesmo objeto para todas as chamadas coalescidas)
+
+        Raises:
+            A exceção de func, repassada a todas as chamadas coalescidas
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._stats['coalesced'] += 1
+                leader = False
+            else:
+                call = _InFlightCall()
+                self._calls[key] = call
+                self._stats['executions'] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        """Quantidade de chaves sendo calculadas no momento."""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de execuções reais e chamadas coalescidas."""
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._calls))
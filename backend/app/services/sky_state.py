@@ -0,0 +1,179 @@
+"""
+Estado do Céu Compartilhado ("sky state") - Posições Atuais dos Planetas.
+
+As posições geocêntricas de "agora" são as mesmas para todos os usuários:
+/transits/current, /daily-info e a Lua Fora de Curso recalculavam as mesmas
+longitudes a cada requisição. Aqui o céu é calculado uma única vez por
+intervalo de tempo (bucket, padrão 1 minuto) e compartilhado pelo processo:
+- Longitude, velocidade, retrogradação, signo e grau de cada planeta
+- Fase e signo da Lua
+- Os próximos buckets são pré-calculados em segundo plano
+
+Os endpoints por usuário fazem apenas as contas que dependem do mapa natal.
+"""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import threading
+
+from app.core.config import settings
+from app.services.astrology_calculator import get_zodiac_sign
+from app.services.ephemeris_batch_engine import (
+    BATCH_BODIES,
+    calculate_positions_batch,
+    datetimes_to_julian_days,
+)
+
+
+# Buckets guardados (atuais, anteriores recentes e pré-calculados)
+MAX_CACHED_BUCKETS = 32
+
+
+def _bucket_seconds() -> int:
+    return max(1, int(getattr(settings, 'SKY_STATE_BUCKET_SECONDS', 60)))
+
+
+def bucket_start(instant: datetime) -> datetime:
+    """Início do bucket (UTC) que contém o instante."""
+    seconds = _bucket_seconds()
+    epoch_seconds = int((instant - datetime(1970, 1, 1)).total_seconds())
+    return datetime(1970, 1, 1) + timedelta(seconds=epoch_seconds - epoch_seconds % seconds)
+
+
+def compute_sky_state(instant: datetime) -> Dict[str, object]:
+    """
+    Calcula o céu geocêntrico em um instante UTC (todos os planetas em uma passada).
+
+    Returns:
+        Dicionário com:
+        - instant, julian_day
+        - planets: {planeta: {longitude, speed, retrograde, sign, degree}}
+        - longitudes: {planeta: longitude}
+        - moon_sign, moon_phase, moon_phase_angle
+    """
+    from app.services.daily_info_calculator import calculate_moon_phase
+
+    longitudes, speeds = calculate_positions_batch([instant], BATCH_BODIES)
+    planets = {}
+    for body, longitude, speed in zip(BATCH_BODIES, longitudes[0].tolist(), speeds[0].tolist()):
+        sign = get_zodiac_sign(longitude)
+        planets[body] = {
+            'longitude': longitude,
+            'speed': speed,
+            'retrograde': speed < 0,
+            'sign': sign['sign'],
+            'degree': sign['degree'],
+        }
+
+    moon_longitude = planets['moon']['longitude']
+    sun_longitude = planets['sun']['longitude']
+    return {
+        'instant': instant,
+        'julian_day': float(datetimes_to_julian_days([instant])[0]),
+        'planets': planets,
+        'longitudes': {body: data['longitude'] for body, data in planets.items()},
+        'moon_sign': planets['moon']['sign'],
+        'moon_phase': calculate_moon_phase(moon_longitude, sun_longitude),
+        'moon_phase_angle': (moon_longitude - sun_longitude) % 360,
+    }
+
+
+class SkyStateProvider:
+    """
+    Cache do céu por bucket de tempo, compartilhado entre requisições
+    (thread-safe), com pré-cálculo dos próximos buckets em segundo plano.
+    """
+
+    def __init__(self, preroll_buckets: Optional[int] = None):
+        self._lock = threading.Lock()
+        self._states: "OrderedDict[datetime, Dict[str, object]]" = OrderedDict()
+        self._pending = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._preroll_buckets = preroll_buckets
+        self._stats = {'hits': 0, 'misses': 0, 'prerolled': 0}
+
+    def _store(self, start: datetime, state: Dict[str, object]) -> None:
+        """Grava um bucket e descarta os mais antigos. Requer _lock."""
+        self._states[start] = state
+        while len(self._states) > MAX_CACHED_BUCKETS:
+            self._states.pop(min(self._states))
+
+    def get(self, instant: Optional[datetime] = None) -> Dict[str, object]:
+        """Céu do bucket que contém o instante UTC (padrão: agora)."""
+        start = bucket_start(instant if instant is not None else datetime.utcnow())
+        with self._lock:
+            state = self._states.get(start)
+            if state is not None:
+                self._stats['hits'] += 1
+        if state is None:
+            state = compute_sky_state(start)
+            with self._lock:
+                self._stats['misses'] += 1
+                self._store(start, state)
+        self._schedule_preroll(start)
+        return state
+
+    def _schedule_preroll(self, start: datetime) -> None:
+        """Agenda o cálculo em segundo plano dos próximos buckets ainda ausentes."""
+        count = self._preroll_buckets
+        if count is None:
+            count = int(getattr(settings, 'SKY_STATE_PREROLL_BUCKETS', 2))
+        step = timedelta(seconds=_bucket_seconds())
+
+        with self._lock:
+            missing = [
+                start + step * offset
+                for offset in range(1, count + 1)
+                if start + step * offset not in self._states and start + step * offset not in self._pending
+            ]
+            if not missing:
+                return
+            self._pending.update(missing)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sky-state")
+            executor = self._executor
+
+        executor.submit(self._preroll, missing)
+
+    def _preroll(self, starts) -> None:
+        for start in starts:
+            try:
+                state = compute_sky_state(start)
+                with self._lock:
+                    self._store(start, state)
+                    self._stats['prerolled'] += 1
+            except Exception as e:
+                print(f"[WARNING] Erro ao pré-calcular estado do céu: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(start)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['buckets'] = len(self._states)
+            return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+
+_provider: Optional[SkyStateProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_sky_state_provider() -> SkyStateProvider:
+    """Provedor compartilhado do processo."""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = SkyStateProvider()
+    return _provider
+
+
+def get_sky_state(instant: Optional[datetime] = None) -> Dict[str, object]:
+    """Atalho: céu compartilhado do bucket atual (ou do instante UTC informado)."""
+    return get_sky_state_provider().get(instant)
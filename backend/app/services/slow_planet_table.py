@@ -0,0 +1,270 @@
+"""
+Tabela Pré-Computada de Planetas Lentos (Júpiter a Plutão).
+
+Posições diárias (00:00 UT) de 1900 a 2100 em float32, no formato
+(dia × planeta × [longitude, velocidade]) - cerca de 3 MB em disco.
+
+A tabela é lida via memória mapeada (np.load com mmap_mode='r'), então todos
+os processos workers compartilham o mesmo page cache. Posições entre dias são
+obtidas por interpolação cúbica de Hermite (usa longitude e velocidade).
+
+Geração (e verificação): python scripts/build_ephemeris_table.py
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.ephemeris_batch_engine import (
+    BATCH_BODIES,
+    calculate_positions_batch,
+    datetimes_to_julian_days,
+    julian_day_to_datetime,
+)
+
+
+# Planetas armazenados na tabela (ordem define o eixo dos planetas)
+SLOW_PLANETS = ['jupiter', 'saturn', 'uranus', 'neptune', 'pluto']
+
+# Intervalo coberto pela tabela (00:00 UT)
+TABLE_START = datetime(1900, 1, 1)
+TABLE_END = datetime(2100, 12, 31)
+
+TABLE_FILENAME = "slow_planets.npy"
+METADATA_FILENAME = "metadata.json"
+
+# Quantidade de dias calculados por lote durante a geração
+BUILD_CHUNK_DAYS = 3650
+
+
+def _default_table_dir() -> Path:
+    """Diretório da tabela (configurável via EPHEMERIS_TABLE_PATH)."""
+    from app.core.config import settings
+
+    table_dir = Path(settings.EPHEMERIS_TABLE_PATH)
+    if not table_dir.is_absolute():
+        backend_root = Path(__file__).parent.parent.parent
+        table_dir = backend_root / table_dir
+    return table_dir
+
+
+def build_slow_planet_table(
+    output_dir: Optional[Path] = None,
+    start: datetime = TABLE_START,
+    end: datetime = TABLE_END
+) -> Path:
+    """
+    Gera a tabela diária de longitudes/velocidades dos planetas lentos.
+
+    Args:
+        output_dir: Diretório de saída (padrão: EPHEMERIS_TABLE_PATH)
+        start: Primeiro dia da tabela (00:00 UT)
+        end: Último dia da tabela (00:00 UT)
+
+    Returns:
+        Caminho do arquivo .npy gerado
+    """
+    output_dir = Path(output_dir) if output_dir else _default_table_dir()
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    start_jd = float(datetimes_to_julian_days([start])[0])
+    end_jd = float(datetimes_to_julian_days([end])[0])
+    n_days = int(round(end_jd - start_jd)) + 1
+
+    table_path = output_dir / TABLE_FILENAME
+    table = np.lib.format.open_memmap(
+        table_path, mode='w+', dtype=np.float32, shape=(n_days, len(SLOW_PLANETS), 2)
+    )
+
+    for chunk_start in range(0, n_days, BUILD_CHUNK_DAYS):
+        chunk_end = min(chunk_start + BUILD_CHUNK_DAYS, n_days)
+        instants = [julian_day_to_datetime(start_jd + day) for day in range(chunk_start, chunk_end)]
+        longitudes, speeds = calculate_positions_batch(instants, SLOW_PLANETS)
+        table[chunk_start:chunk_end, :, 0] = longitudes
+        table[chunk_start:chunk_end, :, 1] = speeds
+
+    table.flush()
+    del table
+
+    metadata = {
+        'bodies': SLOW_PLANETS,
+        'start_jd': start_jd,
+        'n_days': n_days,
+        'step_days': 1.0,
+        'dtype': 'float32',
+        'columns': ['longitude', 'speed'],
+        'created_at': datetime.now().isoformat()
+    }
+    with open(output_dir / METADATA_FILENAME, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
+
+    return table_path
+
+
+def verify_slow_planet_table(
+    table_dir: Optional[Path] = None,
+    start: datetime = TABLE_START,
+    end: datetime = TABLE_END,
+    tolerance_degrees: float = 0.01
+) -> "SlowPlanetTable":
+    """
+    Confere a tabela gerada: planetas, intervalo, formato, valores finitos e
+    algumas posições comparadas ao Swiss Ephemeris.
+
+    Raises:
+        ValueError: se a tabela estiver ausente, incompleta ou divergente
+    """
+    table_dir = Path(table_dir) if table_dir else _default_table_dir()
+    if not (table_dir / TABLE_FILENAME).exists() or not (table_dir / METADATA_FILENAME).exists():
+        raise ValueError(f"Tabela de efemérides não encontrada em {table_dir}")
+
+    table = SlowPlanetTable(table_dir)
+    if table.bodies != SLOW_PLANETS:
+        raise ValueError(f"Planetas da tabela ({table.bodies}) diferentes de {SLOW_PLANETS}")
+
+    start_jd, end_jd = (float(jd) for jd in datetimes_to_julian_days([start, end]))
+    n_days = int(round(end_jd - start_jd)) + 1
+    if table.start_jd != start_jd or table.n_days != n_days:
+        raise ValueError(
+            f"Intervalo da tabela (jd {table.start_jd}, {table.n_days} dias) "
+            f"diferente do esperado (jd {start_jd}, {n_days} dias)"
+        )
+    if table.table.dtype != np.float32 or not np.isfinite(table.table).all():
+        raise ValueError("Tabela de efemérides com tipo inválido ou valores não finitos")
+    longitudes = table.table[:, :, 0]
+    if longitudes.min() < 0 or longitudes.max() >= 360:
+        raise ValueError("Tabela de efemérides com longitudes fora de [0, 360)")
+
+    # Amostras no início, meio e fim do intervalo (entre dias, exercitando a interpolação)
+    sample_days = np.array([0, n_days // 2, n_days - 2], dtype=np.float64) + 0.5
+    julian_days = start_jd + sample_days
+    interpolated, _ = table.positions(julian_days, SLOW_PLANETS)
+    expected, _ = calculate_positions_batch([julian_day_to_datetime(jd) for jd in julian_days], SLOW_PLANETS)
+    error = np.abs((interpolated - np.asarray(expected) + 180.0) % 360.0 - 180.0).max()
+    if error > tolerance_degrees:
+        raise ValueError(f"Tabela de efemérides diverge do Swiss Ephemeris em {error:.4f}°")
+
+    return table
+
+
+class SlowPlanetTable:
+    """Leitura da tabela memória-mapeada com interpolação de Hermite."""
+
+    def __init__(self, table_dir: Path):
+        with open(table_dir / METADATA_FILENAME, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+
+        self.bodies = list(metadata['bodies'])
+        self.start_jd = float(metadata['start_jd'])
+        self.n_days = int(metadata['n_days'])
+        self.table = np.load(table_dir / TABLE_FILENAME, mmap_mode='r')
+
+        if self.table.shape != (self.n_days, len(self.bodies), 2):
+            raise ValueError(f"Tabela de efemérides inconsistente: {self.table.shape}")
+
+    def covers(self, julian_days: np.ndarray) -> bool:
+        """Se todas as datas estão dentro do intervalo da tabela."""
+        if julian_days.size == 0:
+            return True
+        offsets = julian_days - self.start_jd
+        return bool(offsets.min() >= 0 and offsets.max() < self.n_days - 1)
+
+    def positions(
+        self,
+        julian_days: np.ndarray,
+        bodies: Sequence[str]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Interpola longitudes e velocidades para as datas julianas informadas.
+
+        Returns:
+            Tupla (longitudes, speeds) com shape (len(julian_days), len(bodies))
+        """
+        columns = [self.bodies.index(b) for b in bodies]
+        offsets = np.asarray(julian_days, dtype=np.float64) - self.start_jd
+        day_index = np.floor(offsets).astype(np.int64)
+        s = (offsets - day_index)[:, None]
+
+        # Apenas as linhas necessárias são lidas do arquivo mapeado
+        rows0 = np.asarray(self.table[day_index][:, columns], dtype=np.float64)
+        rows1 = np.asarray(self.table[day_index + 1][:, columns], dtype=np.float64)
+
+        p0, m0 = rows0[..., 0], rows0[..., 1]
+        m1 = rows1[..., 1]
+        # Desenrolar a passagem por 360° -> 0°
+        p1 = p0 + (rows1[..., 0] - p0 + 180.0) % 360.0 - 180.0
+
+        # Base cúbica de Hermite (passo h = 1 dia)
+        s2, s3 = s * s, s * s * s
+        h00 = 2 * s3 - 3 * s2 + 1
+        h10 = s3 - 2 * s2 + s
+        h01 = -2 * s3 + 3 * s2
+        h11 = s3 - s2
+        longitudes = h00 * p0 + h10 * m0 + h01 * p1 + h11 * m1
+
+        # Derivada da base para a velocidade
+        speeds = (
+            (6 * s2 - 6 * s) * p0 + (3 * s2 - 4 * s + 1) * m0
+            + (-6 * s2 + 6 * s) * p1 + (3 * s2 - 2 * s) * m1
+        )
+
+        return np.mod(longitudes, 360.0), speeds
+
+
+_slow_planet_table: Optional[SlowPlanetTable] = None
+_table_load_attempted = False
+
+
+def get_slow_planet_table() -> Optional[SlowPlanetTable]:
+    """
+    Retorna a tabela carregada (singleton) ou None se ela não foi gerada.
+    """
+    global _slow_planet_table, _table_load_attempted
+
+    if not _table_load_attempted:
+        _table_load_attempted = True
+        table_dir = _default_table_dir()
+        if (table_dir / TABLE_FILENAME).exists() and (table_dir / METADATA_FILENAME).exists():
+            try:
+                _slow_planet_table = SlowPlanetTable(table_dir)
+            except Exception as e:
+                print(f"[WARNING] Erro ao carregar tabela de planetas lentos: {e}")
+                _slow_planet_table = None
+
+    return _slow_planet_table
+
+
+def lookup_positions(
+    instants: Sequence[datetime],
+    bodies: Optional[Sequence[str]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Mesmo contrato de calculate_positions_batch: planetas lentos vêm da tabela
+    pré-computada (quando disponível e no intervalo), os demais do Swiss Ephemeris.
+
+    Returns:
+        Tupla (longitudes, speeds) com shape (len(instants), len(bodies))
+    """
+    body_keys = [b.lower() for b in (bodies or BATCH_BODIES)]
+    instants = list(instants)
+    table = get_slow_planet_table()
+
+    julian_days = datetimes_to_julian_days(instants)
+    table_bodies = [b for b in body_keys if table is not None and b in table.bodies]
+    if not table_bodies or not table.covers(julian_days):
+        return calculate_positions_batch(instants, body_keys)
+
+    longitudes = np.empty((len(instants), len(body_keys)), dtype=np.float64)
+    speeds = np.empty((len(instants), len(body_keys)), dtype=np.float64)
+
+    table_cols = [body_keys.index(b) for b in table_bodies]
+    longitudes[:, table_cols], speeds[:, table_cols] = table.positions(julian_days, table_bodies)
+
+    other_bodies = [b for b in body_keys if b not in table_bodies]
+    if other_bodies:
+        other_cols = [body_keys.index(b) for b in other_bodies]
+        longitudes[:, other_cols], speeds[:, other_cols] = calculate_positions_batch(instants, other_bodies)
+
+    return longitudes, speeds
@@ -0,0 +1,166 @@
+"""
+Solver da Revolução Solar (instante exato do retorno do Sol).
+
+Em vez de calcular mapas completos em uma grade de dias e horas, resolve
+longitude_Sol(t) - longitude_Sol_natal = 0 usando apenas a longitude do Sol
+(Swiss Ephemeris direto, sem casas nem timezone por ponto):
+1. Estimativa inicial: instante natal + N anos trópicos (cai a poucos minutos
+   da raiz, inclusive para nascidos em 29/02)
+2. Newton: a velocidade do Sol vem junto com a longitude, então cada iteração
+   custa uma única avaliação e a convergência é quadrática
+3. Salvaguarda: se Newton não convergir, a raiz é cercada e refinada por falsa
+   posição (refine_root do solver de aspectos)
+
+Precisão: 1 segundo. Vários anos são resolvidos na mesma chamada,
+reaproveitando a longitude natal do Sol.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pytz
+
+from app.services.aspect_event_solver import refine_root
+from app.services.ephemeris_batch_engine import (
+    calculate_body_at_julian_day,
+    datetimes_to_julian_days,
+    julian_day_to_datetime,
+    local_to_utc,
+)
+
+
+# Duração média do ano trópico (em dias)
+TROPICAL_YEAR_DAYS = 365.242189
+
+# Precisão do instante do retorno: 1 segundo (em dias)
+SOLAR_RETURN_TOLERANCE_DAYS = 1.0 / 86400.0
+
+MAX_NEWTON_ITERATIONS = 10
+
+# Meia largura do intervalo usado pela salvaguarda (em dias)
+BRACKET_HALF_WIDTH_DAYS = 3.0
+
+
+def _wrap180(angle: float) -> float:
+    """Normaliza um ângulo para o intervalo [-180, 180)."""
+    return (angle + 180.0) % 360.0 - 180.0
+
+
+class SunOffsetFunction:
+    """Distância angular com sinal entre o Sol em uma data juliana e o Sol natal."""
+
+    def __init__(self, natal_longitude: float):
+        self.natal_longitude = natal_longitude
+        self.evaluations = 0
+
+    def evaluate(self, julian_day: float) -> Tuple[float, float]:
+        """Retorna (distância em graus, velocidade do Sol em graus/dia)."""
+        self.evaluations += 1
+        longitude, speed = calculate_body_at_julian_day(julian_day, 'sun')
+        return _wrap180(longitude - self.natal_longitude), speed
+
+    def __call__(self, julian_day: float) -> float:
+        return self.evaluate(julian_day)[0]
+
+
+def solve_solar_return(
+    natal_longitude: float,
+    guess_julian_day: float,
+    tolerance: float = SOLAR_RETURN_TOLERANCE_DAYS
+) -> Dict[str, float]:
+    """
+    Encontra o instante em que o Sol volta à longitude natal perto da estimativa.
+
+    Returns:
+        Dicionário com 'julian_day' (UT), 'precision' (graus) e 'evaluations'
+    """
+    func = SunOffsetFunction(natal_longitude)
+
+    julian_day = guess_julian_day
+    for _ in range(MAX_NEWTON_ITERATIONS):
+        offset, speed = func.evaluate(julian_day)
+        if speed <= 0:
+            break
+        step = offset / speed
+        if abs(step) <= tolerance:
+            return {'julian_day': julian_day, 'precision': abs(offset), 'evaluations': func.evaluations}
+        if abs(step) > BRACKET_HALF_WIDTH_DAYS:
+            break
+        julian_day -= step
+
+    # Salvaguarda: cercar a raiz ao redor da estimativa e refinar por falsa posição
+    a = guess_julian_day - BRACKET_HALF_WIDTH_DAYS
+    b = guess_julian_day + BRACKET_HALF_WIDTH_DAYS
+    fa, fb = func(a), func(b)
+    if fa * fb > 0:
+        raise ValueError("Retorno solar não encontrado perto da data estimada")
+
+    julian_day = refine_root(func, a, fa, b, fb, tolerance)
+    return {
+        'julian_day': julian_day,
+        'precision': abs(func(julian_day)),
+        'evaluations': func.evaluations
+    }
+
+
+def find_solar_returns(
+    birth_date: datetime,
+    birth_time: str,
+    latitude: float,
+    longitude: float,
+    years: Sequence[int],
+    timezone_name: Optional[str] = None
+) -> List[Dict[str, object]]:
+    """
+    Calcula o instante exato da Revolução Solar para cada ano pedido.
+
+    Args:
+        birth_date: Data de nascimento
+        birth_time: Hora de nascimento no formato "HH:MM" (hora local)
+        latitude: Latitude do local de nascimento
+        longitude: Longitude do local de nascimento
+        years: Anos alvo
+        timezone_name: Nome do timezone. Se None, é inferido das coordenadas
+
+    Returns:
+        Lista (na ordem de years) de dicionários com:
+        - target_year, julian_day
+        - utc_datetime e local_datetime (sem timezone, precisão de segundos)
+        - precision: diferença final do Sol em graus
+        - evaluations: posições do Sol calculadas
+    """
+    if timezone_name is None:
+        from app.services.swiss_ephemeris_calculator import resolve_timezone_name
+        timezone_name = resolve_timezone_name(latitude, longitude)
+    try:
+        tz = pytz.timezone(timezone_name)
+    except Exception:
+        tz = pytz.UTC
+
+    time_parts = birth_time.split(":")
+    hour = int(time_parts[0]) if len(time_parts) > 0 else 0
+    minute = int(time_parts[1]) if len(time_parts) > 1 else 0
+
+    # Mesmo horário local usado pelo mapa natal (a hora informada vale no fuso do local)
+    birth_local = birth_date.replace(hour=hour, minute=minute, second=0, microsecond=0, tzinfo=None)
+    birth_utc = local_to_utc(birth_local, latitude, longitude, tz.zone)
+    natal_julian_day = float(datetimes_to_julian_days([birth_utc])[0])
+    natal_longitude, _ = calculate_body_at_julian_day(natal_julian_day, 'sun')
+
+    returns = []
+    for year in years:
+        guess = natal_julian_day + (year - birth_local.year) * TROPICAL_YEAR_DAYS
+        solution = solve_solar_return(natal_longitude, guess)
+
+        # Arredondar para o segundo mais próximo
+        utc_datetime = (julian_day_to_datetime(solution['julian_day']) + timedelta(microseconds=500_000)).replace(microsecond=0)
+        local_datetime = pytz.UTC.localize(utc_datetime).astimezone(tz).replace(tzinfo=None)
+        returns.append({
+            'target_year': year,
+            'julian_day': solution['julian_day'],
+            'utc_datetime': utc_datetime,
+            'local_datetime': local_datetime,
+            'precision': solution['precision'],
+            'evaluations': solution['evaluations'],
+        })
+
+    return returns
@@ -6,9 +6,12 @@ Este serviço substitui os cálculos aproximados por cálculos precisos usando
 Swiss Ephemeris, que é o padrão ouro para cálculos astrológicos profissionais.
 """
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import pytz
 
+from app.core.metrics import timed_stage
+from app.services.single_flight import SingleFlight
+
 # Importações do kerykeion com tratamento de erro
 try:
     from kerykeion import AstrologicalSubject
@@ -19,11 +22,7 @@ except ImportError:
     AstrologicalSubject = None
     AstrologicalSubjectModel = None
 
-try:
-    from timezonefinder import TimezoneFinder
-    TZ_FINDER = TimezoneFinder()
-except ImportError:
-    TZ_FINDER = None
+from app.services.geo_service import timezone_at
 
 
 # Mapeamento de signos em português
@@ -46,6 +45,9 @@ PLANET_KEYS = {
     "pluto": "Pluto",
 }
 
+# Construções de AstrologicalSubject em andamento (coalescidas por dados de nascimento)
+_kr_flight = SingleFlight("kr_instance")
+
 PLANET_DISPLAY_NAMES = {
     "sun": "Sol",
     "moon": "Lua",
@@ -100,6 +102,28 @@ def shortest_angular_distance(angle1: float, angle2: float) -> float:
     return abs(diff)
 
 
+def resolve_timezone_name(latitude: float, longitude: float) -> str:
+    """
+    Infere o nome do timezone a partir das coordenadas.
+    Usa o serviço de geolocalização (gazetteer + timezonefinder, com cache);
+    senão, aproxima pela longitude.
+    """
+    inferred_tz = timezone_at(latitude, longitude)
+    
+    if inferred_tz:
+        return inferred_tz
+    
+    # Aproximação básica: longitude / 15 = timezone offset
+    # Para produção, isso deve vir do frontend ou de um banco de dados de cidades
+    tz_offset = round(longitude / 15.0)
+    # Limitar a faixa razoável
+    tz_offset = max(-12, min(14, tz_offset))
+    # Criar timezone com UTC offset
+    # Importante: na convenção Etc/GMT o sinal é invertido
+    return f"Etc/GMT{(-tz_offset):+d}"
+
+
+@timed_stage('ephemeris')
 def create_kr_instance(
     birth_date: datetime,
     birth_time: str,
@@ -125,28 +149,9 @@ def create_kr_instance(
     hour = int(time_parts[0]) if len(time_parts) > 0 else 0
     minute = int(time_parts[1]) if len(time_parts) > 1 else 0
     
-    # Se timezone não fornecido, tentar inferir da longitude
+    # Se timezone não fornecido, tentar inferir das coordenadas
     if timezone_name is None:
-        try:
-            if TZ_FINDER:
-                inferred_tz = TZ_FINDER.timezone_at(lat=latitude, lng=longitude)
-            else:
-                inferred_tz = None
-        except Exception:
-            inferred_tz = None
-        
-        if inferred_tz:
-            timezone_name = inferred_tz
-    
-    if timezone_name is None:
-        # Aproximação básica: longitude / 15 = timezone offset
-        # Para produção, isso deve vir do frontend ou de um banco de dados de cidades
-        tz_offset = round(longitude / 15.0)
-        # Limitar a faixa razoável
-        tz_offset = max(-12, min(14, tz_offset))
-        # Criar timezone com UTC offset
-        # Importante: na convenção Etc/GMT o sinal é invertido
-        timezone_name = f"Etc/GMT{(-tz_offset):+d}"
+        timezone_name = resolve_timezone_name(latitude, longitude)
     
     try:
         # Criar timezone
@@ -166,6 +171,23 @@ def create_kr_instance(
     if not KERYKEION_AVAILABLE:
         raise ImportError("kerykeion não está disponível. Instale com: pip install kerykeion")
     
+    # Requisições simultâneas com os mesmos dados compartilham um único cálculo
+    flight_key = (
+        local_datetime.replace(tzinfo=None).isoformat(),
+        round(latitude, 6),
+        round(longitude, 6),
+        timezone_name
+    )
+    return _kr_flight.do(flight_key, _build_kr_model, local_datetime, latitude, longitude, timezone_name)
+
+
+def _build_kr_model(
+    local_datetime: datetime,
+    latitude: float,
+    longitude: float,
+    timezone_name: str
+) -> AstrologicalSubjectModel:
+    """Constrói o AstrologicalSubject e retorna seu modelo interno."""
     # Criar instância AstrologicalSubject (API v5)
     # A classe ainda expõe os mesmos pontos planetários necessários
     subject = AstrologicalSubject(
@@ -217,6 +239,7 @@ def get_planet_position(kr: AstrologicalSubjectModel, planet_key: str) -> Dict[s
     }
 
 
+@timed_stage('ephemeris')
 def calculate_birth_chart(
     birth_date: datetime,
     birth_time: str,
@@ -240,7 +263,11 @@ def calculate_birth_chart(
     """
     # Criar instância kerykeion (fonte única de verdade)
     kr = create_kr_instance(birth_date, birth_time, latitude, longitude, timezone_name)
-    
+    return _chart_from_kr(kr, birth_date, birth_time)
+
+
+def _chart_from_kr(kr: AstrologicalSubjectModel, birth_date: datetime, birth_time: str) -> Dict[str, any]:
+    """Extrai o dicionário do mapa de uma instância kerykeion já calculada."""
     # Dicionário para armazenar todas as longitudes (fonte única)
     planet_longitudes = {}
     
@@ -398,6 +425,7 @@ def calculate_birth_chart(
     return result
 
 
+@timed_stage('ephemeris')
 def calculate_complete_chart_with_houses(
     birth_date: datetime,
     birth_time: str,
@@ -776,6 +804,7 @@ def get_planet_house(kr: AstrologicalSubjectModel, planet_key: str) -> int:
         return 1  # Default
 
 
+@timed_stage('ephemeris')
 def calculate_solar_return(
     birth_date: datetime,
     birth_time: str,
@@ -789,7 +818,8 @@ def calculate_solar_return(
     
     A Revolução Solar é calculada para o momento exato em que o Sol retorna
     à mesma posição do nascimento, mas no ano especificado (ou ano atual).
-    Usa Swiss Ephemeris para máxima precisão e cálculo correto de casas.
+    O instante é resolvido pelo solver da Revolução Solar (precisão de 1 segundo)
+    e apenas o mapa final é construído com kerykeion.
     
     Args:
         birth_date: Data de nascimento
@@ -802,90 +832,63 @@ def calculate_solar_return(
     Returns:
         Dicionário com o mapa de revolução solar completo
     """
-    from datetime import timedelta
-    
     # Usar ano atual se não especificado
     if target_year is None:
         target_year = datetime.now().year
     
-    # Calcular mapa natal para obter posição do Sol
-    natal_chart = calculate_birth_chart(birth_date, birth_time, latitude, longitude, timezone_name)
-    natal_sun_longitude = natal_chart["sun_longitude"]
-    
-    # Encontrar o momento exato do retorno solar
-    # Começar com data aproximada (aniversário)
-    time_parts = birth_time.split(":")
-    hour = int(time_parts[0]) if len(time_parts) > 0 else 0
-    minute = int(time_parts[1]) if len(time_parts) > 1 else 0
-    
-    # Data inicial aproximada
-    solar_return_date = datetime(target_year, birth_date.month, birth_date.day, hour, minute, 0)
+    return calculate_solar_returns(
+        birth_date, birth_time, latitude, longitude, [target_year], timezone_name
+    )[0]
+
+
+@timed_stage('ephemeris')
+def calculate_solar_returns(
+    birth_date: datetime,
+    birth_time: str,
+    latitude: float,
+    longitude: float,
+    years: List[int],
+    timezone_name: Optional[str] = None
+) -> List[Dict[str, any]]:
+    """
+    Calcula os mapas de Revolução Solar de vários anos em uma única chamada.
     
-    # Refinar a data para encontrar o momento exato do retorno solar
-    # O Sol se move aproximadamente 0.9856 graus por dia (~365.25 dias para 360 graus)
-    best_date = solar_return_date
-    best_diff = 360.0
+    Returns:
+        Lista de mapas (mesmo formato de calculate_solar_return) na ordem de years
+    """
+    from app.services.solar_return_solver import find_solar_returns
     
-    # Buscar em um intervalo de ±3 dias
-    for day_offset in range(-3, 4):
-        test_date = solar_return_date + timedelta(days=day_offset)
-        
-        try:
-            # Calcular mapa para esta data de teste
-            test_chart = calculate_birth_chart(
-                test_date, 
-                birth_time, 
-                latitude, 
-                longitude, 
-                timezone_name
-            )
-            test_sun_longitude = test_chart["sun_longitude"]
-            
-            # Calcular diferença angular (considerando que pode ter dado uma volta completa)
-            diff = shortest_angular_distance(test_sun_longitude, natal_sun_longitude)
-            
-            if diff < best_diff:
-                best_diff = diff
-                best_date = test_date
-        except Exception as e:
-            print(f"[WARNING] Erro ao calcular posição solar para {test_date}: {e}")
-            continue
+    if timezone_name is None:
+        timezone_name = resolve_timezone_name(latitude, longitude)
     
-    # Refinar ainda mais com horas (buscar dentro de ±24 horas)
-    final_date = best_date
-    final_diff = best_diff
+    solved_returns = find_solar_returns(
+        birth_date, birth_time, latitude, longitude, years, timezone_name
+    )
+    return [
+        _build_solar_return_chart(solved, latitude, longitude, timezone_name)
+        for solved in solved_returns
+    ]
+
+
+def _build_solar_return_chart(
+    solved: Dict[str, any],
+    latitude: float,
+    longitude: float,
+    timezone_name: str
+) -> Dict[str, any]:
+    """Constrói o mapa completo da Revolução Solar para o instante resolvido."""
+    from datetime import timedelta
     
-    for hour_offset in range(-24, 25):
-        test_date = best_date + timedelta(hours=hour_offset)
-        
-        try:
-            test_chart = calculate_birth_chart(
-                test_date, 
-                birth_time, 
-                latitude, 
-                longitude, 
-                timezone_name
-            )
-            test_sun_longitude = test_chart["sun_longitude"]
-            diff = shortest_angular_distance(test_sun_longitude, natal_sun_longitude)
-            
-            if diff < final_diff:
-                final_diff = diff
-                final_date = test_date
-        except Exception as e:
-            continue
+    final_date = solved["local_datetime"]
+    target_year = solved["target_year"]
     
-    # Calcular mapa completo da revolução solar para o momento exato
-    solar_return_chart = calculate_birth_chart(
-        final_date, 
-        birth_time, 
-        latitude, 
-        longitude, 
-        timezone_name
-    )
+    # kerykeion trabalha com minutos: usar o minuto mais próximo do instante exato
+    chart_date = final_date + timedelta(seconds=30)
+    chart_time = f"{chart_date.hour:02d}:{chart_date.minute:02d}"
     
-    # Criar instância kerykeion para obter casas corretas
-    kr_sr = create_kr_instance(final_date, birth_time, latitude, longitude, timezone_name)
+    # Uma única instância kerykeion para o mapa e as casas
+    kr_sr = create_kr_instance(chart_date, chart_time, latitude, longitude, timezone_name)
+    solar_return_chart = _chart_from_kr(kr_sr, chart_date, chart_time)
     
     # Obter casas dos planetas (kerykeion calcula corretamente)
     planets_to_get_houses = ["sun", "moon", "mercury", "venus", "mars", "jupiter", "saturn"]
@@ -902,6 +905,7 @@ def calculate_solar_return(
     # Construir resultado no formato esperado
     result = {
         "solar_return_date": final_date.isoformat(),
+        "solar_return_utc": solved["utc_datetime"].isoformat(),
         "target_year": target_year,
         
         # Ascendente
@@ -944,7 +948,7 @@ def calculate_solar_return(
         "midheaven_degree": solar_return_chart["midheaven_degree"],
         
         # Informações adicionais para validação
-        "sun_return_precision": final_diff,  # Diferença em graus (deve ser muito pequena)
+        "sun_return_precision": solved["precision"],  # Diferença em graus (deve ser muito pequena)
         "planet_longitudes": solar_return_chart.get("planet_longitudes", {}),
     }
     
@@ -11,6 +11,8 @@ from app.services.astrology_calculator import (
     get_zodiac_sign,
     ZODIAC_SIGNS
 )
+from app.services.slow_planet_table import lookup_positions
+from app.services.aspect_event_solver import ASPECT_TARGETS, find_aspect_window
 
 
 def calculate_aspect_angle(angle1: float, angle2: float) -> float:
@@ -54,127 +56,19 @@ def find_aspect_start_end_dates(
     """
     Encontra as datas de início e fim de um aspecto.
     Retorna (start_date, end_date) ou (None, None) se não encontrar.
-    Versão otimizada com menos cálculos para evitar timeout.
+    
+    Usa o solver de eventos (busca de raízes na separação angular), com
+    precisão de minutos e suporte a múltiplas passagens por retrogradação.
+    Os observadores são mantidos por compatibilidade: o cálculo é geocêntrico.
     """
     if check_date is None:
         check_date = datetime.now()
     
-    # Definir ângulo alvo do aspecto
-    aspect_targets = {
-        'conjunção': 0,
-        'sextil': 60,
-        'quadratura': 90,
-        'trígono': 120,
-        'oposição': 180
-    }
-    target_angle = aspect_targets.get(aspect_type)
-    if target_angle is None:
+    if aspect_type not in ASPECT_TARGETS:
         return (None, None)
     
-    # Para evitar timeout, usar estimativas mais simples para planetas muito lentos
-    # Plutão e Netuno se movem muito devagar, então usar estimativas
-    if slow_planet in ['pluto', 'neptune']:
-        # Para planetas muito lentos, usar estimativas baseadas no tipo de aspecto
-        duration_days = {
-            'conjunção': 60,
-            'sextil': 40,
-            'quadratura': 50,
-            'trígono': 40,
-            'oposição': 60
-        }
-        estimated_duration = duration_days.get(aspect_type, 50)
-        start_date = check_date - timedelta(days=estimated_duration // 2)
-        end_date = check_date + timedelta(days=estimated_duration // 2)
-        return (start_date, end_date)
-    
-    # Buscar data de início (quando entra no orbe) - buscar 30 dias para trás com intervalo maior
-    start_date = None
-    search_date = check_date - timedelta(days=30)
-    search_interval = timedelta(days=2)  # Intervalo maior para ser mais rápido
-    
-    prev_angle = None
-    iterations = 0
-    max_iterations = 30  # Limitar iterações para evitar loops infinitos
-    
-    while search_date <= check_date and iterations < max_iterations:
-        try:
-            temp_observer = ephem.Observer()
-            temp_observer.lat = transit_observer.lat
-            temp_observer.lon = transit_observer.lon
-            temp_observer.date = search_date.strftime('%Y/%m/%d %H:%M:%S')
-            
-            transit_longitude = calculate_planet_position(temp_observer, slow_planet)
-            angle = calculate_aspect_angle(transit_longitude, natal_longitude)
-            angle_diff = abs(angle - target_angle)
-            
-            # Se está dentro do orbe agora e não estava antes, encontramos o início
-            if angle_diff <= orb:
-                if prev_angle is not None and abs(prev_angle - target_angle) > orb:
-                    start_date = search_date
-                    break
-                elif start_date is None:
-                    start_date = search_date
-            
-            prev_angle = angle
-            search_date += search_interval
-            iterations += 1
-        except Exception as e:
-            search_date += search_interval
-            iterations += 1
-            continue
-    
-    # Buscar data de fim (quando sai do orbe) - buscar 60 dias para frente com intervalo maior
-    end_date = None
-    search_date = check_date
-    max_search = check_date + timedelta(days=60)
-    
-    prev_angle = None
-    was_in_orb = False
-    iterations = 0
-    max_iterations = 30  # Limitar iterações
-    
-    while search_date <= max_search and iterations < max_iterations:
-        try:
-            temp_observer = ephem.Observer()
-            temp_observer.lat = transit_observer.lat
-            temp_observer.lon = transit_observer.lon
-            temp_observer.date = search_date.strftime('%Y/%m/%d %H:%M:%S')
-            
-            transit_longitude = calculate_planet_position(temp_observer, slow_planet)
-            angle = calculate_aspect_angle(transit_longitude, natal_longitude)
-            angle_diff = abs(angle - target_angle)
-            
-            # Se estava dentro do orbe e agora saiu, encontramos o fim
-            if was_in_orb and angle_diff > orb:
-                end_date = search_date
-                break
-            
-            if angle_diff <= orb:
-                was_in_orb = True
-            else:
-                was_in_orb = False
-            
-            search_date += search_interval
-            iterations += 1
-        except Exception as e:
-            search_date += search_interval
-            iterations += 1
-            continue
-    
-    # Se não encontrou fim, estimar baseado no tipo de aspecto
-    if start_date and not end_date:
-        # Estimativas baseadas na velocidade dos planetas lentos
-        duration_days = {
-            'conjunção': 30,
-            'sextil': 20,
-            'quadratura': 25,
-            'trígono': 20,
-            'oposição': 30
-        }
-        estimated_duration = duration_days.get(aspect_type, 30)
-        end_date = start_date + timedelta(days=estimated_duration)
-    
-    return (start_date, end_date)
+    window = find_aspect_window(slow_planet, natal_longitude, aspect_type, check_date, orb=orb)
+    return (window['start_date'], window['end_date'])
 
 
 def calculate_future_transits(
@@ -305,6 +199,16 @@ def calculate_future_transits(
     current_date = today
     check_interval = timedelta(days=7)
     
+    # Posições semanais dos planetas lentos (matriz semana × planeta), lidas da
+    # tabela pré-computada quando disponível
+    scan_dates = []
+    scan_date = today
+    while scan_date <= end_date:
+        scan_dates.append(scan_date)
+        scan_date += check_interval
+    scan_positions, _ = lookup_positions(scan_dates, slow_planets)
+    scan_index = 0
+    
     while current_date <= end_date and len(transits) < max_transits * 2:  # Buscar mais para filtrar depois
         # Criar observador para a data atual
         transit_observer = ephem.Observer()
@@ -315,10 +219,13 @@ def calculate_future_transits(
         utc_date = current_date
         transit_observer.date = utc_date.strftime('%Y/%m/%d %H:%M:%S')
         
+        week_positions = scan_positions[scan_index]
+        scan_index += 1
+        
         # Verificar trânsitos de planetas lentos
-        for slow_planet in slow_planets:
+        for planet_index, slow_planet in enumerate(slow_planets):
             try:
-                transit_longitude = calculate_planet_position(transit_observer, slow_planet)
+                transit_longitude = float(week_positions[planet_index])
                 
                 # Verificar aspectos com planetas e pontos do mapa natal
                 for natal_point, natal_name in natal_points.items():
@@ -362,26 +269,26 @@ def calculate_future_transits(
                             transit_type = 'saturn-return'
                         
                         if is_significant:
-                            # Calcular datas de início e fim do aspecto
+                            # Calcular datas de início, fim e passagens exatas do aspecto
                             # Usar try/except para evitar que erros quebrem o cálculo
                             start_date = current_date
                             end_date = current_date
+                            exact_dates = []
                             
                             try:
-                                calculated_start, calculated_end = find_aspect_start_end_dates(
-                                    birth_observer,
-                                    transit_observer,
+                                window = find_aspect_window(
                                     slow_planet,
                                     natal_longitude,
                                     aspect_type,
-                                    orb=8.0,
-                                    check_date=current_date
+                                    current_date,
+                                    orb=8.0
                                 )
                                 
-                                if calculated_start:
-                                    start_date = calculated_start
-                                if calculated_end:
-                                    end_date = calculated_end
+                                if window['start_date']:
+                                    start_date = window['start_date']
+                                if window['end_date']:
+                                    end_date = window['end_date']
+                                exact_dates = window['exact_dates']
                             except Exception as e:
                                 print(f"[WARNING] Erro ao calcular datas de aspecto: {e}")
                                 # Usar estimativas se houver erro
@@ -484,6 +391,7 @@ def calculate_future_transits(
                                 'natal_sign': natal_sign_data['sign'],
                                 'transit_sign': transit_sign_data['sign'],
                                 'angle': angle,
+                                'exact_dates': [d.isoformat() for d in exact_dates],
                                 'title': title,
                                 'description': description,
                                 'is_active': start_date <= today <= end_date  # Ativo se hoje está entre início e fim
@@ -0,0 +1,279 @@
+"""
+Calendário da Lua Fora de Curso (Void of Course) - Baseado em Eventos.
+
+A Lua Fora de Curso é geocêntrica: não depende do local do usuário. Por isso
+os períodos são calculados uma única vez e guardados em uma tabela de
+intervalos compartilhada por todas as requisições; cada consulta vira uma
+busca binária.
+
+Para cada passagem da Lua por um signo (ingresso → ingresso):
+1. Ingressos exatos: raiz de longitude_Lua(t) - 30°·k por Newton
+2. Aspectos exatos (conjunção, sextil, quadratura, trígono, oposição) com os
+   planetas de Sol a Plutão: a separação Lua - planeta cresce sempre (a Lua é
+   mais rápida que qualquer planeta, mesmo retrógrado), então os ângulos
+   cruzados no signo são conhecidos de antemão e cada um é refinado por Newton
+3. Período fora de curso: do último aspecto exato até o ingresso seguinte
+   (o signo inteiro, se a Lua não fizer nenhum aspecto nele)
+
+Precisão: 1 segundo.
+"""
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import math
+import threading
+
+from app.services.aspect_event_solver import ASPECT_TARGETS
+from app.services.ephemeris_batch_engine import (
+    calculate_body_at_julian_day,
+    datetimes_to_julian_days,
+    julian_day_to_datetime,
+)
+
+
+# Planetas considerados nos aspectos da Lua
+VOC_PLANETS = [
+    'sun', 'mercury', 'venus', 'mars', 'jupiter',
+    'saturn', 'uranus', 'neptune', 'pluto'
+]
+
+# Separações Lua - planeta (0-360°) que formam aspecto maior, com o nome do aspecto
+ASPECT_SEPARATIONS = sorted({
+    (side * angle) % 360: name
+    for name, angle in ASPECT_TARGETS.items()
+    for side in (1, -1)
+}.items())
+
+# Precisão dos eventos: 1 segundo (em dias)
+VOC_EVENT_TOLERANCE_DAYS = 1.0 / 86400.0
+
+MAX_NEWTON_ITERATIONS = 20
+
+# O calendário é estendido em blocos (em dias) além do intervalo pedido
+CALENDAR_CHUNK_DAYS = 31
+
+# Consultas mais distantes que isso da cobertura atual recriam o calendário
+CALENDAR_MAX_GAP_DAYS = 366
+
+
+def _wrap180(angle: float) -> float:
+    """Normaliza um ângulo para o intervalo [-180, 180)."""
+    return (angle + 180.0) % 360.0 - 180.0
+
+
+def _to_julian_day(instant: datetime) -> float:
+    return float(datetimes_to_julian_days([instant])[0])
+
+
+def to_utc_datetime(julian_day: float) -> datetime:
+    """Data juliana → datetime UTC sem timezone, arredondado ao segundo."""
+    return (julian_day_to_datetime(julian_day) + timedelta(microseconds=500_000)).replace(microsecond=0)
+
+
+def _moon_offset(julian_day: float, target: float, planet: Optional[str]) -> Tuple[float, float]:
+    """Distância (Lua - planeta - alvo) em graus e sua velocidade em graus/dia."""
+    moon_longitude, moon_speed = calculate_body_at_julian_day(julian_day, 'moon')
+    planet_longitude, planet_speed = (0.0, 0.0)
+    if planet is not None:
+        planet_longitude, planet_speed = calculate_body_at_julian_day(julian_day, planet)
+    return _wrap180(moon_longitude - planet_longitude - target), moon_speed - planet_speed
+
+
+def solve_moon_event(
+    target: float,
+    guess_julian_day: float,
+    planet: Optional[str] = None,
+    tolerance: float = VOC_EVENT_TOLERANCE_DAYS
+) -> float:
+    """
+    Instante em que a Lua atinge a longitude alvo (planet=None) ou a separação
+    alvo em relação a um planeta, perto da estimativa (Newton).
+    """
+    julian_day = guess_julian_day
+    for _ in range(MAX_NEWTON_ITERATIONS):
+        offset, speed = _moon_offset(julian_day, target, planet)
+        step = offset / speed
+        julian_day -= step
+        if abs(step) <= tolerance:
+            break
+    return julian_day
+
+
+def find_next_ingress(julian_day: float) -> float:
+    """Próximo ingresso da Lua em um signo, estritamente depois de julian_day."""
+    start = julian_day
+    for _ in range(3):
+        longitude, speed = calculate_body_at_julian_day(start, 'moon')
+        boundary = (math.floor(longitude / 30.0) + 1) * 30.0 % 360.0
+        guess = start + ((boundary - longitude) % 360.0) / speed
+        ingress = solve_moon_event(boundary, guess)
+        if ingress > julian_day + VOC_EVENT_TOLERANCE_DAYS:
+            return ingress
+        # julian_day já era um ingresso (longitude no limite do signo)
+        start = julian_day + 60 * VOC_EVENT_TOLERANCE_DAYS
+    return ingress
+
+
+def find_previous_ingress(ingress_julian_day: float) -> float:
+    """Ingresso anterior a um ingresso conhecido."""
+    longitude, speed = calculate_body_at_julian_day(ingress_julian_day, 'moon')
+    boundary = (round(longitude / 30.0) * 30.0 - 30.0) % 360.0
+    return solve_moon_event(boundary, ingress_julian_day - 30.0 / speed)
+
+
+def find_moon_aspects(start_julian_day: float, end_julian_day: float) -> List[Tuple[float, str, str]]:
+    """
+    Aspectos exatos da Lua com os planetas dentro de (início, fim].
+
+    Returns:
+        Lista ordenada de (data juliana, planeta, aspecto)
+    """
+    span = end_julian_day - start_julian_day
+    events = []
+    for planet in VOC_PLANETS:
+        separation_start, _ = _moon_offset(start_julian_day, 0.0, planet)
+        separation_end, _ = _moon_offset(end_julian_day, 0.0, planet)
+        separation_start %= 360.0
+        advance = (separation_end - separation_start) % 360.0
+        if advance <= 0:
+            continue
+
+        for separation, aspect in ASPECT_SEPARATIONS:
+            distance = (separation - separation_start) % 360.0
+            if 0 < distance <= advance:
+                guess = start_julian_day + span * distance / advance
+                julian_day = solve_moon_event(separation, guess, planet)
+                julian_day = min(max(julian_day, start_julian_day), end_julian_day)
+                events.append((julian_day, planet, aspect))
+
+    events.sort()
+    return events
+
+
+def _sign_name(longitude: float) -> str:
+    from app.services.astrology_calculator import get_zodiac_sign
+    return get_zodiac_sign(longitude % 360.0)['sign']
+
+
+def build_sign_passage(ingress_julian_day: float, next_ingress_julian_day: float) -> Dict[str, object]:
+    """Passagem da Lua por um signo: aspectos exatos e período fora de curso."""
+    aspects = find_moon_aspects(ingress_julian_day, next_ingress_julian_day)
+    moon_longitude, _ = calculate_body_at_julian_day(
+        (ingress_julian_day + next_ingress_julian_day) / 2.0, 'moon'
+    )
+    void_start = aspects[-1][0] if aspects else ingress_julian_day
+    return {
+        'ingress': ingress_julian_day,
+        'void_start': void_start,
+        'void_end': next_ingress_julian_day,
+        'aspects': aspects,
+        'moon_sign': _sign_name(moon_longitude),
+        'next_sign': _sign_name(moon_longitude + 30.0),
+    }
+
+
+class VoidOfCourseCalendar:
+    """
+    Tabela de intervalos com as passagens da Lua pelos signos, estendida sob
+    demanda e compartilhada entre requisições (thread-safe).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._ingresses: List[float] = []
+        self._passages: List[Dict[str, object]] = []
+        self._stats = {'lookups': 0, 'passages_computed': 0, 'resets': 0}
+
+    def _extend(self, start_julian_day: float, end_julian_day: float) -> None:
+        """Garante a cobertura de [início, fim]. Requer _lock."""
+        if self._ingresses and (
+            start_julian_day > self._ingresses[-1] + CALENDAR_MAX_GAP_DAYS
+            or end_julian_day < self._ingresses[0] - CALENDAR_MAX_GAP_DAYS
+        ):
+            self._ingresses, self._passages = [], []
+            self._stats['resets'] += 1
+
+        if not self._ingresses:
+            self._ingresses.append(find_next_ingress(start_julian_day))
+
+        if self._ingresses[0] > start_julian_day:
+            target = start_julian_day - CALENDAR_CHUNK_DAYS
+            ingresses, passages = [self._ingresses[0]], []
+            while ingresses[-1] > target:
+                previous = find_previous_ingress(ingresses[-1])
+                passages.append(build_sign_passage(previous, ingresses[-1]))
+                ingresses.append(previous)
+            self._ingresses[:0] = ingresses[:0:-1]
+            self._passages[:0] = passages[::-1]
+            self._stats['passages_computed'] += len(passages)
+
+        if self._ingresses[-1] <= end_julian_day:
+            target = end_julian_day + CALENDAR_CHUNK_DAYS
+            while self._ingresses[-1] <= target:
+                following = find_next_ingress(self._ingresses[-1])
+                self._passages.append(build_sign_passage(self._ingresses[-1], following))
+                self._ingresses.append(following)
+                self._stats['passages_computed'] += 1
+
+    def _passage_index(self, julian_day: float) -> int:
+        """Índice da passagem que contém julian_day (ingresso <= t < próximo). Requer _lock."""
+        self._extend(julian_day, julian_day)
+        return bisect_right(self._ingresses, julian_day) - 1
+
+    def sign_passage(self, instant: datetime) -> Dict[str, object]:
+        """Passagem da Lua pelo signo no instante (datas em datas julianas)."""
+        julian_day = _to_julian_day(instant)
+        with self._lock:
+            self._stats['lookups'] += 1
+            return self._passages[self._passage_index(julian_day)]
+
+    def void_periods(self, start: datetime, end: datetime) -> List[Dict[str, object]]:
+        """Períodos fora de curso que se sobrepõem a [início, fim]."""
+        start_julian_day, end_julian_day = _to_julian_day(start), _to_julian_day(end)
+        with self._lock:
+            self._stats['lookups'] += 1
+            self._extend(start_julian_day, end_julian_day)
+            first = max(0, bisect_right(self._ingresses, start_julian_day) - 1)
+            last = bisect_right(self._ingresses, end_julian_day)
+            return [
+                format_void_period(passage)
+                for passage in self._passages[first:last]
+                if passage['void_end'] > start_julian_day and passage['void_start'] < end_julian_day
+            ]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['passages'] = len(self._passages)
+            return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ingresses, self._passages = [], []
+
+
+def format_void_period(passage: Dict[str, object]) -> Dict[str, object]:
+    """Período fora de curso de uma passagem, com datas UTC e o último aspecto."""
+    last_aspect = passage['aspects'][-1] if passage['aspects'] else None
+    return {
+        'start': to_utc_datetime(passage['void_start']),
+        'end': to_utc_datetime(passage['void_end']),
+        'moon_sign': passage['moon_sign'],
+        'next_sign': passage['next_sign'],
+        'last_aspect_planet': last_aspect[1] if last_aspect else None,
+        'last_aspect': last_aspect[2] if last_aspect else None,
+    }
+
+
+_calendar: Optional[VoidOfCourseCalendar] = None
+_calendar_lock = threading.Lock()
+
+
+def get_void_of_course_calendar() -> VoidOfCourseCalendar:
+    """Calendário compartilhado do processo."""
+    global _calendar
+    if _calendar is None:
+        with _calendar_lock:
+            if _calendar is None:
+                _calendar = VoidOfCourseCalendar()
+    return _calendar
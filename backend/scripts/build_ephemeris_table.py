@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Script para gerar a tabela pré-computada de planetas lentos (Júpiter a Plutão).
+Execute no build da imagem ou após atualizar os arquivos do Swiss Ephemeris.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Adicionar o diretório backend ao path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.services.slow_planet_table import (
+    SLOW_PLANETS,
+    TABLE_END,
+    TABLE_START,
+    build_slow_planet_table,
+    verify_slow_planet_table,
+)
+
+
+def build_table():
+    """Gera a tabela diária e informa o tamanho final."""
+    print("=" * 60)
+    print("GERANDO TABELA DE PLANETAS LENTOS")
+    print("=" * 60)
+    print(f"   Planetas: {', '.join(SLOW_PLANETS)}")
+    print(f"   Intervalo: {TABLE_START.date()} a {TABLE_END.date()}")
+
+    started = time.time()
+    try:
+        table_path = build_slow_planet_table()
+    except Exception as e:
+        print(f"\n❌ Erro ao gerar tabela: {e}")
+        return False
+
+    try:
+        table = verify_slow_planet_table(table_path.parent)
+    except Exception as e:
+        print(f"\n❌ Tabela gerada é inválida: {e}")
+        return False
+
+    size_mb = table_path.stat().st_size / (1024 * 1024)
+    print(f"\n✅ Tabela salva e verificada em {table_path} ({size_mb:.1f} MB)")
+    print(f"   Formato: {table.table.shape}")
+    print(f"   Tempo: {time.time() - started:.1f}s")
+    return True
+
+
+if __name__ == "__main__":
+    success = build_table()
+    sys.exit(0 if success else 1)
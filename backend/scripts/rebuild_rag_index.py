@@ -2,8 +2,15 @@
 """
 Script para reconstruir o índice RAG incluindo documentos de numerologia.
 Execute este script após adicionar novos PDFs de numerologia ou astrologia.
+
+Por padrão a reconstrução é incremental: só os arquivos novos ou alterados
+(manifest.json no índice) são extraídos e têm embeddings gerados.
+    python scripts/rebuild_rag_index.py              # incremental
+    python scripts/rebuild_rag_index.py --full       # todos os arquivos
+    python scripts/rebuild_rag_index.py --workers 4  # processos de extração
 """
 
+import argparse
 import sys
 from pathlib import Path
 
@@ -13,8 +20,8 @@ sys.path.insert(0, str(backend_path))
 
 from app.services.rag_service_fastembed import get_rag_service
 
-def rebuild_index():
-    """Reconstrói o índice RAG processando todos os documentos."""
+def rebuild_index(full: bool = False, workers: int = None):
+    """Reconstrói o índice RAG processando os documentos novos ou alterados (ou todos, com full)."""
     print("=" * 60)
     print("RECONSTRUINDO ÍNDICE RAG")
     print("=" * 60)
@@ -28,7 +35,7 @@ def rebuild_index():
         print("      - Pasta numerologia/ (numerologia)")
         print("      - Pasta tarot/ (numerologia - conexão tarot-numerologia)")
         
-        num_chunks = rag_service.process_all_documents()
+        num_chunks = rag_service.process_all_documents(incremental=not full, workers=workers)
         
         if num_chunks == 0:
             print("\n⚠️  Nenhum documento processado!")
@@ -74,6 +81,10 @@ def rebuild_index():
         return False
 
 if __name__ == "__main__":
-    success = rebuild_index()
+    parser = argparse.ArgumentParser(description="Reconstrói o índice RAG")
+    parser.add_argument("--full", action="store_true", help="Reprocessar todos os arquivos (ignorar o manifesto)")
+    parser.add_argument("--workers", type=int, default=None, help="Processos de extração (padrão: RAG_INGEST_WORKERS ou CPUs)")
+    args = parser.parse_args()
+    success = rebuild_index(full=args.full, workers=args.workers)
     sys.exit(0 if success else 1)
 
@@ -0,0 +1 @@
+"""Benchmark dos caminhos quentes (cálculo, RAG e montagem de prompt)."""
@@ -0,0 +1,6 @@
+import sys
+
+from tests.benchmarks.runner import main
+
+
+sys.exit(main())
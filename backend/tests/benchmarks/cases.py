@@ -0,0 +1,157 @@
+"""
+Casos do benchmark: caminhos quentes de cálculo, busca (RAG) e montagem de prompt.
+
+Cada caso recebe entradas fixas e devolve a função medida (sem argumentos).
+A preparação (mapas de entrada, índice sintético) fica fora da medição.
+"""
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict
+from unittest.mock import patch
+
+import numpy as np
+
+
+# Entradas fixas (mesmo mapa em todos os casos)
+BIRTH_DATE = datetime(1990, 5, 15)
+BIRTH_TIME = "10:30"
+LATITUDE, LONGITUDE = -23.5505, -46.6333
+TIMEZONE = "America/Sao_Paulo"
+FULL_NAME = "Ana Luíza Ferreira"
+CHECK_DATE = datetime(2025, 12, 5, 14, 37)
+SOLAR_RETURN_YEAR = 2025
+
+# Índice sintético do RAG (sem download do modelo BGE)
+RAG_DOCUMENTS = 5000
+RAG_DIMENSION = 384
+RAG_QUERIES = [
+    "Sol em Touro na casa 11",
+    "Lua em Leão na casa 2",
+    "Ascendente em Câncer",
+    "Saturno em quadratura com o Sol",
+    "Número do destino 7",
+]
+
+
+class SkipBenchmark(Exception):
+    """O caso não pode rodar neste ambiente (dependência ausente)."""
+
+
+def bench_calculate_birth_chart() -> Callable[[], object]:
+    from app.services.swiss_ephemeris_calculator import calculate_birth_chart
+    return lambda: calculate_birth_chart(BIRTH_DATE, BIRTH_TIME, LATITUDE, LONGITUDE, TIMEZONE)
+
+
+def bench_calculate_complete_chart_with_houses() -> Callable[[], object]:
+    from app.services.swiss_ephemeris_calculator import calculate_complete_chart_with_houses
+    return lambda: calculate_complete_chart_with_houses(BIRTH_DATE, BIRTH_TIME, LATITUDE, LONGITUDE, TIMEZONE)
+
+
+def bench_calculate_future_transits() -> Callable[[], object]:
+    from app.services.transits_calculator import calculate_future_transits
+    return lambda: calculate_future_transits(BIRTH_DATE, BIRTH_TIME, LATITUDE, LONGITUDE, months_ahead=24, max_transits=10)
+
+
+def bench_calculate_best_timing() -> Callable[[], object]:
+    from app.services.best_timing_calculator import calculate_best_timing
+    return lambda: calculate_best_timing('pedir_aumento', BIRTH_DATE, BIRTH_TIME, LATITUDE, LONGITUDE, days_ahead=30)
+
+
+def bench_calculate_best_timing_all() -> Callable[[], object]:
+    from app.services.best_timing_calculator import calculate_best_timing_all
+    return lambda: calculate_best_timing_all(BIRTH_DATE, BIRTH_TIME, LATITUDE, LONGITUDE, days_ahead=30, interval_hours=1)
+
+
+def bench_calculate_moon_void_of_course() -> Callable[[], object]:
+    from app.services.moon_void_calculator import calculate_moon_void_of_course
+    return lambda: calculate_moon_void_of_course(check_date=CHECK_DATE, latitude=LATITUDE, longitude=LONGITUDE)
+
+
+def bench_calculate_moon_void_of_course_cold() -> Callable[[], object]:
+    """Lua Fora de Curso com o calendário compartilhado vazio (primeira requisição)."""
+    from app.services.moon_void_calculator import calculate_moon_void_of_course
+    from app.services.void_of_course_calendar import get_void_of_course_calendar
+
+    calendar = get_void_of_course_calendar()
+
+    def run():
+        calendar.clear()
+        return calculate_moon_void_of_course(check_date=CHECK_DATE, latitude=LATITUDE, longitude=LONGITUDE)
+    return run
+
+
+def bench_calculate_solar_return() -> Callable[[], object]:
+    from app.services.swiss_ephemeris_calculator import calculate_solar_return
+    return lambda: calculate_solar_return(BIRTH_DATE, BIRTH_TIME, LATITUDE, LONGITUDE, SOLAR_RETURN_YEAR, TIMEZONE)
+
+
+class _HashEmbeddingModel:
+    """Modelo de embeddings determinístico (vetor pseudoaleatório por texto)."""
+
+    def embed(self, texts):
+        for text in texts:
+            seed = sum(ord(c) * (i + 1) for i, c in enumerate(text))
+            yield np.random.default_rng(seed).normal(size=RAG_DIMENSION).astype(np.float32)
+
+
+def _synthetic_rag_service():
+    from app.services import rag_service_fastembed
+    from app.services.rag_service_fastembed import RAGServiceFastEmbed, _normalize_rows
+
+    if not rag_service_fastembed.HAS_FASTEMBED:
+        raise SkipBenchmark("FastEmbed não instalado")
+
+    # Construir sem carregar o modelo BGE
+    with patch.object(rag_service_fastembed, 'HAS_FASTEMBED', False):
+        service = RAGServiceFastEmbed(docs_path="docs", index_path="benchmark_rag_index")
+
+    rng = np.random.default_rng(42)
+    service.embeddings_matrix = _normalize_rows(
+        rng.normal(size=(RAG_DOCUMENTS, RAG_DIMENSION)).astype(np.float32)
+    )
+    service.embeddings_normalized = True
+    service.documents = [
+        {
+            'text': f"Trecho sintético {i}",
+            'source': f"livro_{i % 40}.pdf",
+            'page': i % 300,
+            'category': 'numerology' if i % 5 == 0 else 'astrology',
+        }
+        for i in range(RAG_DOCUMENTS)
+    ]
+    service.embedding_model = _HashEmbeddingModel()
+    return service
+
+
+def bench_rag_search() -> Callable[[], object]:
+    service = _synthetic_rag_service()
+    return lambda: [service.search(query, top_k=8) for query in RAG_QUERIES]
+
+
+def bench_create_precomputed_data_block() -> Callable[[], object]:
+    from app.services.precomputed_chart_engine import create_precomputed_data_block
+    from app.services.swiss_ephemeris_calculator import calculate_birth_chart
+
+    chart_data = calculate_birth_chart(BIRTH_DATE, BIRTH_TIME, LATITUDE, LONGITUDE, TIMEZONE)
+    return lambda: create_precomputed_data_block(chart_data, 'pt')
+
+
+def bench_calculate_full_numerology_map() -> Callable[[], object]:
+    from app.services.numerology_calculator import NumerologyCalculator
+    return lambda: NumerologyCalculator.calculate_full_numerology_map(FULL_NAME, BIRTH_DATE)
+
+
+# Registro dos casos (nome no JSON → preparação)
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = OrderedDict([
+    ('calculate_birth_chart', bench_calculate_birth_chart),
+    ('calculate_complete_chart_with_houses', bench_calculate_complete_chart_with_houses),
+    ('calculate_future_transits', bench_calculate_future_transits),
+    ('calculate_best_timing', bench_calculate_best_timing),
+    ('calculate_best_timing_all', bench_calculate_best_timing_all),
+    ('calculate_moon_void_of_course', bench_calculate_moon_void_of_course),
+    ('calculate_moon_void_of_course_cold', bench_calculate_moon_void_of_course_cold),
+    ('calculate_solar_return', bench_calculate_solar_return),
+    ('rag_search', bench_rag_search),
+    ('create_precomputed_data_block', bench_create_precomputed_data_block),
+    ('calculate_full_numerology_map', bench_calculate_full_numerology_map),
+])
@@ -0,0 +1,197 @@
+"""
+Executor do benchmark: mede os casos, grava JSON e compara duas execuções.
+
+Uso (a partir de backend/):
+    python -m tests.benchmarks run                       # grava benchmark_results/<commit>.json
+    python -m tests.benchmarks run -k best_timing --rounds 3
+    python -m tests.benchmarks compare antes.json depois.json --threshold 0.10
+
+O compare sai com código 1 se algum caso ficar mais lento que o limite
+(mediana por padrão), para uso em CI entre commits.
+"""
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+
+BACKEND_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_RESULTS_DIR = BACKEND_ROOT / "benchmark_results"
+
+DEFAULT_ROUNDS = 7
+# Cada rodada repete a função até durar ao menos isso (em segundos)
+DEFAULT_MIN_ROUND_TIME = 0.05
+DEFAULT_THRESHOLD = 0.10
+RESULT_METRICS = ('min', 'median', 'mean')
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def measure(func: Callable[[], object], rounds: int = DEFAULT_ROUNDS, min_round_time: float = DEFAULT_MIN_ROUND_TIME) -> Dict[str, Any]:
+    """
+    Mede uma função: 1 aquecimento (caches do processo), 1 chamada para
+    calibrar as repetições por rodada e `rounds` rodadas. Tempos por chamada,
+    em segundos.
+    """
+    func()
+    started = time.perf_counter()
+    func()
+    single = max(time.perf_counter() - started, 1e-9)
+    number = max(1, int(min_round_time / single))
+
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - started) / number)
+
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'rounds': rounds,
+        'number': number,
+    }
+
+
+def run_suite(
+    benchmarks: Dict[str, Callable[[], Callable[[], object]]],
+    selection: Optional[str] = None,
+    rounds: int = DEFAULT_ROUNDS,
+    min_round_time: float = DEFAULT_MIN_ROUND_TIME
+) -> Dict[str, Any]:
+    """Executa os casos (filtrados por substring) e retorna o documento JSON."""
+    from tests.benchmarks.cases import SkipBenchmark
+
+    results, skipped = {}, {}
+    for name, setup in benchmarks.items():
+        if selection and selection not in name:
+            continue
+        try:
+            func = setup()
+        except SkipBenchmark as e:
+            skipped[name] = str(e)
+            print(f"[BENCHMARK] {name}: ignorado ({e})")
+            continue
+        results[name] = measure(func, rounds, min_round_time)
+        print(f"[BENCHMARK] {name}: mediana {results[name]['median'] * 1000:.3f} ms "
+              f"({results[name]['rounds']}×{results[name]['number']})")
+
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+        },
+        'benchmarks': results,
+        'skipped': skipped,
+    }
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    metric: str = 'median',
+    threshold: float = DEFAULT_THRESHOLD
+) -> List[Dict[str, Any]]:
+    """
+    Compara dois documentos de resultados, caso a caso.
+
+    Returns:
+        Lista com name, baseline, current, ratio e status
+        ('regression', 'improvement', 'ok', 'new' ou 'missing')
+    """
+    before, after = baseline.get('benchmarks', {}), current.get('benchmarks', {})
+    rows = []
+    for name in list(before) + [n for n in after if n not in before]:
+        if name not in after:
+            rows.append({'name': name, 'baseline': before[name][metric], 'current': None, 'ratio': None, 'status': 'missing'})
+            continue
+        if name not in before:
+            rows.append({'name': name, 'baseline': None, 'current': after[name][metric], 'ratio': None, 'status': 'new'})
+            continue
+
+        ratio = after[name][metric] / before[name][metric] if before[name][metric] > 0 else float('inf')
+        if ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 - threshold:
+            status = 'improvement'
+        else:
+            status = 'ok'
+        rows.append({'name': name, 'baseline': before[name][metric], 'current': after[name][metric], 'ratio': ratio, 'status': status})
+    return rows
+
+
+def _format_ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value * 1000:.3f}"
+
+
+def _print_comparison(rows: List[Dict[str, Any]], baseline: Dict[str, Any], current: Dict[str, Any], metric: str) -> None:
+    print(f"Comparando {baseline['meta'].get('commit')} → {current['meta'].get('commit')} ({metric}, ms)")
+    width = max([len(row['name']) for row in rows] + [4])
+    print(f"{'caso':<{width}}  {'antes':>12}  {'depois':>12}  {'razão':>7}  status")
+    for row in rows:
+        ratio = "-" if row['ratio'] is None else f"{row['ratio']:.2f}x"
+        flag = "⚠️ " if row['status'] == 'regression' else ""
+        print(f"{row['name']:<{width}}  {_format_ms(row['baseline']):>12}  {_format_ms(row['current']):>12}  "
+              f"{ratio:>7}  {flag}{row['status']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks", description="Benchmark dos caminhos quentes do backend")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Executa os casos e grava o JSON")
+    run_parser.add_argument("-k", dest="selection", help="Executa apenas casos cujo nome contém o texto")
+    run_parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS)
+    run_parser.add_argument("--min-round-time", type=float, default=DEFAULT_MIN_ROUND_TIME)
+    run_parser.add_argument("-o", "--output", help="Arquivo de saída (padrão: benchmark_results/<commit>.json)")
+
+    compare_parser = subparsers.add_parser("compare", help="Compara duas execuções e aponta regressões")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--metric", choices=RESULT_METRICS, default="median")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="Aumento relativo tolerado (0.10 = 10%%)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        from tests.benchmarks.cases import BENCHMARKS
+        document = run_suite(BENCHMARKS, args.selection, args.rounds, args.min_round_time)
+        output = Path(args.output) if args.output else DEFAULT_RESULTS_DIR / f"{document['meta']['commit']}.json"
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2, ensure_ascii=False)
+        print(f"[BENCHMARK] Resultados salvos em {output}")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+    rows = compare_results(baseline, current, args.metric, args.threshold)
+    _print_comparison(rows, baseline, current, args.metric)
+    return 1 if any(row['status'] == 'regression' for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -73,6 +73,15 @@ def reset_environment(monkeypatch):
     # Cleanup após teste (se necessário)
 
 
+@pytest.fixture(autouse=True)
+def clear_auth_cache():
+    """Tokens de testes anteriores não devem resolver para usuários já removidos."""
+    from app.services.auth_cache import clear_auth_cache
+    clear_auth_cache()
+    yield
+    clear_auth_cache()
+
+
 @pytest.fixture
 def db_session():
     """Fixture para sessão de banco de dados (mock)."""
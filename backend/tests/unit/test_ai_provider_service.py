@@ -0,0 +1,137 @@
+"""
+Testes TDD para a camada assíncrona dos provedores de IA.
+Garante que as gerações não bloqueiam o event loop e respeitam os limites.
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services import ai_provider_service
+from app.services.ai_provider_service import AIProviderService, get_ai_provider
+
+
+class SlowSyncProvider(AIProviderService):
+    """Provedor fake com SDK síncrono lento (usa a implementação em thread)."""
+
+    instances = 0
+
+    def __init__(self):
+        SlowSyncProvider.instances += 1
+
+    def generate_text(self, system_prompt, user_prompt, temperature=0.7, max_tokens=2000, **kwargs):
+        time.sleep(0.2)
+        return f"{user_prompt}:{kwargs.get('model', 'default')}"
+
+    def is_available(self):
+        return True
+
+    def get_provider_name(self):
+        return "slow"
+
+
+class CountingAsyncProvider(SlowSyncProvider):
+    """Provedor fake assíncrono que registra o pico de gerações simultâneas."""
+
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.peak = 0
+        self.clients_created = 0
+
+    def get_provider_name(self):
+        return "counting"
+
+    def _create_async_client(self):
+        self.clients_created += 1
+        return object()
+
+    async def _agenerate(self, system_prompt, user_prompt, temperature=0.7, max_tokens=2000, **kwargs):
+        self._get_async_client()
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.05)
+        self.active -= 1
+        return user_prompt
+
+
+@pytest.fixture(autouse=True)
+def fake_providers(monkeypatch):
+    monkeypatch.setattr(ai_provider_service, "PROVIDER_CLASSES", {
+        "slow": SlowSyncProvider,
+        "counting": CountingAsyncProvider,
+    })
+    ai_provider_service.reset_ai_providers()
+    SlowSyncProvider.instances = 0
+    yield
+    ai_provider_service.reset_ai_providers()
+
+
+class TestAIProviderPooling:
+    """Testes para a reutilização das instâncias dos provedores."""
+
+    @pytest.mark.unit
+    def test_get_ai_provider_reuses_instance(self):
+        """TDD: Chamadas seguidas devem retornar o mesmo provedor (mesmo pool de conexões)."""
+        first = get_ai_provider()
+        second = get_ai_provider()
+
+        assert first is second
+        assert SlowSyncProvider.instances == 1
+
+    @pytest.mark.unit
+    def test_requested_provider_comes_first(self):
+        """TDD: O provedor solicitado deve ter prioridade."""
+        assert get_ai_provider("counting").get_provider_name() == "counting"
+
+
+class TestAIProviderAsync:
+    """Testes para agenerate_text e os limites de concorrência."""
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    async def test_sync_provider_does_not_block_event_loop(self):
+        """
+        TDD: Gerações simultâneas com SDK síncrono devem rodar em paralelo.
+        Código crítico - uma chamada lenta não pode travar os demais usuários.
+        """
+        provider = get_ai_provider("slow")
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            provider.agenerate_text("sistema", f"p{i}", model="m") for i in range(8)
+        ])
+        elapsed = time.perf_counter() - start
+
+        assert results == [f"p{i}:m" for i in range(8)]
+        assert elapsed < 0.2 * 8 / 2
+
+    @pytest.mark.unit
+    async def test_concurrency_limit_per_provider(self, monkeypatch):
+        """TDD: O pico de gerações simultâneas deve respeitar AI_PROVIDER_CONCURRENCY."""
+        monkeypatch.setattr(settings, "AI_PROVIDER_CONCURRENCY", {"counting": 3})
+        provider = get_ai_provider("counting")
+
+        await asyncio.gather(*[provider.agenerate_text("sistema", f"p{i}") for i in range(12)])
+
+        assert provider.peak == 3
+
+    @pytest.mark.unit
+    async def test_async_client_is_reused_within_event_loop(self):
+        """TDD: O cliente assíncrono deve ser criado uma vez por event loop."""
+        provider = get_ai_provider("counting")
+
+        for i in range(5):
+            await provider.agenerate_text("sistema", f"p{i}")
+
+        assert provider.clients_created == 1
+
+    @pytest.mark.unit
+    async def test_astream_text_falls_back_to_single_chunk(self):
+        """TDD: Provedor sem stream nativo deve enviar o texto completo em uma parte."""
+        provider = get_ai_provider("slow")
+
+        chunks = [chunk async for chunk in provider.astream_text("sistema", "p", model="m")]
+
+        assert chunks == ["p:m"]
@@ -115,3 +115,304 @@ class TestInterpretationAPI:
         except SyntaxError as e:
             pytest.fail(f"Módulo tem erro de sintaxe: {e}")
 
+
+
+class FakeStreamingProvider:
+    """Provedor de IA fake que envia a resposta em vários trechos."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def get_provider_name(self):
+        return "fake"
+
+    def get_model_name(self):
+        return "fake-model"
+
+    async def agenerate_text(self, system_prompt, user_prompt, **kwargs):
+        return "".join(self.chunks)
+
+    async def astream_text(self, system_prompt, user_prompt, **kwargs):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def _parse_sse(body):
+    """Converte o corpo text/event-stream em lista de (evento, dados)."""
+    import json
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestInterpretationStreaming:
+    """Testes para as variantes em streaming (SSE) das interpretações."""
+
+    @pytest.mark.critical
+    @pytest.mark.api
+    @pytest.mark.unit
+    def test_planet_stream_sends_tokens_and_final_payload(self, client):
+        """
+        TDD: O stream deve enviar os tokens e terminar com a mesma resposta do endpoint JSON.
+        Código crítico - o frontend substitui a prévia pelo evento 'done'.
+        """
+        provider = FakeStreamingProvider(["Marte ", "em Áries ", "é impulsivo."])
+        payload = {"planet": "Marte", "sign": "Áries"}
+
+        with patch('app.services.ai_provider_service.get_ai_provider', return_value=provider):
+            response = client.post("/api/interpretation/planet/stream", json=payload)
+            expected = client.post("/api/interpretation/planet", json=payload).json()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _parse_sse(response.text)
+        assert events[0][0] == "start"
+        assert [data["text"] for name, data in events if name == "token"] == provider.chunks
+        assert events[-1] == ("done", expected)
+
+    @pytest.mark.api
+    @pytest.mark.unit
+    def test_prompt_preparation_runs_off_the_event_loop(self, client):
+        """TDD: RAG e montagem do prompt (síncronos) não devem rodar no event loop, no JSON nem no stream."""
+        import asyncio
+        from app.api import interpretation
+        real_prepare = interpretation._prepare_planet_interpretation
+        on_event_loop = []
+
+        def prepare(request):
+            try:
+                asyncio.get_running_loop()
+                on_event_loop.append(True)
+            except RuntimeError:
+                on_event_loop.append(False)
+            return real_prepare(request)
+
+        provider = FakeStreamingProvider(["Vênus em Libra."])
+        payload = {"planet": "Vênus", "sign": "Libra"}
+        with patch('app.services.ai_provider_service.get_ai_provider', return_value=provider), \
+                patch.object(interpretation, '_prepare_planet_interpretation', side_effect=prepare):
+            client.post("/api/interpretation/planet", json=payload)
+            client.post("/api/interpretation/planet/stream", json=payload)
+
+        assert on_event_loop == [False, False]
+
+    @pytest.mark.api
+    @pytest.mark.unit
+    def test_stream_reports_provider_error_as_event(self, client):
+        """TDD: Falha do provedor durante o stream deve virar um evento 'error'."""
+        class FailingProvider(FakeStreamingProvider):
+            async def astream_text(self, system_prompt, user_prompt, **kwargs):
+                yield "Início"
+                raise RuntimeError("limite excedido")
+
+        with patch('app.services.ai_provider_service.get_ai_provider', return_value=FailingProvider([])):
+            response = client.post("/api/interpretation/planet/stream", json={"planet": "Sol", "sign": "Leão"})
+
+        events = _parse_sse(response.text)
+        assert events[-1] == ("error", {"detail": "limite excedido"})
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_incremental_cleaner_matches_full_cleaning(self):
+        """
+        TDD: A limpeza incremental deve produzir o mesmo texto que a limpeza completa.
+        Código crítico - instruções internas não podem vazar no stream.
+        """
+        from app.api.interpretation import _IncrementalContentCleaner, _clean_interpretation_content
+
+        content = (
+            "LEIA ANTES DE ESCREVER: use os dados pré-calculados\n\n"
+            "**ANÁLISE DO TEMPERAMENTO**\n\n"
+            "O Fogo predomina no mapa.\n\n"
+            "NÃO REPITA NA RESPOSTA estas regras\n\n"
+            "A Água está ausente, pedindo atenção às emoções."
+        )
+        cleaner = _IncrementalContentCleaner()
+        streamed = "".join(cleaner.feed(content[i:i + 7]) for i in range(0, len(content), 7))
+        streamed += cleaner.flush()
+
+        assert streamed == _clean_interpretation_content(content)
+        assert "LEIA ANTES" not in streamed and "NÃO REPITA" not in streamed
+
+
+class SlowCountingProvider(FakeStreamingProvider):
+    """Provedor fake lento que registra o pico de gerações simultâneas."""
+
+    def __init__(self, delay=0.2):
+        super().__init__(["**ANÁLISE**\n\nTexto da seção."])
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def agenerate_text(self, system_prompt, user_prompt, **kwargs):
+        import asyncio
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return "".join(self.chunks)
+
+
+FULL_CHART_PAYLOAD = {
+    "name": "Ana", "birthDate": "15/05/1990", "birthTime": "10:30", "birthPlace": "São Paulo",
+    "sunSign": "Touro", "moonSign": "Leão", "ascendant": "Câncer", "sunHouse": 11, "moonHouse": 2,
+    "latitude": -23.5505, "longitude": -46.6333
+}
+
+
+class TestFullBirthChartAll:
+    """Testes para a geração concorrente de todas as seções do Mapa Astral Completo."""
+
+    @pytest.fixture(autouse=True)
+    def no_interpretation_cache(self, monkeypatch):
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "INTERPRETATION_CACHE_ENABLED", False)
+
+    @pytest.mark.critical
+    @pytest.mark.api
+    @pytest.mark.unit
+    def test_all_sections_generated_concurrently_with_one_chart_calculation(self, client):
+        """
+        TDD: Todas as seções devem ser geradas em paralelo, calculando o mapa uma única vez.
+        Código crítico - o relatório completo deve levar o tempo da seção mais lenta.
+        """
+        import time
+        from app.api.interpretation import BIRTH_CHART_SECTIONS
+        from app.services import swiss_ephemeris_calculator
+
+        provider = SlowCountingProvider()
+        real_calculate = swiss_ephemeris_calculator.calculate_birth_chart
+
+        with patch('app.services.ai_provider_service.get_ai_provider', return_value=provider), \
+                patch('app.services.rag_service_fastembed.get_rag_service', return_value=None), \
+                patch('app.services.swiss_ephemeris_calculator.calculate_birth_chart',
+                      side_effect=real_calculate) as calculate:
+            start = time.perf_counter()
+            response = client.post("/api/full-birth-chart/all", json=FULL_CHART_PAYLOAD)
+            elapsed = time.perf_counter() - start
+
+        assert response.status_code == status.HTTP_200_OK
+        events = _parse_sse(response.text)
+        assert events[0] == ("start", {"sections": BIRTH_CHART_SECTIONS, "generated_by": "fake"})
+        sections = [data["section"] for name, data in events if name == "section"]
+        assert sorted(sections) == sorted(BIRTH_CHART_SECTIONS)
+        assert events[-1][0] == "done" and events[-1][1]["failed"] == []
+        assert calculate.call_count == 1
+        assert provider.peak == len(BIRTH_CHART_SECTIONS)
+        assert elapsed < provider.delay * len(BIRTH_CHART_SECTIONS)
+
+    @pytest.mark.api
+    @pytest.mark.unit
+    def test_concurrency_is_bounded(self, client, monkeypatch):
+        """TDD: O número de seções simultâneas deve respeitar FULL_BIRTH_CHART_CONCURRENCY."""
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "FULL_BIRTH_CHART_CONCURRENCY", 2)
+        provider = SlowCountingProvider(delay=0.05)
+
+        with patch('app.services.ai_provider_service.get_ai_provider', return_value=provider), \
+                patch('app.services.rag_service_fastembed.get_rag_service', return_value=None):
+            response = client.post(
+                "/api/full-birth-chart/all",
+                json={**FULL_CHART_PAYLOAD, "sections": ["power", "triad", "karma", "synthesis"]}
+            )
+
+        events = _parse_sse(response.text)
+        assert events[-1] == ("done", {"completed": events[-1][1]["completed"], "failed": []})
+        assert len(events[-1][1]["completed"]) == 4
+        assert provider.peak == 2
+
+    @pytest.mark.api
+    @pytest.mark.unit
+    def test_invalid_section_is_rejected(self, client):
+        """TDD: Seções desconhecidas devem retornar 400 antes de iniciar o stream."""
+        response = client.post("/api/full-birth-chart/all", json={**FULL_CHART_PAYLOAD, "sections": ["power", "xyz"]})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def _primary_chart():
+    from datetime import datetime
+    from types import SimpleNamespace
+    return SimpleNamespace(
+        name="Ana", birth_date=datetime(1990, 5, 15), birth_time="10:30", birth_place="São Paulo",
+        latitude=-23.5505, longitude=-46.6333, sun_sign="Touro", moon_sign="Leão", ascendant_sign="Câncer"
+    )
+
+
+class TestFullBirthChartWarmUp:
+    """Testes para o warm-up do Mapa Astral Completo do usuário autenticado."""
+
+    @pytest.fixture(autouse=True)
+    def no_interpretation_cache(self, monkeypatch):
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "INTERPRETATION_CACHE_ENABLED", False)
+
+    @pytest.mark.critical
+    @pytest.mark.api
+    @pytest.mark.unit
+    def test_requires_authentication(self, client):
+        """
+        TDD: Sem usuário autenticado o warm-up deve retornar 401 sem agendar nada.
+        Código crítico - cada warm-up dispara várias chamadas pagas ao provedor de IA.
+        """
+        provider = SlowCountingProvider(delay=0)
+
+        with patch('app.api.auth.get_current_user', return_value=None), \
+                patch('app.services.ai_provider_service.get_ai_provider', return_value=provider):
+            response = client.post("/api/full-birth-chart/warm-up", json={})
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert provider.peak == 0
+
+    @pytest.mark.api
+    @pytest.mark.unit
+    def test_generates_sections_of_primary_chart(self, client):
+        """TDD: O warm-up deve gerar as seções a partir do mapa primário do usuário."""
+        from app.api import interpretation
+        provider = SlowCountingProvider(delay=0)
+
+        with patch('app.api.auth.get_current_user', return_value=MagicMock(id=1)), \
+                patch('app.api.auth.get_primary_birth_chart', return_value=_primary_chart()), \
+                patch('app.services.ai_provider_service.get_ai_provider', return_value=provider), \
+                patch('app.services.rag_service_fastembed.get_rag_service', return_value=None):
+            response = client.post(
+                "/api/full-birth-chart/warm-up",
+                json={"sections": ["power", "triad"]},
+                headers={"Authorization": "Bearer fake-token"}
+            )
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.json() == {"status": "scheduled", "sections": ["power", "triad"]}
+        assert provider.peak >= 1
+        assert interpretation._birth_chart_generations == {}
+
+    @pytest.mark.critical
+    @pytest.mark.api
+    @pytest.mark.unit
+    def test_skips_chart_already_being_generated(self, client):
+        """
+        TDD: Com um warm-up ou /all do mesmo mapa em andamento, nada novo deve ser agendado.
+        Código crítico - cliques repetidos não podem multiplicar as gerações.
+        """
+        from app.api import interpretation
+        provider = SlowCountingProvider(delay=0)
+
+        with patch('app.api.auth.get_current_user', return_value=MagicMock(id=1)), \
+                patch('app.api.auth.get_primary_birth_chart', return_value=_primary_chart()), \
+                patch('app.services.ai_provider_service.get_ai_provider', return_value=provider):
+            inputs = interpretation._resolve_birth_chart_inputs(
+                interpretation._birth_chart_request_from_primary_chart(_primary_chart(), 'pt')
+            )
+            interpretation._start_birth_chart_generation(inputs)
+            try:
+                response = client.post(
+                    "/api/full-birth-chart/warm-up", json={}, headers={"Authorization": "Bearer fake-token"}
+                )
+            finally:
+                interpretation._finish_birth_chart_generation(inputs)
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.json()["status"] == "already_running"
+        assert provider.peak == 0
@@ -0,0 +1,152 @@
+"""
+Testes TDD para o Cache de Autenticação.
+Garante que requisições autenticadas repetidas não consultam o banco e que alterações invalidam o cache.
+"""
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from jose import jwt
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.auth import get_current_user, get_primary_birth_chart, update_user
+from app.core.config import settings
+from app.core.database import Base
+from app.core.migrations import run_migrations
+from app.models.database import BirthChart, User
+from app.models.schemas import UserUpdateRequest
+from app.services import auth_cache
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def queries(engine):
+    """SQL executado no banco (exceto controle de transação)."""
+    executed = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    return executed
+
+
+@pytest.fixture
+def user(db):
+    user = User(email="cache@teste.com", name="Cache", password_hash="hash", is_active=True)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def _authorization(email, **claims):
+    return "Bearer " + jwt.encode(dict(sub=email, **claims), settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def _add_primary_chart(db, user_id):
+    db.add(BirthChart(
+        user_id=user_id, name="Cache", birth_date=datetime(1990, 1, 15), birth_time="14:30",
+        birth_place="São Paulo", latitude=-23.5505, longitude=-46.6333,
+        sun_sign="Capricorn", moon_sign="Leo", ascendant_sign="Gemini", is_primary=True
+    ))
+    db.commit()
+
+
+class TestAuthCache:
+    """Testes para o caminho de autenticação com cache."""
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_repeated_requests_do_not_query_database(self, db, user, queries):
+        """
+        TDD: Com o mesmo token, usuário e mapa primário devem vir do cache.
+        Código crítico - cada requisição autenticada fazia duas consultas ao banco.
+        """
+        _add_primary_chart(db, user.id)
+        authorization = _authorization(user.email)
+
+        first_user = get_current_user(authorization, db)
+        first_chart = get_primary_birth_chart(first_user, db)
+        queries.clear()
+        cached_user = get_current_user(authorization, db)
+        cached_chart = get_primary_birth_chart(cached_user, db)
+
+        assert queries == []
+        assert (cached_user.id, cached_user.email, cached_user.name) == (user.id, user.email, "Cache")
+        assert not hasattr(cached_user, "password_hash")
+        assert (cached_chart.latitude, cached_chart.birth_time) == (first_chart.latitude, "14:30")
+
+    @pytest.mark.unit
+    def test_missing_chart_is_not_cached(self, db, user):
+        """TDD: Sem mapa primário, a próxima chamada deve consultar de novo (onboarding em outro worker)."""
+        current_user = get_current_user(_authorization(user.email), db)
+        assert get_primary_birth_chart(current_user, db) is None
+
+        _add_primary_chart(db, user.id)
+
+        assert get_primary_birth_chart(current_user, db).sun_sign == "Capricorn"
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_update_user_invalidates_cache(self, db, user):
+        """
+        TDD: update_user deve invalidar o usuário em cache.
+        Código crítico - dados antigos não podem aparecer após uma alteração.
+        """
+        authorization = _authorization(user.email)
+        assert get_current_user(authorization, db).name == "Cache"
+
+        update_user(UserUpdateRequest(name="Novo Nome"), authorization, db)
+
+        assert get_current_user(authorization, db).name == "Novo Nome"
+        assert auth_cache.auth_cache_stats()['invalidations'] >= 1
+
+    @pytest.mark.unit
+    def test_ttl_and_token_expiration_are_respected(self, db, user, queries):
+        """TDD: TTL 0 desativa o cache e um token expirado não é guardado."""
+        with patch.object(settings, 'AUTH_CACHE_TTL_SECONDS', 0):
+            get_current_user(_authorization(user.email), db)
+            queries.clear()
+            get_current_user(_authorization(user.email), db)
+            assert queries != []
+
+        auth_cache.cache_user("expirado", user, token_expires_at=1.0)
+        assert auth_cache.get_cached_user("expirado") is None
+
+    @pytest.mark.unit
+    def test_invalid_token_returns_none(self, db, user):
+        """TDD: Token inválido ou em outro formato continua retornando None."""
+        assert get_current_user("Bearer token_invalido", db) is None
+        assert get_current_user("Basic abc", db) is None
+        assert get_current_user(None, db) is None
+
+
+class TestPrimaryChartIndex:
+    """Testes para o índice composto de birth_charts."""
+
+    @pytest.mark.unit
+    def test_migration_adds_index_to_existing_database(self, engine):
+        """TDD: Bancos criados antes do índice devem recebê-lo nas migrações."""
+        with engine.connect() as conn:
+            conn.execute(text("DROP INDEX ix_birth_charts_user_id_is_primary"))
+            conn.commit()
+
+        run_migrations(engine)
+
+        indexes = {index['name']: index['column_names'] for index in inspect(engine).get_indexes('birth_charts')}
+        assert indexes['ix_birth_charts_user_id_is_primary'] == ['user_id', 'is_primary']
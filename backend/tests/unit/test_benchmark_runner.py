@@ -0,0 +1,60 @@
+"""
+Testes TDD para o Executor do Benchmark.
+Garante que a comparação entre commits aponta regressões de desempenho.
+"""
+import json
+
+import pytest
+
+from tests.benchmarks.runner import compare_results, main, measure
+
+
+def _document(commit, timings):
+    return {
+        'meta': {'commit': commit},
+        'benchmarks': {name: {'min': t, 'median': t, 'mean': t} for name, t in timings.items()},
+    }
+
+
+class TestBenchmarkRunner:
+    """Testes para medição e comparação dos resultados."""
+
+    @pytest.mark.unit
+    def test_measure_reports_per_call_statistics(self):
+        """TDD: A medição deve registrar rodadas, repetições e tempos por chamada."""
+        calls = []
+
+        result = measure(lambda: calls.append(1), rounds=3, min_round_time=0.001)
+
+        assert result['rounds'] == 3
+        assert len(calls) == 2 + 3 * result['number']
+        assert 0 < result['min'] <= result['median']
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_compare_flags_regressions_beyond_threshold(self):
+        """
+        TDD: Casos mais lentos que o limite devem ser marcados como regressão.
+        Código crítico - é o que bloqueia a regressão entre commits.
+        """
+        baseline = _document('a', {'mapa': 0.010, 'rag': 0.002, 'antigo': 0.001})
+        current = _document('b', {'mapa': 0.0125, 'rag': 0.0021, 'novo': 0.003})
+
+        rows = {row['name']: row for row in compare_results(baseline, current, threshold=0.10)}
+
+        assert rows['mapa']['status'] == 'regression'
+        assert rows['mapa']['ratio'] == pytest.approx(1.25)
+        assert rows['rag']['status'] == 'ok'
+        assert rows['antigo']['status'] == 'missing'
+        assert rows['novo']['status'] == 'new'
+
+    @pytest.mark.unit
+    def test_compare_command_exit_code(self, tmp_path):
+        """TDD: O comando compare deve sair com 1 se houver regressão e 0 caso contrário."""
+        before, after, faster = tmp_path / "a.json", tmp_path / "b.json", tmp_path / "c.json"
+        before.write_text(json.dumps(_document('a', {'mapa': 0.010})))
+        after.write_text(json.dumps(_document('b', {'mapa': 0.020})))
+        faster.write_text(json.dumps(_document('c', {'mapa': 0.005})))
+
+        assert main(["compare", str(before), str(after)]) == 1
+        assert main(["compare", str(before), str(faster)]) == 0
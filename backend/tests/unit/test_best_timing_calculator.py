@@ -0,0 +1,186 @@
+"""
+Testes TDD para o Motor Vetorizado de Melhores Momentos.
+Garante a mesma pontuação das regras originais, com céu e cúspides calculados uma vez.
+"""
+import pytest
+import numpy as np
+from datetime import datetime
+from unittest.mock import patch
+
+from app.services.best_timing_calculator import (
+    ACTION_HOUSES,
+    ASPECT_TYPES,
+    NO_ASPECT,
+    PLANET_NAMES,
+    TIMING_PLANETS,
+    _action_weight_tables,
+    _aspect_index_table,
+    _moon_void_mask,
+    calculate_best_timing,
+    calculate_best_timing_all,
+)
+from app.services.transits_calculator import calculate_aspect_angle, get_aspect_type
+
+
+BIRTH_DATE = datetime(1990, 5, 15)
+BIRTH_TIME = "10:30"
+LATITUDE, LONGITUDE = -23.5505, -46.6333
+
+
+def _reference_score(action_config, longitudes, cusps):
+    """Pontuação de um horário pelas regras originais (laços escalares)."""
+    score = 0
+    for houses, scores in (
+        (action_config['primary_houses'], {'trígono': 10, 'sextil': 7, 'conjunção': 8}),
+        (action_config['secondary_houses'], {'trígono': 5, 'sextil': 3, 'conjunção': 4}),
+    ):
+        for house_num in houses:
+            for planet_name, longitude in zip(TIMING_PLANETS, longitudes):
+                if PLANET_NAMES[planet_name] not in action_config['beneficial_planets']:
+                    continue
+                aspect_type = get_aspect_type(calculate_aspect_angle(longitude, cusps[house_num - 1]), orb=8.0)
+                if aspect_type in action_config['preferred_aspects']:
+                    score += scores.get(aspect_type, 0)
+
+    for planet_name, longitude in zip(TIMING_PLANETS, longitudes):
+        if PLANET_NAMES[planet_name] in action_config['avoid_planets']:
+            for house_num in action_config['primary_houses']:
+                aspect_type = get_aspect_type(calculate_aspect_angle(longitude, cusps[house_num - 1]), orb=8.0)
+                if aspect_type in ['quadratura', 'oposição']:
+                    score -= 5
+    return score
+
+
+class TestBestTimingVectorizedScoring:
+    """Testes para a pontuação em matrizes (horário × planeta × casa)."""
+
+    @pytest.mark.critical
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_aspect_table_matches_get_aspect_type(self):
+        """
+        TDD: A tabela de aspectos deve coincidir com get_aspect_type elemento a elemento.
+        Código crítico - define quais aspectos pontuam.
+        """
+        rng = np.random.default_rng(7)
+        longitudes = rng.uniform(0, 360, size=(50, len(TIMING_PLANETS)))
+        cusps = rng.uniform(0, 360, size=12)
+
+        table = _aspect_index_table(longitudes, cusps)
+
+        for slot in range(50):
+            for planet in range(len(TIMING_PLANETS)):
+                for house in range(12):
+                    expected = get_aspect_type(calculate_aspect_angle(longitudes[slot, planet], cusps[house]), orb=8.0)
+                    index = table[slot, planet, house]
+                    assert (ASPECT_TYPES[index] if index != NO_ASPECT else None) == expected
+
+    @pytest.mark.critical
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_weight_tables_reproduce_original_scores(self):
+        """
+        TDD: As tabelas de pesos devem dar o mesmo score das regras originais para todas as ações.
+        Código crítico - a ordem dos melhores momentos depende do score.
+        """
+        rng = np.random.default_rng(11)
+        longitudes = rng.uniform(0, 360, size=(80, len(TIMING_PLANETS)))
+        cusps = rng.uniform(0, 360, size=12)
+        actions = list(ACTION_HOUSES)
+
+        table = _aspect_index_table(longitudes, cusps)
+        weights, _ = _action_weight_tables(actions)
+        scores = weights[:, np.arange(len(TIMING_PLANETS))[None, :, None], np.arange(12)[None, None, :], table].sum(axis=(2, 3))
+
+        for action_index, action in enumerate(actions):
+            expected = [_reference_score(ACTION_HOUSES[action], longitudes[slot], cusps) for slot in range(80)]
+            assert scores[action_index].tolist() == expected
+
+
+class TestBestTimingEngine:
+    """Testes para o cálculo de melhores momentos de ponta a ponta."""
+
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_natal_chart_is_built_once(self):
+        """TDD: As cúspides natais devem vir de um único mapa kerykeion, para todas as ações."""
+        from app.services import swiss_ephemeris_calculator
+
+        real_create = swiss_ephemeris_calculator.create_kr_instance
+        with patch.object(swiss_ephemeris_calculator, 'create_kr_instance', side_effect=real_create) as create:
+            calculate_best_timing_all(BIRTH_DATE, BIRTH_TIME, LATITUDE, LONGITUDE, days_ahead=2)
+
+        assert create.call_count == 1
+
+    @pytest.mark.critical
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_all_actions_match_single_action(self):
+        """
+        TDD: O modo de todas as ações deve retornar o mesmo ranking de cada ação calculada sozinha.
+        Código crítico - os dois endpoints precisam concordar.
+        """
+        combined = calculate_best_timing_all(BIRTH_DATE, BIRTH_TIME, LATITUDE, LONGITUDE, days_ahead=5, interval_hours=3)
+
+        assert set(combined['actions']) == set(ACTION_HOUSES)
+        for action in ('pedir_aumento', 'primeiro_encontro'):
+            single = calculate_best_timing(action, BIRTH_DATE, BIRTH_TIME, LATITUDE, LONGITUDE, days_ahead=5, interval_hours=3)
+            single.pop('analysis_date')
+            result = dict(combined['actions'][action])
+            result.pop('analysis_date')
+            assert result == single
+
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_hourly_granularity(self):
+        """TDD: Com interval_hours=1 todos os horários do período devem ser verificados."""
+        result = calculate_best_timing_all(BIRTH_DATE, BIRTH_TIME, LATITUDE, LONGITUDE, days_ahead=3, interval_hours=1)
+
+        assert result['total_slots'] == 3 * 24 + 1
+        for action_result in result['actions'].values():
+            moments = action_result['best_moments']
+            assert len(moments) <= 10
+            assert [m['score'] for m in moments] == sorted((m['score'] for m in moments), reverse=True)
+            assert all(m['score'] > 0 and m['aspects'] for m in moments)
+
+    @pytest.mark.unit
+    def test_unknown_action_returns_error(self):
+        """TDD: Ações desconhecidas devem retornar erro (sem exceção)."""
+        assert 'error' in calculate_best_timing('voar', BIRTH_DATE, BIRTH_TIME, LATITUDE, LONGITUDE)
+        assert 'error' in calculate_best_timing_all(BIRTH_DATE, BIRTH_TIME, LATITUDE, LONGITUDE, action_types=['voar'])
+
+    @pytest.mark.unit
+    def test_empty_period_returns_no_moments(self):
+        """TDD: Um período sem horários (days_ahead negativo) não deve gerar exceção."""
+        assert len(_moon_void_mask([])) == 0
+
+        result = calculate_best_timing_all(BIRTH_DATE, BIRTH_TIME, LATITUDE, LONGITUDE, days_ahead=-1)
+
+        assert result['total_slots'] == 0
+        assert all(action_result['best_moments'] == [] for action_result in result['actions'].values())
+
+
+class TestBestTimingEndpoints:
+    """Testes para a validação dos parâmetros dos endpoints de melhores momentos."""
+
+    @pytest.mark.api
+    @pytest.mark.unit
+    @pytest.mark.parametrize("path,payload", [
+        ("/api/best-timing/calculate", {"action_type": "pedir_aumento", "days_ahead": 0}),
+        ("/api/best-timing/calculate-all", {"days_ahead": -5}),
+    ])
+    def test_days_ahead_below_one_is_rejected(self, path, payload):
+        """TDD: days_ahead < 1 deve retornar 400 (antes gerava erro 500)."""
+        from types import SimpleNamespace
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        birth_chart = SimpleNamespace(
+            birth_date=BIRTH_DATE, birth_time=BIRTH_TIME, latitude=LATITUDE, longitude=LONGITUDE
+        )
+        with patch('app.api.auth.get_current_user', return_value=SimpleNamespace(id=1)), \
+                patch('app.api.auth.get_primary_birth_chart', return_value=birth_chart):
+            response = TestClient(app).post(path, json=payload, headers={"Authorization": "Bearer fake-token"})
+
+        assert response.status_code == 400
+        assert "days_ahead" in response.json()["detail"]
@@ -0,0 +1,133 @@
+"""
+Testes TDD para o Cache de Mapas Natais (memória LRU/TTL + SQLite).
+Garante que o mesmo mapa não é recalculado entre workers nem após reinícios.
+"""
+import pytest
+from datetime import datetime
+
+from app.services import chart_data_cache as chart_data_cache_module
+from app.services.chart_data_cache import ChartDataCache, get_or_calculate_chart
+
+
+BIRTH = (datetime(1990, 5, 15), "10:30", -23.5505, -46.6333)
+
+
+@pytest.fixture
+def chart_cache(tmp_path, monkeypatch):
+    """Cache isolado com SQLite temporário."""
+    monkeypatch.setattr(ChartDataCache, "_cache", type(ChartDataCache._cache)())
+    monkeypatch.setattr(ChartDataCache, "_db_path", tmp_path / "chart_cache.db")
+    monkeypatch.setattr(ChartDataCache, "_connection", None)
+    monkeypatch.setattr(ChartDataCache, "_connection_pid", None)
+    monkeypatch.setattr(ChartDataCache, "_disk_enabled", True)
+    monkeypatch.setattr(ChartDataCache, "_max_cache_size", 3)
+    monkeypatch.setattr(ChartDataCache, "_ttl_seconds", 3600.0)
+    monkeypatch.setattr(ChartDataCache, "_stats", dict.fromkeys(ChartDataCache._stats, 0))
+    yield ChartDataCache
+    if ChartDataCache._connection is not None:
+        ChartDataCache._connection.close()
+
+
+def _simulate_restart(monkeypatch):
+    """Descarta a memória e a conexão como em um novo worker."""
+    ChartDataCache._connection.close()
+    monkeypatch.setattr(ChartDataCache, "_cache", type(ChartDataCache._cache)())
+    monkeypatch.setattr(ChartDataCache, "_connection", None)
+
+
+class TestChartDataCache:
+    """Testes para as duas camadas do cache de mapas."""
+
+    @pytest.mark.unit
+    def test_calculates_only_once(self, chart_cache):
+        """TDD: O mesmo mapa deve ser calculado apenas uma vez."""
+        calls = []
+
+        def calculate(*args):
+            calls.append(args)
+            return {'sun_sign': 'Touro'}
+
+        first = get_or_calculate_chart(*BIRTH, calculate_func=calculate)
+        second = get_or_calculate_chart(*BIRTH, calculate_func=calculate)
+
+        assert first == second == {'sun_sign': 'Touro'}
+        assert len(calls) == 1
+        assert chart_cache.stats()['memory_hits'] == 1
+        assert chart_cache.stats()['misses'] == 1
+
+    @pytest.mark.unit
+    def test_least_recently_used_is_evicted(self, chart_cache):
+        """TDD: Ao exceder o limite, o item menos usado recentemente sai da memória."""
+        for hour in range(3):
+            chart_cache.set(datetime(2000, 1, 1), f"{hour:02d}:00", 0.0, 0.0, {'hour': hour})
+
+        # Acessar o mais antigo o torna o mais recente
+        chart_cache.get(datetime(2000, 1, 1), "00:00", 0.0, 0.0)
+        chart_cache.set(datetime(2000, 1, 1), "03:00", 0.0, 0.0, {'hour': 3})
+
+        keys = list(chart_cache._cache)
+        assert chart_cache.size() == 3
+        assert chart_cache._generate_cache_key(datetime(2000, 1, 1), "01:00", 0.0, 0.0) not in keys
+        assert chart_cache._generate_cache_key(datetime(2000, 1, 1), "00:00", 0.0, 0.0) in keys
+        assert chart_cache.stats()['evictions'] == 1
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_disk_tier_survives_restart(self, chart_cache, monkeypatch):
+        """
+        TDD: Após reinício (memória vazia), o mapa deve vir do SQLite.
+        Código crítico - evita recálculo em todos os workers após deploy.
+        """
+        chart_cache.set(*BIRTH, {'sun_sign': 'Touro', 'sun_longitude': 54.2})
+        _simulate_restart(monkeypatch)
+
+        def calculate(*args):
+            raise AssertionError("Mapa não deveria ser recalculado")
+
+        chart = get_or_calculate_chart(*BIRTH, calculate_func=calculate)
+
+        assert chart == {'sun_sign': 'Touro', 'sun_longitude': 54.2}
+        assert chart_cache.stats()['disk_hits'] == 1
+
+    @pytest.mark.unit
+    def test_expired_entries_are_recalculated(self, chart_cache, monkeypatch):
+        """TDD: Entradas além do TTL devem ser descartadas nas duas camadas."""
+        chart_cache.set(*BIRTH, {'sun_sign': 'Touro'})
+        monkeypatch.setattr(ChartDataCache, "_ttl_seconds", -1.0)
+
+        assert chart_cache.get(*BIRTH) is None
+        assert chart_cache.stats()['expirations'] == 2
+        assert chart_cache.stats()['misses'] == 1
+
+    @pytest.mark.unit
+    def test_returned_chart_cannot_mutate_cache(self, chart_cache):
+        """TDD: Alterar o dicionário retornado não deve alterar o cache."""
+        chart_cache.set(*BIRTH, {'sun_sign': 'Touro'})
+
+        chart = chart_cache.get(*BIRTH)
+        chart['sun_sign'] = 'Áries'
+
+        assert chart_cache.get(*BIRTH) == {'sun_sign': 'Touro'}
+
+    @pytest.mark.unit
+    def test_key_normalizes_coordinates(self, chart_cache):
+        """TDD: Coordenadas iguais até 6 casas decimais compartilham a entrada."""
+        chart_cache.set(datetime(1990, 5, 15), "10:30", -23.55050001, -46.6333, {'sun_sign': 'Touro'})
+
+        assert chart_cache.get(*BIRTH) == {'sun_sign': 'Touro'}
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_calculation_version_change_invalidates_entries(self, chart_cache, monkeypatch):
+        """
+        TDD: Mapas gravados por outra versão do cálculo não devem ser servidos.
+        Código crítico - o SQLite sobrevive a deploys que corrigem o cálculo.
+        """
+        chart_cache.set(*BIRTH, {'sun_sign': 'Touro'})
+        _simulate_restart(monkeypatch)
+        monkeypatch.setattr(chart_data_cache_module, "CHART_CALC_VERSION", "versao-nova")
+
+        chart = get_or_calculate_chart(*BIRTH, calculate_func=lambda *args: {'sun_sign': 'Gêmeos'})
+
+        assert chart == {'sun_sign': 'Gêmeos'}
+        assert chart_cache.stats()['disk_hits'] == 0
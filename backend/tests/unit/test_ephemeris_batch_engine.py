@@ -0,0 +1,96 @@
+"""
+Testes TDD para o Motor de Efemérides em Lote.
+Garante que as matrizes (tempo × corpo) batem com o cálculo via kerykeion.
+"""
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from app.services.ephemeris_batch_engine import (
+    BATCH_BODIES,
+    calculate_positions_at,
+    calculate_positions_batch,
+    datetimes_to_julian_days,
+    local_to_utc,
+)
+from app.services.astrology_calculator import shortest_angular_distance
+
+
+class TestEphemerisBatchEngine:
+    """Testes para o cálculo de posições em lote."""
+
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_julian_day_of_j2000(self):
+        """TDD: 2000-01-01 12:00 UTC deve ser JD 2451545.0."""
+        jd = datetimes_to_julian_days([datetime(2000, 1, 1, 12, 0)])
+        assert jd[0] == pytest.approx(2451545.0, abs=1e-9)
+
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_aware_datetimes_are_converted_to_utc(self):
+        """TDD: Datetimes com timezone devem ser convertidos para UTC."""
+        aware = datetime(2000, 1, 1, 9, 0, tzinfo=timezone(timedelta(hours=-3)))
+        jd = datetimes_to_julian_days([aware])
+        assert jd[0] == pytest.approx(2451545.0, abs=1e-9)
+
+    @pytest.mark.critical
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_batch_returns_time_by_body_matrices(self):
+        """TDD: Deve retornar matrizes (tempo × corpo) de longitude e velocidade."""
+        instants = [datetime(2024, 1, 1) + timedelta(hours=6 * i) for i in range(8)]
+
+        longitudes, speeds = calculate_positions_batch(instants)
+
+        assert longitudes.shape == (8, len(BATCH_BODIES))
+        assert speeds.shape == (8, len(BATCH_BODIES))
+        assert ((longitudes >= 0) & (longitudes < 360)).all()
+        # Lua se move ~12-15 graus/dia
+        moon_col = BATCH_BODIES.index('moon')
+        assert (speeds[:, moon_col] > 11).all()
+        assert (speeds[:, moon_col] < 16).all()
+
+    @pytest.mark.critical
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_batch_matches_kerykeion_birth_chart(self):
+        """
+        TDD: As longitudes em lote devem bater com calculate_birth_chart.
+        Código crítico - fonte única de verdade das posições planetárias.
+        """
+        from app.services.swiss_ephemeris_calculator import calculate_birth_chart
+
+        chart = calculate_birth_chart(datetime(1990, 5, 15), "10:30", -23.5505, -46.6333)
+        # 10:30 em São Paulo (UTC-3) = 13:30 UTC
+        positions = calculate_positions_at(datetime(1990, 5, 15, 13, 30))
+
+        for body in BATCH_BODIES:
+            assert shortest_angular_distance(
+                positions[body], chart[f"{body}_longitude"]
+            ) < 0.01
+
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_column_order_follows_requested_bodies(self):
+        """TDD: A ordem das colunas deve seguir a lista de corpos pedida."""
+        instant = datetime(2024, 3, 20, 12, 0)
+        full = calculate_positions_at(instant)
+
+        longitudes, _ = calculate_positions_batch([instant], ['pluto', 'sun'])
+
+        assert longitudes[0, 0] == pytest.approx(full['pluto'])
+        assert longitudes[0, 1] == pytest.approx(full['sun'])
+
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_unknown_body_raises_value_error(self):
+        """TDD: Corpo desconhecido deve gerar ValueError."""
+        with pytest.raises(ValueError):
+            calculate_positions_batch([datetime(2024, 1, 1)], ['vulcan'])
+
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_local_to_utc_uses_location_timezone(self):
+        """TDD: Horário local de São Paulo deve ser convertido para UTC."""
+        utc = local_to_utc(datetime(2024, 6, 1, 10, 0), -23.5505, -46.6333)
+        assert utc == datetime(2024, 6, 1, 13, 0)
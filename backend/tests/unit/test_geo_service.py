@@ -0,0 +1,115 @@
+"""
+Testes TDD para o Serviço de Geolocalização e Timezone.
+Garante geocodificação offline e timezone sem busca em polígonos a cada chamada.
+"""
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.services import geo_service
+from app.services.geo_service import (
+    Gazetteer,
+    geocode_place,
+    get_gazetteer,
+    normalize_place_name,
+    reverse_geocode,
+    search_cities,
+    timezone_at,
+)
+from app.services.swiss_ephemeris_calculator import resolve_timezone_name
+
+
+class TestGazetteer:
+    """Testes para a geocodificação direta, reversa e o autocompletar."""
+
+    @pytest.mark.unit
+    def test_normalize_place_name(self):
+        """TDD: Acentos, maiúsculas e pontuação não devem importar."""
+        assert normalize_place_name("  São  Paulo, SP ") == "sao paulo sp"
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_geocode_place_finds_city_in_free_text(self):
+        """
+        TDD: O local digitado deve resolver para a cidade citada, preferindo o nome mais longo.
+        Código crítico - coordenadas erradas mudam todas as casas do mapa.
+        """
+        assert geocode_place("Sobral, CE, Brasil")['latitude'] == -3.6883
+        assert geocode_place("nascido em sao paulo")['name'] == "São Paulo"
+        assert geocode_place("Rio de Janeiro - RJ")['name'] == "Rio de Janeiro"
+        assert geocode_place("Rio Branco, AC")['name'] == "Rio Branco"
+        assert geocode_place("Porto Alegre")['name'] == "Porto Alegre"
+        assert geocode_place("Cidade Inexistente") is None
+
+    @pytest.mark.unit
+    def test_search_cities_by_prefix(self):
+        """TDD: O autocompletar deve retornar as cidades que começam com o prefixo."""
+        names = [city['name'] for city in search_cities("port")]
+
+        assert {"Porto Alegre", "Porto Velho", "Porto"} <= set(names)
+        assert search_cities("xyz") == []
+
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_reverse_geocode_matches_brute_force(self):
+        """TDD: A KD-tree deve encontrar a mesma cidade que a busca exaustiva."""
+        gazetteer = get_gazetteer()
+        for latitude, longitude in [(-23.0, -46.0), (-8.1, -34.9), (40.0, -3.0), (0.0, 0.0), (-3.7, -40.3)]:
+            expected = min(
+                gazetteer.cities,
+                key=lambda c: geo_service._chord_to_km(
+                    sum((a - b) ** 2 for a, b in zip(
+                        geo_service._unit_vector(c['latitude'], c['longitude']),
+                        geo_service._unit_vector(latitude, longitude)
+                    )) ** 0.5
+                )
+            )
+            assert reverse_geocode(latitude, longitude)['name'] == expected['name']
+
+        assert reverse_geocode(-3.6883, -40.3497)['distance_km'] == pytest.approx(0.0, abs=1e-6)
+
+    @pytest.mark.unit
+    def test_empty_gazetteer(self):
+        """TDD: Um gazetteer vazio não deve falhar."""
+        empty = Gazetteer([])
+
+        assert empty.nearest(0.0, 0.0) is None
+        assert empty.find_in_text("São Paulo") is None
+
+
+class TestTimezoneCache:
+    """Testes para a resolução de timezone com cache."""
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_timezone_is_cached_by_rounded_coordinates(self):
+        """
+        TDD: Coordenadas repetidas não devem repetir a busca em polígonos.
+        Código crítico - create_kr_instance é chamado muitas vezes por requisição.
+        """
+        geo_service._cached_timezone_at.cache_clear()
+        finder = MagicMock(wraps=geo_service.TZ_FINDER)
+
+        with patch.object(geo_service, 'TZ_FINDER', finder):
+            first = timezone_at(-10.0, -55.0)
+            second = timezone_at(-10.000001, -55.000001)
+
+        assert first == second == "America/Cuiaba"
+        assert finder.timezone_at.call_count == 1
+
+    @pytest.mark.unit
+    def test_gazetteer_city_skips_polygon_search(self):
+        """TDD: Coordenadas de uma cidade do gazetteer devem usar o timezone dela."""
+        geo_service._cached_timezone_at.cache_clear()
+
+        finder = MagicMock()
+        with patch.object(geo_service, 'TZ_FINDER', finder):
+            assert timezone_at(-8.0476, -34.8770) == "America/Recife"
+
+        finder.timezone_at.assert_not_called()
+
+    @pytest.mark.unit
+    def test_resolve_timezone_name_uses_geo_service(self):
+        """TDD: resolve_timezone_name deve continuar retornando o timezone IANA ou Etc/GMT."""
+        assert resolve_timezone_name(-23.5505, -46.6333) == "America/Sao_Paulo"
+        with patch('app.services.swiss_ephemeris_calculator.timezone_at', return_value=None):
+            assert resolve_timezone_name(0.0, -45.0) == "Etc/GMT+3"
@@ -0,0 +1,233 @@
+"""
+Testes TDD para o Cache Persistente de Interpretações.
+Garante que a mesma seção do mapa não é gerada duas vezes pelo LLM.
+"""
+import asyncio
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.database import InterpretationCache
+from app.services import interpretation_cache
+from app.services.interpretation_cache import (
+    birth_key,
+    chart_fingerprint,
+    get_cached_interpretation,
+    interpretation_cache_key,
+    invalidate_interpretations,
+    store_interpretation,
+)
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_db(tmp_path, monkeypatch):
+    """Banco SQLite temporário só com a tabela do cache."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'cache.db'}")
+    InterpretationCache.__table__.create(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(interpretation_cache, "SessionLocal", session_factory)
+    return session_factory
+
+
+def _store(key, birth, content="Texto"):
+    store_interpretation(
+        key, {'section': 'power', 'title': 'Poder', 'content': content, 'generated_by': 'fake'},
+        birth_key=birth, section='power', language='pt', provider='fake', model=None, prompt_version='1'
+    )
+
+
+class TestInterpretationCacheKeys:
+    """Testes para as chaves endereçadas por conteúdo."""
+
+    @pytest.mark.unit
+    def test_equivalent_chart_data_has_same_fingerprint(self):
+        """TDD: Espaços e forma Unicode não devem mudar a chave."""
+        first = chart_fingerprint({'name': 'Ana  Luíza', 'latitude': -23.55051})
+        second = chart_fingerprint({'latitude': -23.55049, 'name': ' Ana Luíza'})
+
+        assert first == second
+
+    @pytest.mark.unit
+    def test_key_changes_with_section_language_model_and_version(self):
+        """TDD: Qualquer entrada diferente do prompt deve gerar outra chave."""
+        fingerprint = chart_fingerprint({'name': 'Ana'})
+        base = interpretation_cache_key(fingerprint, 'power', 'pt', 'groq', None, '1')
+
+        variants = [
+            interpretation_cache_key(fingerprint, 'triad', 'pt', 'groq', None, '1'),
+            interpretation_cache_key(fingerprint, 'power', 'en', 'groq', None, '1'),
+            interpretation_cache_key(fingerprint, 'power', 'pt', 'deepseek', None, '1'),
+            interpretation_cache_key(fingerprint, 'power', 'pt', 'groq', 'llama-3.3-70b', '1'),
+            interpretation_cache_key(fingerprint, 'power', 'pt', 'groq', None, '2'),
+        ]
+
+        assert base not in variants
+        assert len(set(variants)) == len(variants)
+
+
+class TestInterpretationCacheStore:
+    """Testes para leitura, TTL e invalidação."""
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_store_and_get_round_trip(self):
+        """
+        TDD: A interpretação gravada deve ser retornada pela mesma chave.
+        Código crítico - reabrir o mapa não deve chamar o LLM.
+        """
+        birth = birth_key(datetime(1990, 5, 15), "10:30", -23.5505, -46.6333)
+        _store("k1", birth, content="Fogo predominante")
+
+        cached = get_cached_interpretation("k1")
+
+        assert cached['content'] == "Fogo predominante"
+        assert get_cached_interpretation("outra") is None
+
+    @pytest.mark.unit
+    def test_expired_entry_is_ignored(self, monkeypatch):
+        """TDD: Itens com TTL vencido não devem ser retornados."""
+        monkeypatch.setattr(settings, "INTERPRETATION_CACHE_TTL_SECONDS", -1)
+        _store("k1", "nascimento")
+
+        assert get_cached_interpretation("k1") is None
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_invalidation_removes_only_that_birth_chart(self, isolated_cache_db):
+        """
+        TDD: Atualizar o mapa deve remover apenas as interpretações daquele nascimento.
+        Código crítico - usuário não pode ver interpretação do mapa antigo.
+        """
+        old_birth = birth_key(datetime(1990, 5, 15), "10:30", -23.5505, -46.6333)
+        other_birth = birth_key(datetime(1985, 1, 2), "08:00", -22.9068, -43.1729)
+        _store("k1", old_birth)
+        _store("k2", old_birth)
+        _store("k3", other_birth)
+
+        db = isolated_cache_db()
+        removed = invalidate_interpretations(db, old_birth)
+        db.commit()
+        db.close()
+
+        assert removed == 2
+        assert get_cached_interpretation("k1") is None
+        assert get_cached_interpretation("k3") is not None
+
+    @pytest.mark.unit
+    def test_birth_key_matches_section_request_format(self):
+        """TDD: A chave do nascimento deve ser a mesma para DB (datetime) e requisição (DD/MM/AAAA)."""
+        from_db = birth_key(datetime(1990, 5, 15, 0, 0), "10:30:00", -23.55050001, -46.6333)
+        from_request = birth_key(datetime.strptime("15/05/1990", "%d/%m/%Y"), "10:30", -23.5505, -46.6333)
+
+        assert from_db == from_request
+
+
+class FakeProvider:
+    """Provedor fake que conta as gerações."""
+
+    def __init__(self, model="fake-model"):
+        self.calls = 0
+        self.model = model
+        self.models_used = []
+
+    def get_provider_name(self):
+        return "fake"
+
+    def get_model_name(self):
+        return self.model
+
+    async def agenerate_text(self, system_prompt, user_prompt, **kwargs):
+        self.calls += 1
+        self.models_used.append(kwargs.get("model"))
+        return "**ANÁLISE DO TEMPERAMENTO**\n\nO Fogo predomina."
+
+
+class TestBirthChartSectionCache:
+    """Testes para o uso do cache no endpoint de seções do Mapa Astral Completo."""
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_second_request_is_served_from_cache(self):
+        """
+        TDD: A mesma seção pedida duas vezes deve chamar o LLM apenas uma vez.
+        Código crítico - principal fonte de custo e latência.
+        """
+        from app.api.interpretation import FullBirthChartRequest, _prepare_birth_chart_section, _run_generation_plan
+
+        request = FullBirthChartRequest(
+            name="Ana", birthDate="15/05/1990", birthTime="10:30", birthPlace="São Paulo",
+            sunSign="Touro", moonSign="Leão", ascendant="Câncer", sunHouse=11, moonHouse=2,
+            section="power", latitude=-23.5505, longitude=-46.6333
+        )
+        provider = FakeProvider()
+
+        with patch('app.services.ai_provider_service.get_ai_provider', return_value=provider), \
+                patch('app.services.rag_service_fastembed.get_rag_service', return_value=None):
+            first = asyncio.run(_run_generation_plan(_prepare_birth_chart_section(request)))
+            plan = _prepare_birth_chart_section(request)
+            second = asyncio.run(_run_generation_plan(plan))
+
+        assert provider.calls == 1
+        assert plan['provider'] is None
+        assert second == first
+
+    @pytest.mark.unit
+    def test_cache_write_runs_off_the_event_loop(self):
+        """TDD: Gravar a seção no cache (banco síncrono) não deve bloquear o event loop."""
+        from app.api.interpretation import FullBirthChartRequest, _prepare_birth_chart_section, _run_generation_plan
+
+        request = FullBirthChartRequest(
+            name="Caio", birthDate="20/10/1992", birthTime="22:40", birthPlace="Curitiba",
+            sunSign="Libra", moonSign="Virgem", ascendant="Leão", sunHouse=3, moonHouse=2,
+            section="power", latitude=-25.4284, longitude=-49.2733
+        )
+        on_event_loop = []
+
+        def store(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                on_event_loop.append(True)
+            except RuntimeError:
+                on_event_loop.append(False)
+
+        with patch('app.services.ai_provider_service.get_ai_provider', return_value=FakeProvider()), \
+                patch('app.services.rag_service_fastembed.get_rag_service', return_value=None), \
+                patch('app.services.interpretation_cache.store_interpretation', side_effect=store):
+            asyncio.run(_run_generation_plan(_prepare_birth_chart_section(request)))
+
+        assert on_event_loop == [False]
+
+    @pytest.mark.unit
+    def test_changing_model_regenerates_section(self):
+        """TDD: Trocar o modelo do provedor (ex: GROQ_MODEL) não deve servir a resposta do modelo anterior."""
+        from app.api.interpretation import FullBirthChartRequest, _prepare_birth_chart_section, _run_generation_plan
+
+        request = FullBirthChartRequest(
+            name="Bia", birthDate="02/03/1985", birthTime="08:15", birthPlace="Recife",
+            sunSign="Peixes", moonSign="Áries", ascendant="Touro", sunHouse=11, moonHouse=12,
+            section="power", latitude=-8.0476, longitude=-34.877
+        )
+        provider = FakeProvider(model="modelo-a")
+
+        with patch('app.services.ai_provider_service.get_ai_provider', return_value=provider), \
+                patch('app.services.rag_service_fastembed.get_rag_service', return_value=None):
+            asyncio.run(_run_generation_plan(_prepare_birth_chart_section(request)))
+            provider.model = "modelo-b"
+            asyncio.run(_run_generation_plan(_prepare_birth_chart_section(request)))
+
+        assert provider.calls == 2
+        assert provider.models_used == ["modelo-a", "modelo-b"]
+
+    @pytest.mark.unit
+    def test_groq_model_name_comes_from_settings(self, monkeypatch):
+        """TDD: O modelo do Groq na chave do cache deve ser o configurado em GROQ_MODEL."""
+        from app.core.config import settings
+        from app.services.ai_provider_service import GroqProvider
+
+        monkeypatch.setattr(settings, "GROQ_MODEL", "llama-3.3-70b-versatile")
+
+        assert GroqProvider().get_model_name() == "llama-3.3-70b-versatile"
@@ -0,0 +1,170 @@
+"""
+Testes TDD para a Instrumentação de Desempenho.
+Garante o header Server-Timing por requisição e o endpoint /metrics no formato Prometheus.
+"""
+import asyncio
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.core.metrics import (
+    Histogram,
+    RequestTimings,
+    STAGE_DURATION,
+    _request_timings,
+    stage,
+    timed_stage,
+)
+
+
+@pytest.fixture
+def client():
+    """Cliente de teste para a API."""
+    from app.main import app
+    return TestClient(app)
+
+
+class TestStageTimings:
+    """Testes para a medição de etapas."""
+
+    @pytest.mark.unit
+    def test_histogram_buckets_are_cumulative(self):
+        """TDD: Os buckets devem ser cumulativos e terminar em +Inf com a contagem total."""
+        histogram = Histogram("test_seconds", "Teste", ['stage'], buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value, 'rag')
+
+        data = histogram.snapshot()[('rag',)]
+        assert data['buckets'] == [(0.1, 1), (1.0, 3), (float('inf'), 4)]
+        assert data['count'] == 4
+        assert data['sum'] == pytest.approx(6.05)
+        assert 'test_seconds_bucket{stage="rag",le="+Inf"} 4' in histogram.render()
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_nested_stage_is_counted_once(self):
+        """
+        TDD: Etapas aninhadas com o mesmo nome não devem somar o tempo duas vezes.
+        Código crítico - calculate_complete_chart_with_houses chama create_kr_instance.
+        """
+        @timed_stage('ephemeris')
+        def inner():
+            return 1
+
+        @timed_stage('ephemeris')
+        def outer():
+            return inner() + inner()
+
+        timings = RequestTimings()
+        token = _request_timings.set(timings)
+        try:
+            assert outer() == 2
+            with stage('rag'):
+                pass
+        finally:
+            _request_timings.reset(token)
+
+        stages = timings.stages()
+        assert stages['ephemeris'][1] == 1
+        assert stages['rag'][1] == 1
+        header = timings.header()
+        assert header.startswith('ephemeris;dur=')
+        assert 'rag;dur=' in header
+        assert ', total;dur=' in header
+
+    @pytest.mark.unit
+    def test_stage_outside_request_only_feeds_histogram(self):
+        """TDD: Fora de uma requisição a etapa vai apenas para o histograma do processo."""
+        before = STAGE_DURATION.snapshot().get(('test_stage',), {'count': 0})['count']
+        with stage('test_stage'):
+            pass
+
+        assert STAGE_DURATION.snapshot()[('test_stage',)]['count'] == before + 1
+        assert metrics.current_request_timings() is None
+
+    @pytest.mark.unit
+    def test_llm_generation_is_timed_per_provider(self):
+        """TDD: agenerate_text deve registrar a duração por provedor e a etapa llm."""
+        from app.services.ai_provider_service import AIProviderService
+
+        class FakeProvider(AIProviderService):
+            def generate_text(self, system_prompt, user_prompt, temperature=0.7, max_tokens=2000, **kwargs):
+                return "texto"
+
+            def is_available(self):
+                return True
+
+            def get_provider_name(self):
+                return "fake"
+
+        async def generate():
+            timings = RequestTimings()
+            _request_timings.set(timings)
+            text = await FakeProvider().agenerate_text("sistema", "usuário")
+            return text, timings
+
+        text, timings = asyncio.run(generate())
+
+        assert text == "texto"
+        assert timings.stages()['llm'][1] == 1
+        assert metrics.LLM_DURATION.snapshot()[('fake', 'ok')]['count'] >= 1
+        assert metrics.STAGE_IN_FLIGHT.value('llm') == 0
+
+
+class TestMetricsEndpoints:
+    """Testes para o header Server-Timing e o endpoint /metrics."""
+
+    @pytest.mark.critical
+    @pytest.mark.api
+    def test_response_has_server_timing_with_db_stage(self, client):
+        """
+        TDD: As respostas devem trazer o header Server-Timing com o tempo do banco e o total.
+        Código crítico - é a forma de descobrir qual etapa deixou a requisição lenta.
+        """
+        response = client.get("/health")
+
+        assert response.status_code in (200, 503)
+        server_timing = response.headers["server-timing"]
+        assert "db;dur=" in server_timing
+        assert "total;dur=" in server_timing
+
+    @pytest.mark.api
+    def test_timing_allow_origin_for_allowed_origins(self, client):
+        """TDD: Origens permitidas no CORS devem poder ler o Server-Timing no navegador."""
+        response = client.get("/", headers={"Origin": "https://www.cosmoastral.com.br"})
+
+        assert response.headers["timing-allow-origin"] == "https://www.cosmoastral.com.br"
+        assert "timing-allow-origin" not in client.get("/", headers={"Origin": "https://outro.example"}).headers
+
+    @pytest.mark.api
+    def test_metrics_endpoint_exposes_prometheus_text(self, client):
+        """TDD: /metrics deve expor histogramas por endpoint, etapas e os caches."""
+        client.get("/")
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        assert 'astrologia_http_request_duration_seconds_count{method="GET",endpoint="/",status="200"}' in body
+        assert "# TYPE astrologia_stage_duration_seconds histogram" in body
+        assert 'astrologia_cache_requests_total{cache="geo_timezone",result="hit"}' in body
+        assert 'astrologia_cache_hit_ratio{cache="chart_data"}' in body
+        assert "astrologia_http_requests_in_flight" in body
+
+    @pytest.mark.api
+    def test_unmatched_paths_share_one_label(self, client):
+        """TDD: URLs inexistentes não devem criar uma série por caminho."""
+        client.get("/nao-existe-123")
+
+        assert 'endpoint="unmatched",status="404"' in client.get("/metrics").text
+        assert "/nao-existe-123" not in client.get("/metrics").text
+
+    @pytest.mark.api
+    def test_metrics_disabled(self, client):
+        """TDD: Com METRICS_ENABLED=False o endpoint deve responder 404."""
+        with patch.object(metrics.settings, 'METRICS_ENABLED', False):
+            response = client.get("/metrics")
+
+        assert response.status_code == 404
+        assert "server-timing" not in response.headers
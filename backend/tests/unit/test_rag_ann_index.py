@@ -0,0 +1,167 @@
+"""
+Testes TDD para o índice ANN opcional do RAG (hnswlib / faiss).
+Garante recall com reavaliação exata e persistência junto ao índice base.
+"""
+import threading
+from collections import OrderedDict
+
+import pytest
+import numpy as np
+
+from app.services import rag_service_fastembed
+from app.services.ann_index import ANNIndex, HAS_FAISS, HAS_HNSWLIB
+from app.services.rag_service_fastembed import RAGServiceFastEmbed, _normalize_rows
+
+
+EMBEDDING_DIM = 32
+
+requires_hnswlib = pytest.mark.skipif(not HAS_HNSWLIB, reason="hnswlib não instalado")
+requires_faiss = pytest.mark.skipif(not HAS_FAISS, reason="faiss-cpu não instalado")
+
+
+def _clustered_vectors(n, seed=3):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(20, EMBEDDING_DIM))
+    vectors = centers[rng.integers(0, 20, n)] + 0.4 * rng.normal(size=(n, EMBEDDING_DIM))
+    queries = centers[rng.integers(0, 20, 10)] + 0.4 * rng.normal(size=(10, EMBEDDING_DIM))
+    return vectors.astype(np.float32), queries
+
+
+def _make_service(vectors, ann_backend=None):
+    service = RAGServiceFastEmbed.__new__(RAGServiceFastEmbed)
+    service.embeddings_matrix = vectors
+    service.documents = [
+        {'text': f"doc {i}", 'page': i, 'category': 'numerology' if i % 3 == 0 else 'astrology'}
+        for i in range(len(vectors))
+    ]
+    service.learned_documents = []
+    service.learned_embeddings_matrix = None
+    service.embeddings_normalized = False
+    service.embeddings_dtype = 'float32'
+    service._search_state = {}
+    service._query_embedding_cache = OrderedDict()
+    service._query_cache_lock = threading.Lock()
+    service._query_cache_stats = {'hits': 0, 'misses': 0}
+    service.ann_backend = ann_backend
+    service.ann_index = None
+    service._build_ann_index()
+    return service
+
+
+def _ranked_ids(service, query, top_k=10, category=None, ann_effort=None):
+    return [idx for _, idx, _ in service._rank_documents(query, top_k, category, ann_effort)]
+
+
+@pytest.fixture(autouse=True)
+def fastembed_available(monkeypatch):
+    monkeypatch.setattr(rag_service_fastembed, "HAS_FASTEMBED", True)
+
+
+class TestRAGANNIndex:
+    """Testes para a busca aproximada com reavaliação exata."""
+
+    @requires_hnswlib
+    @pytest.mark.unit
+    def test_hnsw_matches_exact_search(self):
+        """TDD: Com HNSW, o top-k deve coincidir com a busca exata em índice pequeno."""
+        vectors, queries = _clustered_vectors(2000)
+        exact = _make_service(vectors)
+        approximate = _make_service(vectors, ann_backend='hnsw')
+
+        assert approximate.ann_index is not None
+        for query in queries:
+            assert _ranked_ids(approximate, query) == _ranked_ids(exact, query)
+
+    @requires_hnswlib
+    @pytest.mark.unit
+    def test_hnsw_respects_category_filter(self):
+        """TDD: Resultados aproximados devem respeitar o filtro de categoria."""
+        vectors, queries = _clustered_vectors(2000)
+        exact = _make_service(vectors)
+        approximate = _make_service(vectors, ann_backend='hnsw')
+
+        for query in queries:
+            ids = _ranked_ids(approximate, query, top_k=5, category='numerology')
+            assert all(i % 3 == 0 for i in ids)
+            assert ids == _ranked_ids(exact, query, top_k=5, category='numerology')
+
+    @requires_hnswlib
+    @pytest.mark.unit
+    def test_index_round_trips_through_disk(self, tmp_path):
+        """TDD: O índice salvo deve ser recarregado com o mesmo backend."""
+        vectors, queries = _clustered_vectors(500)
+        normalized = _normalize_rows(vectors)
+        index = ANNIndex.build(normalized, 'hnsw')
+        index.save(tmp_path)
+
+        loaded = ANNIndex.load(tmp_path, 'hnsw')
+
+        assert loaded is not None and loaded.size == 500
+        query = _normalize_rows(queries[0])[0]
+        assert list(loaded.search(query, 5)[0]) == list(index.search(query, 5)[0])
+        assert ANNIndex.load(tmp_path, 'ivfpq') is None
+
+    @requires_hnswlib
+    @pytest.mark.unit
+    def test_index_rebuilt_on_load_is_saved(self, tmp_path, monkeypatch):
+        """TDD: Um índice ANN reconstruído no load_index deve ser salvo para os próximos workers."""
+        import json
+        vectors, _ = _clustered_vectors(500)
+        base = _make_service(vectors)
+        np.save(tmp_path / "embeddings.npy", _normalize_rows(vectors))
+        (tmp_path / "documents.json").write_text(json.dumps(base.documents), encoding='utf-8')
+        (tmp_path / "metadata.json").write_text(
+            json.dumps({'model_name': 'fake-model', 'normalized': True}), encoding='utf-8'
+        )
+
+        def worker():
+            service = _make_service(vectors[:1])
+            service.index_path = tmp_path
+            service.bge_model_name = 'fake-model'
+            service.ann_backend = 'hnsw'
+            assert service.load_index() is True
+            return service
+
+        first = worker()
+        assert first.ann_index is not None and first.ann_index.size == 500
+        assert not list(tmp_path.glob("*.tmp"))
+
+        monkeypatch.setattr(ANNIndex, "build", classmethod(lambda cls, *args: pytest.fail("não deveria reconstruir")))
+        second = worker()
+
+        assert second.ann_index.size == 500
+
+    @requires_faiss
+    @pytest.mark.unit
+    def test_ivfpq_recall_improves_with_effort(self):
+        """TDD: Mais nprobe deve aumentar (ou manter) o recall do IVF-PQ."""
+        vectors, queries = _clustered_vectors(20000)
+        exact = _make_service(vectors)
+        approximate = _make_service(vectors, ann_backend='ivfpq')
+
+        def recall(effort):
+            hits = [
+                len(set(_ranked_ids(approximate, q, ann_effort=effort)) & set(_ranked_ids(exact, q)))
+                for q in queries
+            ]
+            return sum(hits) / (10 * len(queries))
+
+        assert recall(64) >= recall(1)
+        assert recall(64) >= 0.7
+
+    @requires_faiss
+    @pytest.mark.unit
+    def test_small_index_falls_back_to_exact_search(self):
+        """TDD: IVF-PQ sem vetores suficientes para treino deve cair na busca exata."""
+        vectors, queries = _clustered_vectors(100)
+
+        service = _make_service(vectors, ann_backend='ivfpq')
+
+        assert service.ann_index is None
+        assert len(_ranked_ids(service, queries[0])) == 10
+
+    @pytest.mark.unit
+    def test_unknown_backend_raises_value_error(self):
+        """TDD: Backend desconhecido deve gerar ValueError."""
+        with pytest.raises(ValueError):
+            ANNIndex.build(np.eye(4, dtype=np.float32), 'annoy')
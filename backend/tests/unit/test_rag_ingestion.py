@@ -0,0 +1,173 @@
+"""
+Testes TDD para a Ingestão de Documentos do RAG.
+Garante que a reconstrução do índice só reprocessa os arquivos alterados.
+"""
+import hashlib
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.services import rag_service_fastembed
+from app.services.rag_ingestion import (
+    discover_sources,
+    extract_document_chunks,
+    ingest_documents,
+    iter_extracted,
+)
+
+
+EMBEDDING_DIM = 8
+SIGNATURE = {'model_name': 'fake-model', 'chunk_size': 1000, 'chunk_overlap': 200}
+
+
+class CountingEmbedder:
+    """Vetor determinístico por texto; registra os textos enviados ao modelo."""
+
+    def __init__(self):
+        self.texts = []
+
+    def embed(self, texts, batch_size=None):
+        for text in texts:
+            self.texts.append(text)
+            seed = int(hashlib.sha256(text.encode('utf-8')).hexdigest()[:8], 16)
+            yield np.random.default_rng(seed).normal(size=EMBEDDING_DIM).astype(np.float32)
+
+
+def _write_book(path, title, paragraphs=3):
+    body = "\n\n".join(
+        f"{title}: parágrafo {i} sobre trânsitos, casas e aspectos planetários. " * 12
+        for i in range(paragraphs)
+    )
+    path.write_text(body, encoding='utf-8')
+
+
+def _title_of(chunk_text):
+    """Título do livro de teste que gerou o chunk (cada frase começa com ele)."""
+    for title in ('Casas revisadas', 'Dignidades', 'Casas', 'Aspectos', 'Arcanos'):
+        if f"{title}: " in chunk_text:
+            return title
+    return None
+
+
+@pytest.fixture
+def library(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (tmp_path / "tarot").mkdir()
+    _write_book(docs / "casas.md", "Casas")
+    _write_book(docs / "aspectos.md", "Aspectos")
+    _write_book(tmp_path / "tarot" / "arcanos.md", "Arcanos")
+    return docs
+
+
+def _ingest(docs, embedder, previous=None, signature=SIGNATURE):
+    previous = previous or {}
+    return ingest_documents(
+        discover_sources(docs),
+        embedder.embed,
+        previous_documents=previous.get('documents'),
+        previous_matrix=previous.get('embeddings'),
+        manifest=previous.get('manifest'),
+        settings_signature=signature,
+        batch_size=4,
+    )
+
+
+class TestIngestionPipeline:
+    """Testes para a extração e o fluxo em lotes."""
+
+    @pytest.mark.unit
+    def test_sources_and_chunks(self, library):
+        """TDD: Arquivos em ordem estável; tarot entra como numerologia."""
+        sources = discover_sources(library)
+
+        assert [source['key'] for source in sources] == ['docs/aspectos.md', 'docs/casas.md', 'tarot/arcanos.md']
+        chunks = extract_document_chunks(str(sources[2]['path']), sources[2]['category'])
+        assert chunks and all(chunk['category'] == 'numerology' for chunk in chunks)
+        assert chunks[0]['source'] == 'arcanos.md'
+        assert chunks[0]['file_type'] == 'markdown'
+
+    @pytest.mark.unit
+    def test_process_pool_matches_inline_extraction(self, library):
+        """TDD: A extração em processos deve produzir os mesmos chunks da extração sequencial."""
+        sources = discover_sources(library)
+
+        inline = {source['key']: chunks for source, chunks in iter_extracted(sources, workers=1)}
+        pooled = {source['key']: chunks for source, chunks in iter_extracted(sources, workers=2)}
+
+        assert pooled == inline
+
+
+class TestIncrementalRebuild:
+    """Testes para o manifesto e a reconstrução incremental."""
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_only_changed_files_are_embedded(self, library):
+        """
+        TDD: Arquivos sem alteração devem reaproveitar as linhas da matriz atual.
+        Código crítico - reconstruir o índice inteiro a cada livro novo leva horas.
+        """
+        first = _ingest(library, CountingEmbedder())
+
+        _write_book(library / "casas.md", "Casas revisadas", paragraphs=4)
+        (library / "aspectos.md").unlink()
+        _write_book(library / "dignidades.md", "Dignidades")
+
+        embedder = CountingEmbedder()
+        second = _ingest(library, embedder, previous=first)
+        full = _ingest(library, CountingEmbedder())
+
+        assert second['stats'] == {'reused': 1, 'processed': 2, 'removed': 1, 'chunks': len(full['documents'])}
+        assert embedder.texts and all(_title_of(text) in ('Casas revisadas', 'Dignidades') for text in embedder.texts)
+        assert second['documents'] == full['documents']
+        np.testing.assert_array_equal(second['embeddings'], full['embeddings'])
+        assert list(second['manifest']['files']) == ['docs/casas.md', 'docs/dignidades.md', 'tarot/arcanos.md']
+
+    @pytest.mark.unit
+    def test_unchanged_library_embeds_nothing(self, library):
+        """TDD: Sem alterações, nenhum texto deve ir para o modelo de embeddings."""
+        first = _ingest(library, CountingEmbedder())
+        embedder = CountingEmbedder()
+
+        second = _ingest(library, embedder, previous=first)
+
+        assert embedder.texts == []
+        np.testing.assert_array_equal(second['embeddings'], first['embeddings'])
+
+    @pytest.mark.unit
+    def test_model_change_forces_full_rebuild(self, library):
+        """TDD: Com outro modelo de embeddings, todas as linhas devem ser recalculadas."""
+        first = _ingest(library, CountingEmbedder())
+        embedder = CountingEmbedder()
+
+        second = _ingest(library, embedder, previous=first, signature=dict(SIGNATURE, model_name='outro'))
+
+        assert second['stats']['reused'] == 0
+        assert len(embedder.texts) == len(first['documents'])
+
+    @pytest.mark.unit
+    def test_service_rebuild_uses_saved_manifest(self, library):
+        """TDD: process_all_documents + save_index devem permitir reconstrução incremental depois de load_index."""
+        def make_service():
+            with patch.object(rag_service_fastembed, 'HAS_FASTEMBED', False):
+                service = rag_service_fastembed.RAGServiceFastEmbed(
+                    docs_path=str(library), index_path=str(library.parent / "index")
+                )
+            service.bge_model_name = 'fake-model'
+            service.embedding_model = CountingEmbedder()
+            return service
+
+        service = make_service()
+        total = service.process_all_documents(workers=1)
+        service.save_index()
+
+        _write_book(library / "casas.md", "Casas revisadas")
+        reloaded = make_service()
+        assert reloaded.load_index() is True
+        assert reloaded.process_all_documents(workers=1) == total
+
+        texts = reloaded.embedding_model.texts
+        assert texts and all(_title_of(text) == 'Casas revisadas' for text in texts)
+        assert (library.parent / "index" / "manifest.json").exists()
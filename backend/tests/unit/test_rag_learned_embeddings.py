@@ -0,0 +1,165 @@
+"""
+Testes TDD para o buffer de embeddings dos documentos aprendidos.
+Garante inserção O(1) amortizada e leituras consistentes durante escritas concorrentes.
+"""
+import threading
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from app.services import rag_learning_service, rag_service_fastembed
+from app.services.learned_embeddings import LearnedEmbeddingBuffer
+
+
+EMBEDDING_DIM = 8
+
+
+def _vector(i):
+    return np.random.default_rng(i).normal(size=EMBEDDING_DIM).astype(np.float32)
+
+
+def _doc(i):
+    return {'text': f"aprendido {i}", 'id': i, 'category': 'numerology' if i % 3 == 0 else 'astrology'}
+
+
+class CountingEmbedder:
+    """Vetor determinístico por texto; registra os textos enviados ao modelo."""
+
+    def __init__(self):
+        self.texts = []
+
+    def embed(self, texts, batch_size=None):
+        for text in texts:
+            self.texts.append(text)
+            yield _vector(sum(text.encode('utf-8')))
+
+
+class TestLearnedEmbeddingBuffer:
+    """Testes para o crescimento e os snapshots do buffer."""
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_capacity_doubles_instead_of_copying_every_insert(self):
+        """
+        TDD: A matriz só deve ser realocada ao encher, dobrando a capacidade.
+        Código crítico - np.vstack por inserção tornava o aprendizado O(n²).
+        """
+        buffer = LearnedEmbeddingBuffer(initial_capacity=4)
+        capacities = []
+        for i in range(100):
+            buffer.append(_doc(i), _vector(i))
+            capacities.append(buffer.capacity)
+
+        assert sorted(set(capacities)) == [4, 8, 16, 32, 64, 128]
+        state = buffer.snapshot()
+        assert state['size'] == 100
+        np.testing.assert_allclose(np.linalg.norm(state['normalized'], axis=1), 1.0, rtol=1e-5)
+        assert np.array_equal(np.flatnonzero(state['masks']['numerology']), np.arange(0, 100, 3))
+
+    @pytest.mark.unit
+    def test_published_snapshot_is_not_affected_by_later_writes(self):
+        """TDD: Um snapshot já lido deve continuar igual após inserções e realocações."""
+        buffer = LearnedEmbeddingBuffer(initial_capacity=2)
+        buffer.extend([_doc(0), _doc(1)], np.vstack([_vector(0), _vector(1)]))
+        before = buffer.snapshot()
+        rows = before['normalized'].copy()
+
+        for i in range(2, 10):
+            buffer.append(_doc(i), _vector(i))
+
+        assert before['size'] == 2
+        np.testing.assert_array_equal(before['normalized'], rows)
+        assert len(buffer.snapshot()['normalized']) == 10
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_readers_see_consistent_state_during_writes(self):
+        """
+        TDD: Leitores sem lock devem sempre ver linhas, documentos e máscaras do mesmo tamanho.
+        Código crítico - o aprendizado roda com buscas concorrentes.
+        """
+        buffer = LearnedEmbeddingBuffer(initial_capacity=1)
+        expected = np.vstack([_vector(i) for i in range(2000)])
+        expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+        errors = []
+        done = threading.Event()
+
+        def reader():
+            while not done.is_set():
+                state = buffer.snapshot()
+                n = state['size']
+                if n == 0:
+                    continue
+                try:
+                    assert state['normalized'].shape == (n, EMBEDDING_DIM)
+                    assert all(len(mask) == n for mask in state['masks'].values())
+                    last = n - 1
+                    assert state['documents'][last]['id'] == last
+                    np.testing.assert_allclose(state['normalized'][last], expected[last], rtol=1e-5)
+                except AssertionError as e:
+                    errors.append(e)
+
+        readers = [threading.Thread(target=reader) for _ in range(3)]
+        for thread in readers:
+            thread.start()
+        for i in range(2000):
+            buffer.append(_doc(i), _vector(i))
+        done.set()
+        for thread in readers:
+            thread.join()
+
+        assert errors == []
+        assert len(buffer) == 2000
+
+
+class TestLearnedDocumentsInService:
+    """Testes para a carga dos documentos aprendidos no serviço RAG."""
+
+    @staticmethod
+    def _service(index_path, embedder):
+        with patch.object(rag_service_fastembed, 'HAS_FASTEMBED', False):
+            service = rag_service_fastembed.RAGServiceFastEmbed(index_path=str(index_path))
+        service.bge_model_name = 'fake-model'
+        service.embedding_model = embedder
+        return service
+
+    @pytest.mark.unit
+    def test_startup_reuses_cached_learned_embeddings(self, tmp_path):
+        """TDD: No startup, só interpretações novas devem passar pelo modelo de embeddings."""
+        learned = [
+            {'text': f"Interpretação aprendida número {i} sobre Saturno na casa {i}.", 'hash': f"h{i}",
+             'category': 'astrology', 'metadata': {}}
+            for i in range(5)
+        ]
+        learning = MagicMock()
+        learning.get_learned_interpretations.side_effect = lambda: list(learned)
+
+        with patch.object(rag_learning_service, 'get_learning_service', return_value=learning):
+            first = self._service(tmp_path, CountingEmbedder())
+            first.load_learned_documents()
+
+            learned.append({'text': "Interpretação aprendida nova sobre Júpiter em trânsito.", 'hash': "h5",
+                            'category': 'astrology', 'metadata': {}})
+            second = self._service(tmp_path, CountingEmbedder())
+            second.load_learned_documents()
+
+        assert len(first.embedding_model.texts) == 5
+        assert second.embedding_model.texts == [learned[5]['text']]
+        assert len(second.learned_documents) == 6
+        np.testing.assert_allclose(second.learned_embeddings_matrix[:5], first.learned_embeddings_matrix, rtol=1e-6)
+
+    @pytest.mark.unit
+    def test_added_document_is_searchable(self, tmp_path):
+        """TDD: Um documento aprendido em tempo de execução entra nas buscas seguintes."""
+        service = self._service(tmp_path, CountingEmbedder())
+        service.documents = [{'text': 'base', 'category': 'astrology'}]
+        service.embeddings_matrix = -np.ones((1, EMBEDDING_DIM), dtype=np.float32)
+        text = "Saturno em trânsito pela casa 10 pede responsabilidade e estrutura."
+
+        assert service.add_learned_document(text) is True
+        service.embedding_model.embed = lambda texts: [_vector(sum(text.encode('utf-8'))) for _ in texts]
+        results = service.search(text, top_k=1)
+
+        assert results[0]['is_learned'] is True
+        assert results[0]['text'] == text
@@ -0,0 +1,111 @@
+"""
+Testes TDD para o Aprendizado Contínuo do RAG.
+Garante que o log somente-anexação e o índice MinHash/LSH mantêm o custo por interpretação constante.
+"""
+import json
+import random
+from unittest.mock import patch
+
+import pytest
+
+from app.services import rag_learning_service
+from app.services.near_duplicate_index import jaccard, minhash_signature, word_set
+from app.services.rag_learning_service import RAGLearningService
+
+
+METADATA = {"planet": "Sol", "category": "astrology"}
+
+
+def _interpretation(seed: int, words: int = 80) -> str:
+    """Texto válido com vocabulário aleatório (similaridade baixa entre sementes diferentes)."""
+    rng = random.Random(seed)
+    body = " ".join(f"termo{rng.randrange(5000)}" for _ in range(words))
+    return f"O Sol nesta posição indica {body}."
+
+
+@pytest.fixture
+def learning_path(tmp_path):
+    return tmp_path / "rag_learning"
+
+
+class TestNearDuplicateIndex:
+    """Testes para as assinaturas MinHash."""
+
+    @pytest.mark.unit
+    def test_signature_estimates_jaccard(self):
+        """TDD: A fração de valores iguais nas assinaturas deve aproximar o Jaccard exato."""
+        words1 = word_set(_interpretation(1, words=200))
+        words2 = frozenset(list(words1)[:150]) | word_set(_interpretation(2, words=50))
+
+        estimate = (minhash_signature(words1) == minhash_signature(words2)).mean()
+
+        assert abs(estimate - jaccard(words1, words2)) < 0.15
+
+
+class TestLearningStore:
+    """Testes para o log somente-anexação."""
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_duplicates_and_near_duplicates_are_rejected(self, learning_path):
+        """
+        TDD: Textos iguais ou quase iguais aos aprendidos devem ser rejeitados.
+        Código crítico - duplicatas poluem o contexto recuperado pelo RAG.
+        """
+        service = RAGLearningService(str(learning_path))
+        original = _interpretation(1)
+        assert service.save_interpretation(original, "Sol", dict(METADATA)) is True
+
+        near = original.replace("indica", "mostra", 1)
+        assert service.validate_interpretation(original, METADATA) == (False, "Interpretação duplicada")
+        assert service.validate_interpretation(near, METADATA)[1].startswith("Interpretação muito similar")
+        assert service.validate_interpretation(_interpretation(2), METADATA) == (True, "Válida")
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_validation_cost_does_not_scan_corpus(self, learning_path):
+        """
+        TDD: Validar um texto novo deve comparar apenas com os candidatos do LSH, não com todo o corpus.
+        Código crítico - o corpus aprendido pode chegar a centenas de milhares de entradas.
+        """
+        service = RAGLearningService(str(learning_path))
+        for seed in range(300):
+            service.save_interpretation(_interpretation(seed), "Sol", dict(METADATA))
+        assert len(service.learned_interpretations) == 300
+
+        with patch.object(rag_learning_service, 'jaccard', wraps=jaccard) as exact:
+            assert service.validate_interpretation(_interpretation(10_000), METADATA) == (True, "Válida")
+
+        assert exact.call_count < 10
+
+    @pytest.mark.unit
+    def test_entries_persist_and_are_shared_between_workers(self, learning_path):
+        """TDD: Outra instância no mesmo caminho (outro worker) deve ver as interpretações salvas."""
+        worker_a = RAGLearningService(str(learning_path))
+        worker_b = RAGLearningService(str(learning_path))
+        text = _interpretation(7)
+
+        assert worker_a.save_interpretation(text, "Sol", dict(METADATA)) is True
+
+        assert worker_b.validate_interpretation(text, METADATA) == (False, "Interpretação duplicada")
+        assert worker_b.save_interpretation(text, "Sol", dict(METADATA)) is False
+        assert [entry["text"] for entry in RAGLearningService(str(learning_path)).get_learned_interpretations()] == [
+            text.strip()
+        ]
+
+    @pytest.mark.unit
+    def test_legacy_json_is_migrated_once(self, learning_path):
+        """TDD: O antigo learned_interpretations.json deve ser importado uma única vez."""
+        learning_path.mkdir(parents=True)
+        legacy = [
+            {"text": _interpretation(1), "query": "Sol", "metadata": METADATA, "category": "astrology"},
+            {"text": _interpretation(2), "query": "Sol", "metadata": METADATA, "category": "numerology"},
+        ]
+        (learning_path / "learned_interpretations.json").write_text(json.dumps(legacy), encoding='utf-8')
+
+        service = RAGLearningService(str(learning_path))
+        assert len(service.get_learned_interpretations()) == 2
+        assert len(service.get_learned_interpretations(category="numerology")) == 1
+
+        service.clear_learned_data()
+        assert RAGLearningService(str(learning_path)).get_learned_interpretations() == []
@@ -0,0 +1,252 @@
+"""
+Testes TDD para a busca vetorial do RAG (FastEmbed).
+Garante que a busca matricial retorna o mesmo ranking da similaridade cosseno.
+"""
+import threading
+from collections import OrderedDict
+
+import pytest
+import numpy as np
+
+from app.services import rag_service_fastembed
+from app.services.rag_service_fastembed import RAGServiceFastEmbed
+
+
+EMBEDDING_DIM = 16
+
+
+class FakeEmbeddingModel:
+    """Modelo de embeddings determinístico (sem download do BGE)."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def embed(self, texts):
+        return [self.vectors[text] for text in texts]
+
+
+def _make_service(n_docs=200, seed=7):
+    rng = np.random.default_rng(seed)
+    service = RAGServiceFastEmbed.__new__(RAGServiceFastEmbed)
+    service.embeddings_matrix = rng.normal(size=(n_docs, EMBEDDING_DIM)).astype(np.float32)
+    service.documents = [
+        {
+            'text': f"doc {i}",
+            'source': f"livro_{i}.pdf",
+            'page': i,
+            'category': 'numerology' if i % 4 == 0 else 'astrology'
+        }
+        for i in range(n_docs)
+    ]
+    service.learned_documents = []
+    service.learned_embeddings_matrix = None
+    service.embeddings_normalized = False
+    service.embeddings_dtype = 'float32'
+    service._search_state = {}
+    service._query_embedding_cache = OrderedDict()
+    service._query_cache_lock = threading.Lock()
+    service._query_cache_stats = {'hits': 0, 'misses': 0}
+    service.ann_backend = None
+    service.ann_index = None
+    query = rng.normal(size=EMBEDDING_DIM)
+    service.embedding_model = FakeEmbeddingModel({'consulta': query})
+    return service, query
+
+
+def _brute_force_ranking(matrix, query):
+    scores = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query))
+    return list(np.argsort(-scores))
+
+
+@pytest.fixture(autouse=True)
+def fastembed_available(monkeypatch):
+    monkeypatch.setattr(rag_service_fastembed, "HAS_FASTEMBED", True)
+
+
+class TestRAGVectorSearch:
+    """Testes para a busca matricial com top-k por argpartition."""
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_matrix_search_matches_cosine_ranking(self):
+        """
+        TDD: O top-k deve ser o mesmo da similaridade cosseno par a par.
+        Código crítico - define o contexto enviado às interpretações.
+        """
+        service, query = _make_service()
+
+        results = service.search("consulta", top_k=10)
+
+        expected = _brute_force_ranking(service.embeddings_matrix, query)[:10]
+        assert [r['page'] for r in results] == expected
+        assert all(results[i]['score'] >= results[i + 1]['score'] for i in range(9))
+
+    @pytest.mark.unit
+    def test_category_filter_uses_only_matching_documents(self):
+        """TDD: O filtro de categoria deve considerar apenas documentos da categoria."""
+        service, query = _make_service()
+
+        results = service.search("consulta", top_k=5, category='numerology')
+
+        numerology = [i for i, doc in enumerate(service.documents) if doc['category'] == 'numerology']
+        ranking = _brute_force_ranking(service.embeddings_matrix[numerology], query)[:5]
+        assert [r['page'] for r in results] == [numerology[i] for i in ranking]
+        assert all(r['category'] == 'numerology' for r in results)
+
+    @pytest.mark.unit
+    def test_learned_documents_are_ranked_with_boost(self):
+        """TDD: Documentos aprendidos entram no ranking com boost de 5%."""
+        service, query = _make_service()
+        service.learned_documents = [{'text': 'aprendido', 'category': 'astrology'}]
+        service.learned_embeddings_matrix = np.array([query * 3.0])
+
+        results = service.search("consulta", top_k=3)
+
+        assert results[0]['is_learned'] is True
+        assert results[0]['score'] == pytest.approx(1.05, abs=1e-5)
+
+    @pytest.mark.unit
+    def test_search_state_follows_matrix_replacement(self):
+        """TDD: Ao substituir a matriz (novo índice), a busca deve usar os novos vetores."""
+        service, query = _make_service()
+        service.search("consulta", top_k=1)
+
+        service.embeddings_matrix = -service.embeddings_matrix
+        results = service.search("consulta", top_k=1)
+
+        assert results[0]['page'] == _brute_force_ranking(service.embeddings_matrix, query)[0]
+
+    @pytest.mark.unit
+    def test_top_k_larger_than_index(self):
+        """TDD: top_k maior que o índice retorna todos os documentos."""
+        service, _ = _make_service(n_docs=3)
+
+        results = service.search("consulta", top_k=10)
+
+        assert len(results) == 3
+
+
+class CountingEmbeddingModel(FakeEmbeddingModel):
+    """Modelo fake que registra cada chamada de embed (lote)."""
+
+    def __init__(self, vectors):
+        super().__init__(vectors)
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        return super().embed(texts)
+
+
+class TestRAGQueryBatching:
+    """Testes para o cache de embeddings de consultas e search_many."""
+
+    @pytest.mark.unit
+    def test_repeated_query_uses_embedding_cache(self):
+        """TDD: A mesma consulta (após normalização) deve ser embutida uma vez."""
+        service, query = _make_service()
+        service.embedding_model = CountingEmbeddingModel({'consulta': query})
+
+        service.search("consulta", top_k=3)
+        service.search("  consulta ", top_k=3)
+
+        assert service.embedding_model.calls == [['consulta']]
+        assert service.query_cache_stats()['hits'] == 1
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_search_many_matches_individual_searches(self):
+        """
+        TDD: search_many deve retornar o mesmo que search para cada consulta.
+        Código crítico - contexto da sinastria vem de search_many.
+        """
+        service, _ = _make_service()
+        rng = np.random.default_rng(21)
+        vectors = {f"q{i}": rng.normal(size=EMBEDDING_DIM) for i in range(6)}
+        service.embedding_model = CountingEmbeddingModel(vectors)
+        queries = list(vectors)
+
+        batched = service.search_many(queries, top_k=4, category='astrology')
+        individual = [service.search(q, top_k=4, category='astrology') for q in queries]
+
+        assert [[r['page'] for r in res] for res in batched] == [[r['page'] for r in res] for res in individual]
+        # Um único lote para as 6 consultas; as buscas individuais usam o cache
+        assert service.embedding_model.calls == [queries]
+
+    @pytest.mark.unit
+    def test_search_many_embeds_only_cache_misses(self):
+        """TDD: Apenas consultas fora do cache devem ir para o lote do FastEmbed."""
+        service, query = _make_service()
+        vectors = {'consulta': query, 'outra': -query}
+        service.embedding_model = CountingEmbeddingModel(vectors)
+
+        service.search("consulta", top_k=3)
+        results = service.search_many(['consulta', 'outra', 'outra'], top_k=3)
+
+        assert service.embedding_model.calls == [['consulta'], ['outra']]
+        assert len(results) == 3
+        assert results[1] == results[2]
+
+
+def _saved_service(tmp_path, embeddings_dtype):
+    service, query = _make_service()
+    service.index_path = tmp_path
+    service.bge_model_name = "fake-model"
+    service.embeddings_dtype = embeddings_dtype
+    service.save_index()
+
+    loaded, _ = _make_service(n_docs=0)
+    loaded.index_path = tmp_path
+    loaded.bge_model_name = "fake-model"
+    loaded.embedding_model = service.embedding_model
+    assert loaded.load_index() is True
+    return service, loaded, query
+
+
+class TestRAGZeroCopyIndex:
+    """Testes para o carregamento do índice via memória mapeada."""
+
+    @pytest.mark.unit
+    def test_loaded_index_is_memory_mapped_without_embedding_lists(self, tmp_path):
+        """TDD: O índice carregado deve ser um mmap e os documentos não devem carregar embeddings."""
+        _, loaded, _ = _saved_service(tmp_path, 'float32')
+
+        assert isinstance(loaded.embeddings_matrix, np.memmap)
+        assert loaded.embeddings_normalized is True
+        assert all('embedding' not in doc for doc in loaded.documents)
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_loaded_index_keeps_ranking(self, tmp_path):
+        """
+        TDD: A busca após salvar/carregar deve retornar o mesmo ranking.
+        Código crítico - índice carregado por todos os workers.
+        """
+        service, loaded, _ = _saved_service(tmp_path, 'float32')
+
+        expected = [r['page'] for r in service.search("consulta", top_k=10)]
+
+        assert [r['page'] for r in loaded.search("consulta", top_k=10)] == expected
+        # Busca sobre o mmap não deve criar uma cópia normalizada
+        assert np.shares_memory(loaded._search_state['base']['normalized'], loaded.embeddings_matrix)
+
+    @pytest.mark.unit
+    def test_float16_index_matches_float32_ranking(self, tmp_path):
+        """TDD: O índice float16 deve ocupar metade do espaço e manter o top-k."""
+        service, loaded, query = _saved_service(tmp_path, 'float16')
+
+        assert loaded.embeddings_matrix.dtype == np.float16
+        expected = _brute_force_ranking(service.embeddings_matrix, query)[:5]
+        assert [r['page'] for r in loaded.search("consulta", top_k=5)] == expected
+
+    @pytest.mark.unit
+    def test_learned_document_does_not_store_embedding_list(self):
+        """TDD: Documentos aprendidos guardam o embedding apenas na matriz."""
+        service, query = _make_service()
+        text = "Texto aprendido sobre trânsitos de Saturno " * 3
+        service.embedding_model = FakeEmbeddingModel({text: query})
+
+        assert service.add_learned_document(text) is True
+
+        assert 'embedding' not in service.learned_documents[0]
+        assert service.learned_embeddings_matrix.shape == (1, EMBEDDING_DIM)
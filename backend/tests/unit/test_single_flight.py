@@ -0,0 +1,103 @@
+"""
+Testes TDD para o Single-Flight (coalescência de cálculos concorrentes).
+Garante que requisições simultâneas do mesmo mapa executam um único cálculo.
+"""
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from app.services import chart_data_cache
+from app.services.chart_data_cache import ChartDataCache, get_or_calculate_chart
+from app.services.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Testes para a coalescência de chamadas."""
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_concurrent_calls_share_one_execution(self):
+        """
+        TDD: Chamadas simultâneas com a mesma chave executam a função uma vez.
+        Código crítico - evita recálculo do mapa natal em cada endpoint do dashboard.
+        """
+        flight = SingleFlight("test")
+        calls = []
+
+        def slow_calculation():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'sun_sign': 'Touro'}
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: flight.do("same", slow_calculation), range(8)))
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert flight.stats()['coalesced'] == 7
+        assert flight.in_flight() == 0
+
+    @pytest.mark.unit
+    def test_errors_are_propagated_to_all_waiters(self):
+        """TDD: Um erro no cálculo deve chegar a todas as chamadas coalescidas."""
+        flight = SingleFlight("test")
+        started = threading.Event()
+
+        def failing_calculation():
+            started.set()
+            time.sleep(0.1)
+            raise ValueError("falhou")
+
+        def call():
+            try:
+                flight.do("same", failing_calculation)
+            except ValueError as e:
+                return str(e)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            leader = pool.submit(call)
+            started.wait()
+            followers = [pool.submit(call) for _ in range(3)]
+            errors = [leader.result()] + [f.result() for f in followers]
+
+        assert errors == ["falhou"] * 4
+        assert flight.in_flight() == 0
+
+    @pytest.mark.unit
+    def test_sequential_calls_recalculate(self):
+        """TDD: Single-flight não é cache - chamadas sequenciais executam novamente."""
+        flight = SingleFlight("test")
+        calls = []
+
+        flight.do("same", lambda: calls.append(1))
+        flight.do("same", lambda: calls.append(1))
+
+        assert len(calls) == 2
+
+    @pytest.mark.unit
+    def test_get_or_calculate_chart_coalesces_cache_misses(self, tmp_path, monkeypatch):
+        """TDD: Misses simultâneos do cache de mapas devem gerar um único cálculo."""
+        monkeypatch.setattr(ChartDataCache, "_cache", type(ChartDataCache._cache)())
+        monkeypatch.setattr(ChartDataCache, "_db_path", tmp_path / "chart_cache.db")
+        monkeypatch.setattr(ChartDataCache, "_connection", None)
+        monkeypatch.setattr(chart_data_cache, "_chart_flight", SingleFlight("natal_chart"))
+        calls = []
+
+        def calculate(*args):
+            calls.append(args)
+            time.sleep(0.2)
+            return {'sun_sign': 'Touro'}
+
+        def request(_):
+            return get_or_calculate_chart(
+                datetime(1990, 5, 15), "10:30", -23.5505, -46.6333, calculate_func=calculate
+            )
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            results = list(pool.map(request, range(6)))
+
+        assert len(calls) == 1
+        assert all(result == {'sun_sign': 'Touro'} for result in results)
+        ChartDataCache._connection.close()
@@ -0,0 +1,101 @@
+"""
+Testes TDD para o Estado do Céu Compartilhado.
+Garante que as posições de "agora" são calculadas uma vez por bucket para todos os usuários.
+"""
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from app.services import sky_state
+from app.services.ephemeris_batch_engine import calculate_positions_at
+from app.services.sky_state import SkyStateProvider, bucket_start, compute_sky_state
+
+
+INSTANT = datetime(2025, 12, 5, 14, 37, 42)
+
+
+class TestSkyStateProvider:
+    """Testes para o cache por bucket de tempo."""
+
+    @pytest.mark.unit
+    def test_bucket_start_floors_to_minute(self):
+        """TDD: Com buckets de 60 s o instante deve ser truncado no minuto."""
+        assert bucket_start(INSTANT) == datetime(2025, 12, 5, 14, 37)
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_same_bucket_is_computed_once(self):
+        """
+        TDD: Várias requisições no mesmo bucket devem reutilizar o mesmo cálculo.
+        Código crítico - é o ganho do serviço compartilhado.
+        """
+        provider = SkyStateProvider(preroll_buckets=0)
+
+        with patch.object(sky_state, 'compute_sky_state', side_effect=compute_sky_state) as compute:
+            first = provider.get(INSTANT)
+            second = provider.get(INSTANT + timedelta(seconds=10))
+
+        assert compute.call_count == 1
+        assert second is first
+        assert provider.stats()['hits'] == 1
+
+    @pytest.mark.unit
+    def test_next_buckets_are_prerolled_in_background(self):
+        """TDD: Os próximos buckets devem ser pré-calculados em segundo plano."""
+        provider = SkyStateProvider(preroll_buckets=2)
+
+        provider.get(INSTANT)
+        provider._executor.shutdown(wait=True)
+        provider._preroll_buckets = 0
+        provider.get(INSTANT + timedelta(minutes=2))
+
+        stats = provider.stats()
+        assert stats['prerolled'] == 2
+        assert stats['misses'] == 1
+        assert stats['hits'] == 1
+
+
+class TestSkyStateContent:
+    """Testes para o conteúdo do estado do céu."""
+
+    @pytest.mark.critical
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_positions_match_ephemeris(self):
+        """
+        TDD: As posições do céu compartilhado devem ser as do Swiss Ephemeris no início do bucket.
+        Código crítico - fonte de /daily-info e da Lua Fora de Curso.
+        """
+        state = compute_sky_state(datetime(2025, 12, 5, 14, 37))
+        expected = calculate_positions_at(datetime(2025, 12, 5, 14, 37))
+
+        for body, longitude in expected.items():
+            assert state['longitudes'][body] == pytest.approx(longitude, abs=1e-9)
+            planet = state['planets'][body]
+            assert planet['retrograde'] == (planet['speed'] < 0)
+        assert state['moon_sign'] == state['planets']['moon']['sign']
+        assert 0 <= state['moon_phase_angle'] < 360
+
+    @pytest.mark.unit
+    def test_daily_info_uses_shared_sky(self):
+        """TDD: /daily-info sem data deve ler a Lua e o Sol do céu compartilhado."""
+        from app.services.daily_info_calculator import get_daily_info
+
+        fake_state = {'longitudes': {'moon': 185.0, 'sun': 5.0}}
+        with patch.object(sky_state, 'get_sky_state', return_value=fake_state):
+            info = get_daily_info()
+
+        assert info['moon_sign'] == 'Libra'
+        assert info['moon_phase'] == 'Lua Cheia'
+
+    @pytest.mark.unit
+    def test_moon_void_now_uses_sky_state_instant(self):
+        """TDD: A Lua Fora de Curso de "agora" deve usar o instante e a Lua do céu compartilhado."""
+        from app.services.moon_void_calculator import calculate_moon_void_of_course
+
+        state = compute_sky_state(datetime(2025, 12, 5, 14, 37))
+        with patch.object(sky_state, 'get_sky_state', return_value=state):
+            now = calculate_moon_void_of_course()
+
+        explicit = calculate_moon_void_of_course(check_date=datetime(2025, 12, 5, 14, 37))
+        assert now == explicit
@@ -0,0 +1,134 @@
+"""
+Testes TDD para a Tabela Pré-Computada de Planetas Lentos.
+Garante que a interpolação bate com o Swiss Ephemeris e que o fallback funciona.
+"""
+import pytest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.services import slow_planet_table
+from app.services.astrology_calculator import shortest_angular_distance
+from app.services.ephemeris_batch_engine import calculate_positions_batch, datetimes_to_julian_days
+from app.services.slow_planet_table import (
+    SLOW_PLANETS,
+    SlowPlanetTable,
+    build_slow_planet_table,
+    lookup_positions,
+    verify_slow_planet_table,
+)
+
+
+@pytest.fixture(scope="module")
+def table_dir(tmp_path_factory):
+    """Tabela reduzida (2025-2027) para manter os testes rápidos."""
+    output_dir = tmp_path_factory.mktemp("ephemeris_tables")
+    build_slow_planet_table(output_dir, start=datetime(2025, 1, 1), end=datetime(2027, 12, 31))
+    return output_dir
+
+
+@pytest.fixture
+def loaded_table(table_dir, monkeypatch):
+    """Substitui o singleton pela tabela reduzida."""
+    table = SlowPlanetTable(table_dir)
+    monkeypatch.setattr(slow_planet_table, "_slow_planet_table", table)
+    monkeypatch.setattr(slow_planet_table, "_table_load_attempted", True)
+    return table
+
+
+class TestSlowPlanetTable:
+    """Testes para geração, leitura e interpolação da tabela."""
+
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_table_is_memory_mapped_float32(self, loaded_table):
+        """TDD: A tabela deve ser float32 e lida via mmap (dia × planeta × 2)."""
+        assert isinstance(loaded_table.table, np.memmap)
+        assert loaded_table.table.dtype == np.float32
+        assert loaded_table.table.shape == (loaded_table.n_days, len(SLOW_PLANETS), 2)
+
+    @pytest.mark.critical
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_interpolation_matches_swiss_ephemeris(self, loaded_table):
+        """
+        TDD: Posições interpoladas entre dias devem bater com o cálculo direto.
+        Código crítico - alimenta a varredura de trânsitos futuros.
+        """
+        instants = [datetime(2026, 1, 3, 5, 17) + timedelta(hours=29 * i) for i in range(300)]
+
+        interpolated, _ = lookup_positions(instants, SLOW_PLANETS)
+        expected, _ = calculate_positions_batch(instants, SLOW_PLANETS)
+
+        for row in range(len(instants)):
+            for col in range(len(SLOW_PLANETS)):
+                assert shortest_angular_distance(interpolated[row, col], expected[row, col]) < 0.005
+
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_mixed_bodies_keep_requested_column_order(self, loaded_table):
+        """TDD: Planetas rápidos vêm do Swiss Ephemeris na coluna pedida."""
+        instants = [datetime(2026, 6, 1, 12, 0)]
+
+        longitudes, _ = lookup_positions(instants, ['moon', 'saturn', 'sun'])
+        expected, _ = calculate_positions_batch(instants, ['moon', 'saturn', 'sun'])
+
+        assert longitudes[0, 0] == pytest.approx(expected[0, 0])
+        assert longitudes[0, 2] == pytest.approx(expected[0, 2])
+        assert shortest_angular_distance(longitudes[0, 1], expected[0, 1]) < 0.005
+
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_dates_outside_table_fall_back_to_swiss_ephemeris(self, loaded_table):
+        """TDD: Datas fora do intervalo da tabela devem usar o cálculo direto."""
+        instants = [datetime(2030, 1, 1)]
+        assert not loaded_table.covers(datetimes_to_julian_days(instants))
+
+        longitudes, _ = lookup_positions(instants, SLOW_PLANETS)
+        expected, _ = calculate_positions_batch(instants, SLOW_PLANETS)
+
+        assert np.allclose(longitudes, expected)
+
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_missing_table_falls_back_to_swiss_ephemeris(self, monkeypatch):
+        """TDD: Sem tabela gerada, lookup_positions deve calcular diretamente."""
+        monkeypatch.setattr(slow_planet_table, "_slow_planet_table", None)
+        monkeypatch.setattr(slow_planet_table, "_table_load_attempted", True)
+        instants = [datetime(2026, 1, 1)]
+
+        longitudes, _ = lookup_positions(instants, ['jupiter'])
+        expected, _ = calculate_positions_batch(instants, ['jupiter'])
+
+        assert np.allclose(longitudes, expected)
+
+    @pytest.mark.unit
+    def test_verification_accepts_generated_table(self, table_dir):
+        """TDD: A tabela recém-gerada deve passar na verificação do build."""
+        table = verify_slow_planet_table(table_dir, start=datetime(2025, 1, 1), end=datetime(2027, 12, 31))
+
+        assert table.bodies == SLOW_PLANETS
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_verification_rejects_incomplete_or_corrupted_table(self, table_dir, tmp_path):
+        """
+        TDD: Tabela ausente, de outro intervalo ou com valores corrompidos deve falhar a verificação.
+        Código crítico - o build da imagem falha em vez de publicar uma tabela errada.
+        """
+        import shutil
+        start, end = datetime(2025, 1, 1), datetime(2027, 12, 31)
+
+        with pytest.raises(ValueError):
+            verify_slow_planet_table(tmp_path / "vazio", start=start, end=end)
+        with pytest.raises(ValueError):
+            verify_slow_planet_table(table_dir, start=start, end=datetime(2028, 12, 31))
+
+        corrupted_dir = tmp_path / "corrompida"
+        shutil.copytree(table_dir, corrupted_dir)
+        table = np.load(corrupted_dir / slow_planet_table.TABLE_FILENAME, mmap_mode='r+')
+        table[10, 0, 0] = np.nan
+        table.flush()
+        del table
+        with pytest.raises(ValueError):
+            verify_slow_planet_table(corrupted_dir, start=start, end=end)
@@ -0,0 +1,102 @@
+"""
+Testes TDD para o Solver da Revolução Solar.
+Garante o instante exato do retorno do Sol (segundos) com poucas avaliações.
+"""
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from app.services.astrology_calculator import shortest_angular_distance
+from app.services.ephemeris_batch_engine import calculate_positions_at
+from app.services.solar_return_solver import find_solar_returns, solve_solar_return
+
+
+BIRTH_DATE = datetime(1990, 5, 15)
+BIRTH_TIME = "10:30"
+LATITUDE, LONGITUDE = -23.5505, -46.6333
+TIMEZONE = "America/Sao_Paulo"
+
+
+def _sun(instant: datetime) -> float:
+    return calculate_positions_at(instant, ['sun'])['sun']
+
+
+class TestSolarReturnSolver:
+    """Testes para o instante exato da Revolução Solar."""
+
+    @pytest.mark.critical
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_return_instant_matches_natal_sun(self):
+        """
+        TDD: No instante calculado o Sol deve estar na longitude natal (precisão de segundos).
+        Código crítico - define o mapa anual do usuário.
+        """
+        natal_sun = _sun(datetime(1990, 5, 15, 13, 30))  # 10:30 em São Paulo = 13:30 UTC
+
+        solar_return = find_solar_returns(BIRTH_DATE, BIRTH_TIME, LATITUDE, LONGITUDE, [2025], TIMEZONE)[0]
+
+        # O Sol anda ~0,041° por hora: 2 segundos ≈ 0,00003°
+        assert shortest_angular_distance(_sun(solar_return['utc_datetime']), natal_sun) < 3e-5
+        assert solar_return['local_datetime'] == solar_return['utc_datetime'] - timedelta(hours=3)
+        assert solar_return['local_datetime'].date() in (datetime(2025, 5, 14).date(), datetime(2025, 5, 15).date())
+
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_range_of_years_uses_few_sun_evaluations(self):
+        """TDD: Cada ano deve custar apenas algumas avaliações do Sol."""
+        years = list(range(2000, 2031))
+
+        returns = find_solar_returns(BIRTH_DATE, BIRTH_TIME, LATITUDE, LONGITUDE, years, TIMEZONE)
+
+        assert [r['target_year'] for r in returns] == years
+        assert all(r['utc_datetime'].year == year for r, year in zip(returns, years))
+        assert max(r['evaluations'] for r in returns) <= 5
+
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_leap_day_birth_has_return_every_year(self):
+        """TDD: Nascidos em 29/02 devem ter retorno também em anos não bissextos."""
+        returns = find_solar_returns(datetime(1992, 2, 29), "23:50", LATITUDE, LONGITUDE, [1993, 1994, 1995], TIMEZONE)
+
+        for solar_return in returns:
+            assert solar_return['local_datetime'].month in (2, 3)
+
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_bad_initial_guess_falls_back_to_bracketing(self):
+        """TDD: Uma estimativa ruim deve cair na salvaguarda e ainda encontrar a raiz."""
+        natal_sun = _sun(datetime(2025, 5, 15, 0, 0))
+        guess = 2460810.5 + 2.0  # 2 dias depois de 2025-05-15 00:00 UTC
+
+        with patch('app.services.solar_return_solver.MAX_NEWTON_ITERATIONS', 0):
+            solution = solve_solar_return(natal_sun, guess)
+
+        assert solution['julian_day'] == pytest.approx(2460810.5, abs=1.0 / 1440.0)
+
+
+class TestSolarReturnChart:
+    """Testes para o mapa completo da Revolução Solar."""
+
+    @pytest.mark.critical
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_chart_is_built_once_for_exact_instant(self):
+        """
+        TDD: Apenas o mapa final deve ser construído com kerykeion, no minuto do retorno.
+        Código crítico - antes eram dezenas de mapas completos por requisição.
+        """
+        from app.services import swiss_ephemeris_calculator
+
+        real_create = swiss_ephemeris_calculator.create_kr_instance
+        with patch.object(swiss_ephemeris_calculator, 'create_kr_instance', side_effect=real_create) as create:
+            chart = swiss_ephemeris_calculator.calculate_solar_return(
+                BIRTH_DATE, BIRTH_TIME, LATITUDE, LONGITUDE, 2025, TIMEZONE
+            )
+
+        assert create.call_count == 1
+        assert chart['target_year'] == 2025
+        assert chart['sun_return_precision'] < 1e-4
+        natal_sun = _sun(datetime(1990, 5, 15, 13, 30))
+        # Mapa construído no minuto mais próximo: Sol a menos de 0,001° do natal
+        assert shortest_angular_distance(chart['planet_longitudes']['sun'], natal_sun) < 1e-3
@@ -0,0 +1,117 @@
+"""
+Testes TDD para o Calendário da Lua Fora de Curso.
+Garante último aspecto e ingresso exatos e consultas sem recálculo.
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from app.services.aspect_event_solver import ASPECT_TARGETS
+from app.services.astrology_calculator import get_zodiac_sign
+from app.services.ephemeris_batch_engine import calculate_positions_at
+from app.services.moon_void_calculator import calculate_moon_void_of_course, get_void_of_course_periods
+from app.services.transits_calculator import calculate_aspect_angle
+from app.services.void_of_course_calendar import VoidOfCourseCalendar
+
+
+START = datetime(2026, 10, 1)
+END = datetime(2026, 11, 1)
+
+
+@pytest.fixture(scope="module")
+def periods():
+    return get_void_of_course_periods(START, END)
+
+
+class TestVoidOfCourseCalendar:
+    """Testes para os períodos calculados por eventos."""
+
+    @pytest.mark.critical
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_void_starts_at_exact_last_aspect(self, periods):
+        """
+        TDD: O início do período deve ser o instante exato do último aspecto da Lua.
+        Código crítico - horário exibido ao usuário.
+        """
+        for period in periods:
+            if period['last_aspect_planet'] is None:
+                continue
+            planet = period['last_aspect_planet']
+            positions = calculate_positions_at(period['start'], ['moon', planet])
+            angle = calculate_aspect_angle(positions['moon'], positions[planet])
+            # A Lua anda ~0,01° em 1 minuto
+            assert angle == pytest.approx(ASPECT_TARGETS[period['last_aspect']], abs=0.01)
+
+    @pytest.mark.critical
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_void_ends_at_sign_ingress(self, periods):
+        """TDD: O fim do período deve ser o ingresso da Lua no próximo signo."""
+        assert len(periods) >= 12
+        for period in periods:
+            before = calculate_positions_at(period['end'] - timedelta(minutes=1), ['moon'])['moon']
+            after = calculate_positions_at(period['end'] + timedelta(minutes=1), ['moon'])['moon']
+            assert get_zodiac_sign(before)['sign'] == period['moon_sign']
+            assert get_zodiac_sign(after)['sign'] == period['next_sign']
+
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_periods_are_ordered_and_disjoint(self, periods):
+        """TDD: Os períodos devem estar em ordem e sem sobreposição."""
+        for current, following in zip(periods, periods[1:]):
+            assert current['start'] < current['end'] <= following['start']
+
+    @pytest.mark.unit
+    def test_lookups_inside_coverage_do_not_recompute(self):
+        """TDD: Consultas dentro do intervalo já calculado devem ser apenas buscas."""
+        calendar = VoidOfCourseCalendar()
+        calendar.void_periods(START, END)
+        computed = calendar.stats()['passages_computed']
+
+        for hour in range(0, 24 * 30, 6):
+            calendar.sign_passage(START + timedelta(hours=hour))
+
+        assert calendar.stats()['passages_computed'] == computed
+
+    @pytest.mark.unit
+    def test_backward_extension_matches_forward_calculation(self):
+        """TDD: Estender o calendário para trás deve gerar os mesmos períodos."""
+        forward = VoidOfCourseCalendar().void_periods(START, END)
+        calendar = VoidOfCourseCalendar()
+        calendar.void_periods(END, END + timedelta(days=5))
+
+        backward = calendar.void_periods(START, END)
+
+        assert [(p['start'], p['end']) for p in backward] == [(p['start'], p['end']) for p in forward]
+
+
+class TestMoonVoidOfCourse:
+    """Testes para calculate_moon_void_of_course sobre o calendário."""
+
+    @pytest.mark.critical
+    @pytest.mark.calculation
+    @pytest.mark.unit
+    def test_is_void_inside_period_only(self, periods):
+        """
+        TDD: A Lua deve estar fora de curso apenas entre o último aspecto e o ingresso.
+        Código crítico - penaliza horários no best timing.
+        """
+        period = periods[3]
+        middle = period['start'] + (period['end'] - period['start']) / 2
+
+        inside = calculate_moon_void_of_course(middle)
+        before = calculate_moon_void_of_course(period['start'] - timedelta(minutes=5))
+
+        assert inside['is_void'] is True
+        assert (inside['void_start'], inside['void_end']) == (period['start'], period['end'])
+        assert inside['next_aspect'] == "Mudança de signo"
+        assert before['is_void'] is False
+        assert before['next_aspect_time'] == period['start']
+
+    @pytest.mark.unit
+    def test_result_does_not_depend_on_location(self, periods):
+        """TDD: O cálculo é geocêntrico - a localização não altera o resultado."""
+        instant = periods[0]['start'] + timedelta(minutes=30)
+
+        assert calculate_moon_void_of_course(instant, -23.55, -46.63) == \
+            calculate_moon_void_of_course(instant, 51.5, -0.12)
@@ -0,0 +1,152 @@
+"""
+Testes TDD para a Inicialização Rápida (aquecimento em segundo plano, /livez e /readyz).
+Garante que o servidor sobe sem dependências pesadas e só fica pronto após o aquecimento.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect
+
+from app.core import warmup
+from app.core.migrations import run_migrations
+
+
+BACKEND_ROOT = Path(__file__).parent.parent.parent
+
+
+@pytest.fixture
+def client():
+    """Cliente de teste para a API (sem disparar o startup)."""
+    from app.main import app
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def clean_warmup_state():
+    warmup.reset_warmup()
+    yield
+    warmup.reset_warmup()
+
+
+class TestLazyStartup:
+    """Testes para o import leve de app.main."""
+
+    @pytest.mark.critical
+    @pytest.mark.unit
+    def test_importing_app_does_not_load_heavy_dependencies(self):
+        """
+        TDD: Importar app.main não deve carregar kerykeion, Swiss Ephemeris, FastEmbed nem ONNX.
+        Código crítico - o container precisa aceitar conexões em menos de um segundo.
+        """
+        heavy = ['kerykeion', 'swisseph', 'fastembed', 'onnxruntime', 'app.services.rag_service_fastembed']
+        code = (
+            "import sys, app.main; "
+            f"print('LOADED=' + ','.join(m for m in {heavy!r} if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=BACKEND_ROOT, capture_output=True, text=True, timeout=120
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip().splitlines()[-1] == "LOADED="
+
+    @pytest.mark.unit
+    def test_run_migrations_creates_tables(self, tmp_path):
+        """TDD: As migrações fora de banda devem criar as tabelas em um banco vazio."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+
+        assert run_migrations(engine) is True
+        assert {'users', 'birth_charts', 'pending_registrations', 'interpretation_cache'} <= set(
+            inspect(engine).get_table_names()
+        )
+
+
+class TestWarmup:
+    """Testes para as etapas do aquecimento."""
+
+    @pytest.mark.unit
+    def test_failed_step_does_not_stop_the_others(self):
+        """TDD: Uma etapa com erro deve ser registrada e as seguintes devem rodar."""
+        calls = []
+
+        def failing():
+            raise RuntimeError("modelo ausente")
+
+        state = warmup.run_warmup([
+            ('rag', failing),
+            ('ai_provider', lambda: calls.append('ai_provider')),
+        ])
+
+        assert calls == ['ai_provider']
+        assert state['steps']['rag']['status'] == 'failed'
+        assert state['steps']['rag']['error'] == 'modelo ausente'
+        assert state['steps']['ai_provider']['status'] == 'ok'
+        assert state['finished_at'] is not None
+
+    @pytest.mark.unit
+    def test_steps_follow_settings(self):
+        """TDD: Migrações e carga das dependências devem respeitar a configuração."""
+        with patch.object(warmup.settings, 'RUN_MIGRATIONS_ON_STARTUP', False), \
+                patch.object(warmup.settings, 'WARMUP_ON_STARTUP', False):
+            assert [name for name, _ in warmup.warmup_steps()] == ['database']
+
+        with patch.object(warmup.settings, 'RUN_MIGRATIONS_ON_STARTUP', True), \
+                patch.object(warmup.settings, 'WARMUP_ON_STARTUP', True):
+            assert [name for name, _ in warmup.warmup_steps()] == [
+                'migrations', 'database', 'ephemeris', 'rag', 'ai_provider'
+            ]
+
+    @pytest.mark.unit
+    def test_start_warmup_runs_once(self):
+        """TDD: O aquecimento deve ser iniciado uma única vez por processo."""
+        with patch.object(warmup, 'run_warmup') as run:
+            assert warmup.start_warmup() is True
+            assert warmup.start_warmup() is False
+            warmup._thread.join(timeout=5)
+
+        run.assert_called_once()
+
+
+class TestHealthEndpoints:
+    """Testes para /livez e /readyz."""
+
+    @pytest.mark.api
+    def test_livez_always_ok(self, client):
+        """TDD: /livez deve responder 200 mesmo antes do aquecimento."""
+        response = client.get("/livez")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "alive"
+
+    @pytest.mark.critical
+    @pytest.mark.api
+    def test_readyz_waits_for_warmup(self, client):
+        """
+        TDD: /readyz deve responder 503 até o aquecimento terminar e 200 depois.
+        Código crítico - evita que a primeira requisição pague a carga do modelo.
+        """
+        starting = client.get("/readyz")
+        assert starting.status_code == 503
+        assert starting.json()["status"] == "starting"
+
+        warmup.run_warmup([('ephemeris', lambda: None)])
+        ready = client.get("/readyz")
+
+        assert ready.status_code == 200
+        assert ready.json()["ready"] is True
+        assert ready.json()["warmup"]["steps"]["ephemeris"]["status"] == "ok"
+
+    @pytest.mark.api
+    def test_readyz_unavailable_when_database_is_down(self, client):
+        """TDD: Sem banco, /readyz deve responder 503 mesmo com o aquecimento concluído."""
+        warmup.run_warmup([])
+        with patch.object(warmup, 'check_database', side_effect=RuntimeError("sem conexão")):
+            response = client.get("/readyz")
+
+        assert response.status_code == 503
+        assert response.json()["database"] == "disconnected"
+        assert response.json()["status"] == "unavailable"
@@ -16,6 +16,7 @@ class Settings(BaseSettings):
     DOCS_PATH: str = "docs"
     INDEX_PATH: str = "rag_index_fastembed"
     BGE_MODEL_NAME: str = "BAAI/bge-small-en-v1.5"
+    RAG_ANN_BACKEND: str = ""  # "" (busca exata), "hnsw" (hnswlib) ou "ivfpq" (faiss-cpu)
     
     # Server Configuration
     HOST: str = "0.0.0.0"
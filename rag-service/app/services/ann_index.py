@@ -0,0 +1,207 @@
+"""
+Índice de Vizinhos Aproximados (ANN) para a base de conhecimento do RAG.
+
+Backends opcionais:
+- 'hnsw': grafo HNSW via hnswlib (pip install hnswlib)
+- 'ivfpq': IVF com quantização por produto via faiss (pip install faiss-cpu)
+
+Os vetores devem estar normalizados (produto interno = similaridade cosseno).
+O esforço de busca é ajustável por consulta: ef (HNSW) ou nprobe (IVF-PQ);
+valores maiores aumentam o recall e a latência.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Importações opcionais com tratamento de erro
+try:
+    import hnswlib
+    HAS_HNSWLIB = True
+except ImportError:
+    hnswlib = None
+    HAS_HNSWLIB = False
+
+try:
+    import faiss
+    HAS_FAISS = True
+except ImportError:
+    faiss = None
+    HAS_FAISS = False
+
+
+ANN_BACKENDS = ('hnsw', 'ivfpq')
+
+ANN_METADATA_FILENAME = "ann_metadata.json"
+ANN_INDEX_FILENAMES = {
+    'hnsw': "ann_hnsw.bin",
+    'ivfpq': "ann_ivfpq.faiss",
+}
+
+# Parâmetros de construção
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+DEFAULT_HNSW_EF = 64
+
+IVF_PQ_BITS = 8
+IVF_MIN_TRAINING_POINTS = 39  # faiss recomenda ~39 pontos por centróide
+DEFAULT_IVF_NPROBE = 16
+
+
+def is_backend_available(backend: str) -> bool:
+    """Se a biblioteca do backend está instalada."""
+    if backend == 'hnsw':
+        return HAS_HNSWLIB
+    if backend == 'ivfpq':
+        return HAS_FAISS
+    return False
+
+
+def _pq_subquantizers(dim: int) -> int:
+    """Maior número de subquantizadores <= 64 que divide a dimensão."""
+    for m in range(min(64, dim), 0, -1):
+        if dim % m == 0 and dim // m >= 4:
+            return m
+    return 1
+
+
+class ANNIndex:
+    """Índice ANN sobre vetores normalizados (ids = posição na matriz)."""
+
+    def __init__(self, backend: str, dim: int, index, size: int, default_effort: int):
+        self.backend = backend
+        self.dim = dim
+        self.index = index
+        self.size = size
+        self.default_effort = default_effort
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, backend: str) -> "ANNIndex":
+        """
+        Constrói o índice a partir de vetores normalizados (n × dim).
+
+        Raises:
+            ValueError: Backend desconhecido ou poucos vetores para treinar o IVF-PQ
+            ImportError: Biblioteca do backend não instalada
+        """
+        if backend not in ANN_BACKENDS:
+            raise ValueError(f"Backend ANN desconhecido: {backend}")
+        if not is_backend_available(backend):
+            raise ImportError(f"Backend ANN '{backend}' indisponível. Instale hnswlib ou faiss-cpu")
+
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        n, dim = vectors.shape
+
+        if backend == 'hnsw':
+            index = hnswlib.Index(space='ip', dim=dim)
+            index.init_index(max_elements=n, ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+            index.add_items(vectors, np.arange(n))
+            return cls(backend, dim, index, n, DEFAULT_HNSW_EF)
+
+        # Cada centróide do PQ precisa de pontos de treino suficientes
+        if n < 2 ** IVF_PQ_BITS * IVF_MIN_TRAINING_POINTS // 4:
+            raise ValueError(f"Poucos vetores ({n}) para treinar IVF-PQ; use 'hnsw' ou a busca exata")
+
+        nlist = max(1, min(int(4 * np.sqrt(n)), n // IVF_MIN_TRAINING_POINTS))
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFPQ(
+            quantizer, dim, nlist, _pq_subquantizers(dim), IVF_PQ_BITS, faiss.METRIC_INNER_PRODUCT
+        )
+        index.train(vectors)
+        index.add(vectors)
+        return cls(backend, dim, index, n, DEFAULT_IVF_NPROBE)
+
+    def search(self, query: np.ndarray, k: int, effort: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Busca os k vizinhos aproximados de um vetor normalizado.
+
+        Args:
+            query: Vetor de consulta normalizado (dim,)
+            k: Número de vizinhos
+            effort: ef (HNSW) ou nprobe (IVF-PQ). Se None, usa o padrão do índice
+
+        Returns:
+            Tupla (índices, similaridades aproximadas) em ordem decrescente
+        """
+        k = min(k, self.size)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        query = np.ascontiguousarray(query, dtype=np.float32).reshape(1, -1)
+        effort = effort or self.default_effort
+
+        if self.backend == 'hnsw':
+            # ef precisa ser >= k
+            self.index.set_ef(max(effort, k))
+            labels, distances = self.index.knn_query(query, k=k)
+            return labels[0].astype(np.int64), 1.0 - distances[0]
+
+        self.index.nprobe = effort
+        scores, labels = self.index.search(query, k)
+        valid = labels[0] >= 0
+        return labels[0][valid].astype(np.int64), scores[0][valid]
+
+    def save(self, index_dir: Path) -> None:
+        """
+        Salva o índice e seus metadados no diretório do índice RAG.
+
+        Cada arquivo é gravado em um temporário (por processo) e renomeado:
+        vários workers podem salvar ao mesmo tempo e um leitor nunca vê um
+        arquivo pela metade. Os metadados vão por último.
+        """
+        index_dir = Path(index_dir)
+        index_path = index_dir / ANN_INDEX_FILENAMES[self.backend]
+        temp_index_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+        if self.backend == 'hnsw':
+            self.index.save_index(str(temp_index_path))
+        else:
+            faiss.write_index(self.index, str(temp_index_path))
+        os.replace(temp_index_path, index_path)
+
+        metadata = {
+            'backend': self.backend,
+            'dim': self.dim,
+            'size': self.size,
+            'default_effort': self.default_effort
+        }
+        metadata_path = index_dir / ANN_METADATA_FILENAME
+        temp_metadata_path = metadata_path.with_name(f"{metadata_path.name}.{os.getpid()}.tmp")
+        with open(temp_metadata_path, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2)
+        os.replace(temp_metadata_path, metadata_path)
+
+    @classmethod
+    def load(cls, index_dir: Path, backend: str) -> Optional["ANNIndex"]:
+        """
+        Carrega o índice salvo para o backend pedido.
+
+        Returns:
+            ANNIndex ou None se não existir (ou se for de outro backend)
+        """
+        index_dir = Path(index_dir)
+        metadata_path = index_dir / ANN_METADATA_FILENAME
+        if backend not in ANN_BACKENDS or not metadata_path.exists() or not is_backend_available(backend):
+            return None
+
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        if metadata.get('backend') != backend:
+            return None
+
+        index_path = index_dir / ANN_INDEX_FILENAMES[backend]
+        if not index_path.exists():
+            return None
+
+        dim, size = int(metadata['dim']), int(metadata['size'])
+        if backend == 'hnsw':
+            index = hnswlib.Index(space='ip', dim=dim)
+            index.load_index(str(index_path), max_elements=size)
+        else:
+            index = faiss.read_index(str(index_path))
+
+        default_effort = metadata.get('default_effort') or (
+            DEFAULT_HNSW_EF if backend == 'hnsw' else DEFAULT_IVF_NPROBE
+        )
+        return cls(backend, dim, index, size, int(default_effort))
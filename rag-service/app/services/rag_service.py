@@ -31,8 +31,14 @@ try:
 except ImportError:
     HAS_GROQ = False
 
+from app.services.ann_index import ANN_BACKENDS, ANNIndex
 from app.services.local_knowledge_base import LocalKnowledgeBase
 
+# Candidatos pedidos ao índice ANN por resultado (reavaliados com a similaridade exata)
+ANN_RERANK_FACTOR = 4
+# Fator extra de candidatos quando há filtro de categoria
+ANN_CATEGORY_OVERSAMPLE = 4
+
 
 def _chunk_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[str]:
     """
@@ -75,6 +81,34 @@ def _chunk_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) ->
     return chunks
 
 
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    Normaliza cada linha para norma 1 (float32), de modo que o produto
+    escalar seja a similaridade cosseno. Linhas nulas permanecem nulas.
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Índices dos k maiores scores em ordem decrescente.
+    Usa argpartition (O(n)) e ordena apenas os k selecionados.
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+
 class RAGServiceFastEmbed:
     """Serviço RAG usando FastEmbed e modelo BGE do Hugging Face."""
     
@@ -83,7 +117,8 @@ class RAGServiceFastEmbed:
         docs_path: str = "docs",
         index_path: str = "rag_index_fastembed",
         groq_api_key: Optional[str] = None,
-        bge_model_name: str = "BAAI/bge-small-en-v1.5"
+        bge_model_name: str = "BAAI/bge-small-en-v1.5",
+        ann_backend: Optional[str] = None
     ):
         """
         Inicializa o serviço RAG com FastEmbed.
@@ -93,6 +128,7 @@ class RAGServiceFastEmbed:
             index_path: Caminho para salvar/carregar o índice
             groq_api_key: Chave API do Groq para geração
             bge_model_name: Nome do modelo BGE do Hugging Face
+            ann_backend: Índice aproximado opcional ('hnsw' ou 'ivfpq'). None = busca exata
         """
         self.docs_path = Path(docs_path)
         self.index_path = Path(index_path)
@@ -104,6 +140,17 @@ class RAGServiceFastEmbed:
         self.documents: List[Dict[str, Any]] = []  # Lista de documentos com embeddings
         self.embeddings_matrix: Optional[np.ndarray] = None  # Matriz de embeddings
         
+        # Estado da busca vetorial (matriz normalizada e máscaras por categoria),
+        # reconstruído sempre que a matriz de origem muda
+        self._search_state: Optional[Dict[str, Any]] = None
+        
+        # Índice ANN opcional
+        if ann_backend and ann_backend not in ANN_BACKENDS:
+            print(f"[WARNING] Backend ANN desconhecido '{ann_backend}', usando busca exata")
+            ann_backend = None
+        self.ann_backend: Optional[str] = ann_backend or None
+        self.ann_index: Optional[ANNIndex] = None
+        
         if not HAS_FASTEMBED:
             print("[WARNING] FastEmbed não instalado. Instale com: pip install fastembed")
             return
@@ -352,6 +399,7 @@ class RAGServiceFastEmbed:
             doc['embedding'] = embeddings_list[i]
         
         self.documents = documents
+        self._build_ann_index()
         
         print(f"[RAG-FastEmbed] Índice criado com sucesso!")
         print(f"  → {len(documents)} chunks indexados")
@@ -381,11 +429,16 @@ class RAGServiceFastEmbed:
         # Salvar embeddings como numpy array (mais eficiente)
         np.save(self.index_path / "embeddings.npy", self.embeddings_matrix)
         
+        # Salvar índice ANN (se configurado)
+        if self.ann_index is not None:
+            self.ann_index.save(self.index_path)
+        
         # Salvar metadados
         metadata = {
             'model_name': self.bge_model_name,
             'num_documents': len(self.documents),
-            'embedding_dim': self.embeddings_matrix.shape[1]
+            'embedding_dim': self.embeddings_matrix.shape[1],
+            'ann_backend': self.ann_index.backend if self.ann_index is not None else None
         }
         with open(self.index_path / "metadata.json", 'w', encoding='utf-8') as f:
             json.dump(metadata, f, indent=2)
@@ -436,6 +489,14 @@ class RAGServiceFastEmbed:
                 doc['embedding'] = self.embeddings_matrix[i].tolist()
                 self.documents.append(doc)
             
+            # Carregar índice ANN salvo (ou construí-lo se o índice base for mais antigo)
+            if self.ann_backend:
+                self.ann_index = ANNIndex.load(self.index_path, self.ann_backend)
+                if self.ann_index is None or self.ann_index.size != len(self.documents):
+                    print(f"[RAG-FastEmbed] Índice ANN '{self.ann_backend}' não encontrado, construindo...")
+                    self._build_ann_index()
+                    self._save_rebuilt_ann_index()
+            
             print(f"[RAG-FastEmbed] Índice carregado de {self.index_path}")
             print(f"  → {len(self.documents)} documentos carregados")
             return True
@@ -454,12 +515,101 @@ class RAGServiceFastEmbed:
             return 0.0
         return float(dot_product / (norm1 * norm2))
     
+    def _save_rebuilt_ann_index(self) -> None:
+        """Persiste o índice ANN reconstruído no startup (os próximos workers só o carregam)."""
+        if self.ann_index is None:
+            return
+        try:
+            self.ann_index.save(self.index_path)
+            print(f"[RAG-FastEmbed] Índice ANN '{self.ann_backend}' salvo em {self.index_path}")
+        except Exception as e:
+            print(f"[WARNING] Não foi possível salvar o índice ANN (será reconstruído no próximo startup): {e}")
+    
+    def _build_ann_index(self) -> None:
+        """Constrói o índice ANN configurado sobre os embeddings normalizados."""
+        self.ann_index = None
+        if not self.ann_backend or self.embeddings_matrix is None or not self.documents:
+            return
+        
+        try:
+            state = self._get_search_state()
+            self.ann_index = ANNIndex.build(state['normalized'], self.ann_backend)
+            print(f"[RAG-FastEmbed] Índice ANN '{self.ann_backend}' construído ({self.ann_index.size} vetores)")
+        except (ImportError, ValueError) as e:
+            print(f"[WARNING] Índice ANN indisponível, usando busca exata: {e}")
+    
+    def _get_search_state(self) -> Dict[str, Any]:
+        """
+        Matriz normalizada e categorias dos documentos.
+        Recalculada apenas quando a matriz de embeddings é substituída.
+        """
+        state = self._search_state
+        if state is None or state['source'] is not self.embeddings_matrix or state['size'] != len(self.documents):
+            state = {
+                'source': self.embeddings_matrix,
+                'size': len(self.documents),
+                'normalized': _normalize_rows(self.embeddings_matrix[:len(self.documents)]),
+                'categories': np.array([doc.get('category') for doc in self.documents], dtype=object),
+                'masks': {}
+            }
+            self._search_state = state
+        return state
+    
+    def _category_mask(self, state: Dict[str, Any], category: str) -> np.ndarray:
+        """Máscara booleana (pré-computada) dos documentos de uma categoria."""
+        mask = state['masks'].get(category)
+        if mask is None:
+            mask = state['categories'] == category
+            state['masks'][category] = mask
+        return mask
+    
+    def _rank_documents(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int,
+        category: Optional[str] = None,
+        ann_effort: Optional[int] = None
+    ) -> List[tuple]:
+        """
+        Rankeia documentos por similaridade cosseno (uma multiplicação matriz × vetor).
+        Com índice ANN, os documentos são pré-selecionados pelo índice e
+        reavaliados com a similaridade exata.
+        
+        Returns:
+            Lista de tuplas (score, índice) em ordem decrescente
+        """
+        state = self._get_search_state()
+        query_vector = _normalize_rows(query_embedding)[0]
+        
+        if self.ann_index is not None and self.ann_index.size == state['size']:
+            n_candidates = top_k * ANN_RERANK_FACTOR
+            if category:
+                n_candidates *= ANN_CATEGORY_OVERSAMPLE
+            indices, _ = self.ann_index.search(query_vector, n_candidates, effort=ann_effort)
+            if category:
+                mask = self._category_mask(state, category)
+                indices = indices[mask[indices]]
+            # Filtro de categoria muito restritivo: usar a busca exata
+            if not category or len(indices) >= min(top_k, int(self._category_mask(state, category).sum())):
+                scores = state['normalized'][indices] @ query_vector
+                order = _top_k_indices(scores, top_k)
+                return [(float(scores[i]), int(indices[i])) for i in order]
+        
+        scores = state['normalized'] @ query_vector
+        if category:
+            indices = np.flatnonzero(self._category_mask(state, category))
+            best = indices[_top_k_indices(scores[indices], top_k)]
+        else:
+            best = _top_k_indices(scores, top_k)
+        return [(float(scores[i]), int(i)) for i in best]
+    
     def search(
         self, 
         query: str, 
         top_k: int = 5, 
         expand_query: bool = False,
-        category: Optional[str] = None
+        category: Optional[str] = None,
+        ann_effort: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Busca documentos relevantes para a query.
@@ -469,6 +619,7 @@ class RAGServiceFastEmbed:
             top_k: Número de resultados a retornar
             expand_query: Se True, faz múltiplas buscas com variações da query
             category: Filtrar por categoria ('astrology' ou 'numerology')
+            ann_effort: Esforço do índice ANN (ef/nprobe): maior = mais recall e latência
         
         Returns:
             Lista de documentos relevantes com metadados e score
@@ -538,29 +689,14 @@ class RAGServiceFastEmbed:
             # Buscar mais resultados se houver filtro de categoria (otimizado: reduzido de *3 para *1.5)
             search_top_k = int(top_k * 1.5) if category else (int(top_k * 1.2) if expand_query else top_k)
             
-            # Calcular similaridade com todos os documentos
-            similarities = []
-            for i, doc in enumerate(self.documents):
-                # Filtrar por categoria se especificada
-                if category and doc.get('category') != category:
-                    continue
-                
-                doc_embedding = np.array(doc.get('embedding', []))
-                if len(doc_embedding) == 0:
-                    continue
-                
-                similarity = self._cosine_similarity(query_embedding, doc_embedding)
-                similarities.append((similarity, i))
-            
-            # Ordenar por similaridade e pegar top_k
-            similarities.sort(reverse=True, key=lambda x: x[0])
-            top_indices = [idx for _, idx in similarities[:search_top_k]]
+            # Similaridade com todos os documentos em uma única multiplicação
+            # matriz × vetor (ou via índice ANN, se configurado)
+            similarities = self._rank_documents(query_embedding, search_top_k, category, ann_effort)
             
             # Converter para formato esperado
             results = []
-            for idx in top_indices:
+            for similarity_score, idx in similarities:
                 doc = self.documents[idx]
-                similarity_score = similarities[top_indices.index(idx)][0] if top_indices else 0.0
                 
                 results.append({
                     'text': doc.get('text', ''),
@@ -1008,7 +1144,8 @@ def get_rag_service() -> RAGServiceFastEmbed:
             docs_path=str(docs_path),
             index_path=str(index_path),
             groq_api_key=groq_api_key,
-            bge_model_name=settings.BGE_MODEL_NAME
+            bge_model_name=settings.BGE_MODEL_NAME,
+            ann_backend=settings.RAG_ANN_BACKEND or None
         )
         
         # Tentar carregar índice existente
@@ -226,6 +226,59 @@ class TestRAGServiceSearch:
         pass
 
 
+
+class TestRAGServiceVectorSearch:
+    """Testes para a busca matricial e o índice ANN (sem carregar o modelo BGE)."""
+    
+    @pytest.fixture
+    def service(self):
+        """Serviço com embeddings sintéticos."""
+        rng = np.random.default_rng(11)
+        service = RAGServiceFastEmbed.__new__(RAGServiceFastEmbed)
+        service.embeddings_matrix = rng.normal(size=(500, 16)).astype(np.float32)
+        service.documents = [
+            {'text': f"doc {i}", 'category': 'numerology' if i % 2 else 'astrology'}
+            for i in range(500)
+        ]
+        service._search_state = None
+        service.ann_backend = None
+        service.ann_index = None
+        return service
+    
+    def test_rank_matches_cosine_similarity(self, service):
+        """Testa que o ranking matricial é o mesmo da similaridade par a par."""
+        query = np.random.default_rng(5).normal(size=16)
+        ranked = service._rank_documents(query, 10)
+        
+        expected = sorted(
+            range(500),
+            key=lambda i: service._cosine_similarity(query, service.embeddings_matrix[i]),
+            reverse=True
+        )[:10]
+        assert [idx for _, idx in ranked] == expected
+    
+    def test_rank_with_category_filter(self, service):
+        """Testa que o filtro de categoria usa apenas documentos da categoria."""
+        query = np.random.default_rng(5).normal(size=16)
+        ranked = service._rank_documents(query, 10, category='numerology')
+        assert len(ranked) == 10
+        assert all(idx % 2 == 1 for _, idx in ranked)
+    
+    def test_hnsw_index_matches_exact_search(self, service):
+        """Testa que o índice HNSW (se instalado) retorna o mesmo top-k da busca exata."""
+        from app.services.ann_index import HAS_HNSWLIB
+        if not HAS_HNSWLIB:
+            pytest.skip("hnswlib não instalado")
+        
+        query = np.random.default_rng(5).normal(size=16)
+        exact = service._rank_documents(query, 10)
+        
+        service.ann_backend = 'hnsw'
+        service._build_ann_index()
+        assert service.ann_index is not None
+        assert [idx for _, idx in service._rank_documents(query, 10)] == [idx for _, idx in exact]
+
+
 @pytest.fixture
 def temp_dir():
     """Fixture para diretório temporário."""